@@ -3,6 +3,7 @@ This file contains the logic for parsing different types of log files on the mai
 */
 
 import fs from 'fs'
+import zlib from 'zlib'
 import createRecentLogsManager from '../settings/recentLogManager'
 
 const recentLogsManager = createRecentLogsManager()
@@ -269,7 +270,10 @@ export default function openFile(event, filePath) {
   }
 
   try {
-    const fileData = fs.readFileSync(filePath, 'utf8')
+    // Compressed FGCS telemetry logs (.ftlog.gz) are a series of gzip members
+    const fileData = filePath.endsWith('.gz')
+      ? zlib.gunzipSync(fs.readFileSync(filePath)).toString('utf8')
+      : fs.readFileSync(filePath, 'utf8')
     const fileLines = fileData.trim().split('\n')
 
     const logType = determineLogFileType(filePath, fileLines[0])
@@ -35,7 +35,10 @@ import { AddCommand } from "./spotlight/commandHandler.js"
 
 // Helper imports
 import { IconAlertTriangle } from "@tabler/icons-react"
-import { showErrorNotification } from "../helpers/notification.js"
+import {
+  showErrorNotification,
+  showNotification,
+} from "../helpers/notification.js"
 import { socket } from "../helpers/socket"
 
 // Styling imports
@@ -194,6 +197,13 @@ export default function Navbar({ currentPage }) {
       setDroneConnectionStatusMessage(msg.message)
     })
 
+    // Logs left behind by a previous session are recovered in the background after connecting
+    socket.on("log_recovery_status", (msg) => {
+      if (msg.total > 0 && msg.recovered === msg.total) {
+        showNotification("Recovered logs", msg.message)
+      }
+    })
+
     return () => {
       socket.off("connect")
       socket.off("disconnect")
@@ -204,6 +214,7 @@ export default function Navbar({ currentPage }) {
       socket.off("disconnect")
       socket.off("connection_error")
       socket.off("drone_connect_status")
+      socket.off("log_recovery_status")
       setConnected(false)
     }
   }, [])
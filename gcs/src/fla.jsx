@@ -786,7 +786,7 @@ export default function FLA() {
                 color={tailwindColors.blue[600]}
                 variant="filled"
                 onChange={updateFile}
-                accept={[".log", ".ftlog"]}
+                accept={[".log", ".ftlog", ".gz"]}
                 loading={loadingFile}
               >
                 {(props) => <Button {...props}>Analyse a log</Button>}
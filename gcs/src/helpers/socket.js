@@ -9,3 +9,20 @@ socket.on("connect", () => {
 socket.on("disconnect", () => {
   console.log("Disconnected from socket")
 })
+
+// The backend can send telemetry as batches, unpack them into individual
+// messages for the "incoming_msg" listeners
+socket.on("telemetry_batch", (batch) => {
+  const listeners = socket.listeners("incoming_msg")
+  if (listeners.length === 0) return
+
+  for (const record of batch.records) {
+    const msgType = record[0]
+    const fields = batch.fields[msgType]
+    const msg = { mavpackettype: msgType }
+    for (let i = 0; i < fields.length; i++) {
+      msg[fields[i]] = record[i + 1]
+    }
+    listeners.forEach((listener) => listener(msg))
+  }
+})
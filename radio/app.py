@@ -22,6 +22,6 @@ if __name__ == "__main__":
     print("Starting backend.")
     print(host)
     socketio.run(app, allow_unsafe_werkzeug=True, host=host, port=port)
-    if droneStatus.drone:
-        droneStatus.drone.close()
+    if droneStatus.drone or len(droneStatus.vehicles):
+        droneStatus.closeAllVehicles()
         print("Backend closed.")
@@ -40,6 +40,8 @@ if 'logs' in config and config['logs'].get('location'):
 else:
     log_dir = os.path.expanduser("~/.imacs/logs")
 
+telemetry_config = config.get('telemetry') or {}
+
 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 os.makedirs(log_dir, exist_ok=True)
@@ -0,0 +1,666 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from concurrent.futures import Future as ConcurrentFuture
+from logging import Logger, getLogger
+from threading import Thread
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import serial
+from pymavlink import mavutil
+
+from app.messageBus import MessageBus
+from app.messageDispatcher import MessageMatcher, MessageTypes
+from app.telemetryCoalescer import TelemetryCoalescer
+
+T = TypeVar("T")
+
+READ_SIZE = 4096
+DEFAULT_REQUEST_TIMEOUT = 3.0
+HEARTBEAT_TIMEOUT = 5.0
+# Sent from the same IDs as pymavlink uses by default, so the drone treats the async
+# link like any other GCS
+SOURCE_SYSTEM = 255
+SOURCE_COMPONENT = 0
+
+
+class LinkClosedError(ConnectionError):
+    """Raised to every request waiting on a link when it is closed or drops."""
+
+
+def parseConnectionString(connection_string: str) -> Tuple[str, str, int]:
+    """
+    Split a pymavlink style connection string into its transport, host and port. A
+    serial port is returned as the transport "serial" with the device as the host.
+
+    Args:
+        connection_string (str): For example tcp:127.0.0.1:5760, udpin:0.0.0.0:14550, udpout:127.0.0.1:14550 or /dev/ttyUSB0
+
+    Raises:
+        ValueError: If the host or port of a network connection is missing
+
+    Returns:
+        Tuple[str, str, int]: The transport, host or device, and port (0 for serial)
+    """
+    transport, _, address = connection_string.partition(":")
+    if transport not in ("tcp", "udp", "udpin", "udpout"):
+        return "serial", connection_string, 0
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid connection string {connection_string}")
+    # pymavlink treats udp: as listening
+    return ("udpin" if transport == "udp" else transport), host, int(port)
+
+
+class AsyncMessageSubscription(MessageMatcher):
+    def __init__(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> None:
+        """
+        A stream of every matching message from the drone, read with get() or by
+        iterating it with async for.
+        """
+        super().__init__(msg_types, condition, **fields)
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self._queue.put_nowait((msg, None))
+
+    def setException(self, exception: BaseException) -> None:
+        self._queue.put_nowait((None, exception))
+
+    async def get(
+        self, timeout: Optional[float] = None
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        """
+        Get the next matching message.
+
+        Args:
+            timeout (Optional[float], optional): The time to wait in seconds, None waits forever. Defaults to None.
+
+        Returns:
+            Optional[mavutil.mavlink.MAVLink_message]: The next matching message, or None if the timeout was reached
+
+        Raises:
+            LinkClosedError: If the link was closed
+        """
+        try:
+            msg, exception = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        if exception is not None:
+            # Keep the failure for any further calls
+            self._queue.put_nowait((None, exception))
+            raise exception
+        return msg
+
+    def __aiter__(self) -> AsyncIterator[mavutil.mavlink.MAVLink_message]:
+        return self
+
+    async def __anext__(self) -> mavutil.mavlink.MAVLink_message:
+        try:
+            return await self.get()
+        except LinkClosedError:
+            raise StopAsyncIteration from None
+
+
+class AsyncMessageDispatcher:
+    def __init__(self, logger: Logger) -> None:
+        """
+        The asyncio version of MessageDispatcher, routing messages to the requests and
+        subscriptions waiting on them. Everything runs on the event loop, so no locking
+        is needed and waiting on a response doesn't hold a thread.
+
+        Args:
+            logger (Logger): The logger to report dispatch errors to
+        """
+        self.logger = logger
+        self._pending: Dict[str, List[Tuple[MessageMatcher, asyncio.Future]]] = {}
+        self._subscriptions: Dict[str, List[AsyncMessageSubscription]] = {}
+        self._closed_exception: Optional[BaseException] = None
+
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> asyncio.Future:
+        """
+        Register a one-shot request for a message. Must be called before the request is
+        sent so the response cannot be missed.
+
+        Args:
+            msg_types (MessageTypes): The message type, or list of message types, to wait for
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the message. Defaults to None.
+            **fields: Message fields which must equal the given value
+
+        Returns:
+            asyncio.Future: Resolves to the matching message, cancelling it stops waiting
+        """
+        matcher = MessageMatcher(msg_types, condition, **fields)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        if self._closed_exception is not None:
+            future.set_exception(self._closed_exception)
+            return future
+
+        entry = (matcher, future)
+        for msg_type in matcher.msg_types:
+            self._pending.setdefault(msg_type, []).append(entry)
+        future.add_done_callback(lambda _: self.__remove(self._pending, entry))
+        return future
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> AsyncMessageSubscription:
+        """
+        Register a subscription receiving every matching message until it is removed
+        with unsubscribe().
+
+        Args:
+            msg_types (MessageTypes): The message type, or list of message types, to subscribe to
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the message. Defaults to None.
+            **fields: Message fields which must equal the given value
+
+        Returns:
+            AsyncMessageSubscription: The subscription
+        """
+        subscription = AsyncMessageSubscription(msg_types, condition, **fields)
+        if self._closed_exception is not None:
+            subscription.setException(self._closed_exception)
+            return subscription
+        for msg_type in subscription.msg_types:
+            self._subscriptions.setdefault(msg_type, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AsyncMessageSubscription) -> None:
+        for msg_type in subscription.msg_types:
+            self.__remove(self._subscriptions, subscription, msg_type)
+
+    def dispatch(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Deliver a message to every matching subscription and the oldest matching
+        pending request.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message read from the drone
+        """
+        msg_type = msg.get_type()
+        if msg_type not in self._pending and msg_type not in self._subscriptions:
+            return
+
+        for subscription in self._subscriptions.get(msg_type, ()):
+            try:
+                if subscription.matches(msg):
+                    subscription.put(msg)
+            except Exception as e:
+                self.logger.error(e, exc_info=True)
+
+        for matcher, future in list(self._pending.get(msg_type, ())):
+            try:
+                if not future.done() and matcher.matches(msg):
+                    future.set_result(msg)
+                    break
+            except Exception as e:
+                self.logger.error(e, exc_info=True)
+
+    def failAll(self, exception: BaseException) -> None:
+        """
+        Fail every pending request and subscription, and any registered afterwards.
+
+        Args:
+            exception (BaseException): The exception to raise to the waiting callers
+        """
+        self._closed_exception = exception
+        pending = [
+            future for entries in self._pending.values() for _, future in entries
+        ]
+        subscriptions = {
+            id(subscription): subscription
+            for subscriptions in self._subscriptions.values()
+            for subscription in subscriptions
+        }
+        self._pending = {}
+        self._subscriptions = {}
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(exception)
+        for subscription in subscriptions.values():
+            subscription.setException(exception)
+
+    def __remove(
+        self,
+        registry: Dict[str, List[Any]],
+        item: object,
+        msg_type: Optional[str] = None,
+    ) -> None:
+        msg_types = [msg_type] if msg_type is not None else list(registry)
+        for key in msg_types:
+            items = registry.get(key)
+            if items and item in items:
+                items.remove(item)
+                if not items:
+                    del registry[key]
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, link: AsyncMavlinkLink) -> None:
+        self.link = link
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        # A listening link replies to whoever last sent to it, like pymavlink's udpin
+        self.link.peer = addr
+        self.link.receive(data)
+
+    def error_received(self, exc: Exception) -> None:
+        self.link.logger.debug(f"UDP error on {self.link.connection_string}: {exc}")
+
+
+class AsyncMavlinkLink:
+    def __init__(
+        self,
+        connection_string: str,
+        baud: int = 57600,
+        logger: Optional[Logger] = None,
+        source_system: int = SOURCE_SYSTEM,
+        source_component: int = SOURCE_COMPONENT,
+    ) -> None:
+        """
+        A MAVLink connection serviced by an asyncio event loop instead of threads. TCP
+        and UDP use asyncio streams and datagram endpoints, and a serial port is read
+        without blocking when the loop says it is readable, so one loop can service
+        many drones with a single thread.
+
+        Messages are decoded as they arrive and delivered, on the loop, to the message
+        bus callbacks and to the requests awaiting them through the dispatcher. Bus
+        callbacks must not block, long work should be handed to a task or executor.
+
+        The backend does not use it yet: Drone and its controllers still run on their
+        own listener and sender threads, and no setting selects this link instead.
+
+        Args:
+            connection_string (str): A pymavlink style connection string, see parseConnectionString
+            baud (int, optional): The baud rate of a serial port. Defaults to 57600.
+            logger (Optional[Logger], optional): The logger to use. Defaults to the fgcs logger.
+            source_system (int, optional): The system ID messages are sent from. Defaults to SOURCE_SYSTEM.
+            source_component (int, optional): The component ID messages are sent from. Defaults to SOURCE_COMPONENT.
+        """
+        self.connection_string = connection_string
+        self.transport_type, self.host, self.port = parseConnectionString(
+            connection_string
+        )
+        self.baud = baud
+        self.logger = logger or getLogger("fgcs")
+
+        self.mav = mavutil.mavlink.MAVLink(
+            self, srcSystem=source_system, srcComponent=source_component
+        )
+        self.mav.robust_parsing = True
+        self.messageBus = MessageBus(self.logger)
+        self.dispatcher = AsyncMessageDispatcher(self.logger)
+
+        self.target_system = 0
+        self.target_component = 0
+        self.is_active = False
+        self.messages_received = 0
+        self.peer: Optional[Tuple[str, int]] = None
+
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._datagram_transport: Optional[asyncio.DatagramTransport] = None
+        self._serial: Optional[serial.Serial] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def open(self, timeout: float = HEARTBEAT_TIMEOUT) -> None:
+        """
+        Open the connection and wait for the drone's first heartbeat, which sets the
+        system and component the link talks to.
+
+        Args:
+            timeout (float, optional): The seconds to wait for a heartbeat. Defaults to HEARTBEAT_TIMEOUT.
+
+        Raises:
+            TimeoutError: If no heartbeat was received
+            OSError: If the connection could not be opened
+        """
+        self._loop = asyncio.get_running_loop()
+        heartbeat = self.dispatcher.expect(
+            "HEARTBEAT",
+            condition=lambda msg: msg.autopilot
+            != mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+        )
+
+        if self.transport_type == "tcp":
+            reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self._read_task = asyncio.create_task(self.__readStream(reader))
+        elif self.transport_type in ("udpin", "udpout"):
+            if self.transport_type == "udpin":
+                self._datagram_transport, _ = await self._loop.create_datagram_endpoint(
+                    lambda: _DatagramProtocol(self),
+                    local_addr=(self.host, self.port),
+                )
+            else:
+                self.peer = (self.host, self.port)
+                self._datagram_transport, _ = await self._loop.create_datagram_endpoint(
+                    lambda: _DatagramProtocol(self), remote_addr=self.peer
+                )
+                # The drone only starts sending once it has heard from the GCS
+                self.mav.heartbeat_send(
+                    mavutil.mavlink.MAV_TYPE_GCS,
+                    mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+                    0,
+                    0,
+                    0,
+                )
+        else:
+            self.__openSerial()
+        self.is_active = True
+
+        try:
+            msg = await asyncio.wait_for(heartbeat, timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(
+                f"No heartbeat from {self.connection_string} after {timeout} seconds"
+            ) from None
+
+        self.target_system = msg.get_srcSystem()
+        self.target_component = msg.get_srcComponent()
+
+    async def close(self) -> None:
+        """Close the connection, failing every request still waiting on it."""
+        self.is_active = False
+        self.dispatcher.failAll(
+            LinkClosedError(f"Connection to {self.connection_string} was closed")
+        )
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._datagram_transport is not None:
+            self._datagram_transport.close()
+            self._datagram_transport = None
+        if self._serial is not None:
+            if self._loop is not None:
+                self._loop.remove_reader(self._serial.fileno())
+            self._serial.close()
+            self._serial = None
+        self.messageBus.clear()
+
+    def write(self, buf: bytes) -> None:
+        """Called by mav to send an encoded message, only from the event loop."""
+        if self._writer is not None:
+            self._writer.write(buf)
+        elif self._datagram_transport is not None and self.peer is not None:
+            self._datagram_transport.sendto(buf, self.peer)
+        elif self._serial is not None:
+            self._serial.write(buf)
+
+    def send(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Encode and send a message to the drone.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to send
+        """
+        self.mav.send(msg)
+
+    async def request(
+        self,
+        msg: mavutil.mavlink.MAVLink_message,
+        response_types: MessageTypes,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        """
+        Send a message and wait for its response.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to send
+            response_types (MessageTypes): The message type, or list of message types, of the response
+            timeout (float, optional): The seconds to wait for the response. Defaults to DEFAULT_REQUEST_TIMEOUT.
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the response. Defaults to None.
+            **fields: Response fields which must equal the given value
+
+        Returns:
+            Optional[mavutil.mavlink.MAVLink_message]: The response, or None if the timeout was reached
+
+        Raises:
+            LinkClosedError: If the link was closed while waiting
+        """
+        response = self.dispatcher.expect(response_types, condition, **fields)
+        self.send(msg)
+        try:
+            return await asyncio.wait_for(response, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def command(
+        self,
+        command: int,
+        *params: float,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        """
+        Send a COMMAND_LONG and wait for its COMMAND_ACK.
+
+        Args:
+            command (int): The MAV_CMD to send
+            *params (float): Up to 7 command parameters, the rest are sent as 0
+            timeout (float, optional): The seconds to wait for the acknowledgement. Defaults to DEFAULT_REQUEST_TIMEOUT.
+
+        Returns:
+            Optional[mavutil.mavlink.MAVLink_message]: The COMMAND_ACK, or None if the timeout was reached
+        """
+        padded_params = (list(params) + [0] * 7)[:7]
+        msg = self.mav.command_long_encode(
+            self.target_system, self.target_component, command, 0, *padded_params
+        )
+        return await self.request(msg, "COMMAND_ACK", timeout, command=command)
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> AsyncMessageSubscription:
+        """
+        Get a stream of every matching message, see AsyncMessageDispatcher.subscribe.
+        """
+        return self.dispatcher.subscribe(msg_types, condition, **fields)
+
+    def receive(self, data: bytes) -> None:
+        """
+        Decode and deliver the messages in data read from the connection.
+
+        Args:
+            data (bytes): The bytes read
+        """
+        try:
+            msgs = self.mav.parse_buffer(data) or []
+        except mavutil.mavlink.MAVError as e:
+            self.logger.debug(
+                f"Dropped invalid data from {self.connection_string}: {e}"
+            )
+            return
+
+        now = time.time()
+        for msg in msgs:
+            if msg.get_type() == "BAD_DATA":
+                continue
+            msg._timestamp = now
+            self.messages_received += 1
+            self.dispatcher.dispatch(msg)
+            if self.messageBus.hasSubscribers(msg.get_type()):
+                self.messageBus.publish(msg)
+
+    async def __readStream(self, reader: asyncio.StreamReader) -> None:
+        while self.is_active or self._writer is not None:
+            try:
+                data = await reader.read(READ_SIZE)
+            except (ConnectionError, OSError) as e:
+                self.logger.error(f"Connection to {self.connection_string} failed: {e}")
+                data = b""
+            if not data:
+                break
+            self.receive(data)
+
+        if self._writer is not None:
+            self.logger.error(f"Connection to {self.connection_string} was lost")
+            self._read_task = None
+            await self.close()
+
+    def __openSerial(self) -> None:
+        if sys.platform == "win32":
+            raise OSError(
+                "Serial ports are not supported by the asyncio link on Windows"
+            )
+        assert self._loop is not None
+        self._serial = serial.Serial(self.host, self.baud, timeout=0)
+        self._loop.add_reader(self._serial.fileno(), self.__readSerial)
+
+    def __readSerial(self) -> None:
+        assert self._serial is not None
+        try:
+            data = self._serial.read(self._serial.in_waiting or 1)
+        except serial.SerialException as e:
+            self.logger.error(f"Serial port {self.host} failed: {e}")
+            asyncio.ensure_future(self.close())
+            return
+        if data:
+            self.receive(data)
+
+
+class AsyncTelemetryForwarder:
+    def __init__(
+        self,
+        link: AsyncMavlinkLink,
+        emitCb: Callable[[Any], None],
+        rate: float = 10,
+        msg_types: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Forwards a link's telemetry to the GUI from the event loop, coalescing it with a
+        TelemetryCoalescer so a burst of messages doesn't turn into a burst of events.
+        The flushes are scheduled on the loop instead of polled by a thread.
+
+        Args:
+            link (AsyncMavlinkLink): The link to forward the telemetry of
+            emitCb (Callable[[Any], None]): Sends a message to the GUI, such as a partial of utils.sendMessage with the vehicle ID
+            rate (float, optional): The rate, in hertz, to forward coalesced messages at. Defaults to 10.
+            msg_types (Optional[List[str]], optional): The messages to forward. Defaults to every message.
+        """
+        self.link = link
+        self.coalescer = TelemetryCoalescer(emitCb, rate=rate, key_by_source=True)
+        self._subscriptions = [
+            link.messageBus.subscribe(msg_type, self.coalescer.push)
+            for msg_type in (msg_types or ["*"])
+        ]
+        self._task: Optional[asyncio.Task] = asyncio.get_running_loop().create_task(
+            self.__run()
+        )
+
+    def stop(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.unsubscribe()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def __run(self) -> None:
+        while self.link.is_active:
+            wait = self.coalescer.timeUntilNextFlush()
+            await asyncio.sleep(wait if wait is not None else self.coalescer.interval)
+            self.coalescer.flush()
+
+
+class AsyncLinkLoop:
+    def __init__(self, logger: Optional[Logger] = None) -> None:
+        """
+        Runs an asyncio event loop on one thread for any number of links, so code on
+        other threads, such as the Socket.IO handlers, can open links and wait on
+        their requests.
+
+        Args:
+            logger (Optional[Logger], optional): The logger for the links. Defaults to the fgcs logger.
+        """
+        self.logger = logger or getLogger("fgcs")
+        self.loop = asyncio.new_event_loop()
+        self.links: List[AsyncMavlinkLink] = []
+        self._thread = Thread(
+            target=self.loop.run_forever, name="async-link-loop", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and wait for its result, from another thread.
+
+        Args:
+            coroutine (Awaitable[T]): The coroutine
+            timeout (Optional[float], optional): The seconds to wait, None waits forever. Defaults to None.
+
+        Returns:
+            T: The result of the coroutine
+        """
+        future: ConcurrentFuture = asyncio.run_coroutine_threadsafe(
+            coroutine, self.loop  # type: ignore[arg-type]
+        )
+        return future.result(timeout)
+
+    def connect(
+        self,
+        connection_string: str,
+        baud: int = 57600,
+        timeout: float = HEARTBEAT_TIMEOUT,
+    ) -> AsyncMavlinkLink:
+        """
+        Open a link on the loop and wait for the drone's heartbeat.
+
+        Args:
+            connection_string (str): A pymavlink style connection string
+            baud (int, optional): The baud rate of a serial port. Defaults to 57600.
+            timeout (float, optional): The seconds to wait for a heartbeat. Defaults to HEARTBEAT_TIMEOUT.
+
+        Returns:
+            AsyncMavlinkLink: The open link
+        """
+        link = AsyncMavlinkLink(connection_string, baud=baud, logger=self.logger)
+        self.run(link.open(timeout))
+        self.links.append(link)
+        return link
+
+    def close(self) -> None:
+        """Close every link and stop the loop."""
+
+        async def closeLinks() -> None:
+            await asyncio.gather(*(link.close() for link in self.links))
+
+        self.run(closeLinks())
+        self.links = []
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=1)
+        self.loop.close()
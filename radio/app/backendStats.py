@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymavlink import mavutil
+from typing_extensions import NotRequired, TypedDict
+
+from app.boundedQueue import QueueStats
+from app.priorityMessageQueue import PriorityClassStats
+
+# Receive rates are counted over windows of this many seconds
+RATE_WINDOW = 1.0
+
+# Upper bounds in milliseconds of the listener execution time histogram buckets, with a
+# final bucket for anything slower
+LISTENER_TIME_BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0)
+LISTENER_TIME_BUCKET_NAMES = [f"<={bound}ms" for bound in LISTENER_TIME_BUCKETS_MS] + [
+    f">{LISTENER_TIME_BUCKETS_MS[-1]}ms"
+]
+
+# Each listener's [count, total seconds, max seconds, *histogram bucket counts]
+_COUNT, _TOTAL, _MAX = 0, 1, 2
+_BUCKETS = 3
+
+
+class MessageTypeStats(TypedDict):
+    count: int
+    rate: float
+    bytes: int
+
+
+class ListenerStats(TypedDict):
+    message: str
+    listener: str
+    count: int
+    mean_ms: float
+    max_ms: float
+    histogram: Dict[str, int]
+
+
+class LinkStats(TypedDict):
+    bytes_received: int
+    bytes_per_second: float
+
+
+class BackendStatsSnapshot(TypedDict):
+    uptime: float
+    messages: Dict[str, MessageTypeStats]
+    listeners: List[ListenerStats]
+    link: LinkStats
+
+
+class TelemetryForwardStats(TypedDict):
+    forwarded: int
+    coalesced: int
+
+
+class DecodeStats(TypedDict):
+    decoded: int
+    skipped: int
+    skipped_types: Dict[str, int]
+
+
+class BackendStatsReport(TypedDict):
+    enabled: bool
+    queues: Dict[str, QueueStats]
+    message_queue: Dict[str, PriorityClassStats]
+    telemetry: TelemetryForwardStats
+    packets_received: Optional[int]
+    packets_lost: Optional[int]
+    bytes_sent: Optional[int]
+    decode: NotRequired[DecodeStats]
+    backend: NotRequired[BackendStatsSnapshot]
+
+
+def getListenerName(callback: Callable) -> str:
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class BackendStats:
+    def __init__(self) -> None:
+        """
+        Counters for the drone's hot paths: how many of each message type are received
+        and at what rate, how long each message listener takes and how many bytes come
+        over the link.
+
+        recordMessage() is only called from the drone listener thread and
+        recordListener() only from the drone sender thread. getStats() can be called
+        from any thread, it copies the counters without a lock so a snapshot may be a
+        message behind.
+        """
+        self.start_time = time.monotonic()
+
+        self._counts: Dict[str, int] = {}
+        self._bytes: Dict[str, int] = {}
+        self._bytes_received = 0
+
+        self._window_start = self.start_time
+        self._window_counts: Dict[str, int] = {}
+        self._window_bytes = 0
+        self._rates: Dict[str, float] = {}
+        self._byte_rate = 0.0
+
+        self._listeners: Dict[Tuple[str, Callable], List[float]] = {}
+
+    def recordMessage(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Count a message received from the drone.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message
+        """
+        msg_type = msg.get_type()
+        msgbuf = msg.get_msgbuf()
+        length = len(msgbuf) if msgbuf is not None else 0
+
+        self._counts[msg_type] = self._counts.get(msg_type, 0) + 1
+        self._bytes[msg_type] = self._bytes.get(msg_type, 0) + length
+        self._bytes_received += length
+
+        now = time.monotonic()
+        if now - self._window_start >= RATE_WINDOW:
+            self.__closeWindow(now)
+        self._window_counts[msg_type] = self._window_counts.get(msg_type, 0) + 1
+        self._window_bytes += length
+
+    def recordListener(
+        self, msg_type: str, callback: Callable, duration: float
+    ) -> None:
+        """
+        Add a message listener's execution time to its histogram.
+
+        Args:
+            msg_type (str): The type of message the listener ran for
+            callback (Callable): The listener
+            duration (float): How long the listener took in seconds
+        """
+        key = (msg_type, callback)
+        listener = self._listeners.get(key)
+        if listener is None:
+            listener = self._listeners[key] = [0, 0.0, 0.0] + [0] * len(
+                LISTENER_TIME_BUCKET_NAMES
+            )
+
+        listener[_COUNT] += 1
+        listener[_TOTAL] += duration
+        if duration > listener[_MAX]:
+            listener[_MAX] = duration
+        listener[_BUCKETS + bisect_left(LISTENER_TIME_BUCKETS_MS, duration * 1000)] += 1
+
+    def getStats(self) -> BackendStatsSnapshot:
+        """
+        Get a snapshot of the counters.
+
+        Returns:
+            BackendStatsSnapshot: The message counts and rates, listener execution times and link throughput
+        """
+        now = time.monotonic()
+        window_counts = dict(self._window_counts)
+        elapsed = now - self._window_start
+        # Messages stopping leaves the last window open, so its partial counts are more
+        # recent than the rates of the window before it
+        if elapsed >= RATE_WINDOW:
+            rates = {
+                msg_type: count / elapsed for msg_type, count in window_counts.items()
+            }
+            byte_rate = self._window_bytes / elapsed
+        else:
+            rates = dict(self._rates)
+            byte_rate = self._byte_rate
+
+        bytes_by_type = dict(self._bytes)
+        messages: Dict[str, MessageTypeStats] = {
+            msg_type: {
+                "count": count,
+                "rate": rates.get(msg_type, 0.0),
+                "bytes": bytes_by_type.get(msg_type, 0),
+            }
+            for msg_type, count in sorted(dict(self._counts).items())
+        }
+
+        listeners: List[ListenerStats] = []
+        for (msg_type, callback), listener in list(self._listeners.items()):
+            count = int(listener[_COUNT])
+            listeners.append(
+                {
+                    "message": msg_type,
+                    "listener": getListenerName(callback),
+                    "count": count,
+                    "mean_ms": listener[_TOTAL] / count * 1000 if count else 0.0,
+                    "max_ms": listener[_MAX] * 1000,
+                    "histogram": {
+                        name: int(bucket_count)
+                        for name, bucket_count in zip(
+                            LISTENER_TIME_BUCKET_NAMES, listener[_BUCKETS:]
+                        )
+                    },
+                }
+            )
+        listeners.sort(
+            key=lambda stats: stats["mean_ms"] * stats["count"], reverse=True
+        )
+
+        return {
+            "uptime": now - self.start_time,
+            "messages": messages,
+            "listeners": listeners,
+            "link": {
+                "bytes_received": self._bytes_received,
+                "bytes_per_second": byte_rate,
+            },
+        }
+
+    def __closeWindow(self, now: float) -> None:
+        elapsed = now - self._window_start
+        self._rates = {
+            msg_type: count / elapsed for msg_type, count in self._window_counts.items()
+        }
+        self._byte_rate = self._window_bytes / elapsed
+        self._window_counts = {}
+        self._window_bytes = 0
+        self._window_start = now
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import pickle
+import tempfile
+from collections import deque
+from pathlib import Path
+from queue import Empty
+from threading import Condition
+from typing import IO, Deque, Generic, Optional, TypeVar
+
+from typing_extensions import TypedDict
+
+# What a bounded queue does with a new item when it is full
+DROP_OLDEST = "drop_oldest"  # Discard the oldest item to make space
+BLOCK = "block"  # Wait until the consumer makes space
+SPILL = "spill"  # Write the item to a file on disk until the consumer catches up
+
+QUEUE_POLICIES = (DROP_OLDEST, BLOCK, SPILL)
+
+T = TypeVar("T")
+
+
+class QueueStats(TypedDict):
+    size: int
+    max_size: int
+    policy: str
+    dropped: int
+    spilled: int
+
+
+def checkQueuePolicy(policy: str, allowed_policies: tuple = QUEUE_POLICIES) -> None:
+    """
+    Check that a queue overflow policy is one of the allowed policies.
+
+    Args:
+        policy (str): The policy to check
+        allowed_policies (tuple, optional): The allowed policies. Defaults to QUEUE_POLICIES.
+
+    Raises:
+        ValueError: If the policy is not allowed
+    """
+    if policy not in allowed_policies:
+        raise ValueError(
+            f"Queue policy must be one of {', '.join(allowed_policies)}, got {policy}"
+        )
+
+
+class BoundedQueue(Generic[T]):
+    def __init__(
+        self,
+        max_size: int,
+        policy: str = BLOCK,
+        spill_directory: Optional[Path] = None,
+    ) -> None:
+        """
+        FIFO queue holding at most max_size items in memory, for a single consumer thread.
+        When the queue is full a new item is handled according to the policy:
+            drop_oldest: the oldest item is discarded
+            block: put() waits until there is space
+            spill: the item is written to a temporary file, and read back in order once
+                the items in memory have been consumed
+
+        Args:
+            max_size (int): The maximum number of items held in memory, 0 for no limit
+            policy (str, optional): The overflow policy, one of QUEUE_POLICIES. Defaults to BLOCK.
+            spill_directory (Optional[Path], optional): The directory to create the spill file in, only used by the spill policy. Defaults to the system temp directory.
+        """
+        checkQueuePolicy(policy)
+
+        self.max_size = max_size
+        self.policy = policy
+        self.spill_directory = spill_directory
+
+        self._condition = Condition()
+        self._items: Deque[T] = deque()
+        self._closed = False
+
+        self._spill_file: Optional[IO[bytes]] = None
+        self._spill_read_offset = 0
+        self._spill_write_offset = 0
+        self._spill_pending = 0
+
+        self.dropped_count = 0
+        self.spilled_count = 0
+
+    def put(self, item: T) -> None:
+        """
+        Add an item to the end of the queue.
+
+        Args:
+            item (T): The item to add, must be picklable when using the spill policy
+        """
+        with self._condition:
+            if self._closed:
+                return
+
+            if self._spill_pending or self.__isFull():
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped_count += 1
+                elif self.policy == BLOCK:
+                    self._condition.wait_for(
+                        lambda: self._closed or not self.__isFull()
+                    )
+                    if self._closed:
+                        return
+                else:
+                    # Items already on disk are older, so keep spilling until they
+                    # have been read back to keep the queue in order
+                    self.__spill(item)
+                    self._condition.notify()
+                    return
+
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Remove and return the item at the front of the queue.
+
+        Args:
+            timeout (Optional[float], optional): The time to wait for an item in seconds, None waits forever. Defaults to None.
+
+        Returns:
+            T: The item
+
+        Raises:
+            Empty: If no item arrived before the timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.qsize, timeout):
+                raise Empty
+
+            if not self._items:
+                self.__unspill()
+
+            self._condition.notify()
+            return self._items.popleft()
+
+    def qsize(self) -> int:
+        return len(self._items) + self._spill_pending
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def getStats(self) -> QueueStats:
+        """
+        Get the size of the queue and the number of items dropped and spilled to disk.
+
+        Returns:
+            QueueStats: The queue stats
+        """
+        return {
+            "size": self.qsize(),
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "dropped": self.dropped_count,
+            "spilled": self.spilled_count,
+        }
+
+    def close(self) -> None:
+        """
+        Stop accepting items and delete the spill file, any items still on disk are lost.
+        A put() waiting for space returns without adding its item.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+            self._spill_pending = 0
+
+    def __isFull(self) -> bool:
+        return self.max_size > 0 and len(self._items) >= self.max_size
+
+    def __spill(self, item: T) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(
+                prefix="spill_", dir=self.spill_directory
+            )
+
+        self._spill_file.seek(self._spill_write_offset)
+        pickle.dump(item, self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_write_offset = self._spill_file.tell()
+        self._spill_pending += 1
+        self.spilled_count += 1
+
+    def __unspill(self) -> None:
+        # Read back as many spilled items as fit in memory, these are all older than
+        # the items still on disk so new items keep being spilled until it is empty
+        assert self._spill_file is not None
+
+        self._spill_file.seek(self._spill_read_offset)
+        while self._spill_pending and not self.__isFull():
+            self._items.append(pickle.load(self._spill_file))
+            self._spill_pending -= 1
+        self._spill_read_offset = self._spill_file.tell()
+
+        if self._spill_pending == 0:
+            # Everything on disk has been read back, so start the file again from the
+            # beginning rather than letting it grow for the rest of the flight
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spill_read_offset = 0
+            self._spill_write_offset = 0
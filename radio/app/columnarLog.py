@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import struct
+import zipfile
+from pathlib import Path
+from secrets import token_hex
+from typing import Dict, Iterator, List, Optional, TextIO, Union
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+from app.compressedFtlog import isCompressedLogFile
+
+# Columnar formats, chosen when converting a log. NPZ_FORMAT is an uncompressed .npz
+# file with a .npy member per column, PARQUET_FORMAT is a directory with a .parquet
+# file per message type and needs pyarrow
+NPZ_FORMAT = "npz"
+PARQUET_FORMAT = "parquet"
+
+COLUMNAR_FORMATS = (NPZ_FORMAT, PARQUET_FORMAT)
+
+FTLOG_LOG_TYPE = "fgcs_telemetry"
+DATAFLASH_LOG_TYPE = "dataflash"
+
+# Cache of converted logs, made next to the log being converted
+CACHE_DIRECTORY_NAME = ".columnar_cache"
+
+# Dataflash format characters, https://ardupilot.org/copter/docs/logmessages.html
+DATAFLASH_COLUMN_TYPES = {
+    **{format_type: np.int64 for format_type in "bBhHiIqQM"},
+    **{format_type: np.str_ for format_type in "nNZa"},
+}
+DATAFLASH_FMT_HEADER = "FMT, 128, 89, FMT, BBnNZ, Type,Length,Name,Format,Columns"
+
+# The columns of each message type, keyed by message type then field
+Columns = Dict[str, Dict[str, np.ndarray]]
+
+
+def hashLogFile(log_file: Path) -> str:
+    """
+    Hash the contents of a log file, without reading all of it into memory.
+
+    Args:
+        log_file (Path): The log file
+
+    Returns:
+        str: The SHA-256 of the log file as hex
+    """
+    with open(log_file, "rb") as log_file_handle:
+        return hashlib.file_digest(
+            log_file_handle, lambda: hashlib.sha256(usedforsecurity=False)
+        ).hexdigest()
+
+
+def getLogType(log_file: Path) -> Optional[str]:
+    """
+    Find the type of a log file from its extension, or from its first line if the
+    extension is ambiguous, the same way as the FLA does.
+
+    Args:
+        log_file (Path): The log file
+
+    Returns:
+        Optional[str]: FTLOG_LOG_TYPE, DATAFLASH_LOG_TYPE or None if the type is unknown
+    """
+    if log_file.suffix == ".log":
+        return DATAFLASH_LOG_TYPE
+    if log_file.suffix == ".ftlog" or isCompressedLogFile(log_file):
+        return FTLOG_LOG_TYPE
+
+    with openLogFile(log_file) as log_file_handle:
+        first_line = log_file_handle.readline().strip()
+    if first_line == DATAFLASH_FMT_HEADER:
+        return DATAFLASH_LOG_TYPE
+    if "==START_TIME==" in first_line:
+        return FTLOG_LOG_TYPE
+    return None
+
+
+def openLogFile(log_file: Path) -> TextIO:
+    if isCompressedLogFile(log_file):
+        return gzip.open(log_file, "rt", errors="replace")
+    return open(log_file, errors="replace")
+
+
+def splitFtlogFields(fields: str) -> Iterator[List[str]]:
+    """
+    Split the "field:value,..." part of an FTLog line. Values such as lists can hold
+    commas, so a part without a colon is part of the previous value.
+
+    Args:
+        fields (str): The fields of the line
+
+    Yields:
+        List[str]: The field name and value
+    """
+    field: Optional[List[str]] = None
+    for part in fields.split(","):
+        if ":" in part and not part.startswith(" "):
+            if field is not None:
+                yield field
+            field = part.split(":", 1)
+        elif field is not None:
+            field[1] += "," + part
+    if field is not None:
+        yield field
+
+
+def toColumn(values: List[str]) -> np.ndarray:
+    """
+    Convert the text values of a field into a typed column. Whole numbers become an
+    int64 column, other numbers a float64 column, lists of numbers of the same length a
+    2D float64 column and anything else a fixed width unicode column.
+
+    Args:
+        values (List[str]): The values, one per message
+
+    Returns:
+        np.ndarray: The column
+    """
+    try:
+        return np.array([int(value) for value in values], dtype=np.int64)
+    except (ValueError, OverflowError):
+        pass
+    try:
+        return np.array([float(value) for value in values], dtype=np.float64)
+    except ValueError:
+        pass
+    if values and all(value.startswith("[") for value in values):
+        try:
+            column = np.array(
+                [
+                    [float(item) for item in value.strip("[]").split(",") if item]
+                    for value in values
+                ],
+                dtype=np.float64,
+            )
+            if column.ndim == 2:
+                return column
+        except ValueError:
+            pass
+    return np.array(values, dtype=np.str_)
+
+
+def parseFtlog(log_file: Path) -> Columns:
+    """
+    Parse an FTLog file, compressed or not, into columns. Every message type has a
+    _timestamp column as well as a column for each of its fields. Messages which don't
+    have every field of the first message of their type are left out.
+
+    Args:
+        log_file (Path): The FTLog file
+
+    Returns:
+        Columns: The columns of each message type
+    """
+    values: Dict[str, Dict[str, List[str]]] = {}
+    with openLogFile(log_file) as log_file_handle:
+        for line in log_file_handle:
+            if line.startswith("==") or line.count(",") < 1:
+                continue
+            timestamp, msg_type, *rest = line.rstrip("\n").split(",", 2)
+            fields = dict(splitFtlogFields(rest[0])) if rest else {}
+            fields["_timestamp"] = timestamp
+
+            msg_values = values.get(msg_type)
+            if msg_values is None:
+                msg_values = values[msg_type] = {field: [] for field in fields}
+            elif msg_values.keys() != fields.keys():
+                continue
+            for field, value in fields.items():
+                msg_values[field].append(value)
+
+    return {
+        msg_type: {field: toColumn(column) for field, column in msg_values.items()}
+        for msg_type, msg_values in values.items()
+    }
+
+
+def parseDataflashLog(log_file: Path) -> Columns:
+    """
+    Parse a dataflash text log into columns, using the FMT messages in the log to name
+    and type the fields of each message type.
+
+    Args:
+        log_file (Path): The dataflash text log
+
+    Returns:
+        Columns: The columns of each message type
+    """
+    formats: Dict[str, List[str]] = {}
+    field_names: Dict[str, List[str]] = {}
+    values: Dict[str, List[List[str]]] = {}
+
+    with openLogFile(log_file) as log_file_handle:
+        for line in log_file_handle:
+            parts = [part.strip() for part in line.split(",")]
+            msg_type = parts[0]
+            if msg_type == "FMT" and len(parts) >= 5:
+                formats[parts[3]] = list(parts[4])
+                field_names[parts[3]] = parts[5:]
+                continue
+
+            msg_format = formats.get(msg_type)
+            if msg_format is None:
+                continue
+            fields = parts[1:]
+            if len(fields) > len(msg_format) and msg_format[-1] in "nNZ":
+                # Text such as MSG messages can hold commas
+                fields[len(msg_format) - 1 :] = [
+                    ", ".join(fields[len(msg_format) - 1 :])
+                ]
+            if len(fields) != len(msg_format):
+                continue
+            values.setdefault(msg_type, []).append(fields)
+
+    columns: Columns = {}
+    for msg_type, rows in values.items():
+        columns[msg_type] = {}
+        for i, (field, format_type) in enumerate(
+            zip(field_names[msg_type], formats[msg_type])
+        ):
+            column_values = [row[i] for row in rows]
+            try:
+                columns[msg_type][field] = np.array(
+                    column_values,
+                    dtype=DATAFLASH_COLUMN_TYPES.get(format_type, np.float64),
+                )
+            except ValueError:
+                columns[msg_type][field] = np.array(column_values, dtype=np.str_)
+    return columns
+
+
+def writeNpz(columns: Columns, columnar_file: Path) -> None:
+    arrays: Dict[str, np.ndarray] = {
+        f"{msg_type}/{field}": column
+        for msg_type, msg_columns in columns.items()
+        for field, column in msg_columns.items()
+    }
+    # Stored uncompressed so loadNpz can memory-map the columns
+    np.savez(columnar_file, allow_pickle=False, **arrays)
+
+
+def writeParquet(columns: Columns, columnar_file: Path) -> None:
+    columnar_file.mkdir()
+    for msg_type, msg_columns in columns.items():
+        pq.write_table(
+            pa.table(
+                {
+                    field: column.tolist() if column.ndim > 1 else column
+                    for field, column in msg_columns.items()
+                }
+            ),
+            columnar_file.joinpath(f"{msg_type}.parquet"),
+        )
+
+
+def loadNpz(columnar_file: Path) -> Columns:
+    """
+    Load the columns of an uncompressed .npz file, memory-mapping each column rather
+    than reading it into memory.
+
+    Args:
+        columnar_file (Path): The .npz file
+
+    Returns:
+        Columns: The memory-mapped columns of each message type
+    """
+    columns: Columns = {}
+    with open(columnar_file, "rb") as columnar_file_handle, zipfile.ZipFile(
+        columnar_file_handle
+    ) as npz:
+        for info in npz.infolist():
+            msg_type, field = info.filename[: -len(".npy")].split("/", 1)
+
+            # The member data starts after its local file header, the lengths of the
+            # name and extra field are at offsets 26 and 28 of the header
+            columnar_file_handle.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack(
+                "<HH", columnar_file_handle.read(4)
+            )
+            columnar_file_handle.seek(
+                info.header_offset + 30 + name_length + extra_length
+            )
+
+            version = np.lib.format.read_magic(columnar_file_handle)
+            if version == (1, 0):
+                read_array_header = np.lib.format.read_array_header_1_0
+            else:
+                read_array_header = np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_array_header(columnar_file_handle)
+            columns.setdefault(msg_type, {})[field] = np.memmap(
+                columnar_file,
+                dtype=dtype,
+                mode="r",
+                offset=columnar_file_handle.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return columns
+
+
+def loadParquet(columnar_file: Path) -> Columns:
+    columns: Columns = {}
+    for table_file in columnar_file.glob("*.parquet"):
+        table = pq.read_table(table_file, memory_map=True)
+        columns[table_file.stem] = {
+            field: table.column(field).to_numpy() for field in table.column_names
+        }
+    return columns
+
+
+def convertLog(
+    log_file: Union[str, Path],
+    cache_directory: Optional[Union[str, Path]] = None,
+    columnar_format: str = NPZ_FORMAT,
+) -> Path:
+    """
+    Convert an FTLog file or dataflash text log into columns stored in a columnar file,
+    named by the hash of the log's contents so a log is only converted once.
+
+    Args:
+        log_file (Union[str, Path]): The log file to convert
+        cache_directory (Optional[Union[str, Path]], optional): The directory to store converted logs in. Defaults to a CACHE_DIRECTORY_NAME directory next to the log file.
+        columnar_format (str, optional): NPZ_FORMAT or PARQUET_FORMAT. Defaults to NPZ_FORMAT.
+
+    Raises:
+        ValueError: If the columnar format or the type of the log file is unknown
+        ImportError: If the columnar format is PARQUET_FORMAT and pyarrow is not installed
+
+    Returns:
+        Path: The columnar file, which can be read with loadColumns
+    """
+    if columnar_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format {columnar_format}")
+    if columnar_format == PARQUET_FORMAT and pq is None:
+        raise ImportError("pyarrow is needed to convert logs to Parquet")
+
+    log_file = Path(log_file)
+    cache_directory = (
+        Path(cache_directory)
+        if cache_directory is not None
+        else log_file.parent.joinpath(CACHE_DIRECTORY_NAME)
+    )
+    columnar_file = cache_directory.joinpath(
+        f"{hashLogFile(log_file)}.{columnar_format}"
+    )
+    if columnar_file.exists():
+        return columnar_file
+
+    log_type = getLogType(log_file)
+    if log_type == FTLOG_LOG_TYPE:
+        columns = parseFtlog(log_file)
+    elif log_type == DATAFLASH_LOG_TYPE:
+        columns = parseDataflashLog(log_file)
+    else:
+        raise ValueError(f"Unknown log file type for {log_file}")
+
+    # Written under a temporary name so a partly written file is never used as the cache
+    cache_directory.mkdir(parents=True, exist_ok=True)
+    tmp_columnar_file = cache_directory.joinpath(
+        f"tmp_{token_hex(8)}.{columnar_format}"
+    )
+    if columnar_format == NPZ_FORMAT:
+        writeNpz(columns, tmp_columnar_file)
+    else:
+        writeParquet(columns, tmp_columnar_file)
+    os.replace(tmp_columnar_file, columnar_file)
+    return columnar_file
+
+
+def loadColumns(columnar_file: Union[str, Path]) -> Columns:
+    """
+    Load the columns of a log converted by convertLog, memory-mapped where possible.
+
+    Args:
+        columnar_file (Union[str, Path]): The columnar file
+
+    Returns:
+        Columns: The columns of each message type
+    """
+    columnar_file = Path(columnar_file)
+    if columnar_file.suffix == f".{PARQUET_FORMAT}":
+        return loadParquet(columnar_file)
+    return loadNpz(columnar_file)
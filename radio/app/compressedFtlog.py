@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import gzip
+import os
+import zlib
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+
+from typing_extensions import TypedDict
+
+FTLOG_SUFFIX = ".ftlog"
+COMPRESSED_FTLOG_SUFFIX = ".ftlog.gz"
+FRAME_INDEX_SUFFIX = ".idx"
+
+# Number of lines compressed into each frame
+FRAME_LINES = 1000
+# Bytes read at a time when scanning a compressed log file for its frames
+SCAN_READ_SIZE = 64 * 1024
+
+
+class FrameIndexEntry(TypedDict):
+    offset: int
+    length: int
+    lines: int
+    first_timestamp: Optional[float]
+    last_timestamp: Optional[float]
+
+
+def isCompressedLogFile(log_file: Path) -> bool:
+    return log_file.name.endswith(COMPRESSED_FTLOG_SUFFIX)
+
+
+def getLogFileSuffix(log_file: Path) -> str:
+    return COMPRESSED_FTLOG_SUFFIX if isCompressedLogFile(log_file) else FTLOG_SUFFIX
+
+
+def getFrameIndexFile(log_file: Path) -> Path:
+    return log_file.with_name(log_file.name + FRAME_INDEX_SUFFIX)
+
+
+def getLineTimestamp(line: str) -> Optional[float]:
+    """
+    Get the timestamp of an FTLog line.
+
+    Args:
+        line (str): The line
+
+    Returns:
+        Optional[float]: The timestamp, or None for ==START_TIME== and ==NEXT_FILE== lines
+    """
+    if line.startswith("=="):
+        return None
+    try:
+        return float(line[: line.index(",")])
+    except ValueError:
+        return None
+
+
+def compressFrame(lines: List[str]) -> bytes:
+    """
+    Compress lines into a frame, a gzip member which can be decompressed on its own.
+    Frames written one after the other make up a normal gzip file.
+
+    Args:
+        lines (List[str]): The lines, each ending with a newline
+
+    Returns:
+        bytes: The frame
+    """
+    return gzip.compress("".join(lines).encode(), mtime=0)
+
+
+def decompressFrame(frame: bytes) -> str:
+    return zlib.decompressobj(wbits=31).decompress(frame).decode()
+
+
+def createFrameIndexEntry(
+    offset: int, length: int, lines: List[str]
+) -> FrameIndexEntry:
+    timestamps = [
+        timestamp
+        for timestamp in (getLineTimestamp(line) for line in lines)
+        if timestamp is not None
+    ]
+    return {
+        "offset": offset,
+        "length": length,
+        "lines": len(lines),
+        "first_timestamp": timestamps[0] if timestamps else None,
+        "last_timestamp": timestamps[-1] if timestamps else None,
+    }
+
+
+def formatFrameIndexEntry(entry: FrameIndexEntry) -> str:
+    first_timestamp = entry["first_timestamp"]
+    last_timestamp = entry["last_timestamp"]
+    return (
+        f"{entry['offset']},{entry['length']},{entry['lines']},"
+        f"{'' if first_timestamp is None else first_timestamp},"
+        f"{'' if last_timestamp is None else last_timestamp}\n"
+    )
+
+
+def parseFrameIndexEntry(line: str) -> FrameIndexEntry:
+    offset, length, lines, first_timestamp, last_timestamp = line.strip().split(",")
+    return {
+        "offset": int(offset),
+        "length": int(length),
+        "lines": int(lines),
+        "first_timestamp": float(first_timestamp) if first_timestamp else None,
+        "last_timestamp": float(last_timestamp) if last_timestamp else None,
+    }
+
+
+def writeFrame(
+    log_file_handle: IO[bytes], index_file_handle: IO[str], lines: List[str]
+) -> None:
+    """
+    Compress lines into a frame at the end of a compressed log file, and add the frame
+    to the log file's index.
+
+    Args:
+        log_file_handle (IO[bytes]): The compressed log file
+        index_file_handle (IO[str]): The index of the compressed log file
+        lines (List[str]): The lines, each ending with a newline
+    """
+    frame = compressFrame(lines)
+    entry = createFrameIndexEntry(log_file_handle.tell(), len(frame), lines)
+
+    log_file_handle.write(frame)
+    log_file_handle.flush()
+    index_file_handle.write(formatFrameIndexEntry(entry))
+    index_file_handle.flush()
+
+
+def scanFrames(log_file: Path, offset: int = 0) -> List[FrameIndexEntry]:
+    """
+    Find the frames of a compressed log file by decompressing it, for when its index is
+    missing or behind. Scanning stops at the first frame which is incomplete or corrupt.
+
+    Args:
+        log_file (Path): The compressed log file
+        offset (int, optional): The offset of the first frame to scan from. Defaults to 0.
+
+    Returns:
+        List[FrameIndexEntry]: The complete frames from the offset, in order
+    """
+    entries: List[FrameIndexEntry] = []
+    with open(log_file, "rb") as log_file_handle:
+        log_file_handle.seek(offset)
+        data = b""
+        while True:
+            decompressor = zlib.decompressobj(wbits=31)
+            text = []
+            length = 0
+            while not decompressor.eof:
+                if not data:
+                    data = log_file_handle.read(SCAN_READ_SIZE)
+                    if not data:
+                        return entries
+                try:
+                    text.append(decompressor.decompress(data))
+                except zlib.error:
+                    return entries
+                length += len(data)
+                data = b""
+
+            # The start of the next frame was read along with the end of this one
+            data = decompressor.unused_data
+            length -= len(data)
+            try:
+                lines = b"".join(text).decode().splitlines(keepends=True)
+            except UnicodeDecodeError:
+                return entries
+            entries.append(createFrameIndexEntry(offset, length, lines))
+            offset += length
+
+
+def readFrameIndex(log_file: Path) -> List[FrameIndexEntry]:
+    """
+    Read the frame index of a compressed log file. Frames which are not entirely in the
+    log file, because the GCS exited while they were being written, are left out. If
+    the index is missing, the frames are found by scanning the log file.
+
+    Args:
+        log_file (Path): The compressed log file
+
+    Returns:
+        List[FrameIndexEntry]: The frames in the order they are in the log file
+    """
+    index_file = getFrameIndexFile(log_file)
+    if not index_file.is_file():
+        return scanFrames(log_file)
+
+    size = os.stat(log_file).st_size
+    entries = []
+    with open(index_file) as index_file_handle:
+        for line in index_file_handle:
+            try:
+                entry = parseFrameIndexEntry(line)
+            except ValueError:
+                break
+            if entry["offset"] + entry["length"] > size:
+                break
+            entries.append(entry)
+    return entries
+
+
+def readFrames(
+    log_file: Path,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Iterator[str]:
+    """
+    Read the lines of a compressed log file, only decompressing the frames which
+    overlap the time range. When a time range is given, lines without a timestamp such
+    as ==START_TIME== are left out.
+
+    Args:
+        log_file (Path): The compressed log file
+        start_time (Optional[float], optional): The earliest timestamp to read. Defaults to the start of the log.
+        end_time (Optional[float], optional): The latest timestamp to read. Defaults to the end of the log.
+
+    Yields:
+        str: The lines, each ending with a newline
+    """
+    has_range = start_time is not None or end_time is not None
+    start_time = float("-inf") if start_time is None else start_time
+    end_time = float("inf") if end_time is None else end_time
+
+    with open(log_file, "rb") as log_file_handle:
+        for entry in readFrameIndex(log_file):
+            first_timestamp = entry["first_timestamp"]
+            last_timestamp = entry["last_timestamp"]
+            if has_range and (
+                first_timestamp is None
+                or last_timestamp is None
+                or last_timestamp < start_time
+                or first_timestamp > end_time
+            ):
+                continue
+
+            log_file_handle.seek(entry["offset"])
+            frame = decompressFrame(log_file_handle.read(entry["length"]))
+            for line in frame.splitlines(keepends=True):
+                if has_range:
+                    timestamp = getLineTimestamp(line)
+                    if timestamp is None or not start_time <= timestamp <= end_time:
+                        continue
+                yield line
+
+
+def readLastFrameLine(log_file: Path) -> str:
+    """
+    Read the last line of a compressed log file by only decompressing its last frame.
+
+    Args:
+        log_file (Path): The compressed log file
+
+    Returns:
+        str: The last line, empty if the file has no complete frames
+    """
+    index = readFrameIndex(log_file)
+    if not index:
+        return ""
+
+    with open(log_file, "rb") as log_file_handle:
+        log_file_handle.seek(index[-1]["offset"])
+        lines = decompressFrame(log_file_handle.read(index[-1]["length"])).splitlines(
+            keepends=True
+        )
+    return lines[-1] if lines else ""
+
+
+def mergeFrameIndexes(
+    log_files: List[Path], merged_log_file: Path, merged_offset: int
+) -> None:
+    """
+    Append the frame indexes of compressed log files to the index of the log file they
+    are being merged into, moving each frame to where its log file will be.
+
+    Args:
+        log_files (List[Path]): The compressed log files being merged, in order
+        merged_log_file (Path): The compressed log file they are merged into
+        merged_offset (int): The size of the merged log file before they are appended
+    """
+    with open(getFrameIndexFile(merged_log_file), "a") as merged_index_file_handle:
+        for log_file in log_files:
+            for entry in readFrameIndex(log_file):
+                entry["offset"] += merged_offset
+                merged_index_file_handle.write(formatFrameIndexEntry(entry))
+            merged_offset += os.stat(log_file).st_size
+
+
+def truncateToLastFrame(log_file: Path) -> None:
+    """
+    Remove anything after the last complete frame of a compressed log file, such as a
+    frame that was only partly written because the GCS exited. Complete frames missing
+    from the index, or the whole index if it is missing, are added to it first so no
+    flight data is lost.
+
+    Args:
+        log_file (Path): The compressed log file
+    """
+    index_file = getFrameIndexFile(log_file)
+    index = readFrameIndex(log_file) if index_file.is_file() else []
+    end = index[-1]["offset"] + index[-1]["length"] if index else 0
+
+    unindexed = scanFrames(log_file, end)
+    # Rewritten rather than appended to, to drop any partly written index line
+    with open(index_file, "w") as index_file_handle:
+        for entry in index + unindexed:
+            index_file_handle.write(formatFrameIndexEntry(entry))
+
+    if unindexed:
+        end = unindexed[-1]["offset"] + unindexed[-1]["length"]
+    if os.stat(log_file).st_size > end:
+        os.truncate(log_file, end)
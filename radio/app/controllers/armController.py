@@ -10,6 +10,9 @@ from pymavlink import mavutil
 if TYPE_CHECKING:
     from app.drone import Drone
 
+# How long to wait for the COMMAND_ACK, and then for the HEARTBEAT showing the new arm state
+ARM_TIMEOUT = 3
+
 
 class ArmController:
     def __init__(self, drone: Drone) -> None:
@@ -34,7 +37,9 @@ class ArmController:
         if self.drone.armed:
             return {"success": False, "message": "Already armed"}
 
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+        )
 
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
@@ -43,20 +48,25 @@ class ArmController:
         )
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-            self.drone.is_listening = True
+            response = ack.result(timeout=ARM_TIMEOUT)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM):
                 # Wait for the drone to be armed fully after the command has been accepted
                 self.drone.logger.debug("Waiting for arm")
+                timeout = time.monotonic() + ARM_TIMEOUT
                 while not self.drone.armed:
+                    if time.monotonic() > timeout:
+                        self.drone.logger.warning("Timed out waiting for arm")
+                        return {
+                            "success": False,
+                            "message": "Could not arm, timed out",
+                        }
                     time.sleep(0.05)
                 self.drone.logger.debug("ARMED")
                 return {"success": True, "message": "Armed successfully"}
             else:
                 self.drone.logger.debug("Arming failed")
         except Exception as e:
-            self.drone.is_listening = True
             self.drone.logger.error(e, exc_info=True)
             if self.drone.droneErrorCb:
                 self.drone.droneErrorCb(str(e))
@@ -76,7 +86,9 @@ class ArmController:
         if not self.drone.armed:
             return {"success": False, "message": "Already disarmed"}
 
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+        )
 
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
@@ -85,20 +97,25 @@ class ArmController:
         )
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-            self.drone.is_listening = True
+            response = ack.result(timeout=ARM_TIMEOUT)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM):
                 # Wait for the drone to be disarmed fully after the command has been accepted
                 self.drone.logger.debug("Waiting for disarm")
+                timeout = time.monotonic() + ARM_TIMEOUT
                 while self.drone.armed:
+                    if time.monotonic() > timeout:
+                        self.drone.logger.warning("Timed out waiting for disarm")
+                        return {
+                            "success": False,
+                            "message": "Could not disarm, timed out",
+                        }
                     time.sleep(0.05)
                 self.drone.logger.debug("DISARMED")
                 return {"success": True, "message": "Disarmed successfully"}
             else:
                 self.drone.logger.debug("Could not disarm, command not accepted")
         except Exception as e:
-            self.drone.is_listening = True
             self.drone.logger.error(e, exc_info=True)
             if self.drone.droneErrorCb:
                 self.drone.droneErrorCb(str(e))
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import time
 from typing import TYPE_CHECKING, List, Union
 
 import serial
@@ -135,8 +134,9 @@ class FlightModesController:
         Returns:
             A message to show if the drone recieved the message and succesfully set the new mode
         """
-        self.drone.is_listening = False
-        time.sleep(0.3)
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_MODE
+        )
         self.drone.sendCommand(
             message=mavutil.mavlink.MAV_CMD_DO_SET_MODE,
             param1=1,
@@ -149,22 +149,17 @@ class FlightModesController:
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="COMMAND_ACK", blocking=True, timeout=3
-            )
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_SET_MODE):
-                self.drone.is_listening = True
                 self.drone.logger.info("Flight mode set successfully")
                 return {"success": True, "message": "Flight mode set successfully"}
             else:
-                self.drone.is_listening = True
                 return {
                     "success": False,
                     "message": "Could not set flight mode",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not set flight mode, serial exception",
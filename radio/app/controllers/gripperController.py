@@ -102,7 +102,9 @@ class GripperController:
                 "message": 'Gripper action must be either "release" or "grab"',
             }
 
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_GRIPPER
+        )
 
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_DO_GRIPPER,
@@ -116,9 +118,7 @@ class GripperController:
         )
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_GRIPPER):
                 return {
@@ -131,7 +131,6 @@ class GripperController:
                     "message": "Setting gripper failed",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Setting gripper failed, serial exception",
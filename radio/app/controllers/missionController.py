@@ -4,7 +4,7 @@ import os
 from typing import TYPE_CHECKING, Any, List
 
 import serial
-from app.customTypes import Response
+from app.customTypes import Response, VehicleType
 from app.utils import commandAccepted, wpToMissionItemInt
 from pymavlink import mavutil, mavwp
 
@@ -129,7 +129,9 @@ class MissionController:
         else:
             loader = self.rallyLoader
 
-        self.drone.is_listening = False
+        mission_count = self.drone.messageDispatcher.expect(
+            "MISSION_COUNT", mission_type=mission_type
+        )
 
         try:
             self.drone.master.mav.mission_request_list_send(
@@ -138,7 +140,7 @@ class MissionController:
                 mission_type=mission_type,
             )
         except TypeError:
-            self.drone.is_listening = True
+            self.drone.messageDispatcher.cancel(mission_count)
             # TypeError is raised if mavlink V1 is used where the mission_request_list_send
             # function does not have a mission_type parameter
             self.drone.logger.error(
@@ -150,27 +152,12 @@ class MissionController:
             }
 
         try:
-            response = self.drone.master.recv_match(
-                type=[
-                    "MISSION_COUNT",
-                ],
-                blocking=True,
-                timeout=2,
-            )
+            response = mission_count.result(timeout=2)
             if response:
-                if response.mission_type != mission_type:
-                    self.drone.logger.error(
-                        f"Received response with wrong mission type {response.mission_type}, expected {mission_type}"
-                    )
-                    return {
-                        "success": False,
-                        "message": f"Received response with wrong mission type {response.mission_type}, expected {mission_type}",
-                    }
                 self.drone.logger.debug(
                     f"Got response for mission count of {response.count} for mission type {response.mission_type}"
                 )
                 loader.clear()
-                self.drone.is_listening = True
                 for i in range(0, response.count):
                     retry_count = 0
                     while retry_count < 3:
@@ -204,7 +191,6 @@ class MissionController:
                     "data": loader.wpoints,
                 }
             else:
-                self.drone.is_listening = True
                 self.drone.logger.error(
                     f"No response received for mission count for mission type {mission_type}."
                 )
@@ -214,7 +200,6 @@ class MissionController:
                 }
 
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": f"{failure_message}, serial exception",
@@ -240,7 +225,9 @@ class MissionController:
 
         failure_message = f"Failed to get mission item {item_number}/{mission_count} for mission type {mission_type}"
 
-        self.drone.is_listening = False
+        mission_item = self.drone.messageDispatcher.expect(
+            "MISSION_ITEM_INT", seq=item_number, mission_type=mission_type
+        )
 
         self.drone.master.mav.mission_request_int_send(
             self.drone.target_system,
@@ -250,13 +237,7 @@ class MissionController:
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="MISSION_ITEM_INT",
-                blocking=True,
-                timeout=1.5,
-            )
-
-            self.drone.is_listening = True
+            response = mission_item.result(timeout=1.5)
 
             if response:
                 self.drone.logger.debug(
@@ -277,7 +258,6 @@ class MissionController:
                 }
 
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             self.drone.logger.error(
                 f"Got no response for mission item {item_number}/{mission_count}, serial exception"
             )
@@ -293,16 +273,16 @@ class MissionController:
         Returns:
             Dict: The response of the mission start request
         """
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_MISSION_START
+        )
 
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_MISSION_START,
         )
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_MISSION_START):
                 return {
@@ -315,7 +295,6 @@ class MissionController:
                     "message": "Failed to start mission",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Failed to start mission, serial exception",
@@ -328,14 +307,14 @@ class MissionController:
         Returns:
             Dict: The response of the mission restart request
         """
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_MISSION_CURRENT
+        )
 
         self.drone.sendCommand(mavutil.mavlink.MAV_CMD_DO_SET_MISSION_CURRENT, param2=1)
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(
                 response, mavutil.mavlink.MAV_CMD_DO_SET_MISSION_CURRENT
@@ -350,7 +329,6 @@ class MissionController:
                     "message": "Failed to restart mission",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Failed to restart mission, serial exception",
@@ -365,20 +343,21 @@ class MissionController:
             Dict: The response of the mission pause request
         """
 
-        self.drone.is_listening = False
-
         # Use GUIDED mode to hold position while maintaining mission context
         # copter: 4, plane: 15
         guided_mode = 4
 
-        # Check if it's a plane (frame type 1)
-        if hasattr(self.drone, "frame_type") and self.drone.frame_type == 1:
+        if self.drone.vehicleState.aircraft_type == VehicleType.FIXED_WING.value:
             guided_mode = 15
 
         self.drone.logger.info(
             f"Attempting to pause mission by setting mode to {guided_mode} (GUIDED)"
         )
 
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_MODE
+        )
+
         self.drone.sendCommand(
             message=mavutil.mavlink.MAV_CMD_DO_SET_MODE,
             param1=1,  # MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
@@ -386,11 +365,7 @@ class MissionController:
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="COMMAND_ACK", blocking=True, timeout=3
-            )
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             self.drone.logger.info(f"Pause command response: {response}")
 
@@ -411,7 +386,6 @@ class MissionController:
                     "message": "Failed to pause mission",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             self.drone.logger.error("Failed to pause mission - serial exception")
             return {
                 "success": False,
@@ -427,13 +401,15 @@ class MissionController:
             Dict: The response of the mission resume request
         """
 
-        self.drone.is_listening = False
-
         # AUTO mode is 3 for both copter and plane
         auto_mode = 3
 
         self.drone.logger.info("Attempting to resume mission by setting mode to AUTO")
 
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_MODE
+        )
+
         self.drone.sendCommand(
             message=mavutil.mavlink.MAV_CMD_DO_SET_MODE,
             param1=1,  # MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
@@ -441,11 +417,7 @@ class MissionController:
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="COMMAND_ACK", blocking=True, timeout=3
-            )
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             self.drone.logger.info(f"Resume command response: {response}")
 
@@ -466,7 +438,6 @@ class MissionController:
                     "message": "Failed to resume mission",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             self.drone.logger.error("Failed to resume mission - serial exception")
             return {
                 "success": False,
@@ -484,46 +455,32 @@ class MissionController:
         if not mission_type_check.get("success"):
             return mission_type_check
 
-        self.drone.is_listening = False
+        mission_ack = self.drone.messageDispatcher.expect(
+            "MISSION_ACK", mission_type=mission_type
+        )
         self.drone.master.mav.mission_clear_all_send(
             self.drone.target_system,
             self.drone.target_component,
             mission_type=mission_type,
         )
         try:
-            while True:
-                response = self.drone.master.recv_match(
-                    type=[
-                        "MISSION_ACK",
-                    ],
-                    blocking=True,
-                    timeout=2,
+            response = mission_ack.result(timeout=2)
+            if response and response.type == 0:
+                return {
+                    "success": True,
+                    "message": "Mission cleared successfully",
+                }
+            elif response:
+                self.drone.logger.error(
+                    f"Error clearing mission, mission ack response: {response.type}"
                 )
-                if not response:
-                    break
-                elif response.mission_type != mission_type:
-                    continue
-                elif response.type == 0:
-                    self.drone.is_listening = True
-
-                    return {
-                        "success": True,
-                        "message": "Mission cleared successfully",
-                    }
-                else:
-                    self.drone.logger.error(
-                        f"Error clearing mission, mission ack response: {response.type}"
-                    )
-                    break
 
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not clear mission",
             }
 
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not clear mission, serial exception",
@@ -729,13 +686,15 @@ class MissionController:
             self.drone.logger.error(f"Clear mission failed: {clear_mission_response}")
             return clear_mission_response
 
-        self.drone.is_listening = False
-
         # For fence and rally, use mission type 0 to avoid SITL compatibility issues
         upload_mission_type = (
             0 if mission_type in [TYPE_FENCE, TYPE_RALLY] else mission_type
         )
 
+        mission_responses = self.drone.messageDispatcher.subscribe(
+            ["MISSION_REQUEST", "MISSION_ACK"]
+        )
+
         self.drone.master.mav.mission_count_send(
             self.drone.target_system,
             self.drone.target_component,
@@ -745,14 +704,9 @@ class MissionController:
 
         try:
             while True:
-                response = self.drone.master.recv_match(
-                    type=["MISSION_REQUEST", "MISSION_ACK"],
-                    blocking=True,
-                    timeout=2,
-                )
+                response = mission_responses.get(timeout=2)
 
                 if not response:
-                    self.drone.is_listening = True
                     return {
                         "success": False,
                         "message": "Could not upload mission, mission request not received",
@@ -763,27 +717,22 @@ class MissionController:
                         "message": "Could not upload mission, received mission acknowledgement error",
                     }
                 elif response.mission_type == upload_mission_type:
+                    is_last_item = response.seq == loader.count() - 1
+                    if is_last_item:
+                        mission_ack = self.drone.messageDispatcher.expect(
+                            "MISSION_ACK", mission_type=upload_mission_type
+                        )
+
                     item_to_send = loader.item(response.seq)
                     converted_item = wpToMissionItemInt(
                         item_to_send, upload_mission_type
                     )
                     self.drone.master.mav.send(converted_item)
 
-                    if response.seq == loader.count() - 1:
-                        mission_ack_response = self.drone.master.recv_match(
-                            type=[
-                                "MISSION_ACK",
-                            ],
-                            blocking=True,
-                            timeout=2,
-                        )
-                        self.drone.is_listening = True
+                    if is_last_item:
+                        mission_ack_response = mission_ack.result(timeout=2)
 
-                        if (
-                            mission_ack_response
-                            and mission_ack_response.type == 0
-                            and mission_ack_response.mission_type == upload_mission_type
-                        ):
+                        if mission_ack_response and mission_ack_response.type == 0:
                             return {
                                 "success": True,
                                 "message": "Mission uploaded successfully",
@@ -794,8 +743,9 @@ class MissionController:
                                 "message": "Could not upload mission, not received mission acknowledgement",
                             }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not upload mission, serial exception",
             }
+        finally:
+            self.drone.messageDispatcher.unsubscribe(mission_responses)
@@ -65,8 +65,6 @@ class MotorTestController:
         Returns:
             Response: The response from the motor test
         """
-        self.drone.is_listening = False
-
         throttle, duration, err = self.checkMotorTestValues(data)
         if err:
             return {"success": False, "message": err}
@@ -79,6 +77,10 @@ class MotorTestController:
             )
             return {"success": False, "message": "Invalid value for motorInstance"}
 
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST
+        )
+
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST,
             param1=motor_instance,  # ID of the motor to be tested
@@ -92,9 +94,7 @@ class MotorTestController:
         motor_letter = chr(64 + motor_instance)
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST):
                 self.drone.logger.info(f"Motor test started for motor {motor_instance}")
@@ -111,8 +111,6 @@ class MotorTestController:
                     "message": f"Motor test for motor {motor_letter} not started",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
-
             self.drone.logger.error(
                 f"Motor test for motor {motor_instance} not started, serial exception"
             )
@@ -131,8 +129,6 @@ class MotorTestController:
         Returns:
             Response: The response from the motor test
         """
-        self.drone.is_listening = False
-
         throttle, duration, err = self.checkMotorTestValues(data)
         if err:
             return {"success": False, "message": err}
@@ -144,6 +140,10 @@ class MotorTestController:
             )
             return {"success": False, "message": "Invalid value for number_of_motors"}
 
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST
+        )
+
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST,
             param1=0,  # ID of the motor to be tested
@@ -155,9 +155,7 @@ class MotorTestController:
         )
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST):
                 self.drone.logger.info("Motor sequence test started")
@@ -166,8 +164,6 @@ class MotorTestController:
                 self.drone.logger.error("Motor sequence test not started")
                 return {"success": False, "message": "Motor sequence test not started"}
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
-
             self.drone.logger.error("Motor sequence test not started, serial exception")
             return {
                 "success": False,
@@ -187,8 +183,6 @@ class MotorTestController:
         # Timeout after 3 seconds waiting for the motor test confirmation
         RESPONSE_TIMEOUT = 3
 
-        self.drone.is_listening = False
-
         throttle, duration, err = self.checkMotorTestValues(data)
         if err:
             return {"success": False, "message": err}
@@ -201,6 +195,10 @@ class MotorTestController:
             )
             return {"success": False, "message": "Invalid value for number_of_motors"}
 
+        acks = self.drone.messageDispatcher.subscribe(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST
+        )
+
         # Send all commands
         for idx in range(1, num_motors + 1):
             self.drone.sendCommand(
@@ -217,21 +215,17 @@ class MotorTestController:
         try:
             # Attempt to gather all the command acknowledegements
             for _ in range(num_motors):
-                response = self.drone.master.recv_match(
-                    type="COMMAND_ACK", blocking=True, timeout=RESPONSE_TIMEOUT
-                )
+                response = acks.get(timeout=RESPONSE_TIMEOUT)
                 if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST):
                     successful_responses += 1
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
-
             self.drone.logger.error("All motor test not started, serial exception")
             return {
                 "success": False,
                 "message": "All motor test not started, serial exception",
             }
-
-        self.drone.is_listening = True
+        finally:
+            self.drone.messageDispatcher.unsubscribe(acks)
 
         # Return data based on the number of successful command acknowledgements
         if successful_responses == num_motors:
@@ -23,19 +23,25 @@ class NavController:
 
     def getHomePosition(self) -> Response:
         """
-        Request the current home position from the drone.
+        Get the current home position of the drone, only requesting it from the drone if
+        it has not been received since it was last set.
         """
-        self.drone.is_listening = False
+        cached_home_position = self.drone.vehicleState.home_position
+        if cached_home_position is not None:
+            return {
+                "success": True,
+                "message": "Home position received",
+                "data": cached_home_position,
+            }
+
+        home_position_message = self.drone.messageDispatcher.expect("HOME_POSITION")
         self.drone.sendCommand(
             mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE,
             param1=mavutil.mavlink.MAVLINK_MSG_ID_HOME_POSITION,
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="HOME_POSITION", blocking=True, timeout=3
-            )
-            self.drone.is_listening = True
+            response = home_position_message.result(timeout=3)
 
             if response:
                 self.drone.logger.info(f"Home position received, {response}")
@@ -58,7 +64,6 @@ class NavController:
                     "message": "Could not get home position",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             self.drone.logger.warning("Could not get home position, serial exception")
             return {
                 "success": False,
@@ -75,22 +80,19 @@ class NavController:
             alt (float): The altitude of the home point
         """
 
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_HOME
+        )
         self.drone.sendCommandInt(
             mavutil.mavlink.MAV_CMD_DO_SET_HOME, x=lat, y=lon, z=alt
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type=[
-                    "COMMAND_ACK",
-                ],
-                blocking=True,
-                timeout=2,
-            )
-            self.drone.is_listening = True
+            response = ack.result(timeout=2)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_SET_HOME):
+                # Make the next getHomePosition request the new home position
+                self.drone.vehicleState.clear("home_position")
                 return {
                     "success": True,
                     "message": "Home point set successfully",
@@ -103,7 +105,6 @@ class NavController:
                 }
 
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not set home point, serial exception",
@@ -129,26 +130,24 @@ class NavController:
         if not guidedModeSetResult["success"]:
             return guidedModeSetResult
 
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+        )
 
         self.drone.sendCommand(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, param7=alt)
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_NAV_TAKEOFF):
-                self.drone.is_listening = True
                 self.drone.logger.info("Takeoff command send successfully")
                 return {"success": True, "message": "Takeoff command sent successfully"}
             else:
-                self.drone.is_listening = True
                 return {
                     "success": False,
                     "message": "Could not takeoff",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not takeoff, serial exception",
@@ -161,13 +160,14 @@ class NavController:
         Returns:
             Response: The response from the land command
         """
-        self.drone.is_listening = False
+        ack = self.drone.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_NAV_LAND
+        )
 
         self.drone.sendCommand(mavutil.mavlink.MAV_CMD_NAV_LAND)
 
         try:
-            response = self.drone.master.recv_match(type="COMMAND_ACK", blocking=True)
-            self.drone.is_listening = True
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_NAV_LAND):
                 self.drone.logger.info("Land command send successfully")
@@ -178,7 +178,6 @@ class NavController:
                     "message": "Could not land",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": "Could not land, serial exception",
@@ -200,8 +199,6 @@ class NavController:
         if not guidedModeSetResult["success"]:
             return guidedModeSetResult
 
-        self.drone.is_listening = False
-
         self.drone.master.mav.set_position_target_global_int_send(
             0,
             self.drone.target_system,
@@ -223,8 +220,6 @@ class NavController:
 
         self.drone.logger.info(f"Reposition command sent to {lat}, {lon}, {alt}m")
 
-        self.drone.is_listening = True
-
         try:
             return {
                 "success": True,
@@ -236,7 +231,6 @@ class NavController:
                 },
             }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             self.drone.logger.error("Reposition command not accepted, serial exception")
             return {
                 "success": False,
@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING, Any, List, Optional
 
 import serial
 from app.customTypes import IncomingParam, Number, Response
+from app.logReplay import ReplayConnection
+from app.messageDispatcher import MessageSubscription
 from pymavlink import mavutil
 
 if TYPE_CHECKING:
@@ -39,9 +41,22 @@ class ParamsController:
         Returns:
             Response: The response from the retrieval of the specific parameter
         """
-        self.drone.is_listening = False
         failure_message = f"Failed to get parameter {param_name}"
 
+        if isinstance(self.drone.master, ReplayConnection):
+            # Requests sent over a replay link are dropped, so only the values
+            # already replayed from the recording can be returned
+            param = self.drone.master.param_values.get(param_name)
+            if param is None:
+                return {
+                    "success": False,
+                    "message": f"{failure_message}, not in the replayed log",
+                }
+            return {"success": True, "data": param}
+
+        param_value = self.drone.messageDispatcher.expect(
+            "PARAM_VALUE", param_id=param_name
+        )
         self.drone.master.mav.param_request_read_send(
             self.drone.target_system,
             self.drone.target_component,
@@ -50,24 +65,19 @@ class ParamsController:
         )
 
         try:
-            response = self.drone.master.recv_match(
-                type="PARAM_VALUE", blocking=True, timeout=timeout
-            )
+            response = param_value.result(timeout=timeout)
 
-            if response and response.param_id == param_name:
-                self.drone.is_listening = True
+            if response:
                 return {
                     "success": True,
                     "data": response,
                 }
             else:
-                self.drone.is_listening = True
                 return {
                     "success": False,
                     "message": f"{failure_message}, timed out",
                 }
         except serial.serialutil.SerialException:
-            self.drone.is_listening = True
             return {
                 "success": False,
                 "message": f"{failure_message}, serial exception",
@@ -78,19 +88,23 @@ class ParamsController:
         Request all parameters from the drone.
         """
         self.drone.stopAllDataStreams()
-        self.drone.is_listening = False
+
+        param_values = self.drone.messageDispatcher.subscribe("PARAM_VALUE")
 
         self.getAllParamsThread = Thread(
-            target=self.getAllParamsThreadFunc, daemon=True
+            target=self.getAllParamsThreadFunc, args=(param_values,), daemon=True
         )
         self.getAllParamsThread.start()
 
         self.drone.master.param_fetch_all()
         self.is_requesting_params = True
 
-    def getAllParamsThreadFunc(self) -> None:
+    def getAllParamsThreadFunc(self, param_values: MessageSubscription) -> None:
         """
         The thread function to get all parameters from the drone.
+
+        Args:
+            param_values (MessageSubscription): The subscription to the PARAM_VALUE messages sent by the drone
         """
         timeout = time.time() + 20  # 20 seconds from now
 
@@ -102,11 +116,11 @@ class ParamsController:
                     self.current_param_index = 0
                     self.total_number_of_params = 0
                     self.params = []
-                    self.drone.is_listening = True
+                    self.drone.messageDispatcher.unsubscribe(param_values)
                     return
 
-                msg = self.drone.master.recv_msg()
-                if msg and msg.msgname == "PARAM_VALUE":
+                msg = param_values.get(timeout=max(timeout - time.time(), 0))
+                if msg:
                     self.saveParam(msg.param_id, msg.param_value, msg.param_type)
 
                     self.current_param_index = msg.param_index
@@ -119,7 +133,7 @@ class ParamsController:
                         self.current_param_index = 0
                         self.total_number_of_params = 0
                         self.params = sorted(self.params, key=lambda k: k["param_id"])
-                        self.drone.is_listening = True
+                        self.drone.messageDispatcher.unsubscribe(param_values)
                         self.drone.logger.info("Got all params")
                         return
             except serial.serialutil.SerialException:
@@ -127,7 +141,7 @@ class ParamsController:
                 self.current_param_index = 0
                 self.total_number_of_params = 0
                 self.params = []
-                self.drone.is_listening = True
+                self.drone.messageDispatcher.unsubscribe(param_values)
                 self.drone.logger.error("Serial exception while getting all params")
                 return
 
@@ -176,7 +190,6 @@ class ParamsController:
         Returns:
             bool: True if the parameter was set, False if it failed
         """
-        self.drone.is_listening = False
         got_ack = False
         save_timeout = 5
 
@@ -204,7 +217,6 @@ class ParamsController:
                     self.drone.logger.error(
                         "can't send %s of type %u" % (param_name, param_type)
                     )
-                    self.drone.is_listening = True
                     return False
                 # vfloat, = struct.unpack(">f", vstr)
             vfloat = float(param_value)
@@ -212,35 +224,37 @@ class ParamsController:
             self.drone.logger.error(
                 f"Could not set parameter {param_name} with value {param_value}: {e}"
             )
-            self.drone.is_listening = True
             return False
 
         # Keep trying to set the parameter until we get an ack or run out of retries or timeout
         while retries > 0 and not got_ack:
             retries -= 1
+            param_value_ack = self.drone.messageDispatcher.expect(
+                "PARAM_VALUE",
+                lambda msg: str(msg.param_id).upper() == str(param_name).upper(),
+            )
             self.drone.master.param_set_send(
                 param_name.upper(), vfloat, parm_type=param_type
             )
-            tstart = time.time()
-            while time.time() - tstart < save_timeout:
-                ack = self.drone.master.recv_match(type="PARAM_VALUE")
-                if ack is None:
-                    time.sleep(0.1)
-                    continue
-                if str(param_name).upper() == str(ack.param_id).upper():
-                    got_ack = True
-                    self.drone.logger.debug(
-                        f"Got parameter saving ack for {param_name} for value {param_value}"
-                    )
-                    self.saveParam(ack.param_id, ack.param_value, ack.param_type)
-                    break
+            try:
+                ack = param_value_ack.result(timeout=save_timeout)
+            except serial.serialutil.SerialException:
+                self.drone.logger.error(
+                    f"Serial exception while setting {param_name} to {vfloat}"
+                )
+                return False
+
+            if ack:
+                got_ack = True
+                self.drone.logger.debug(
+                    f"Got parameter saving ack for {param_name} for value {param_value}"
+                )
+                self.saveParam(ack.param_id, ack.param_value, ack.param_type)
 
         if not got_ack:
             self.drone.logger.error(f"timeout setting {param_name} to {vfloat}")
-            self.drone.is_listening = True
             return False
 
-        self.drone.is_listening = True
         return True
 
     def saveParam(self, param_name: str, param_value: Number, param_type: int) -> None:
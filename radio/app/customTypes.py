@@ -12,6 +12,10 @@ class IncomingParam(TypedDict):
     param_type: NotRequired[int]
 
 
+class VehicleDataType(TypedDict):
+    vehicle_id: NotRequired[str]
+
+
 class Response(TypedDict):
     success: bool
     message: NotRequired[str]
@@ -1,13 +1,11 @@
-import copy
 import os
 import time
 import traceback
 from logging import Logger, getLogger
 from pathlib import Path
-from queue import Queue
-from secrets import token_hex
+from queue import Empty
 from threading import Thread
-from typing import Callable, Dict, List, Optional
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
 
 import serial
 from pymavlink import mavutil
@@ -22,12 +20,70 @@ from app.controllers.motorTestController import MotorTestController
 from app.controllers.navController import NavController
 from app.controllers.paramsController import ParamsController
 from app.controllers.rcController import RcController
+from app import telemetry_config
+from app.backendStats import BackendStats, BackendStatsReport
+from app.boundedQueue import BLOCK, DROP_OLDEST, BoundedQueue, QueueStats
+from app.compressedFtlog import FRAME_INDEX_SUFFIX, getLogFileSuffix
 from app.customTypes import Number, Response, VehicleType
-from app.utils import commandAccepted, getVehicleType
+from app.fileLock import FileLock
+from app.ftlogIndex import MESSAGE_INDEX_SUFFIX
+from app.ftlogWriter import (
+    FtlogWriter,
+    getActiveLogFiles,
+    mergeLogFiles,
+    readFirstLine,
+    readLastLine,
+)
+from app.logReplay import ReplayConnection, isReplayPort, openReplayConnection
+from app.linkDemux import LinkComponentInfo, LinkDemux
+from app.mavlinkRouter import MavlinkRouter, RouterEndpointStats
+from app.messageBus import WILDCARD, MessageBus, MessageBusSubscription
+from app.messageDispatcher import MessageDispatcher
+from app.priorityMessageQueue import (
+    DEFAULT_CRITICAL_MESSAGES,
+    DEFAULT_STATUS_MESSAGES,
+    PriorityClassStats,
+    PriorityMessageQueue,
+)
+from app.selectiveDecoder import MAVUTIL_MESSAGES, SelectiveDecoder, isSkippedMessage
+from app.telemetryBatcher import TelemetryBatch, TelemetryBatcher
+from app.telemetryCoalescer import TelemetryCoalescer
+from app.utils import (
+    commandAccepted,
+    getVehicleType,
+    sendLogRecoveryStatus,
+    sendMessage,
+    sendTelemetryBatch,
+)
+from app.tlogCapture import (
+    FLIGHT_LOG_FORMATS,
+    FTLOG_FORMAT,
+    TLOG_FORMAT,
+    convertTlogToFtlog,
+    formatFtlogLine,
+    formatTlogRecord,
+)
+from app.vehicleState import VehicleState
 
 # Constants
 
-LOG_LINE_LIMIT = 50000
+TELEMETRY_FORWARD_RATE = 10
+TELEMETRY_BATCH_INTERVAL_MS = 0
+
+MESSAGE_QUEUE_SIZE = 1000
+MESSAGE_QUEUE_POLICY = DROP_OLDEST
+LOG_QUEUE_SIZE = 10000
+LOG_QUEUE_POLICY = BLOCK
+# How long the log thread waits for a message before flushing the log files and
+# checking if the drone is closed
+LOG_QUEUE_TIMEOUT = 0.5
+LOG_FLUSH_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL_MS = 1000
+ROUTER_DEDUP_WINDOW_MS = 1000
+# Messages the listener thread reads itself, so they are always fully decoded
+LISTENER_MESSAGES = frozenset(("HEARTBEAT", "TIMESYNC", "STATUSTEXT"))
+# Held while recovering temp logs so two GCS processes never recover the same logs
+LOG_RECOVERY_LOCK_FILE = ".recovery.lock"
 
 DATASTREAM_RATES_WIRED = {
     mavutil.mavlink.MAV_DATA_STREAM_RAW_SENSORS: 2,
@@ -65,6 +121,21 @@ VALID_BAUDRATES = [
 ]
 
 
+class LinkView:
+    def __init__(
+        self, coalescer: TelemetryCoalescer, subscription: MessageBusSubscription
+    ) -> None:
+        """
+        The telemetry of another system on the drone's link being forwarded to the GUI.
+
+        Args:
+            coalescer (TelemetryCoalescer): Coalesces the system's messages before they are sent
+            subscription (MessageBusSubscription): The link demux subscription feeding the coalescer
+        """
+        self.coalescer = coalescer
+        self.subscription = subscription
+
+
 class Drone:
     def __init__(
         self,
@@ -80,7 +151,7 @@ class Drone:
         The drone class interfaces with the UAS via MavLink.
 
         Args:
-            port (str): The port to connect to the drone.
+            port (str): The port to connect to the drone, or a replay port (see app.logReplay) to play back a recorded tlog.
             baud (int, optional): The baud rate for the connection. Defaults to 57600.
             wireless (bool, optional): Whether the connection is wireless. Defaults to False.
             droneErrorCb (Optional[Callable], optional): Callback function for drone errors. Defaults to None.
@@ -91,10 +162,21 @@ class Drone:
         self.baud = baud
         self.wireless = wireless
         self.logger = logger
-        self.connectionType = "TCP" if self.port.startswith("tcp") else "SERIAL"
+        if isReplayPort(self.port):
+            self.connectionType = "REPLAY"
+        elif self.port.startswith("tcp"):
+            self.connectionType = "TCP"
+        else:
+            self.connectionType = "SERIAL"
         self.droneErrorCb = droneErrorCb
         self.droneDisconnectCb = droneDisconnectCb
         self.droneConnectStatusCb = droneConnectStatusCb
+        # Set when the drone is added to the vehicle registry, its telemetry is then
+        # only sent to the clients in the vehicle's room
+        self.vehicle_id: Optional[str] = None
+        # The screen the GUI is showing for this drone, set by set_state and checked by
+        # the endpoints which only work on one screen
+        self.state: Optional[str] = None
 
         self.connectionError: Optional[str] = None
 
@@ -108,7 +190,12 @@ class Drone:
 
         try:
             self.sendConnectionStatusUpdate("Connecting to drone")
-            self.master: mavutil.mavserial = mavutil.mavlink_connection(port, baud=baud)
+            if isReplayPort(port):
+                self.master: Union[
+                    mavutil.mavserial, ReplayConnection
+                ] = openReplayConnection(port)
+            else:
+                self.master = mavutil.mavlink_connection(port, baud=baud)
         except Exception as e:
             self.logger.exception(traceback.format_exc())
             self.master = None
@@ -148,27 +235,133 @@ class Drone:
         self.autopilot = initial_heartbeat.autopilot
         self.target_system = self.master.target_system
         self.target_component = self.master.target_component
+        # mavutil leaves target_component at 0 as it never sets it from heartbeats, the
+        # autopilot's own component is the one which sent the heartbeat
+        self.autopilot_component = initial_heartbeat.get_srcComponent()
 
         self.logger.debug(
-            f"Heartbeat received (system {self.target_system} component {self.target_component})"
+            f"Heartbeat received (system {self.target_system} component {self.autopilot_component})"
         )
 
-        self.message_listeners: Dict[str, Callable] = {}
-        self.message_queue: Queue = Queue()
-        self.log_message_queue: Queue = Queue()
+        self.vehicleState = VehicleState(self.target_system, self.autopilot_component)
+        self.vehicleState.update(initial_heartbeat)
+
+        self.messageBus = MessageBus(self.logger)
+        # Other systems and components on the same link, such as a second aircraft
+        # sharing the telemetry radio, are split out by the demux
+        self.linkDemux = LinkDemux(self.logger, self.vehicleState)
+        self.linkDemux.route(initial_heartbeat)
+
+        # Other local programs can share the link through the router's endpoints
+        self.router: Optional[MavlinkRouter] = None
+        router_endpoints = telemetry_config.get("router_endpoints") or []
+        if router_endpoints:
+            try:
+                self.router = MavlinkRouter(
+                    router_endpoints,
+                    self.__injectMessage,
+                    self.logger,
+                    vehicle_system=self.target_system,
+                    dedup_window=telemetry_config.get(
+                        "router_dedup_window_ms", ROUTER_DEDUP_WINDOW_MS
+                    )
+                    / 1000,
+                )
+            except ValueError as e:
+                self.logger.error(f"Not starting the MAVLink router, {e}")
+        self.linkViews: Dict[int, LinkView] = {}
+        self.backendStats: Optional[BackendStats] = None
+        self.setBackendStatsEnabled(telemetry_config.get("backend_stats", False))
+        self.messageDispatcher = MessageDispatcher(self.logger)
+        # Only the messages something listens for, or which are logged, are decoded
+        self.always_decoded_messages = (
+            LISTENER_MESSAGES | MAVUTIL_MESSAGES | self.vehicleState.getMessageTypes()
+        )
+        self.decoder: Optional[SelectiveDecoder] = None
+        if telemetry_config.get("selective_decode", True) and isinstance(
+            self.master, mavutil.mavfile
+        ):
+            self.decoder = SelectiveDecoder(self.master.mav, self.__shouldDecode)
+        self.message_queue = PriorityMessageQueue(
+            critical_messages=telemetry_config.get(
+                "critical_messages", DEFAULT_CRITICAL_MESSAGES
+            ),
+            status_messages=telemetry_config.get(
+                "status_messages", DEFAULT_STATUS_MESSAGES
+            ),
+            max_size=telemetry_config.get("message_queue_size", MESSAGE_QUEUE_SIZE),
+            policy=telemetry_config.get("message_queue_policy", MESSAGE_QUEUE_POLICY),
+        )
+        # Batching is disabled when the interval is 0, each message is then sent as its own event
+        batch_interval = telemetry_config.get(
+            "batch_interval_ms", TELEMETRY_BATCH_INTERVAL_MS
+        )
+        self.telemetryBatcher: Optional[TelemetryBatcher] = (
+            TelemetryBatcher(self.__sendTelemetryBatch, interval=batch_interval / 1000)
+            if batch_interval > 0
+            else None
+        )
+        self.telemetryCoalescer = TelemetryCoalescer(
+            self.telemetryBatcher.add if self.telemetryBatcher else self.__sendMessage,
+            rate=telemetry_config.get("forward_rate", TELEMETRY_FORWARD_RATE),
+            key_by_source=telemetry_config.get("coalesce_by_source", False),
+        )
         self.log_directory = Path.home().joinpath("FGCS", "logs")
         self.log_directory.mkdir(parents=True, exist_ok=True)
-        self.current_log_file: Optional[Path] = None
-        self.log_file_names: List[Path] = []
-        self.cleanTempLogs()
+        self.log_message_queue: BoundedQueue[Union[str, bytes]] = BoundedQueue(
+            max_size=telemetry_config.get("log_queue_size", LOG_QUEUE_SIZE),
+            policy=telemetry_config.get("log_queue_policy", LOG_QUEUE_POLICY),
+            spill_directory=self.log_directory,
+        )
+        self.ftlogWriter = FtlogWriter(
+            self.log_directory,
+            flush_size=telemetry_config.get("log_flush_size", LOG_FLUSH_SIZE),
+            flush_interval=telemetry_config.get(
+                "log_flush_interval_ms", LOG_FLUSH_INTERVAL_MS
+            )
+            / 1000,
+            compress=telemetry_config.get("compress_logs", False),
+        )
+
+        self.flight_log_format = telemetry_config.get("flight_log_format", FTLOG_FORMAT)
+        if self.flight_log_format not in FLIGHT_LOG_FORMATS:
+            self.logger.warning(
+                f"Unknown flight log format {self.flight_log_format}, using {FTLOG_FORMAT}"
+            )
+            self.flight_log_format = FTLOG_FORMAT
+        self.tlog_file: Optional[Path] = None
+        self.tlog_file_handle: Optional[BinaryIO] = None
 
-        self.sendConnectionStatusUpdate("Cleaned temp logs")
+        self.columnar_log_format: Optional[str] = (
+            telemetry_config.get("columnar_log_format") or None
+        )
+        if self.columnar_log_format is not None:
+            # Only imported when the logs are converted, as it needs numpy
+            from app.columnarLog import COLUMNAR_FORMATS
+
+            if self.columnar_log_format not in COLUMNAR_FORMATS:
+                self.logger.warning(
+                    f"Unknown columnar log format {self.columnar_log_format}, logs will not be converted"
+                )
+                self.columnar_log_format = None
+
+        # Recovering the logs left behind if the GCS exited while logging can take a
+        # while, so it is done in the background. The temp log files are listed now,
+        # before this connection creates any of its own.
+        self.log_recovery_thread = Thread(
+            target=self.cleanTempLogs, args=(self.__findTempLogFiles(),), daemon=True
+        )
+        self.log_recovery_thread.start()
+
+        self.sendConnectionStatusUpdate("Recovering temp logs in the background")
 
         self.is_active = True
 
         self.number_of_motors = 4  # Is there a way to get this from the drone?
 
-        self.armed = False
+        # The listener thread must be running before the controllers are set up
+        # as they request parameters from the drone through it
+        self.startThread()
 
         self.paramsController = ParamsController(self)
         self.sendConnectionStatusUpdate("Setup parameters controller")
@@ -199,13 +392,23 @@ class Drone:
 
         self.stopAllDataStreams()
 
-        self.is_listening = True
-
-        self.startThread()
+    @property
+    def armed(self) -> bool:
+        """Whether the drone is armed, from the last HEARTBEAT received."""
+        return self.vehicleState.armed
 
     def __getNextLogFilePath(self, line: str) -> str:
         return line.split("==NEXT_FILE==")[-1].split("==END==")[0]
 
+    def __getUniqueLogFile(self, name: str, suffix: str) -> Path:
+        # Vehicles disconnected in the same second would otherwise share a log file
+        log_file = self.log_directory.joinpath(f"{name}{suffix}")
+        count = 0
+        while log_file.exists():
+            count += 1
+            log_file = self.log_directory.joinpath(f"{name}-{count}{suffix}")
+        return log_file
+
     def __getCurrentDateTimeStr(self) -> str:
         return time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
 
@@ -221,120 +424,114 @@ class Drone:
     def getValidBaudrates() -> list[int]:
         return VALID_BAUDRATES
 
-    def cleanTempLogs(self) -> None:
-        """
-        Clean up and try to recover any temporary log files that were not properly closed.
-        """
-        log_files = [
+    def __findTempLogFiles(self) -> List[Path]:
+        # Other connected vehicles are still writing to their temp logs
+        active_log_files = getActiveLogFiles()
+        return [
             file
             for file in self.log_directory.iterdir()
-            if file.is_file() and file.name.startswith("tmp_")
+            if file.is_file()
+            and file.name.startswith("tmp_")
+            and not file.name.endswith((FRAME_INDEX_SUFFIX, MESSAGE_INDEX_SUFFIX))
+            and file not in active_log_files
         ]
+
+    def cleanTempLogs(self, log_files: Optional[List[Path]] = None) -> None:
+        """
+        Clean up and try to recover any temporary log files that were not properly closed.
+        Progress is sent to the GUI as log_recovery_status events. Only one process
+        recovers logs at a time, if another process is already recovering them this
+        returns straight away.
+
+        Args:
+            log_files (Optional[List[Path]], optional): The temp log files to recover. Defaults to every temp log file in the log directory.
+        """
+        recovery_lock = FileLock(self.log_directory.joinpath(LOG_RECOVERY_LOCK_FILE))
+        if not recovery_lock.acquire():
+            self.logger.info("Temp logs are already being recovered by another process")
+            return
+
+        try:
+            self.__recoverTempLogs(
+                log_files if log_files is not None else self.__findTempLogFiles()
+            )
+        except Exception as e:
+            self.logger.error("Failed to recover temp logs")
+            self.logger.error(e, exc_info=True)
+            sendLogRecoveryStatus("Failed to recover temp logs", 0, 0)
+        finally:
+            recovery_lock.release()
+
+    def __recoverTempLogs(self, log_files: List[Path]) -> None:
+        # Another process may have recovered some of the files before the lock was acquired
+        log_files = [file for file in log_files if file.is_file()]
         first_recovered_log_files = [
             file for file in log_files if file.name.startswith("tmp_first_")
         ]
+        if not first_recovered_log_files:
+            return
 
-        number_of_first_recovered_log_files = 0
+        total = len(first_recovered_log_files)
+        sendLogRecoveryStatus(f"Recovering {total} sets of temp logs", 0, total)
 
         # Go through each first ("starting") log file
-        for first_recovered_log_file in first_recovered_log_files:
+        for recovered, first_recovered_log_file in enumerate(
+            first_recovered_log_files, start=1
+        ):
             exif_date = None
             final_recovered_log_file = self.log_directory.joinpath(
-                f"RECOVERED_TMP_{self.__getCurrentDateTimeStr()}.ftlog"
+                f"RECOVERED_TMP_{self.__getCurrentDateTimeStr()}{getLogFileSuffix(first_recovered_log_file)}"
             )
-            no_next_log_file_flag = False
-            next_log_file = None
-
-            with open(final_recovered_log_file, "a") as final_recovered_log_file_handle:
-                with open(first_recovered_log_file) as first_recovered_log_file_handle:
-                    lines = first_recovered_log_file_handle.readlines()
-                    first_line = lines[0]
-                    last_line = lines[-1]
-
-                    if first_line.startswith("==START_TIME=="):
-                        exif_date = first_line.split("==START_TIME==")[-1].split(
-                            "==END=="
-                        )[0]
-
-                    final_recovered_log_file_handle.writelines(lines)
-                    number_of_first_recovered_log_files += 1
-
-                    # Try and get the file name of the next log file
-                    # If the next file is not found, then the first log file is the only log file for this set of logs
-                    if last_line.startswith("==NEXT_FILE=="):
-                        next_log_file_name = self.__getNextLogFilePath(last_line)
-                        next_log_file = self.log_directory.joinpath(next_log_file_name)
-
-                        # If the next file is not found or doesn't exist in the list of log files, or if the file isn't a file, then stop the recovery
-                        if (
-                            not next_log_file
-                            or next_log_file not in log_files
-                            or not next_log_file.is_file()
-                        ):
-                            self.logger.error(
-                                f"Could not find the next log file {next_log_file_name}, stopping recovery"
-                            )
-                            no_next_log_file_flag = True
-                    else:
-                        no_next_log_file_flag = True
-
-            os.remove(first_recovered_log_file)
-
-            if no_next_log_file_flag:
-                continue
 
-            # Go through each log file listed in the end of the previous log file whilst appending the messages to the final log file
-            while next_log_file is not None:
-                with open(
-                    final_recovered_log_file, "a"
-                ) as final_recovered_log_file_handle:
-                    with open(next_log_file) as next_log_file_handle:
-                        lines = next_log_file_handle.readlines()
-                        final_recovered_log_file_handle.writelines(lines)
-                        number_of_first_recovered_log_files += 1
-                        last_line = lines[-1]
-
-                        current_log_file = next_log_file
-
-                        # Try and get the file name of the next log file
-                        if last_line.startswith("==NEXT_FILE=="):
-                            next_log_file_name = self.__getNextLogFilePath(last_line)
-                            next_log_file = self.log_directory.joinpath(
-                                next_log_file_name
-                            )
-
-                            # If the next file is not found or doesn't exist in the list of log files, or if the file isn't a file, then stop the recovery
-                            if (
-                                not next_log_file
-                                or next_log_file not in log_files
-                                or not next_log_file.is_file()
-                            ):
-                                self.logger.error(
-                                    f"Could not find the next log file {next_log_file_name}, stopping recovery"
-                                )
-                                next_log_file = None
-                        else:
-                            next_log_file = None
+            first_line = readFirstLine(first_recovered_log_file)
+            if first_line.startswith("==START_TIME=="):
+                exif_date = first_line.split("==START_TIME==")[-1].split("==END==")[0]
+
+            # Follow the log file listed at the end of each log file to find every log
+            # file in this set of logs, only the last lines of the files are read
+            recovered_log_files = [first_recovered_log_file]
+            last_line = readLastLine(first_recovered_log_file)
+            while last_line.startswith("==NEXT_FILE=="):
+                next_log_file_name = self.__getNextLogFilePath(last_line)
+                next_log_file = self.log_directory.joinpath(next_log_file_name)
+
+                # If the next file doesn't exist in the list of log files, isn't a file, or has already been recovered, then stop the recovery
+                if (
+                    next_log_file not in log_files
+                    or not next_log_file.is_file()
+                    or next_log_file in recovered_log_files
+                ):
+                    self.logger.error(
+                        f"Could not find the next log file {next_log_file_name}, stopping recovery"
+                    )
+                    break
+
+                recovered_log_files.append(next_log_file)
+                last_line = readLastLine(next_log_file)
 
-                    # Remove the current log file as we're done reading from it
-                    os.remove(current_log_file)
+            mergeLogFiles(recovered_log_files, final_recovered_log_file)
 
             if exif_date is not None:
                 self.logger.debug(
-                    f"Recovered logs {number_of_first_recovered_log_files} from {exif_date}"
+                    f"Recovered logs {len(recovered_log_files)} from {exif_date}"
                 )
                 new_final_recovered_log_file_name = self.log_directory.joinpath(
-                    f"{exif_date}_RECOVERED.ftlog"
+                    f"{exif_date}_RECOVERED{getLogFileSuffix(final_recovered_log_file)}"
                 )
-                os.rename(
-                    final_recovered_log_file,
-                    new_final_recovered_log_file_name,
+                # Renames the log file and its frame index if it is compressed
+                mergeLogFiles(
+                    [final_recovered_log_file], new_final_recovered_log_file_name
                 )
             else:
                 new_final_recovered_log_file_name = final_recovered_log_file
 
             self.logger.info(
-                f"Saved {number_of_first_recovered_log_files} recovered drone logs to: {str(new_final_recovered_log_file_name)}"
+                f"Saved {len(recovered_log_files)} recovered drone logs to: {str(new_final_recovered_log_file_name)}"
+            )
+            sendLogRecoveryStatus(
+                f"Saved recovered logs to {new_final_recovered_log_file_name.name}",
+                recovered,
+                total,
             )
 
     def setupDataStreams(self) -> None:
@@ -396,41 +593,138 @@ class Drone:
         )
 
     def addMessageListener(self, message_id: str, func: Callable) -> bool:
-        """Add a message listener for a specific message.
+        """Add a message listener for a specific message. A message can have any number
+        of listeners, but the same function is only added once per message.
 
         Args:
-            message_id (int): The message to add a listener for.
-            func (Optional[Callable], optional): The function to run when the message is received. Defaults to None.
+            message_id (str): The message to add a listener for, or "*" for all messages.
+            func (Callable): The function to run when the message is received.
 
         Returns:
             bool: True if the listener was added, False if it already exists
         """
-        if message_id not in self.message_listeners:
-            self.message_listeners[message_id] = func
-            return True
-        return False
+        for subscription in self.messageBus.getSubscriptions(message_id):
+            if subscription.callback == func:
+                return False
 
-    def removeMessageListener(self, message_id: str) -> bool:
+        self.messageBus.subscribe(message_id, func)
+        return True
+
+    def removeMessageListener(
+        self, message_id: str, func: Optional[Callable] = None
+    ) -> bool:
         """Removes a message listener for a specific message.
 
         Args:
             message_id (str): The message to remove the listener for.
+            func (Optional[Callable], optional): The listener to remove. Defaults to None, which removes all listeners for the message.
 
         Returns:
             bool: True if the listener was removed, False if it does not exist
         """
-        if message_id in self.message_listeners:
-            del self.message_listeners[message_id]
-            return True
+        if func is None:
+            return self.messageBus.unsubscribeAll(message_id)
+
+        for subscription in self.messageBus.getSubscriptions(message_id):
+            if subscription.callback == func:
+                return subscription.unsubscribe()
         return False
 
+    def __sendMessage(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        sendMessage(msg, self.vehicle_id)
+
+    def __sendTelemetryBatch(self, batch: TelemetryBatch) -> None:
+        sendTelemetryBatch(batch, self.vehicle_id)
+
+    def forwardMessage(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """Message listener which forwards a message to the GUI through the telemetry coalescer.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The message to forward
+        """
+        self.telemetryCoalescer.push(msg)
+
+    def getLinkComponents(self) -> List[LinkComponentInfo]:
+        """
+        Get every MAVLink component seen on the drone's link, including those of other
+        systems sharing it.
+
+        Returns:
+            List[LinkComponentInfo]: The components, ordered by system ID and component ID
+        """
+        return self.linkDemux.getComponents()
+
+    def getLinkViewId(self, system_id: int) -> str:
+        """
+        Get the vehicle ID that the telemetry of another system on the link is sent with.
+
+        Args:
+            system_id (int): The system ID
+
+        Returns:
+            str: The vehicle ID of the view
+        """
+        return f"{self.vehicle_id or self.port}/{system_id}"
+
+    def watchLinkSystem(self, system_id: int) -> str:
+        """
+        Forward the telemetry of another system on the link to the GUI, as its own
+        vehicle, without opening another connection. Its messages are coalesced like
+        the drone's own and sent with the view's vehicle ID.
+
+        Args:
+            system_id (int): The system ID to forward the telemetry of
+
+        Returns:
+            str: The vehicle ID the telemetry is sent with
+        """
+        view_id = self.getLinkViewId(system_id)
+        if system_id in self.linkViews:
+            return view_id
+
+        coalescer = TelemetryCoalescer(
+            lambda msg: sendMessage(msg, view_id),
+            rate=self.telemetryCoalescer.rate,
+            key_by_source=True,
+        )
+        self.linkViews[system_id] = LinkView(
+            coalescer, self.linkDemux.subscribe(system_id, WILDCARD, coalescer.push)
+        )
+        self.logger.info(f"Forwarding telemetry of system {system_id} as {view_id}")
+        return view_id
+
+    def unwatchLinkSystem(self, system_id: int) -> bool:
+        """
+        Stop forwarding the telemetry of another system on the link.
+
+        Args:
+            system_id (int): The system ID
+
+        Returns:
+            bool: True if the telemetry was being forwarded
+        """
+        view = self.linkViews.pop(system_id, None)
+        if view is None:
+            return False
+        view.subscription.unsubscribe()
+        return True
+
+    def getRouterStats(self) -> List[RouterEndpointStats]:
+        """
+        Get the traffic forwarded to and received from each router endpoint.
+
+        Returns:
+            List[RouterEndpointStats]: The stats of each endpoint, empty if the router is not enabled
+        """
+        return self.router.getStats() if self.router is not None else []
+
+    def __injectMessage(self, buf: bytes) -> None:
+        # Sent as is, the packet keeps the sequence number and IDs of its sender
+        self.master.write(buf)
+
     def checkForMessages(self) -> None:
         """Check for messages from the drone and add them to the message queue."""
         while self.is_active:
-            if not self.is_listening:
-                time.sleep(0.05)  # Sleep a bit to not clog up processing usage
-                continue
-
             try:
                 msg = self.master.recv_msg()
             except mavutil.mavlink.MAVError as e:
@@ -445,9 +739,9 @@ class Drone:
             except serial.serialutil.SerialException as e:
                 self.logger.error("Autopilot disconnected")
                 self.logger.error(e, exc_info=True)
+                self.messageDispatcher.failAll(e)
                 if self.droneDisconnectCb:
                     self.droneDisconnectCb()
-                self.is_listening = False
                 self.is_active = False
                 break
             except Exception as e:
@@ -458,21 +752,38 @@ class Drone:
                 continue
 
             if msg:
+                if self.backendStats is not None:
+                    self.backendStats.recordMessage(msg)
+                if self.router is not None:
+                    self.router.forward(msg.get_msgbuf())
+
+                self.linkDemux.route(msg)
+                # Nothing listens for or logs this message, its sequence number has
+                # already been counted by mavutil
+                if isSkippedMessage(msg):
+                    continue
+
                 if msg.msgname == "HEARTBEAT":
                     if (
                         msg.autopilot == mavutil.mavlink.MAV_AUTOPILOT_INVALID
                     ):  # No valid autopilot, e.g. a GCS or other MAVLink component
                         continue
 
-                    self.armed = bool(
-                        msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
-                    )
+                # Messages from other systems on the link are only delivered to the
+                # link demux subscribers, so they can't be mistaken for this drone's
+                is_target = msg.get_srcSystem() == self.target_system
+                if is_target:
+                    self.vehicleState.update(msg)
+
+                    # Hand the message to any controller waiting on a response
+                    self.messageDispatcher.dispatch(msg)
 
                 if self.armed:
                     try:
-                        self.log_message_queue.put(
-                            f"{msg._timestamp},{msg.msgname},{','.join([f'{message}:{msg.to_dict()[message]}' for message in msg.to_dict() if message != 'mavpackettype'])}"
-                        )
+                        if self.flight_log_format == TLOG_FORMAT:
+                            self.log_message_queue.put(formatTlogRecord(msg))
+                        else:
+                            self.log_message_queue.put(formatFtlogLine(msg))
                     except Exception as e:
                         self.log_message_queue.put(f"Writing message failed! {e}")
                         continue
@@ -485,76 +796,188 @@ class Drone:
                 elif msg.msgname == "STATUSTEXT":
                     self.logger.info(msg.text)
 
-                if msg.msgname in self.message_listeners:
-                    self.message_queue.put([msg.msgname, msg])
+                if (
+                    is_target and self.messageBus.hasSubscribers(msg.msgname)
+                ) or self.linkDemux.hasSubscribers(msg):
+                    self.message_queue.put(msg)
+
+    def __shouldDecode(self, msg_type: str) -> bool:
+        # Called by the decoder on the listener thread, before the message is decoded
+        return (
+            msg_type in self.always_decoded_messages
+            or self.armed
+            or self.messageBus.hasSubscribers(msg_type)
+            or self.messageDispatcher.isWaitingFor(msg_type)
+            or self.linkDemux.hasTypeSubscribers(msg_type)
+        )
 
     def executeMessages(self) -> None:
-        """Executes message listeners based on messages from the message queue."""
+        """Executes message listeners based on messages from the message queue, critical and status messages are executed first."""
         while self.is_active:
             try:
-                q = self.message_queue.get()
-                self.message_listeners[q[0]](q[1])
-            except KeyError as e:
-                self.logger.error(
-                    f"Could not execute message (likely due to backend abruptly stopping): {e}"
+                msg = self.message_queue.get(
+                    timeout=self.__timeUntilNextTelemetryFlush()
                 )
+                if msg.get_srcSystem() == self.target_system:
+                    self.messageBus.publish(msg)
+                self.linkDemux.publish(msg)
+            except Empty:
+                pass
+
+            self.telemetryCoalescer.flush()
+            for view in list(self.linkViews.values()):
+                view.coalescer.flush()
+            if self.telemetryBatcher:
+                self.telemetryBatcher.flush()
+
+    def __timeUntilNextTelemetryFlush(self) -> Optional[float]:
+        flush_times = [self.telemetryCoalescer.timeUntilNextFlush()]
+        flush_times.extend(
+            view.coalescer.timeUntilNextFlush()
+            for view in list(self.linkViews.values())
+        )
+        if self.telemetryBatcher:
+            flush_times.append(self.telemetryBatcher.timeUntilNextFlush())
 
-    def logMessages(self) -> None:
-        """A thread to log messages into a temp FTLog file from the log queue."""
-        current_line_number = 0
+        due_flush_times = [t for t in flush_times if t is not None]
+        return min(due_flush_times) if due_flush_times else None
 
+    def logMessages(self) -> None:
+        """A thread to log messages into a temp FTLog file, or a tlog file, from the log queue."""
         while self.is_active:
-            log_msg = self.log_message_queue.get()
-            if log_msg:
-                # Check if a temp log file has been created yet, if not create one
-                if self.current_log_file is None:
-                    self.current_log_file = self.log_directory.joinpath(
-                        f"tmp_first_{token_hex(8)}.ftlog"
-                    )
-                    self.log_file_names.append(self.current_log_file)
-                    with open(self.current_log_file, "w") as f:
-                        f.write(
-                            f"==START_TIME=={self.__getCurrentDateTimeStr()}==END==\n"
-                        )
-
-                # Write the incoming telemetry message to the temp log file
-                if current_line_number < LOG_LINE_LIMIT:
-                    with open(self.current_log_file, "a") as current_log_file_handler:
-                        current_log_file_handler.write(log_msg + "\n")
-                        current_line_number += 1
-                else:
-                    # If the current log file has reached the line limit, create a new temp log file
-                    next_log_file_name = self.log_directory.joinpath(
-                        f"tmp_{token_hex(8)}.ftlog"
-                    )
-                    with open(self.current_log_file, "a") as current_log_file_handler:
-                        # Write the next file name to the current log file
-                        current_log_file_handler.write(
-                            f"==NEXT_FILE=={str(next_log_file_name)}==END==\n"
-                        )
-
-                    self.current_log_file = next_log_file_name
-                    self.log_file_names.append(self.current_log_file)
-
-                    with open(self.current_log_file, "w") as f:
-                        f.write(
-                            f"==START_TIME=={self.__getCurrentDateTimeStr()}==END==\n"
-                        )
-                        f.write(log_msg + "\n")
-                        current_line_number = 1
+            try:
+                log_msg = self.log_message_queue.get(timeout=LOG_QUEUE_TIMEOUT)
+            except Empty:
+                self.ftlogWriter.flush()
+                if self.tlog_file_handle is not None:
+                    self.tlog_file_handle.flush()
+                continue
+
+            if isinstance(log_msg, bytes):
+                self.__writeTlogRecord(log_msg)
+            elif log_msg:
+                self.ftlogWriter.write(log_msg)
+
+    def __writeTlogRecord(self, record: bytes) -> None:
+        # A tlog is made of self contained records, so it is written straight to its
+        # final file and never needs to be recovered or merged
+        if self.tlog_file_handle is None:
+            self.tlog_file = self.__getUniqueLogFile(
+                self.__getCurrentDateTimeStr(), ".tlog"
+            )
+            self.tlog_file_handle = open(self.tlog_file, "ab")
+        self.tlog_file_handle.write(record)
+
+    def __exportTlog(self) -> None:
+        # FLA only reads FTLog files, so a copy of the capture is converted for it once
+        # the capture is complete, keeping the listener thread free of the conversion
+        if self.tlog_file is None:
+            return
+        try:
+            ftlog_file = convertTlogToFtlog(self.tlog_file)
+        except Exception as e:
+            self.logger.error("Failed to convert the drone telemetry capture")
+            self.logger.error(e, exc_info=True)
+            return
+        self.logger.info(f"Saved drone logs to: {ftlog_file}")
+        self.__convertToColumnar(ftlog_file)
+
+    def __convertToColumnar(self, log_file: Path) -> None:
+        # Converting the finished log now means FLA can load its columns from the cache
+        # rather than parsing the whole log when it is opened
+        if self.columnar_log_format is None or not log_file.is_file():
+            return
+        try:
+            from app.columnarLog import convertLog
+
+            columnar_file = convertLog(
+                log_file, columnar_format=self.columnar_log_format
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to convert {log_file} to a columnar log")
+            self.logger.error(e, exc_info=True)
+            return
+        self.logger.info(f"Saved columnar log to: {columnar_file}")
+
+    def getMessageQueueStats(self) -> Dict[str, PriorityClassStats]:
+        """Get the queue length, number of processed messages and wait times of each message priority class.
+
+        Returns:
+            Dict[str, PriorityClassStats]: The stats keyed by priority class name
+        """
+        return self.message_queue.getStats()
+
+    def getQueueStats(self) -> Dict[str, QueueStats]:
+        """Get the size of the message and log queues, and how many items each has dropped or spilled to disk.
+
+        Returns:
+            Dict[str, QueueStats]: The stats of each queue
+        """
+        return {
+            "message_queue": self.message_queue.getQueueStats(),
+            "log_queue": self.log_message_queue.getStats(),
+        }
+
+    def setBackendStatsEnabled(self, enabled: bool) -> None:
+        """Start or stop counting received messages and timing message listeners. Stopping clears the counters.
+
+        Args:
+            enabled (bool): Whether to collect the backend stats
+        """
+        if enabled and self.backendStats is None:
+            self.backendStats = BackendStats()
+        elif not enabled:
+            self.backendStats = None
+        self.messageBus.stats = self.backendStats
+
+    def getBackendStats(self) -> BackendStatsReport:
+        """Get the message counts and rates, listener execution times and link throughput if the backend stats are enabled, along with the queue stats.
+
+        Returns:
+            BackendStatsReport: The backend stats
+        """
+        stats: BackendStatsReport = {
+            "enabled": self.backendStats is not None,
+            "queues": self.getQueueStats(),
+            "message_queue": self.getMessageQueueStats(),
+            "telemetry": {
+                "forwarded": self.telemetryCoalescer.forwarded_count,
+                "coalesced": self.telemetryCoalescer.coalesced_count,
+            },
+            # Counted by mavutil from gaps in the packet sequence numbers
+            "packets_received": getattr(self.master, "mav_count", None),
+            "packets_lost": getattr(self.master, "mav_loss", None),
+            "bytes_sent": getattr(self.master.mav, "total_bytes_sent", None),
+        }
+        if self.decoder is not None:
+            stats["decode"] = self.decoder.getStats()
+        if self.backendStats is not None:
+            stats["backend"] = self.backendStats.getStats()
+        return stats
 
     def startThread(self) -> None:
         """Starts the listener and sender threads."""
-        self.listener_thread = Thread(target=self.checkForMessages, daemon=True)
-        self.sender_thread = Thread(target=self.executeMessages, daemon=True)
-        self.log_thread = Thread(target=self.logMessages, daemon=True)
+        # Named so they can be told apart in profiles
+        self.listener_thread = Thread(
+            target=self.checkForMessages, name="drone-listener", daemon=True
+        )
+        self.sender_thread = Thread(
+            target=self.executeMessages, name="drone-sender", daemon=True
+        )
+        self.log_thread = Thread(
+            target=self.logMessages, name="drone-logger", daemon=True
+        )
         self.listener_thread.start()
         self.sender_thread.start()
         self.log_thread.start()
+        if self.router is not None:
+            self.router.start()
 
     def rebootAutopilot(self) -> None:
         """Reboot the autopilot."""
-        self.is_listening = False
+        ack = self.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN
+        )
         self.sendCommand(
             mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN,
             param1=1,  #  Autpilot
@@ -564,7 +987,7 @@ class Drone:
         )
 
         try:
-            response = self.master.recv_match(type="COMMAND_ACK", blocking=True)
+            response = ack.result(timeout=3)
 
             if commandAccepted(
                 response, mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN
@@ -573,7 +996,6 @@ class Drone:
                 self.close()
             else:
                 self.logger.error("Reboot failed")
-                self.is_listening = True
         except serial.serialutil.SerialException:
             self.logger.debug("Rebooting")
             self.close()
@@ -588,7 +1010,9 @@ class Drone:
         Returns:
             Response: The response from the servo set command
         """
-        self.is_listening = False
+        ack = self.messageDispatcher.expect(
+            "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_SET_SERVO
+        )
 
         self.sendCommand(
             mavutil.mavlink.MAV_CMD_DO_SET_SERVO,
@@ -597,7 +1021,7 @@ class Drone:
         )
 
         try:
-            response = self.master.recv_match(type="COMMAND_ACK", blocking=True)
+            response = ack.result(timeout=3)
 
             if commandAccepted(response, mavutil.mavlink.MAV_CMD_DO_SET_SERVO):
                 return {"success": True, "message": f"Setting servo to {pwm_value}"}
@@ -711,42 +1135,54 @@ class Drone:
     def close(self) -> None:
         """Close the connection to the drone."""
         self.logger.info(f"Cleaning up resources for drone at {self}")
-        for message_id in copy.deepcopy(self.message_listeners):
-            self.removeMessageListener(message_id)
+        self.messageBus.clear()
+        self.linkDemux.clear()
+        if self.router is not None:
+            self.router.stop()
+        self.linkViews = {}
 
         self.stopAllDataStreams()
         self.is_active = False
+        self.message_queue.close()
+        self.log_message_queue.close()
+        # Let the log thread finish writing before the logs are saved
+        self.log_thread.join(timeout=LOG_QUEUE_TIMEOUT * 2)
+        self.ftlogWriter.close()
+        if self.tlog_file_handle is not None:
+            self.tlog_file_handle.close()
+            self.tlog_file_handle = None
+            self.logger.info(f"Saved drone telemetry capture to: {self.tlog_file}")
+            self.__exportTlog()
+        self.messageDispatcher.failAll(
+            SerialException("Connection to the drone was closed")
+        )
         self.master.close()
 
-        if len(self.log_file_names) == 0:
+        log_file_names = self.ftlogWriter.log_file_names
+        if len(log_file_names) == 0:
             self.logger.debug("No logs to save")
-        elif (
-            len(self.log_file_names) == 1
-            and os.stat(self.log_file_names[0]).st_size <= 0
-        ):
-            os.remove(self.log_file_names[0])
+        elif len(log_file_names) == 1 and os.stat(log_file_names[0]).st_size <= 0:
+            os.remove(log_file_names[0])
             self.logger.debug("No logs to save")
         else:
-            final_log_file = self.log_directory.joinpath(
-                f"{self.__getCurrentDateTimeStr()}.ftlog"
+            final_log_file = self.__getUniqueLogFile(
+                self.__getCurrentDateTimeStr(), self.ftlogWriter.suffix
             )
 
             try:
-                with open(final_log_file, "a") as final_log_file_handle:
-                    # Open all the log files that were written to in the current session and write their data to the final log file
-                    for log_file in self.log_file_names:
-                        if not log_file.is_file():
-                            self.logger.warning(f"Log file {log_file} is not a file.")
-                            continue
-
-                        with open(log_file) as log_file_handle:
-                            final_log_file_handle.writelines(
-                                log_file_handle.readlines()
-                            )
-                        os.remove(log_file)
+                existing_log_files = []
+                for log_file in log_file_names:
+                    if not log_file.is_file():
+                        self.logger.warning(f"Log file {log_file} is not a file.")
+                        continue
+                    existing_log_files.append(log_file)
+
+                # Copy all the log files that were written to in the current session into the final log file
+                mergeLogFiles(existing_log_files, final_log_file)
             except Exception as e:
                 self.logger.error("Failed to save drone logs")
                 self.logger.error(e, exc_info=True)
 
             self.logger.info(f"Saved drone logs to: {final_log_file}")
+            self.__convertToColumnar(final_log_file)
         self.logger.debug("Closed connection to drone")
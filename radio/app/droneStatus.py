@@ -1,13 +1,113 @@
 """
 Global values to be used by the endpoints. We aren't sure if this is fully the correct way of doing this but it seems to work. Each file
 imports this and access it, it can update the values and every other file will also have the update due to passing by reference (probably).
+
+Every connected vehicle is kept in the vehicles registry. Endpoints act on the vehicle given by the vehicle_id in their data, or on
+drone, the selected vehicle, when no vehicle_id is given. Each vehicle keeps the screen state the GUI set for it.
 """
 
 from typing import List, Optional
 
 
 from app.drone import Drone
+from app.vehicleRegistry import VehicleRegistry
 
 correct_ports: List[str] = []
 drone: Optional[Drone] = None
-state: Optional[str] = None
+vehicles = VehicleRegistry()
+
+
+def getDrone(data: object = None) -> Optional[Drone]:
+    """
+    Get the vehicle a request is for.
+
+    Args:
+        data (object, optional): The data sent with the request, which may contain a vehicle_id. Defaults to None.
+
+    Returns:
+        Optional[Drone]: The vehicle with the vehicle_id, or the selected vehicle if no vehicle_id was given, or None if there is no such vehicle
+    """
+    vehicle_id = data.get("vehicle_id") if isinstance(data, dict) else None
+    if vehicle_id is None:
+        return drone
+    return vehicles.get(str(vehicle_id))
+
+
+def addVehicle(new_drone: Drone, vehicle_id: Optional[str] = None) -> str:
+    """
+    Add a connected vehicle, selecting it if no other vehicle is selected.
+
+    Args:
+        new_drone (Drone): The vehicle
+        vehicle_id (Optional[str], optional): The ID to add the vehicle as. Defaults to its system ID, or its port if that is taken.
+
+    Raises:
+        ValueError: If the vehicle ID is already in use
+
+    Returns:
+        str: The ID of the vehicle
+    """
+    global drone
+
+    vehicle_id = vehicles.add(new_drone, vehicle_id)
+    if drone is None:
+        drone = new_drone
+    return vehicle_id
+
+
+def removeVehicle(old_drone: Drone) -> Optional[str]:
+    """
+    Remove a vehicle without closing it. If it was selected, the next connected vehicle is selected.
+
+    Args:
+        old_drone (Drone): The vehicle
+
+    Returns:
+        Optional[str]: The ID the vehicle had, or None if it wasn't in the registry
+    """
+    global drone
+
+    vehicle_id = vehicles.getVehicleId(old_drone)
+    if vehicle_id is not None:
+        vehicles.remove(vehicle_id)
+    if drone is old_drone:
+        drone = next(iter(vehicles.getVehicles().values()), None)
+    return vehicle_id
+
+
+def selectVehicle(vehicle_id: str) -> bool:
+    """
+    Select the vehicle endpoints act on when they are not given a vehicle_id.
+
+    Args:
+        vehicle_id (str): The ID of the vehicle
+
+    Returns:
+        bool: True if the vehicle was selected, False if there is no vehicle with the ID
+    """
+    global drone
+
+    selected = vehicles.get(vehicle_id)
+    if selected is None:
+        return False
+    drone = selected
+    return True
+
+
+def closeAllVehicles() -> None:
+    """
+    Close and remove every vehicle, including a selected vehicle which was never added
+    to the registry.
+    """
+    global drone
+
+    closing = []
+    for vehicle_id in list(vehicles.getVehicles()):
+        closing.append(vehicles.remove(vehicle_id))
+    # The selected drone isn't in the registry if it was set directly, as the tests do
+    if drone is not None and drone not in closing:
+        closing.append(drone)
+    drone = None
+    for vehicle in closing:
+        if vehicle is not None:
+            vehicle.close()
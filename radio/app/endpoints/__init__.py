@@ -1,5 +1,7 @@
 from flask import Blueprint
 
+from app import telemetry_config
+
 from . import arm as arm
 from . import autopilot as autopilot
 from . import comPorts as comPorts
@@ -11,7 +13,26 @@ from . import mission as mission
 from . import motors as motors
 from . import nav as nav
 from . import params as params
+from . import profiler as profiler
 from . import rc as rc
 from . import states as states
+from . import stats as stats
+from . import vehicles as vehicles
 
 endpoints = Blueprint("endpoints", __name__)
+
+if telemetry_config.get("backend_stats_http", False):
+    endpoints.add_url_rule(
+        "/stats/backend", view_func=stats.getBackendStatsHttp, methods=["GET"]
+    )
+
+if telemetry_config.get("profiler_http", False):
+    endpoints.add_url_rule(
+        "/profiler", view_func=profiler.getProfilerStatusHttp, methods=["GET"]
+    )
+    endpoints.add_url_rule(
+        "/profiler/start", view_func=profiler.startProfilerHttp, methods=["POST"]
+    )
+    endpoints.add_url_rule(
+        "/profiler/stop", view_func=profiler.stopProfilerHttp, methods=["POST"]
+    )
@@ -1,11 +1,10 @@
-from typing_extensions import TypedDict
-
 import app.droneStatus as droneStatus
 from app import socketio
+from app.customTypes import VehicleDataType
 from app.utils import notConnectedError, missingParameterError
 
 
-class ArmDisarmType(TypedDict):
+class ArmDisarmType(VehicleDataType):
     arm: bool
     force: bool
 
@@ -18,7 +17,8 @@ def arm(data: ArmDisarmType) -> None:
     Args:
         data: The data from the client, this contains "arm" which us whether to arm or disarm, and "force" which forces arming/disarming
     """
-    if not droneStatus.drone:
+    drone = droneStatus.getDrone(data)
+    if not drone:
         return notConnectedError(action="arm or disarm")
 
     arm = data.get("arm", None)
@@ -28,8 +28,8 @@ def arm(data: ArmDisarmType) -> None:
     force = data.get("force", False)
 
     if arm:
-        result = droneStatus.drone.armController.arm(force)
+        result = drone.armController.arm(force)
     else:
-        result = droneStatus.drone.armController.disarm(force)
+        result = drone.armController.disarm(force)
 
     socketio.emit("arm_disarm", result)
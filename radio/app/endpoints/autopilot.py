@@ -1,34 +1,42 @@
 import time
+from typing import Optional
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
 from app.drone import Drone
 
 
 @socketio.on("reboot_autopilot")
-def rebootAutopilot() -> None:
+def rebootAutopilot(data: Optional[VehicleDataType] = None) -> None:
     """
     Attempt to reboot the autopilot, this will try to reconnect to the drone 3 times before stopping. This will also stop if the port
-    is not open for 10 seconds.
+    is not open for 10 seconds. The reconnected drone keeps the vehicle ID of the one rebooted.
+
+    Args:
+        data: Optionally contains the vehicle_id of the vehicle to reboot. Defaults to the selected vehicle.
     """
-    if not droneStatus.drone:
+    old_drone = droneStatus.getDrone(data)
+    if not old_drone:
         return
 
-    port = droneStatus.drone.port
-    baud = droneStatus.drone.baud
-    wireless = droneStatus.drone.wireless
-    droneErrorCb = droneStatus.drone.droneErrorCb
-    droneDisconnectCb = droneStatus.drone.droneDisconnectCb
-    droneConnectStatusCb = droneStatus.drone.droneConnectStatusCb
+    port = old_drone.port
+    baud = old_drone.baud
+    wireless = old_drone.wireless
+    droneErrorCb = old_drone.droneErrorCb
+    droneDisconnectCb = old_drone.droneDisconnectCb
+    droneConnectStatusCb = old_drone.droneConnectStatusCb
+    was_selected = old_drone is droneStatus.drone
+    vehicle_id = droneStatus.removeVehicle(old_drone)
     socketio.emit("disconnected_from_drone")
-    droneStatus.drone.rebootAutopilot()
+    old_drone.rebootAutopilot()
 
-    while droneStatus.drone is not None and droneStatus.drone.is_active:
+    while old_drone.is_active:
         time.sleep(0.05)
 
     tries = 0
     while tries < 3:
-        droneStatus.drone = Drone(
+        drone = Drone(
             port,
             baud=baud,
             wireless=wireless,
@@ -36,7 +44,7 @@ def rebootAutopilot() -> None:
             droneDisconnectCb=droneDisconnectCb,
             droneConnectStatusCb=droneConnectStatusCb,
         )
-        if droneStatus.drone.connectionError:
+        if drone.connectionError:
             tries += 1
             time.sleep(2)
         else:
@@ -52,6 +60,10 @@ def rebootAutopilot() -> None:
         )
         return
 
+    droneStatus.addVehicle(drone, vehicle_id)
+    if was_selected:
+        droneStatus.drone = drone
+
     time.sleep(1)
     socketio.emit("connected_to_drone")
     fgcs_logger.info("Rebooted autopilot successfully.")
@@ -1,13 +1,17 @@
 import sys
 import time
+from typing import Optional
 
+from flask_socketio import join_room
 from serial.tools import list_ports
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
 from app.drone import Drone
 from app.utils import droneConnectStatusCb, droneErrorCb, getComPortNames
+from app.vehicleRegistry import getVehicleRoom
 
 
 class ConnectionDataType(TypedDict):
@@ -15,6 +19,22 @@ class ConnectionDataType(TypedDict):
     baud: int
     wireless: bool
     connectionType: str
+    vehicle_id: NotRequired[str]
+
+
+class VehicleDisconnectCb:
+    def __init__(self) -> None:
+        """
+        Called by a drone when its autopilot disconnects. The vehicle is looked up by
+        its ID when called rather than kept, so the drone which replaces it when the
+        autopilot is rebooted is disconnected by the same callback.
+        """
+        self.vehicle_id: Optional[str] = None
+
+    def __call__(self) -> None:
+        if self.vehicle_id is None:
+            return disconnectVehicle(droneStatus.drone)
+        disconnectVehicle(droneStatus.vehicles.get(self.vehicle_id))
 
 
 @socketio.on("get_com_ports")
@@ -42,45 +62,40 @@ def getComPort() -> None:
     socketio.emit("list_com_ports", droneStatus.correct_ports)
 
 
-@socketio.on("connect_to_drone")
-def connectToDrone(data: ConnectionDataType) -> None:
+def createDrone(data: ConnectionDataType) -> Optional[Drone]:
     """
-    This method is responsible for creating the initialising the drone object by
-    connecting to it with the data given.
+    Connect to a drone with the connection form sent by the client, sending a
+    connection_error event if the form is invalid or the connection fails.
 
     Args:
         data: The message passed in from the client containing the form sent (select com port, baud rate, wireless)
-    """
-    if droneStatus.drone:
-        droneStatus.drone.logger.warning(
-            "Attempting a connection to drone when connection is already established."
-        )
-        droneStatus.drone.close()
-        droneStatus.drone = None
 
+    Returns:
+        Optional[Drone]: The connected drone, or None if the connection failed
+    """
     connectionType = data.get("connectionType")
 
     if connectionType not in ["serial", "network"]:
         socketio.emit("connection_error", {"message": "Connection type not specified."})
-        return
+        return None
 
     if connectionType == "serial":
         port = data.get("port")
         if not port:
             socketio.emit("connection_error", {"message": "COM port not specified."})
-            return
+            return None
 
         port = port.split(":")[0]
         if port not in getComPortNames():
             socketio.emit("connection_error", {"message": "COM port not found."})
-            return
+            return None
     else:
         port = data.get("port")  # networktype:ip:port
         if not port:
             socketio.emit(
                 "connection_error", {"message": "Connection address not specified."}
             )
-            return
+            return None
 
     fgcs_logger.debug("Trying to connect to drone")
     baud = data.get("baud", 57600)
@@ -92,25 +107,59 @@ def connectToDrone(data: ConnectionDataType) -> None:
                 "message": f"Expected integer value for baud, recieved {type(baud).__name__}."
             },
         )
-        droneStatus.drone = None
-        return
+        return None
 
+    disconnectCb = VehicleDisconnectCb()
     drone = Drone(
         port,
         wireless=data.get("wireless", True),
         baud=baud,
         droneErrorCb=droneErrorCb,
-        droneDisconnectCb=disconnectFromDrone,
+        droneDisconnectCb=disconnectCb,
         droneConnectStatusCb=droneConnectStatusCb,
     )
 
     if drone.connectionError is not None:
         socketio.emit("connection_error", {"message": drone.connectionError})
-        droneStatus.drone = None
+        return None
+
+    try:
+        disconnectCb.vehicle_id = droneStatus.addVehicle(drone, data.get("vehicle_id"))
+    except ValueError as e:
+        drone.close()
+        socketio.emit("connection_error", {"message": str(e)})
+        return None
+
+    # Telemetry is only sent to the clients which have joined the vehicle's room
+    join_room(getVehicleRoom(disconnectCb.vehicle_id))
+    return drone
+
+
+@socketio.on("connect_to_drone")
+def connectToDrone(data: ConnectionDataType) -> None:
+    """
+    This method is responsible for creating the initialising the drone object by
+    connecting to it with the data given. This replaces the selected vehicle, use
+    add_vehicle to connect to another vehicle while staying connected to it.
+
+    Args:
+        data: The message passed in from the client containing the form sent (select com port, baud rate, wireless), and optionally the vehicle_id to add the drone as
+    """
+    if droneStatus.drone:
+        droneStatus.drone.logger.warning(
+            "Attempting a connection to drone when connection is already established."
+        )
+        old_drone = droneStatus.drone
+        droneStatus.removeVehicle(old_drone)
+        old_drone.close()
+
+    drone = createDrone(data)
+    if drone is None:
         return
 
-    # Set droneStatus drone to local drone
-    droneStatus.drone = drone
+    # The vehicle_id is given to the drone when it is added to the vehicles
+    if drone.vehicle_id is not None:
+        droneStatus.selectVehicle(drone.vehicle_id)
 
     # Sleeping for buffer time, if errors occur try changing back to 1 second
     time.sleep(0.2)
@@ -118,14 +167,53 @@ def connectToDrone(data: ConnectionDataType) -> None:
     socketio.emit("connected_to_drone", {"aircraft_type": drone.aircraft_type})
 
 
+@socketio.on("add_vehicle")
+def addVehicle(data: ConnectionDataType) -> None:
+    """
+    Connect to another vehicle while staying connected to the others. The vehicle is
+    only selected if no other vehicle is connected, its telemetry is sent with its
+    vehicle_id to the clients in its room.
+
+    Args:
+        data: The message passed in from the client containing the same form as connect_to_drone, and optionally the vehicle_id to add the drone as. Defaults to its system ID.
+    """
+    drone = createDrone(data)
+    if drone is None:
+        return
+
+    time.sleep(0.2)
+    fgcs_logger.info(f"Added vehicle {drone.vehicle_id} on {drone.port}")
+    socketio.emit(
+        "vehicle_connected",
+        {"vehicle_id": drone.vehicle_id, "aircraft_type": drone.aircraft_type},
+    )
+
+
+def disconnectVehicle(drone: Optional[Drone]) -> None:
+    """
+    Close a vehicle's connection and remove it from the registry.
+
+    Args:
+        drone (Optional[Drone]): The vehicle to disconnect, if None only the disconnection is sent to the client
+    """
+    vehicle_id = None
+    was_selected = drone is None or drone is droneStatus.drone
+    if drone is not None:
+        vehicle_id = droneStatus.removeVehicle(drone)
+        drone.close()
+
+    if was_selected:
+        socketio.emit("disconnected_from_drone")
+    if vehicle_id is not None:
+        socketio.emit("vehicle_disconnected", {"vehicle_id": vehicle_id})
+
+
 @socketio.on("disconnect_from_drone")
-def disconnectFromDrone() -> None:
+def disconnectFromDrone(data: Optional[VehicleDataType] = None) -> None:
     """
     Disconnect from drone and reset all global variables, send a message to client disconnecting as well
-    """
-    if droneStatus.drone:
-        droneStatus.drone.close()
-        droneStatus.drone = None
 
-    droneStatus.state = None
-    socketio.emit("disconnected_from_drone")
+    Args:
+        data: Optionally contains the vehicle_id of the vehicle to disconnect from. Defaults to the selected vehicle.
+    """
+    disconnectVehicle(droneStatus.getDrone(data))
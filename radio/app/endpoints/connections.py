@@ -15,10 +15,7 @@ def disconnect() -> None:
     """
     Handle client disconnection by reseting all global variables
     """
-    if droneStatus.drone:
-        droneStatus.drone.close()
-    droneStatus.drone = None
-    droneStatus.state = None
+    droneStatus.closeAllVehicles()
     fgcs_logger.debug("Client disconnected!")
 
 
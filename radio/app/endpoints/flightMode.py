@@ -1,33 +1,34 @@
-from typing_extensions import TypedDict
+from typing import Optional
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
-from app.customTypes import SetFlightModeValueAndNumber
+from app.customTypes import SetFlightModeValueAndNumber, VehicleDataType
 from app.utils import droneErrorCb, notConnectedError
 
 
-class SetCurrentFlightModeType(TypedDict):
+class SetCurrentFlightModeType(VehicleDataType):
     newFlightMode: int
 
 
 @socketio.on("get_flight_mode_config")
-def getFlightModeConfig() -> None:
+def getFlightModeConfig(data: Optional[VehicleDataType] = None) -> None:
     """
     Sends the flight mode config to the frontend, only works when the config page is loaded.
     """
-    if droneStatus.state != "config.flight_modes":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the flight mode config")
+
+    if drone.state != "config.flight_modes":
         socketio.emit(
             "params_error",
             {"message": "You must be on the config screen to access the flight modes."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="get the flight mode config")
-
-    flight_modes = droneStatus.drone.flightModesController.flight_modes
-    flight_mode_channel = droneStatus.drone.flightModesController.flight_mode_channel
+    flight_modes = drone.flightModesController.flight_modes
+    flight_mode_channel = drone.flightModesController.flight_mode_channel
 
     socketio.emit(
         "flight_mode_config",
@@ -43,17 +44,18 @@ def setFlightMode(data: SetFlightModeValueAndNumber) -> None:
     Args:
         data (SetFlightModeValueAndNumber): Contains the flight mode number and the flight mode to set to it
     """
-    if droneStatus.state != "config.flight_modes":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="set the flight mode")
+
+    if drone.state != "config.flight_modes":
         socketio.emit(
             "params_error",
             {"message": "You must be on the config screen to access the flight modes."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="set the flight mode")
-
     mode_number = data.get("mode_number", None)
     flight_mode = data.get("flight_mode", None)
 
@@ -61,32 +63,31 @@ def setFlightMode(data: SetFlightModeValueAndNumber) -> None:
         droneErrorCb("Mode number and flight mode must be specified.")
         return
 
-    result = droneStatus.drone.flightModesController.setFlightMode(
-        mode_number, flight_mode
-    )
+    result = drone.flightModesController.setFlightMode(mode_number, flight_mode)
     socketio.emit("set_flight_mode_result", result)
 
 
 @socketio.on("refresh_flight_mode_data")
-def refreshFlightModeData() -> None:
+def refreshFlightModeData(data: Optional[VehicleDataType] = None) -> None:
     """
     Refreshes the flight mode data, only works when the config page is loaded.
     """
-    if droneStatus.state != "config.flight_modes":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="refresh the flight mode data")
+
+    if drone.state != "config.flight_modes":
         socketio.emit(
             "params_error",
             {"message": "You must be on the config screen to access the flight modes."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="refresh the flight mode data")
+    drone.flightModesController.refreshData()
 
-    droneStatus.drone.flightModesController.refreshData()
-
-    flight_modes = droneStatus.drone.flightModesController.flight_modes
-    flight_mode_channel = droneStatus.drone.flightModesController.flight_mode_channel
+    flight_modes = drone.flightModesController.flight_modes
+    flight_mode_channel = drone.flightModesController.flight_mode_channel
 
     socketio.emit(
         "flight_mode_config",
@@ -102,26 +103,25 @@ def setCurrentFlightMode(data: SetCurrentFlightModeType) -> None:
     Args:
         data (dict): A dictionary containing the flight mode to be set as an integer
     """
-    if droneStatus.state != "dashboard":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="set the current flight mode")
+
+    if drone.state != "dashboard":
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the dashboard screen to set the current flight mode."
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="set the current flight mode")
-
     new_flight_mode = data.get("newFlightMode")
 
     if new_flight_mode is None:
         droneErrorCb("Flight mode must be specified.")
         return
 
-    result = droneStatus.drone.flightModesController.setCurrentFlightMode(
-        new_flight_mode
-    )
+    result = drone.flightModesController.setCurrentFlightMode(new_flight_mode)
     socketio.emit("set_current_flight_mode_result", result)
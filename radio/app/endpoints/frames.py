@@ -1,29 +1,33 @@
+from typing import Optional
+
 from app import fgcs_logger, socketio
 import app.droneStatus as droneStatus
+from app.customTypes import VehicleDataType
 from app.utils import notConnectedError
 
 
 @socketio.on("get_frame_config")
-def getFrameDetails() -> None:
+def getFrameDetails(data: Optional[VehicleDataType] = None) -> None:
     """
     Sends the current frame class and frame type of the drone to the frontend. Only works when on the motor test panel of config page
     """
 
-    if droneStatus.state != "config.motor_test":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get frame config")
+
+    if drone.state != "config.motor_test":
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the motor test section of the config page to access the frame details"
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="get frame config")
-
-    frame_type = droneStatus.drone.frameController.frame_type
-    frame_class = droneStatus.drone.frameController.frame_class
+    frame_type = drone.frameController.frame_type
+    frame_class = drone.frameController.frame_class
     socketio.emit(
         "frame_type_config",
         {"frame_type": frame_type, "frame_class": frame_class},
@@ -1,20 +1,20 @@
-from typing import List
-from typing_extensions import TypedDict
+from typing import List, Optional
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
 from app.utils import notConnectedError
 
 
-class CurrentMissionType(TypedDict):
+class CurrentMissionType(VehicleDataType):
     type: str
 
 
-class ControlMissionType(TypedDict):
+class ControlMissionType(VehicleDataType):
     action: str
 
 
-class UploadMissionType(TypedDict):
+class UploadMissionType(VehicleDataType):
     type: str
     mission_data: List[dict]
 
@@ -24,19 +24,20 @@ def getCurrentMission(data: CurrentMissionType) -> None:
     """
     Sends the current mission to the frontend, only works if dashboard or missions screen is loaded.
     """
-    if droneStatus.state not in ["dashboard", "missions"]:
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get current mission")
+
+    if drone.state not in ["dashboard", "missions"]:
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the dashboard or missions screen to get the current mission."
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="get current mission")
-
     mission_type = data.get("type")
     mission_type_array = ["mission", "fence", "rally"]
 
@@ -51,7 +52,7 @@ def getCurrentMission(data: CurrentMissionType) -> None:
         fgcs_logger.error(f"Could not get mission items for {mission_type} type.")
         return
 
-    result = droneStatus.drone.missionController.getCurrentMission(
+    result = drone.missionController.getCurrentMission(
         mission_type_array.index(mission_type)
     )
 
@@ -67,24 +68,25 @@ def getCurrentMission(data: CurrentMissionType) -> None:
 
 
 @socketio.on("get_current_mission_all")
-def getCurrentMissionAll() -> None:
+def getCurrentMissionAll(data: Optional[VehicleDataType] = None) -> None:
     """
     Sends the current mission to the frontend, only works if dashboard or missions screen is loaded.
     """
-    if droneStatus.state not in ["dashboard", "missions"]:
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get current mission")
+
+    if drone.state not in ["dashboard", "missions"]:
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the dashboard or missions screen to get the current mission."
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="get current mission")
-
-    result = droneStatus.drone.missionController.getCurrentMissionAll()
+    result = drone.missionController.getCurrentMissionAll()
 
     socketio.emit(
         "current_mission_all",
@@ -101,19 +103,20 @@ def controlMission(data: ControlMissionType) -> None:
     """
     Controls the current mission based on the action, only works if dashboard or missions screen is loaded.
     """
-    if droneStatus.state not in ["dashboard", "missions"]:
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="control mission")
+
+    if drone.state not in ["dashboard", "missions"]:
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the dashboard or missions screen to control a mission."
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="control mission")
-
     action = data.get("action", None)
 
     fgcs_logger.info(f"Received mission control action: {action}")
@@ -127,16 +130,16 @@ def controlMission(data: ControlMissionType) -> None:
         return
 
     if action == "start":
-        result = droneStatus.drone.missionController.startMission()
+        result = drone.missionController.startMission()
     elif action == "restart":
-        result = droneStatus.drone.missionController.restartMission()
+        result = drone.missionController.restartMission()
     elif action == "pause":
         fgcs_logger.info("Pausing mission...")
-        result = droneStatus.drone.missionController.pauseMission()
+        result = drone.missionController.pauseMission()
         fgcs_logger.info(f"Pause result: {result}")
     elif action == "resume":
         fgcs_logger.info("Resuming mission...")
-        result = droneStatus.drone.missionController.resumeMission()
+        result = drone.missionController.resumeMission()
         fgcs_logger.info(f"Resume result: {result}")
 
     socketio.emit("mission_control_result", result)
@@ -147,17 +150,18 @@ def uploadMission(data: UploadMissionType) -> None:
     """
     Uploads mission data to the drone, only works if missions screen is loaded.
     """
-    if droneStatus.state != "missions":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="upload mission")
+
+    if drone.state != "missions":
         socketio.emit(
             "params_error",
             {"message": "You must be on the missions screen to upload a mission."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="upload mission")
-
     mission_type = data.get("type")
     mission_data = data.get("mission_data", [])
     mission_type_array = ["mission", "fence", "rally"]
@@ -176,7 +180,7 @@ def uploadMission(data: UploadMissionType) -> None:
     fgcs_logger.info(f"Uploading {mission_type} mission with {len(mission_data)} items")
     fgcs_logger.debug(f"Mission data: {mission_data}")
 
-    result = droneStatus.drone.missionController.uploadMissionData(
+    result = drone.missionController.uploadMissionData(
         mission_data, mission_type_array.index(mission_type)
     )
 
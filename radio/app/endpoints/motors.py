@@ -13,10 +13,11 @@ def testOneMotor(data: MotorTestAllValues) -> None:
     Args:
         data: The data passed from the frontend, contains all motor tests values (motor, throttle, duration)
     """
-    if not droneStatus.drone:
+    drone = droneStatus.getDrone(data)
+    if not drone:
         return notConnectedError(action="test one motor")
 
-    result = droneStatus.drone.motorTestController.testOneMotor(data)
+    result = drone.motorTestController.testOneMotor(data)
     socketio.emit(
         "motor_test_result",
         result,
@@ -31,10 +32,11 @@ def testMotorSequence(data: MotorTestThrottleDurationAndNumber) -> None:
     Args:
         data: The data passed from the frontend, contains throttle and duration.
     """
-    if not droneStatus.drone:
+    drone = droneStatus.getDrone(data)
+    if not drone:
         return notConnectedError(action="test motor sequence")
 
-    result = droneStatus.drone.motorTestController.testMotorSequence(data)
+    result = drone.motorTestController.testMotorSequence(data)
     socketio.emit("motor_test_result", result)
 
 
@@ -46,8 +48,9 @@ def testAllMotors(data: MotorTestThrottleDurationAndNumber) -> None:
     Args:
         data: The data passed from the frontend, contains which throttle and duration.
     """
-    if not droneStatus.drone:
+    drone = droneStatus.getDrone(data)
+    if not drone:
         return notConnectedError(action="test all motors")
 
-    result = droneStatus.drone.motorTestController.testAllMotors(data)
+    result = drone.motorTestController.testAllMotors(data)
     socketio.emit("motor_test_result", result)
@@ -1,39 +1,41 @@
-from typing_extensions import TypedDict
+from typing import Optional
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
 from app.utils import notConnectedError
 
 
-class TakeoffDataType(TypedDict):
+class TakeoffDataType(VehicleDataType):
     alt: int
 
 
-class RepositionDataType(TypedDict):
+class RepositionDataType(VehicleDataType):
     lat: float
     lon: float
     alt: int
 
 
 @socketio.on("get_home_position")
-def getHomePosition() -> None:
+def getHomePosition(data: Optional[VehicleDataType] = None) -> None:
     """
     Gets the home position of the drone, only works when the dashboard or missions page is loaded.
     """
-    if droneStatus.state not in ["dashboard", "missions"]:
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get home position")
+
+    if drone.state not in ["dashboard", "missions"]:
         socketio.emit(
             "params_error",
             {
                 "message": "You must be on the dashboard or missions screen to get the home position."
             },
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="get home position")
-
-    result = droneStatus.drone.navController.getHomePosition()
+    result = drone.navController.getHomePosition()
 
     socketio.emit("home_position_result", result)
 
@@ -43,17 +45,18 @@ def takeoff(data: TakeoffDataType) -> None:
     """
     Commands the drone to takeoff, only works when the dashboard page is loaded.
     """
-    if droneStatus.state != "dashboard":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="takeoff")
+
+    if drone.state != "dashboard":
         socketio.emit(
             "params_error",
             {"message": "You must be on the dashboard screen to takeoff."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="takeoff")
-
     alt = data.get("alt", None)
     if alt is None or alt < 0:
         socketio.emit(
@@ -62,28 +65,29 @@ def takeoff(data: TakeoffDataType) -> None:
         )
         return
 
-    result = droneStatus.drone.navController.takeoff(alt)
+    result = drone.navController.takeoff(alt)
 
     socketio.emit("nav_result", result)
 
 
 @socketio.on("land")
-def land() -> None:
+def land(data: Optional[VehicleDataType] = None) -> None:
     """
     Commands the drone to land, only works when the dashboard page is loaded.
     """
-    if droneStatus.state != "dashboard":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="land")
+
+    if drone.state != "dashboard":
         socketio.emit(
             "params_error",
             {"message": "You must be on the dashboard screen to land."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="land")
-
-    result = droneStatus.drone.navController.land()
+    result = drone.navController.land()
 
     socketio.emit("nav_result", result)
 
@@ -93,17 +97,18 @@ def reposition(data: RepositionDataType) -> None:
     """
     Commands the drone to reposition, only works when the dashboard page is loaded.
     """
-    if droneStatus.state != "dashboard":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="reposition")
+
+    if drone.state != "dashboard":
         socketio.emit(
             "params_error",
             {"message": "You must be on the dashboard screen to reposition."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    if not droneStatus.drone:
-        return notConnectedError(action="reposition")
-
     alt = data.get("alt", None)
     if alt is None or alt < 0:
         socketio.emit(
@@ -122,6 +127,6 @@ def reposition(data: RepositionDataType) -> None:
         )
         return
 
-    result = droneStatus.drone.navController.reposition(lat, lon, alt)
+    result = drone.navController.reposition(lat, lon, alt)
 
     socketio.emit("nav_reposition_result", result)
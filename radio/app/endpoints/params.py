@@ -1,31 +1,40 @@
 import time
-from typing import Any, List
+from typing import Any, List, Optional, Union
 
 import app.droneStatus as droneStatus
 from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
+
+
+class SetMultipleParamsType(VehicleDataType):
+    params: List[Any]
 
 
 @socketio.on("set_multiple_params")
-def set_multiple_params(params_list: List[Any]) -> None:
+def set_multiple_params(params_list: Union[List[Any], SetMultipleParamsType]) -> None:
     """
     Set multiple parameters at the same time.
 
     Args:
-        params_list: The list of parameters to be setting from the client.
+        params_list: The list of parameters to be setting from the client. Can also be sent with a vehicle_id as {"params", "vehicle_id"}.
     """
+    data: VehicleDataType = params_list if isinstance(params_list, dict) else {}
+    if isinstance(params_list, dict):
+        params_list = params_list.get("params", [])
     validStates = ["params", "config"]
-    if droneStatus.state not in validStates:
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return
+
+    if drone.state not in validStates:
         socketio.emit(
             "params_error",
             {"message": "You must be on the params screen to save parameters."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
-        return
-
-    if not droneStatus.drone:
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    success = droneStatus.drone.paramsController.setMultipleParams(params_list)
+    success = drone.paramsController.setMultipleParams(params_list)
     if success:
         socketio.emit(
             "param_set_success", {"message": "Parameters saved successfully."}
@@ -35,27 +44,28 @@ def set_multiple_params(params_list: List[Any]) -> None:
 
 
 @socketio.on("refresh_params")
-def refresh_params() -> None:
+def refresh_params(data: Optional[VehicleDataType] = None) -> None:
     """
     Refresh all parameters
     """
-    if droneStatus.state != "params":
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return
+
+    if drone.state != "params":
         socketio.emit(
             "params_error",
             {"message": "You must be on the params screen to refresh the parameters."},
         )
-        fgcs_logger.debug(f"Current state: {droneStatus.state}")
-        return
-
-    if not droneStatus.drone:
+        fgcs_logger.debug(f"Current state: {drone.state}")
         return
 
-    droneStatus.drone.paramsController.getAllParams()
+    drone.paramsController.getAllParams()
 
     timeout = time.time() + 20  # 20 seconds from now yipee
     last_index_sent = -1
 
-    while droneStatus.drone and droneStatus.drone.paramsController.is_requesting_params:
+    while drone.is_active and drone.paramsController.is_requesting_params:
         if time.time() > timeout:
             socketio.emit(
                 "params_error",
@@ -64,19 +74,19 @@ def refresh_params() -> None:
             return
 
         if (
-            last_index_sent != droneStatus.drone.paramsController.current_param_index
-            and droneStatus.drone.paramsController.current_param_index > last_index_sent
+            last_index_sent != drone.paramsController.current_param_index
+            and drone.paramsController.current_param_index > last_index_sent
         ):
             socketio.emit(
                 "param_request_update",
                 {
-                    "current_param_index": droneStatus.drone.paramsController.current_param_index,
-                    "total_number_of_params": droneStatus.drone.paramsController.total_number_of_params,
+                    "current_param_index": drone.paramsController.current_param_index,
+                    "total_number_of_params": drone.paramsController.total_number_of_params,
                 },
             )
-            last_index_sent = droneStatus.drone.paramsController.current_param_index
+            last_index_sent = drone.paramsController.current_param_index
 
         time.sleep(0.2)
 
-    if droneStatus.drone:
-        socketio.emit("params", droneStatus.drone.paramsController.params)
+    if drone.is_active:
+        socketio.emit("params", drone.paramsController.params)
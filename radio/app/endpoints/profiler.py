@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+from flask import request
+from typing_extensions import TypedDict
+
+from app import fgcs_logger, log_sub_dir, socketio
+from app.customTypes import Response
+from app.samplingProfiler import SamplingProfiler
+
+# The profiler samples the whole backend, not a drone, so it outlives connections and
+# writes its profiles next to the session's logs
+profiler = SamplingProfiler(Path(log_sub_dir))
+
+
+class StartProfilerType(TypedDict, total=False):
+    interval_ms: float
+    duration: float
+
+
+def startProfiler(
+    interval_ms: Optional[float] = None, duration: Optional[float] = None
+) -> Response:
+    try:
+        profiler.start(
+            interval=interval_ms / 1000 if interval_ms is not None else None,
+            duration=duration,
+        )
+    except (RuntimeError, ValueError, TypeError) as e:
+        return {"success": False, "message": f"Could not start the profiler, {e}"}
+
+    fgcs_logger.info(f"Started the profiler, sampling every {profiler.interval}s")
+    return {
+        "success": True,
+        "message": "Started the profiler",
+        "data": profiler.getStatus(),
+    }
+
+
+def stopProfiler() -> Response:
+    profile = profiler.stop()
+    if profile is None:
+        return {"success": False, "message": "The profiler is not running"}
+
+    fgcs_logger.info(
+        f"Saved profile of {profile['samples']} samples to: {profile['collapsed_file']}"
+    )
+    return {
+        "success": True,
+        "message": f"Saved profile to {profile['collapsed_file']}",
+        "data": profiler.getStatus(),
+    }
+
+
+@socketio.on("start_profiler")
+def startProfilerEvent(data: Optional[StartProfilerType] = None) -> None:
+    """
+    Start sampling the stacks of every backend thread, to find what is slowing the
+    backend down while it runs.
+
+    Args:
+        data: The form data passed in from the frontend, this optionally contains the interval between samples in milliseconds and the duration in seconds after which the profile is saved
+    """
+    data = data or {}
+    socketio.emit(
+        "profiler_result",
+        startProfiler(data.get("interval_ms"), data.get("duration")),
+    )
+
+
+@socketio.on("stop_profiler")
+def stopProfilerEvent() -> None:
+    """
+    Stop the profiler and save the profile as collapsed stacks and pstats in the session
+    log directory.
+    """
+    socketio.emit("profiler_result", stopProfiler())
+
+
+@socketio.on("get_profiler_status")
+def getProfilerStatus() -> None:
+    """
+    Sends whether the profiler is running, and the files of the last profile saved.
+    """
+    socketio.emit("profiler_status", profiler.getStatus())
+
+
+def startProfilerHttp() -> Tuple[Response, int]:
+    """HTTP version of start_profiler, taking the same options as query parameters."""
+    result = startProfiler(
+        request.args.get("interval_ms", type=float),
+        request.args.get("duration", type=float),
+    )
+    return result, 200 if result["success"] else 409
+
+
+def stopProfilerHttp() -> Tuple[Response, int]:
+    """HTTP version of stop_profiler."""
+    result = stopProfiler()
+    return result, 200 if result["success"] else 409
+
+
+def getProfilerStatusHttp() -> Tuple[dict, int]:
+    """HTTP version of get_profiler_status."""
+    return dict(profiler.getStatus()), 200
@@ -1,18 +1,17 @@
 import time
 
 from pymavlink import mavutil
-from typing_extensions import TypedDict
 
 import app.droneStatus as droneStatus
 from app import socketio
+from app.customTypes import VehicleDataType
 from app.utils import (
     missingParameterError,
     notConnectedError,
-    sendMessage,
 )
 
 
-class SetStateType(TypedDict):
+class SetStateType(VehicleDataType):
     state: str
 
 
@@ -24,14 +23,15 @@ def set_state(data: SetStateType) -> None:
     Args:
         data: The form data passed in from the frontend, this contains the state we wish to change to
     """
-    if not droneStatus.drone:
+    drone = droneStatus.getDrone(data)
+    if not drone:
         return notConnectedError(action="set the drone state")
 
     # Ensure that a state was actually sent
     if (newState := data.get("state", None)) is None:
         return missingParameterError("set_state", "state")
 
-    droneStatus.state = newState
+    drone.state = newState
 
     message_listeners = {
         "dashboard": [
@@ -54,47 +54,38 @@ def set_state(data: SetStateType) -> None:
         "config.flight_modes": ["RC_CHANNELS", "HEARTBEAT"],
     }
 
-    if droneStatus.state == "dashboard":
-        droneStatus.drone.setupDataStreams()
+    if drone.state == "dashboard":
+        drone.setupDataStreams()
         for message in message_listeners["dashboard"]:
-            droneStatus.drone.addMessageListener(message, sendMessage)
-    if droneStatus.state == "missions":
-        droneStatus.drone.stopAllDataStreams()
-        droneStatus.drone.setupSingleDataStream(
-            mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS
-        )
-        droneStatus.drone.setupSingleDataStream(
-            mavutil.mavlink.MAV_DATA_STREAM_POSITION
-        )
+            drone.addMessageListener(message, drone.forwardMessage)
+    if drone.state == "missions":
+        drone.stopAllDataStreams()
+        drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS)
+        drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_POSITION)
         for message in message_listeners["missions"]:
-            droneStatus.drone.addMessageListener(message, sendMessage)
-    elif droneStatus.state == "graphs":
-        droneStatus.drone.stopAllDataStreams()
+            drone.addMessageListener(message, drone.forwardMessage)
+    elif drone.state == "graphs":
+        drone.stopAllDataStreams()
 
-        droneStatus.drone.setupSingleDataStream(
-            mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS
-        )
-        droneStatus.drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTRA1)
-        droneStatus.drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTRA2)
+        drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS)
+        drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTRA1)
+        drone.setupSingleDataStream(mavutil.mavlink.MAV_DATA_STREAM_EXTRA2)
 
         for message in message_listeners["graphs"]:
-            droneStatus.drone.addMessageListener(message, sendMessage)
-    elif droneStatus.state == "params":
-        droneStatus.drone.stopAllDataStreams()
+            drone.addMessageListener(message, drone.forwardMessage)
+    elif drone.state == "params":
+        drone.stopAllDataStreams()
 
-        if len(droneStatus.drone.paramsController.params):
-            socketio.emit("params", droneStatus.drone.paramsController.params)
+        if len(drone.paramsController.params):
+            socketio.emit("params", drone.paramsController.params)
             return
 
-        droneStatus.drone.paramsController.getAllParams()
+        drone.paramsController.getAllParams()
 
         timeout = time.time() + 20
         last_index_sent = -1
 
-        while (
-            droneStatus.drone
-            and droneStatus.drone.paramsController.is_requesting_params
-        ):
+        while drone.is_active and drone.paramsController.is_requesting_params:
             if time.time() > timeout:
                 socketio.emit(
                     "params_error",
@@ -103,38 +94,36 @@ def set_state(data: SetStateType) -> None:
                 return
 
             if (
-                last_index_sent
-                != droneStatus.drone.paramsController.current_param_index
-                and droneStatus.drone.paramsController.current_param_index
-                > last_index_sent
+                last_index_sent != drone.paramsController.current_param_index
+                and drone.paramsController.current_param_index > last_index_sent
             ):
                 socketio.emit(
                     "param_request_update",
                     {
-                        "current_param_index": droneStatus.drone.paramsController.current_param_index,
-                        "total_number_of_params": droneStatus.drone.paramsController.total_number_of_params,
+                        "current_param_index": drone.paramsController.current_param_index,
+                        "total_number_of_params": drone.paramsController.total_number_of_params,
                     },
                 )
-                last_index_sent = droneStatus.drone.paramsController.current_param_index
+                last_index_sent = drone.paramsController.current_param_index
 
             time.sleep(0.2)
 
-        if droneStatus.drone:
-            socketio.emit("params", droneStatus.drone.paramsController.params)
-    elif droneStatus.state == "config":
-        droneStatus.drone.stopAllDataStreams()
-    elif droneStatus.state == "config.flight_modes":
-        droneStatus.drone.stopAllDataStreams()
+        if drone.is_active:
+            socketio.emit("params", drone.paramsController.params)
+    elif drone.state == "config":
+        drone.stopAllDataStreams()
+    elif drone.state == "config.flight_modes":
+        drone.stopAllDataStreams()
 
-        droneStatus.drone.sendDataStreamRequestMessage(
+        drone.sendDataStreamRequestMessage(
             mavutil.mavlink.MAV_DATA_STREAM_RC_CHANNELS, 2
         )
 
         for message in message_listeners["config.flight_modes"]:
-            droneStatus.drone.addMessageListener(message, sendMessage)
-    elif droneStatus.state == "config.rc":
-        droneStatus.drone.stopAllDataStreams()
+            drone.addMessageListener(message, drone.forwardMessage)
+    elif drone.state == "config.rc":
+        drone.stopAllDataStreams()
 
-        droneStatus.drone.sendDataStreamRequestMessage(
+        drone.sendDataStreamRequestMessage(
             mavutil.mavlink.MAV_DATA_STREAM_RC_CHANNELS, 4
         )
@@ -0,0 +1,100 @@
+from typing import Optional, Tuple
+
+from flask import request
+
+import app.droneStatus as droneStatus
+from app import socketio
+from app.customTypes import VehicleDataType
+from app.utils import missingParameterError, notConnectedError
+
+
+@socketio.on("get_message_queue_stats")
+def getMessageQueueStats(data: Optional[VehicleDataType] = None) -> None:
+    """
+    Sends the number of queued and processed messages, and how long messages waited to be
+    executed, for each message priority class.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the message queue stats")
+
+    socketio.emit("message_queue_stats", drone.getMessageQueueStats())
+
+
+@socketio.on("get_queue_stats")
+def getQueueStats(data: Optional[VehicleDataType] = None) -> None:
+    """
+    Sends the size of the message and log queues, and the number of items each queue
+    has dropped or spilled to disk because it was full.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the queue stats")
+
+    socketio.emit("queue_stats", drone.getQueueStats())
+
+
+@socketio.on("get_router_stats")
+def getRouterStats(data: Optional[VehicleDataType] = None) -> None:
+    """
+    Sends the number of messages forwarded to and received from each MAVLink router
+    endpoint, and how many peers are connected to it.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the router stats")
+
+    socketio.emit("router_stats", drone.getRouterStats())
+
+
+class SetBackendStatsType(VehicleDataType):
+    enabled: bool
+
+
+@socketio.on("get_backend_stats")
+def getBackendStats(data: Optional[VehicleDataType] = None) -> None:
+    """
+    Sends the per message type receive counts and rates, message listener execution
+    time histograms and link throughput, if the backend stats are enabled, along with
+    the queue depths and dropped message counts.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the backend stats")
+
+    socketio.emit("backend_stats", drone.getBackendStats())
+
+
+@socketio.on("set_backend_stats")
+def setBackendStats(data: SetBackendStatsType) -> None:
+    """
+    Start or stop collecting the backend stats, which are off by default unless enabled
+    with backend_stats in the telemetry config.
+
+    Args:
+        data: The form data passed in from the frontend, this contains whether to enable the backend stats
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="set the backend stats")
+
+    if (enabled := data.get("enabled", None)) is None:
+        return missingParameterError("set_backend_stats", "enabled")
+
+    drone.setBackendStatsEnabled(bool(enabled))
+    socketio.emit("backend_stats", drone.getBackendStats())
+
+
+def getBackendStatsHttp() -> Tuple[dict, int]:
+    """
+    HTTP version of get_backend_stats, for polling the stats with tools outside the GUI.
+    Only registered when backend_stats_http is enabled in the telemetry config. Takes
+    an optional vehicle_id query parameter.
+    """
+    drone = droneStatus.getDrone(request.args.to_dict())
+    if not drone:
+        return {
+            "message": "Must be connected to the drone to get the backend stats."
+        }, 503
+
+    return dict(drone.getBackendStats()), 200
@@ -0,0 +1,148 @@
+from typing import Optional
+
+from flask_socketio import join_room, leave_room
+from typing_extensions import NotRequired, TypedDict
+
+import app.droneStatus as droneStatus
+from app import fgcs_logger, socketio
+from app.customTypes import VehicleDataType
+from app.utils import droneErrorCb, missingParameterError, notConnectedError
+from app.vehicleRegistry import getVehicleRoom
+
+
+class VehicleIdType(TypedDict):
+    vehicle_id: str
+
+
+class LinkSystemType(TypedDict):
+    system_id: int
+    vehicle_id: NotRequired[str]
+
+
+@socketio.on("list_vehicles")
+def listVehicles() -> None:
+    """
+    Sends every connected vehicle, and which one is selected, to the client.
+    """
+    selected = droneStatus.drone.vehicle_id if droneStatus.drone else None
+    socketio.emit(
+        "vehicles",
+        {"vehicles": droneStatus.vehicles.getVehicleInfo(), "selected": selected},
+    )
+
+
+@socketio.on("select_vehicle")
+def selectVehicle(data: VehicleIdType) -> None:
+    """
+    Select the vehicle that endpoints act on when they are not sent a vehicle_id.
+
+    Args:
+        data: Contains the vehicle_id of the vehicle to select
+    """
+    vehicle_id = data.get("vehicle_id")
+    if vehicle_id is None:
+        return missingParameterError("select_vehicle", "vehicle_id")
+
+    if not droneStatus.selectVehicle(str(vehicle_id)):
+        return droneErrorCb(f"No vehicle with the ID {vehicle_id}.")
+
+    fgcs_logger.info(f"Selected vehicle {vehicle_id}")
+    listVehicles()
+
+
+@socketio.on("join_vehicle")
+def joinVehicle(data: VehicleIdType) -> None:
+    """
+    Start receiving the telemetry of a vehicle. The client that connects to a vehicle
+    joins it automatically, other clients must join to watch it.
+
+    Args:
+        data: Contains the vehicle_id of the vehicle to receive telemetry from
+    """
+    vehicle_id = data.get("vehicle_id")
+    if vehicle_id is None:
+        return missingParameterError("join_vehicle", "vehicle_id")
+
+    if vehicle_id not in droneStatus.vehicles:
+        return droneErrorCb(f"No vehicle with the ID {vehicle_id}.")
+
+    join_room(getVehicleRoom(str(vehicle_id)))
+
+
+@socketio.on("leave_vehicle")
+def leaveVehicle(data: VehicleIdType) -> None:
+    """
+    Stop receiving the telemetry of a vehicle.
+
+    Args:
+        data: Contains the vehicle_id of the vehicle to stop receiving telemetry from
+    """
+    vehicle_id = data.get("vehicle_id")
+    if vehicle_id is None:
+        return missingParameterError("leave_vehicle", "vehicle_id")
+
+    leave_room(getVehicleRoom(str(vehicle_id)))
+
+
+@socketio.on("get_link_components")
+def getLinkComponents(data: Optional[VehicleDataType] = None) -> None:
+    """
+    Sends every MAVLink system and component seen on a vehicle's link, such as other
+    aircraft sharing the telemetry radio, gimbals and companion computers.
+
+    Args:
+        data: Optionally contains the vehicle_id of the link. Defaults to the selected vehicle.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="get the link components")
+
+    socketio.emit(
+        "link_components",
+        {"vehicle_id": drone.vehicle_id, "components": drone.getLinkComponents()},
+    )
+
+
+@socketio.on("watch_link_system")
+def watchLinkSystem(data: LinkSystemType) -> None:
+    """
+    Start receiving the telemetry of another system on a vehicle's link, without
+    opening another connection. The telemetry is sent with the vehicle ID given in the
+    link_view event.
+
+    Args:
+        data: Contains the system_id to receive the telemetry of, and optionally the vehicle_id of the link. Defaults to the selected vehicle.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="watch a system on the link")
+
+    system_id = data.get("system_id")
+    if system_id is None:
+        return missingParameterError("watch_link_system", "system_id")
+    if system_id == drone.target_system:
+        return droneErrorCb(f"System {system_id} is the connected vehicle.")
+
+    view_id = drone.watchLinkSystem(int(system_id))
+    join_room(getVehicleRoom(view_id))
+    socketio.emit("link_view", {"vehicle_id": view_id, "system_id": system_id})
+
+
+@socketio.on("unwatch_link_system")
+def unwatchLinkSystem(data: LinkSystemType) -> None:
+    """
+    Stop receiving the telemetry of another system on a vehicle's link.
+
+    Args:
+        data: Contains the system_id to stop receiving the telemetry of, and optionally the vehicle_id of the link. Defaults to the selected vehicle.
+    """
+    drone = droneStatus.getDrone(data)
+    if not drone:
+        return notConnectedError(action="stop watching a system on the link")
+
+    system_id = data.get("system_id")
+    if system_id is None:
+        return missingParameterError("unwatch_link_system", "system_id")
+
+    leave_room(getVehicleRoom(drone.getLinkViewId(int(system_id))))
+    drone.unwatchLinkSystem(int(system_id))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import IO, Optional
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    def __init__(self, path: Path) -> None:
+        """
+        An exclusive lock shared between processes, held on a lock file. The operating
+        system releases the lock if the process holding it exits without releasing it.
+
+        Args:
+            path (Path): The lock file, created if it does not exist
+        """
+        self.path = path
+        self._file_handle: Optional[IO[bytes]] = None
+
+    def acquire(self) -> bool:
+        """
+        Try to acquire the lock without waiting.
+
+        Returns:
+            bool: True if the lock was acquired, False if another process holds it
+        """
+        if self._file_handle is not None:
+            return True
+
+        file_handle = open(self.path, "a+b")
+        try:
+            if sys.platform == "win32":
+                file_handle.seek(0)
+                msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file_handle.close()
+            return False
+
+        self._file_handle = file_handle
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held."""
+        if self._file_handle is None:
+            return
+
+        if sys.platform == "win32":
+            self._file_handle.seek(0)
+            msvcrt.locking(self._file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file_handle.fileno(), fcntl.LOCK_UN)
+        self._file_handle.close()
+        self._file_handle = None
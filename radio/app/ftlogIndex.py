@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from typing_extensions import TypedDict
+
+from app.compressedFtlog import getLineTimestamp, isCompressedLogFile, readFrames
+
+MESSAGE_INDEX_SUFFIX = ".tidx"
+
+# Seconds of telemetry covered by each entry in the message index
+BUCKET_SECONDS = 10
+
+
+class MessageIndexEntry(TypedDict):
+    offset: int
+    length: int
+    # None for the unindexed end of a log file which has to be scanned
+    first_timestamp: Optional[float]
+    last_timestamp: Optional[float]
+    message_counts: Optional[Dict[str, int]]
+
+
+def getMessageIndexFile(log_file: Path) -> Path:
+    return log_file.with_name(log_file.name + MESSAGE_INDEX_SUFFIX)
+
+
+def getLineMessageType(line: str) -> Optional[str]:
+    parts = line.split(",", 2)
+    return parts[1] if len(parts) > 1 else None
+
+
+def formatMessageIndexEntry(entry: MessageIndexEntry) -> str:
+    message_counts = entry["message_counts"] or {}
+    return (
+        f"{entry['offset']},{entry['length']},"
+        f"{entry['first_timestamp']},{entry['last_timestamp']},"
+        f"{'|'.join(f'{msg_type}={count}' for msg_type, count in message_counts.items())}\n"
+    )
+
+
+def parseMessageIndexEntry(line: str) -> MessageIndexEntry:
+    offset, length, first_timestamp, last_timestamp, message_counts = line.rstrip(
+        "\n"
+    ).split(",")
+    return {
+        "offset": int(offset),
+        "length": int(length),
+        "first_timestamp": float(first_timestamp),
+        "last_timestamp": float(last_timestamp),
+        "message_counts": {
+            msg_type: int(count)
+            for msg_type, count in (
+                item.split("=") for item in message_counts.split("|") if item
+            )
+        },
+    }
+
+
+class MessageIndexWriter:
+    def __init__(
+        self,
+        index_file_handle: TextIO,
+        offset: int,
+        bucket_seconds: float = BUCKET_SECONDS,
+    ) -> None:
+        """
+        Writes the message index of an FTLog file as its lines are written. Each entry of
+        the index covers a run of lines spanning up to bucket_seconds, and records where
+        the lines are in the log file, their time range and how many of each message
+        type they hold.
+
+        Args:
+            index_file_handle (TextIO): The index file to write to
+            offset (int): The offset in the log file of the first line that will be added
+            bucket_seconds (float, optional): The time covered by each entry. Defaults to BUCKET_SECONDS.
+        """
+        self.index_file_handle = index_file_handle
+        self.bucket_seconds = bucket_seconds
+
+        self._offset = offset
+        self._length = 0
+        self._first_timestamp: Optional[float] = None
+        self._last_timestamp: Optional[float] = None
+        self._message_counts: Dict[str, int] = {}
+
+    def addLine(self, line: str, length: int) -> None:
+        """
+        Add the next line written to the log file.
+
+        Args:
+            line (str): The line
+            length (int): The length of the line in bytes, including the newline
+        """
+        timestamp = getLineTimestamp(line)
+        if timestamp is not None:
+            if self._first_timestamp is None:
+                self._first_timestamp = timestamp
+            elif timestamp - self._first_timestamp >= self.bucket_seconds:
+                self.finishEntry()
+                self._first_timestamp = timestamp
+
+            if self._last_timestamp is None or timestamp > self._last_timestamp:
+                self._last_timestamp = timestamp
+            msg_type = getLineMessageType(line)
+            if msg_type is not None:
+                self._message_counts[msg_type] = (
+                    self._message_counts.get(msg_type, 0) + 1
+                )
+
+        self._length += length
+
+    def flush(self) -> None:
+        self.index_file_handle.flush()
+
+    def close(self) -> None:
+        """Write the entry for the last lines and close the index file."""
+        self.finishEntry()
+        self.index_file_handle.close()
+
+    def finishEntry(self) -> None:
+        """Write the entry for the lines added since the last entry, if any have a timestamp."""
+        if self._first_timestamp is not None and self._last_timestamp is not None:
+            self.index_file_handle.write(
+                formatMessageIndexEntry(
+                    {
+                        "offset": self._offset,
+                        "length": self._length,
+                        "first_timestamp": self._first_timestamp,
+                        "last_timestamp": self._last_timestamp,
+                        "message_counts": self._message_counts,
+                    }
+                )
+            )
+        self._offset += self._length
+        self._length = 0
+        self._first_timestamp = None
+        self._last_timestamp = None
+        self._message_counts = {}
+
+
+def getUnindexedEntry(start: int, end: int) -> MessageIndexEntry:
+    return {
+        "offset": start,
+        "length": end - start,
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "message_counts": None,
+    }
+
+
+def readMessageIndex(log_file: Path) -> List[MessageIndexEntry]:
+    """
+    Read the message index of an FTLog file. Any part of the log file not covered by the
+    index, such as the end of a log file that was being written when the GCS exited,
+    lines without a timestamp, or a log file without an index, gets an entry with no
+    time range or message counts.
+
+    Args:
+        log_file (Path): The FTLog file
+
+    Returns:
+        List[MessageIndexEntry]: The entries in the order they are in the log file
+    """
+    size = os.stat(log_file).st_size
+    entries: List[MessageIndexEntry] = []
+    indexed_end = 0
+    index_file = getMessageIndexFile(log_file)
+    if index_file.is_file():
+        with open(index_file) as index_file_handle:
+            for line in index_file_handle:
+                try:
+                    entry = parseMessageIndexEntry(line)
+                except ValueError:
+                    break
+                if entry["offset"] + entry["length"] > size:
+                    break
+                if entry["offset"] > indexed_end:
+                    entries.append(getUnindexedEntry(indexed_end, entry["offset"]))
+                entries.append(entry)
+                indexed_end = entry["offset"] + entry["length"]
+
+    if indexed_end < size:
+        entries.append(getUnindexedEntry(indexed_end, size))
+    return entries
+
+
+def indexLogFileRange(
+    index_file_handle: TextIO, log_file: Path, offset: int, length: int, shift: int
+) -> None:
+    """
+    Add the lines in part of an FTLog file which isn't in its index to an index.
+
+    Args:
+        index_file_handle (TextIO): The index to add the entries to
+        log_file (Path): The FTLog file
+        offset (int): The offset of the first line to index
+        length (int): The number of bytes to index
+        shift (int): How far the lines are moved from their offset in log_file in the indexed log file
+    """
+    index = MessageIndexWriter(index_file_handle, offset + shift)
+    with open(log_file, "rb") as log_file_handle:
+        log_file_handle.seek(offset)
+        while length > 0 and (line := log_file_handle.readline(length)):
+            index.addLine(line.decode(errors="replace"), len(line))
+            length -= len(line)
+    index.finishEntry()
+
+
+def mergeMessageIndexes(
+    log_files: List[Path], merged_log_file: Path, merged_offset: int
+) -> None:
+    """
+    Append the message indexes of FTLog files to the index of the log file they are
+    being merged into, moving each entry to where its log file will be. Any part of a
+    log file not in its index is indexed now.
+
+    Args:
+        log_files (List[Path]): The FTLog files being merged, in order
+        merged_log_file (Path): The FTLog file they are merged into
+        merged_offset (int): The size of the merged log file before they are appended
+    """
+    with open(getMessageIndexFile(merged_log_file), "a") as merged_index_file_handle:
+        for log_file in log_files:
+            for entry in readMessageIndex(log_file):
+                if entry["message_counts"] is None:
+                    indexLogFileRange(
+                        merged_index_file_handle,
+                        log_file,
+                        entry["offset"],
+                        entry["length"],
+                        merged_offset,
+                    )
+                else:
+                    entry["offset"] += merged_offset
+                    merged_index_file_handle.write(formatMessageIndexEntry(entry))
+            merged_offset += os.stat(log_file).st_size
+
+
+def queryFtlog(
+    log_file: Path,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    message_types: Optional[Iterable[str]] = None,
+) -> Iterator[str]:
+    """
+    Read the lines of an FTLog file within a time range and of the given message types,
+    using the log file's index to only read the parts of the file which can hold them.
+
+    Compressed log files have no message index, only the frame index written by
+    app.compressedFtlog, so the frames are skipped by time range alone and every frame
+    in the range is decompressed to filter the message types.
+
+    Args:
+        log_file (Path): The FTLog file, compressed or not
+        start_time (Optional[float], optional): The earliest timestamp to read. Defaults to the start of the log.
+        end_time (Optional[float], optional): The latest timestamp to read. Defaults to the end of the log.
+        message_types (Optional[Iterable[str]], optional): The message types to read. Defaults to all message types.
+
+    Yields:
+        str: The matching lines, each ending with a newline
+    """
+    wanted_types = frozenset(message_types) if message_types is not None else None
+    start = float("-inf") if start_time is None else start_time
+    end = float("inf") if end_time is None else end_time
+
+    def matches(line: str) -> bool:
+        timestamp = getLineTimestamp(line)
+        if timestamp is None or not start <= timestamp <= end:
+            return False
+        return wanted_types is None or getLineMessageType(line) in wanted_types
+
+    if isCompressedLogFile(log_file):
+        for line in readFrames(log_file, start_time, end_time):
+            if matches(line):
+                yield line
+        return
+
+    with open(log_file, "rb") as log_file_handle:
+        for entry in readMessageIndex(log_file):
+            first_timestamp = entry["first_timestamp"]
+            last_timestamp = entry["last_timestamp"]
+            message_counts = entry["message_counts"]
+            if first_timestamp is not None and last_timestamp is not None:
+                if last_timestamp < start or first_timestamp > end:
+                    continue
+            if message_counts is not None and wanted_types is not None:
+                if wanted_types.isdisjoint(message_counts):
+                    continue
+
+            log_file_handle.seek(entry["offset"])
+            chunk = log_file_handle.read(entry["length"])
+            for raw_line in chunk.splitlines(keepends=True):
+                decoded_line = raw_line.decode(errors="replace")
+                if matches(decoded_line):
+                    yield decoded_line
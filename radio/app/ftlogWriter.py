@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from secrets import token_hex
+from threading import Lock
+from typing import IO, BinaryIO, List, Optional, Set, TextIO
+
+from app.compressedFtlog import (
+    COMPRESSED_FTLOG_SUFFIX,
+    FRAME_LINES,
+    FTLOG_SUFFIX,
+    getFrameIndexFile,
+    isCompressedLogFile,
+    mergeFrameIndexes,
+    readLastFrameLine,
+    truncateToLastFrame,
+    writeFrame,
+)
+from app.ftlogIndex import (
+    MessageIndexWriter,
+    getMessageIndexFile,
+    mergeMessageIndexes,
+)
+
+# Number of messages written to a temp log file before moving on to the next one
+LOG_LINE_LIMIT = 50000
+
+FLUSH_SIZE = 64 * 1024
+FLUSH_INTERVAL = 1.0
+
+COPY_BUFFER_SIZE = 1024 * 1024
+# Enough to hold a ==NEXT_FILE== line, more is read if the last line is longer
+LAST_LINE_READ_SIZE = 4096
+
+# Writers with an open temp log file. Several drones can log at once, so recovering temp
+# logs must skip the files that another connection is still writing to.
+_active_writers: Set[FtlogWriter] = set()
+_active_writers_lock = Lock()
+
+
+def getActiveLogFiles() -> Set[Path]:
+    """
+    Get the temp log files of every writer which hasn't been closed, which will be
+    merged when their drone disconnects and must not be recovered.
+
+    Returns:
+        Set[Path]: The temp log files
+    """
+    with _active_writers_lock:
+        writers = list(_active_writers)
+    return {log_file for writer in writers for log_file in list(writer.log_file_names)}
+
+
+def getCurrentDateTimeStr() -> str:
+    return time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
+
+
+def readFirstLine(log_file: Path) -> str:
+    """
+    Read the first line of a log file without reading the rest of it.
+
+    Args:
+        log_file (Path): The log file
+
+    Returns:
+        str: The first line, empty if the file is empty
+    """
+    if isCompressedLogFile(log_file):
+        try:
+            with gzip.open(log_file, "rt") as compressed_log_file_handle:
+                return compressed_log_file_handle.readline()
+        except (OSError, EOFError):
+            return ""
+
+    with open(log_file) as log_file_handle:
+        return log_file_handle.readline()
+
+
+def readLastLine(log_file: Path) -> str:
+    """
+    Read the last line of a log file by reading backwards from the end of it.
+
+    Args:
+        log_file (Path): The log file
+
+    Returns:
+        str: The last line, empty if the file is empty
+    """
+    if isCompressedLogFile(log_file):
+        return readLastFrameLine(log_file)
+
+    with open(log_file, "rb") as log_file_handle:
+        end = log_file_handle.seek(0, os.SEEK_END)
+        read_size = LAST_LINE_READ_SIZE
+        while True:
+            start = max(end - read_size, 0)
+            log_file_handle.seek(start)
+            lines = log_file_handle.read(end - start).splitlines(keepends=True)
+            # The first line read is only known to be whole if it starts the file
+            if start == 0 or len(lines) > 1:
+                return lines[-1].decode() if lines else ""
+            read_size *= 2
+
+
+def appendLogFile(merged_log_file_handle: BinaryIO, log_file: Path) -> None:
+    """
+    Append a log file to the end of an open log file, copying it in the kernel with
+    sendfile where possible instead of reading it into memory.
+
+    Args:
+        merged_log_file_handle (BinaryIO): The log file to append to, positioned at its end and not opened in append mode, which sendfile does not support
+        log_file (Path): The log file to append
+    """
+    with open(log_file, "rb") as log_file_handle:
+        offset = 0
+        size = os.fstat(log_file_handle.fileno()).st_size
+        if sys.platform == "linux":
+            merged_log_file_handle.flush()
+            try:
+                while offset < size:
+                    sent = os.sendfile(
+                        merged_log_file_handle.fileno(),
+                        log_file_handle.fileno(),
+                        offset,
+                        size - offset,
+                    )
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                # Not supported by this filesystem, copy the rest the normal way
+                pass
+            merged_log_file_handle.seek(0, os.SEEK_END)
+
+        if offset < size:
+            log_file_handle.seek(offset)
+            shutil.copyfileobj(
+                log_file_handle, merged_log_file_handle, COPY_BUFFER_SIZE
+            )
+
+
+def mergeLogFiles(log_files: List[Path], merged_log_file: Path) -> None:
+    """
+    Append log files to a merged log file in order, deleting each one once it has been
+    copied. A single log file is renamed rather than copied if the merged log file does
+    not exist yet.
+
+    The message indexes of the log files are merged into the index of the merged log
+    file. Compressed log files are merged the same way, as their frames are complete
+    gzip members, and their frame indexes are merged into the index of the merged log
+    file.
+
+    Args:
+        log_files (List[Path]): The log files to merge
+        merged_log_file (Path): The log file to append them to
+    """
+    compressed = isCompressedLogFile(merged_log_file)
+    if compressed:
+        # Only whole frames can be merged, a frame cut off by the GCS exiting would
+        # stop the rest of the merged log file from being decompressed
+        for log_file in log_files:
+            truncateToLastFrame(log_file)
+
+    if len(log_files) == 1 and not merged_log_file.exists():
+        os.replace(log_files[0], merged_log_file)
+        if compressed:
+            os.replace(
+                getFrameIndexFile(log_files[0]), getFrameIndexFile(merged_log_file)
+            )
+        elif getMessageIndexFile(log_files[0]).is_file():
+            os.replace(
+                getMessageIndexFile(log_files[0]), getMessageIndexFile(merged_log_file)
+            )
+        return
+
+    merged_log_file.touch()
+    merged_offset = os.stat(merged_log_file).st_size
+    if compressed:
+        mergeFrameIndexes(log_files, merged_log_file, merged_offset)
+    else:
+        mergeMessageIndexes(log_files, merged_log_file, merged_offset)
+
+    with open(merged_log_file, "r+b") as merged_log_file_handle:
+        merged_log_file_handle.seek(0, os.SEEK_END)
+        for log_file in log_files:
+            appendLogFile(merged_log_file_handle, log_file)
+            os.remove(log_file)
+            if compressed:
+                getFrameIndexFile(log_file).unlink(missing_ok=True)
+            else:
+                getMessageIndexFile(log_file).unlink(missing_ok=True)
+
+
+class FtlogWriter:
+    def __init__(
+        self,
+        log_directory: Path,
+        line_limit: int = LOG_LINE_LIMIT,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        compress: bool = False,
+        frame_lines: int = FRAME_LINES,
+    ) -> None:
+        """
+        Writes telemetry lines into temp FTLog files, keeping the current file open and
+        buffering lines until flush_size bytes are waiting or flush_interval seconds have
+        passed since the last flush.
+
+        With compress, the temp files are .ftlog.gz files made of frames, gzip members of
+        at most frame_lines lines which are each written by one flush. The offset and time
+        range of every frame is written to a .idx file next to the temp file, so part of
+        the log can be read without decompressing all of it. Otherwise, a .tidx message
+        index is written next to the temp file, recording the offset, time range and
+        message types of each run of lines, so queryFtlog can seek straight to them.
+
+        The first temp file is named tmp_first_*.ftlog and every temp file starts with a
+        ==START_TIME== line. When a file reaches line_limit messages a ==NEXT_FILE== line
+        naming the next temp file is written to it, so cleanTempLogs can follow the chain
+        of files if the GCS exits before they are merged.
+
+        Only called from the drone log thread.
+
+        Args:
+            log_directory (Path): The directory to write the temp log files to
+            line_limit (int, optional): The number of messages in each temp log file. Defaults to LOG_LINE_LIMIT.
+            flush_size (int, optional): The number of buffered bytes which causes a flush. Defaults to FLUSH_SIZE.
+            flush_interval (float, optional): The longest time in seconds that lines are buffered for. Defaults to FLUSH_INTERVAL.
+            compress (bool, optional): Write compressed temp files. Defaults to False.
+            frame_lines (int, optional): The most lines in each compressed frame. Defaults to FRAME_LINES.
+        """
+        self.log_directory = log_directory
+        self.line_limit = line_limit
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.frame_lines = frame_lines
+        self.suffix = COMPRESSED_FTLOG_SUFFIX if compress else FTLOG_SUFFIX
+
+        self.current_log_file: Optional[Path] = None
+        self.log_file_names: List[Path] = []
+
+        self._file_handle: Optional[IO] = None
+        self._index_file_handle: Optional[TextIO] = None
+        self._message_index: Optional[MessageIndexWriter] = None
+        self._line_number = 0
+        self._buffer: List[str] = []
+        self._buffer_size = 0
+        self._last_flush_time = time.monotonic()
+
+    def write(self, line: str) -> None:
+        """
+        Write a telemetry line to the current temp log file, moving on to a new temp log
+        file if the current one is full.
+
+        Args:
+            line (str): The line to write, without a newline at the end
+        """
+        if self._file_handle is None:
+            self.__openLogFile(f"tmp_first_{token_hex(8)}{self.suffix}")
+        elif self._line_number >= self.line_limit:
+            next_log_file = self.log_directory.joinpath(
+                f"tmp_{token_hex(8)}{self.suffix}"
+            )
+            self.__bufferLine(f"==NEXT_FILE=={str(next_log_file)}==END==")
+            self.__closeLogFile()
+            self.__openLogFile(next_log_file.name)
+
+        self.__bufferLine(line)
+        self._line_number += 1
+
+        if (
+            self._buffer_size >= self.flush_size
+            or (self.compress and len(self._buffer) >= self.frame_lines)
+            or time.monotonic() - self._last_flush_time >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered lines to the current temp log file."""
+        self._last_flush_time = time.monotonic()
+        if self._file_handle is None or not self._buffer:
+            return
+
+        if self._index_file_handle is not None:
+            writeFrame(self._file_handle, self._index_file_handle, self._buffer)
+        else:
+            encoded_lines = [line.encode() for line in self._buffer]
+            if self._message_index is not None:
+                for line, encoded_line in zip(self._buffer, encoded_lines):
+                    self._message_index.addLine(line, len(encoded_line))
+            self._file_handle.write(b"".join(encoded_lines))
+            self._file_handle.flush()
+            if self._message_index is not None:
+                self._message_index.flush()
+        self._buffer = []
+        self._buffer_size = 0
+
+    def close(self) -> None:
+        """Flush and close the current temp log file."""
+        if self._file_handle is not None:
+            self.__closeLogFile()
+        with _active_writers_lock:
+            _active_writers.discard(self)
+
+    def __bufferLine(self, line: str) -> None:
+        self._buffer.append(line + "\n")
+        self._buffer_size += len(line) + 1
+
+    def __openLogFile(self, file_name: str) -> None:
+        self.current_log_file = self.log_directory.joinpath(file_name)
+        self.log_file_names.append(self.current_log_file)
+        with _active_writers_lock:
+            _active_writers.add(self)
+        self._line_number = 0
+        start_time_line = f"==START_TIME=={getCurrentDateTimeStr()}==END==\n"
+
+        # The start time is written straight away so a temp file always has it if the GCS exits
+        if self.compress:
+            self._file_handle = open(self.current_log_file, "wb")
+            self._index_file_handle = open(
+                getFrameIndexFile(self.current_log_file), "w"
+            )
+            writeFrame(self._file_handle, self._index_file_handle, [start_time_line])
+        else:
+            encoded_start_time_line = start_time_line.encode()
+            self._file_handle = open(self.current_log_file, "wb")
+            self._file_handle.write(encoded_start_time_line)
+            self._file_handle.flush()
+            self._message_index = MessageIndexWriter(
+                open(getMessageIndexFile(self.current_log_file), "w"),
+                len(encoded_start_time_line),
+            )
+
+    def __closeLogFile(self) -> None:
+        assert self._file_handle is not None
+        self.flush()
+        self._file_handle.close()
+        self._file_handle = None
+        if self._index_file_handle is not None:
+            self._index_file_handle.close()
+            self._index_file_handle = None
+        if self._message_index is not None:
+            self._message_index.close()
+            self._message_index = None
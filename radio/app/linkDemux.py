@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import time
+from logging import Logger
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymavlink import mavutil
+from typing_extensions import TypedDict
+
+from app.messageBus import MessageBus, MessageBusSubscription, MessageCallback
+from app.vehicleState import VehicleState
+
+# (system ID, component ID), a component ID of None stands for every component of the system
+StreamKey = Tuple[int, Optional[int]]
+
+
+class LinkComponentInfo(TypedDict):
+    system_id: int
+    component_id: int
+    mav_type: Optional[int]
+    autopilot: Optional[int]
+    message_count: int
+    last_seen: float
+
+
+class LinkComponent:
+    def __init__(
+        self, system_id: int, component_id: int, state: Optional[VehicleState] = None
+    ) -> None:
+        """
+        A MAVLink component seen on the link, such as an autopilot, gimbal or companion
+        computer, with the latest state built from its messages.
+
+        Args:
+            system_id (int): The system ID of the component
+            component_id (int): The component ID
+            state (Optional[VehicleState], optional): The state to keep up to date. Defaults to a new VehicleState for the component.
+        """
+        self.system_id = system_id
+        self.component_id = component_id
+        self.state = state or VehicleState(system_id, component_id)
+        self.mav_type: Optional[int] = None
+        self.autopilot: Optional[int] = None
+        self.message_count = 0
+        self.last_seen = 0.0
+
+    def getInfo(self) -> LinkComponentInfo:
+        return {
+            "system_id": self.system_id,
+            "component_id": self.component_id,
+            "mav_type": self.mav_type,
+            "autopilot": self.autopilot,
+            "message_count": self.message_count,
+            "last_seen": time.monotonic() - self.last_seen,
+        }
+
+
+class LinkDemux:
+    def __init__(self, logger: Logger, primary_state: VehicleState) -> None:
+        """
+        Splits the messages of one link by the (system ID, component ID) they were sent
+        from, as a telemetry radio or UDP link can carry several aircraft and the other
+        components of each. Every component gets its own state, and callbacks can
+        subscribe to the messages of one component or of every component of a system.
+
+        route() is called by the listener thread for every message, to update the
+        components' state. publish() is called by the sender thread for the messages
+        which hasSubscribers() said were wanted, so slow callbacks don't hold up reading.
+
+        Args:
+            logger (Logger): The logger to report callback errors to
+            primary_state (VehicleState): The state the drone already keeps for the system it connected to, which the components of that system share rather than keeping a copy
+        """
+        self.logger = logger
+        self.primary_state = primary_state
+
+        self._lock = Lock()
+        self._components: Dict[Tuple[int, int], LinkComponent] = {}
+        self._buses: Dict[StreamKey, MessageBus] = {}
+        self._new_component_callbacks: List[Callable[[LinkComponent], None]] = []
+
+    def route(self, msg: mavutil.mavlink.MAVLink_message) -> LinkComponent:
+        """
+        Update the state of the component which sent a message, adding the component if
+        it hasn't been seen before.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message received on the link
+
+        Returns:
+            LinkComponent: The component which sent the message
+        """
+        key = (msg.get_srcSystem(), msg.get_srcComponent())
+        component = self._components.get(key)
+        if component is None:
+            component = self.__addComponent(key)
+
+        component.message_count += 1
+        component.last_seen = time.monotonic()
+        if msg.get_type() == "HEARTBEAT":
+            component.mav_type = msg.type
+            component.autopilot = msg.autopilot
+        # The drone updates its own state before routing the message
+        if component.state is not self.primary_state:
+            component.state.update(msg)
+        return component
+
+    def hasSubscribers(self, msg: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Check if a message would be delivered to any callback.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message
+
+        Returns:
+            bool: True if a callback is subscribed to the message's type from its component or system
+        """
+        if not self._buses:
+            return False
+        msg_type = msg.get_type()
+        system_id = msg.get_srcSystem()
+        for key in ((system_id, msg.get_srcComponent()), (system_id, None)):
+            bus = self._buses.get(key)
+            if bus is not None and bus.hasSubscribers(msg_type):
+                return True
+        return False
+
+    def hasTypeSubscribers(self, msg_type: str) -> bool:
+        """
+        Check if a message type is subscribed to from any system or component.
+
+        Args:
+            msg_type (str): The message type
+
+        Returns:
+            bool: True if a callback is subscribed to the type, or to every message, of any system or component
+        """
+        return any(bus.hasSubscribers(msg_type) for bus in self._buses.values())
+
+    def publish(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Run the callbacks subscribed to a message from its component, then those
+        subscribed to it from every component of its system.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to publish
+        """
+        system_id = msg.get_srcSystem()
+        for key in ((system_id, msg.get_srcComponent()), (system_id, None)):
+            bus = self._buses.get(key)
+            if bus is not None:
+                bus.publish(msg)
+
+    def subscribe(
+        self,
+        system_id: int,
+        msg_type: str,
+        callback: MessageCallback,
+        component_id: Optional[int] = None,
+    ) -> MessageBusSubscription:
+        """
+        Subscribe a callback to the messages of one system or component.
+
+        Args:
+            system_id (int): The system ID to receive the messages of
+            msg_type (str): The message type to subscribe to, or WILDCARD for all messages
+            callback (MessageCallback): The function to run for each message
+            component_id (Optional[int], optional): Only receive the messages of this component. Defaults to every component of the system.
+
+        Returns:
+            MessageBusSubscription: A handle which can be used to unsubscribe
+        """
+        key = (system_id, component_id)
+        with self._lock:
+            bus = self._buses.get(key)
+            if bus is None:
+                bus = MessageBus(self.logger)
+                # Copied so hasSubscribers never sees the dict change size
+                self._buses = {**self._buses, key: bus}
+        return bus.subscribe(msg_type, callback)
+
+    def onNewComponent(self, callback: Callable[[LinkComponent], None]) -> None:
+        """
+        Run a callback, on the listener thread, when a component is first seen.
+
+        Args:
+            callback (Callable[[LinkComponent], None]): The function to run with the new component
+        """
+        with self._lock:
+            self._new_component_callbacks.append(callback)
+
+    def getComponent(
+        self, system_id: int, component_id: int
+    ) -> Optional[LinkComponent]:
+        return self._components.get((system_id, component_id))
+
+    def getComponents(self) -> List[LinkComponentInfo]:
+        """
+        Get every component seen on the link.
+
+        Returns:
+            List[LinkComponentInfo]: The components, ordered by system ID and component ID
+        """
+        return [
+            component.getInfo() for _, component in sorted(self._components.items())
+        ]
+
+    def getSystemIds(self) -> List[int]:
+        """
+        Get the system IDs of the vehicles seen on the link, leaving out ground stations.
+
+        Returns:
+            List[int]: The system IDs, in ascending order
+        """
+        return sorted(
+            {
+                component.system_id
+                for component in self._components.values()
+                if component.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID
+            }
+        )
+
+    def clear(self) -> None:
+        """Remove every subscription."""
+        with self._lock:
+            buses = list(self._buses.values())
+            self._buses = {}
+        for bus in buses:
+            bus.clear()
+
+    def __addComponent(self, key: Tuple[int, int]) -> LinkComponent:
+        component = LinkComponent(
+            *key,
+            self.primary_state if key[0] == self.primary_state.target_system else None,
+        )
+        with self._lock:
+            # Copied so readers on other threads never see the dict change size
+            self._components = {**self._components, key: component}
+            callbacks = list(self._new_component_callbacks)
+
+        self.logger.info(
+            f"Found MAVLink component {key[1]} of system {key[0]} on the link"
+        )
+        for callback in callbacks:
+            try:
+                callback(component)
+            except Exception as e:
+                self.logger.error(f"New component callback failed: {e}", exc_info=True)
+        return component
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import random
+import select
+import socket
+import time
+from collections import deque
+from threading import Condition, Thread
+from typing import Deque, Dict, List, Optional, Tuple
+
+from typing_extensions import TypedDict
+
+# How long the proxy threads wait before checking if the proxy was stopped
+POLL_INTERVAL = 0.1
+READ_SIZE = 4096
+
+MAVLINK_V1_STX = 0xFE
+MAVLINK_V2_STX = 0xFD
+MAVLINK_V1_OVERHEAD = 8
+MAVLINK_V2_OVERHEAD = 12
+MAVLINK_V2_SIGNATURE_LENGTH = 13
+MAVLINK_IFLAG_SIGNED = 0x01
+
+# A serial byte is sent as 10 bits, with a start and stop bit
+BITS_PER_BYTE = 10
+
+
+class ImpairmentProfile(TypedDict):
+    latency: float  # Seconds added to every packet
+    jitter: float  # Up to this many seconds added to or taken from the latency
+    loss: float  # Chance of dropping each packet
+    baud: Optional[int]  # The link speed, None for no cap
+    corruption: float  # Chance of corrupting each byte
+
+
+class ImpairmentStats(TypedDict):
+    packets: int
+    bytes: int
+    dropped: int
+    corrupted: int
+    queued_bytes: int
+
+
+NO_IMPAIRMENT: ImpairmentProfile = {
+    "latency": 0.0,
+    "jitter": 0.0,
+    "loss": 0.0,
+    "baud": None,
+    "corruption": 0.0,
+}
+
+# Scenarios for the links drones are flown with
+IMPAIRMENT_PRESETS: Dict[str, ImpairmentProfile] = {
+    "wired": NO_IMPAIRMENT,
+    # A SiK telemetry radio pair in range
+    "radio_57600": {
+        "latency": 0.02,
+        "jitter": 0.01,
+        "loss": 0.01,
+        "baud": 57600,
+        "corruption": 0.00001,
+    },
+    # A SiK telemetry radio pair near the edge of their range
+    "radio_fringe": {
+        "latency": 0.05,
+        "jitter": 0.03,
+        "loss": 0.1,
+        "baud": 57600,
+        "corruption": 0.0001,
+    },
+    # A long range, low rate radio
+    "long_range_9600": {
+        "latency": 0.15,
+        "jitter": 0.05,
+        "loss": 0.05,
+        "baud": 9600,
+        "corruption": 0.00005,
+    },
+    # Telemetry over a cellular modem
+    "cellular": {
+        "latency": 0.08,
+        "jitter": 0.04,
+        "loss": 0.01,
+        "baud": None,
+        "corruption": 0.0,
+    },
+}
+
+
+def splitMavlinkPackets(buffer: bytearray) -> List[bytes]:
+    """
+    Take the complete MAVLink packets from the start of a buffer, so impairments apply to
+    whole packets like they would on a radio link. Bytes before a packet start are
+    returned on their own.
+
+    Args:
+        buffer (bytearray): The bytes received so far, the packets are removed from it
+
+    Returns:
+        List[bytes]: The packets, in order
+    """
+    packets = []
+    while buffer:
+        if buffer[0] not in (MAVLINK_V1_STX, MAVLINK_V2_STX):
+            start = min(
+                (
+                    index
+                    for index in (
+                        buffer.find(MAVLINK_V1_STX),
+                        buffer.find(MAVLINK_V2_STX),
+                    )
+                    if index >= 0
+                ),
+                default=len(buffer),
+            )
+            packets.append(bytes(buffer[:start]))
+            del buffer[:start]
+            continue
+
+        if len(buffer) < 3:
+            break
+        if buffer[0] == MAVLINK_V1_STX:
+            length = MAVLINK_V1_OVERHEAD + buffer[1]
+        else:
+            length = MAVLINK_V2_OVERHEAD + buffer[1]
+            if buffer[2] & MAVLINK_IFLAG_SIGNED:
+                length += MAVLINK_V2_SIGNATURE_LENGTH
+        if len(buffer) < length:
+            break
+        packets.append(bytes(buffer[:length]))
+        del buffer[:length]
+    return packets
+
+
+class ImpairedLink:
+    def __init__(
+        self,
+        source: socket.socket,
+        destination: socket.socket,
+        profile: ImpairmentProfile,
+        rng: random.Random,
+    ) -> None:
+        """
+        One direction of an impaired link, which reads packets from the source socket
+        and sends them to the destination socket once they are due, dropping and
+        corrupting some of them.
+
+        Args:
+            source (socket.socket): The socket to read from
+            destination (socket.socket): The socket to send to
+            profile (ImpairmentProfile): The impairments to apply
+            rng (random.Random): The random number generator for the impairments
+        """
+        self.source = source
+        self.destination = destination
+        self.profile = profile
+        self.rng = rng
+        self.is_active = True
+
+        self._packets: Deque[Tuple[float, bytes]] = deque()
+        self._condition = Condition()
+        self._link_free_time = 0.0
+        self._last_delivery_time = 0.0
+        self._stats: ImpairmentStats = {
+            "packets": 0,
+            "bytes": 0,
+            "dropped": 0,
+            "corrupted": 0,
+            "queued_bytes": 0,
+        }
+        self._threads = [
+            Thread(target=self.__receivePackets, daemon=True),
+            Thread(target=self.__sendPackets, daemon=True),
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self.is_active = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=POLL_INTERVAL * 10)
+
+    def getStats(self) -> ImpairmentStats:
+        with self._condition:
+            return {**self._stats}
+
+    def impair(self, packet: bytes) -> Optional[Tuple[float, bytes]]:
+        """
+        Apply the impairments to a packet.
+
+        Args:
+            packet (bytes): The packet
+
+        Returns:
+            Optional[Tuple[float, bytes]]: When to deliver the packet and the packet, or None if it is dropped
+        """
+        now = time.monotonic()
+        baud = self.profile["baud"]
+        # The packet takes up the link while it is sent even if it is then lost
+        if baud:
+            self._link_free_time = (
+                max(self._link_free_time, now) + len(packet) * BITS_PER_BYTE / baud
+            )
+        else:
+            self._link_free_time = now
+
+        if self.profile["loss"] and self.rng.random() < self.profile["loss"]:
+            self._stats["dropped"] += 1
+            return None
+
+        if self.profile["corruption"]:
+            corrupted = bytearray(packet)
+            for index in range(len(corrupted)):
+                if self.rng.random() < self.profile["corruption"]:
+                    corrupted[index] ^= 1 << self.rng.randrange(8)
+            if corrupted != packet:
+                self._stats["corrupted"] += 1
+                packet = bytes(corrupted)
+
+        latency = self.profile["latency"]
+        if self.profile["jitter"]:
+            latency += self.rng.uniform(-self.profile["jitter"], self.profile["jitter"])
+        # A serial link never reorders bytes
+        self._last_delivery_time = max(
+            self._link_free_time + max(latency, 0), self._last_delivery_time
+        )
+        return self._last_delivery_time, packet
+
+    def __receivePackets(self) -> None:
+        buffer = bytearray()
+        while self.is_active:
+            readable, _, _ = select.select([self.source], [], [], POLL_INTERVAL)
+            if not readable:
+                continue
+            try:
+                data = self.source.recv(READ_SIZE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+
+            buffer += data
+            with self._condition:
+                for packet in splitMavlinkPackets(buffer):
+                    impaired_packet = self.impair(packet)
+                    if impaired_packet is not None:
+                        self._packets.append(impaired_packet)
+                        self._stats["queued_bytes"] += len(packet)
+                self._condition.notify()
+
+        with self._condition:
+            self.is_active = False
+            self._condition.notify_all()
+
+    def __sendPackets(self) -> None:
+        while True:
+            with self._condition:
+                while self.is_active and (
+                    not self._packets or self._packets[0][0] > time.monotonic()
+                ):
+                    self._condition.wait(
+                        self._packets[0][0] - time.monotonic()
+                        if self._packets
+                        else None
+                    )
+                if not self.is_active:
+                    return
+                _, packet = self._packets.popleft()
+                self._stats["packets"] += 1
+                self._stats["bytes"] += len(packet)
+                self._stats["queued_bytes"] -= len(packet)
+            try:
+                self.destination.sendall(packet)
+            except OSError:
+                return
+
+
+class ImpairmentProxy:
+    def __init__(
+        self,
+        upstream_port: str,
+        profile: ImpairmentProfile = NO_IMPAIRMENT,
+        uplink_profile: Optional[ImpairmentProfile] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        A local TCP proxy between the drone and an autopilot on a TCP port, such as SITL
+        or the mock autopilot, which makes the link between them slow and lossy like a
+        telemetry radio. Connect the drone to connection_string once it has started.
+
+        Args:
+            upstream_port (str): The autopilot's TCP port, "tcp:<host>:<port>"
+            profile (ImpairmentProfile, optional): The impairments of the link from the autopilot to the drone. Defaults to NO_IMPAIRMENT.
+            uplink_profile (Optional[ImpairmentProfile], optional): The impairments of the link from the drone to the autopilot. Defaults to the same as profile.
+            seed (Optional[int], optional): Seed for the random impairments, to make runs repeatable. Defaults to None.
+        """
+        host, _, port = upstream_port.removeprefix("tcp:").rpartition(":")
+        self.upstream_address = (host, int(port))
+        self.profile = profile
+        self.uplink_profile = uplink_profile if uplink_profile is not None else profile
+        self.rng = random.Random(seed)
+        self.connection_string: Optional[str] = None
+        self.is_running = False
+
+        self.downlink: Optional[ImpairedLink] = None
+        self.uplink: Optional[ImpairedLink] = None
+
+        self._server_socket: Optional[socket.socket] = None
+        self._sockets: List[socket.socket] = []
+        self._accept_thread: Optional[Thread] = None
+
+    def start(self) -> str:
+        """
+        Start listening for the drone.
+
+        Returns:
+            str: The port for the drone to connect to
+        """
+        self._server_socket = socket.create_server(("127.0.0.1", 0))
+        self.connection_string = f"tcp:127.0.0.1:{self._server_socket.getsockname()[1]}"
+        self.is_running = True
+        self._accept_thread = Thread(target=self.__acceptConnections, daemon=True)
+        self._accept_thread.start()
+        return self.connection_string
+
+    def stop(self) -> None:
+        self.is_running = False
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=POLL_INTERVAL * 10)
+        self.__closeLinks()
+        if self._server_socket is not None:
+            self._server_socket.close()
+
+    def getStats(self) -> Dict[str, ImpairmentStats]:
+        """
+        Get the packets sent, dropped and corrupted in each direction of the link.
+
+        Returns:
+            Dict[str, ImpairmentStats]: The stats of the "downlink" from the autopilot and the "uplink" to it
+        """
+        return {
+            name: link.getStats()
+            for name, link in (("downlink", self.downlink), ("uplink", self.uplink))
+            if link is not None
+        }
+
+    def __acceptConnections(self) -> None:
+        assert self._server_socket is not None
+        while self.is_running:
+            readable, _, _ = select.select([self._server_socket], [], [], POLL_INTERVAL)
+            if not readable:
+                continue
+
+            # A new connection from the drone replaces the last one, like a reconnect
+            drone_socket, _ = self._server_socket.accept()
+            self.__closeLinks()
+            try:
+                autopilot_socket = socket.create_connection(self.upstream_address)
+            except OSError:
+                drone_socket.close()
+                continue
+
+            self._sockets = [drone_socket, autopilot_socket]
+            self.downlink = ImpairedLink(
+                autopilot_socket, drone_socket, self.profile, self.rng
+            )
+            self.uplink = ImpairedLink(
+                drone_socket, autopilot_socket, self.uplink_profile, self.rng
+            )
+            self.downlink.start()
+            self.uplink.start()
+
+    def __closeLinks(self) -> None:
+        for link in (self.downlink, self.uplink):
+            if link is not None:
+                link.stop()
+        for sock in self._sockets:
+            sock.close()
+        self._sockets = []
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import parse_qs
+
+from pymavlink import mavutil
+from serial import SerialException
+
+# Ports starting with this are replayed from a file instead of opened with mavutil,
+# e.g. "replay:/path/to/flight.tlog?speed=4", where speed is a multiple of real time
+# or "max" to replay as fast as possible
+REPLAY_PORT_PREFIX = "replay:"
+MAX_SPEED = "max"
+
+# The longest recv_msg waits for the next message before returning None, like the
+# read timeout of a serial port
+RECV_TIMEOUT = 0.1
+
+
+def isReplayPort(port: str) -> bool:
+    return port.startswith(REPLAY_PORT_PREFIX)
+
+
+def openReplayConnection(port: str) -> ReplayConnection:
+    """
+    Open a replay connection from a replay port, "replay:<file>[?speed=<speed>&loop=1]".
+
+    Args:
+        port (str): The replay port
+
+    Raises:
+        FileNotFoundError: If the replay file does not exist
+        ValueError: If the speed is not a positive number or "max"
+
+    Returns:
+        ReplayConnection: The replay connection
+    """
+    log_file, _, query = port[len(REPLAY_PORT_PREFIX) :].partition("?")
+    options = {key: values[-1] for key, values in parse_qs(query).items()}
+
+    speed_option = options.get("speed", "1")
+    speed = None if speed_option == MAX_SPEED else float(speed_option)
+    if speed is not None and speed <= 0:
+        raise ValueError(f"Replay speed must be positive or {MAX_SPEED}")
+
+    return ReplayConnection(
+        log_file, speed=speed, loop=options.get("loop", "0") not in ("0", "false")
+    )
+
+
+class ReplayConnection:
+    def __init__(
+        self,
+        log_file: Union[str, Path],
+        speed: Optional[float] = 1.0,
+        loop: bool = False,
+    ) -> None:
+        """
+        A connection to a drone which plays back a recorded tlog, so the drone can be
+        driven without SITL or hardware. It has the parts of the mavutil connection
+        interface that the drone uses. Messages sent to the drone are counted and
+        dropped, so requests such as mission reads time out. Parameter reads are
+        answered from the PARAM_VALUE messages replayed so far instead.
+
+        Files ending in .tlog hold a timestamp before each packet, like the tlog capture
+        flight log format. Any other file is read as raw MAVLink bytes without
+        timestamps, which are always replayed as fast as possible.
+
+        Args:
+            log_file (Union[str, Path]): The tlog or raw capture file to replay
+            speed (Optional[float], optional): How many times faster than real time to replay, keeping the time between messages. None replays as fast as possible. Defaults to 1.0.
+            loop (bool, optional): Start from the beginning again at the end of the file. Defaults to False.
+
+        Raises:
+            FileNotFoundError: If the replay file does not exist
+        """
+        self.log_file = Path(log_file)
+        if not self.log_file.is_file():
+            raise FileNotFoundError(f"Replay file {self.log_file} not found")
+
+        self.timestamps = self.log_file.suffix == ".tlog"
+        self.speed = speed if self.timestamps else None
+        self.loop = loop
+
+        self.target_system = 0
+        self.target_component = 0
+        self.mav = mavutil.mavlink.MAVLink(self, srcSystem=255, srcComponent=0)
+
+        self.messages_replayed = 0
+        self.bytes_sent = 0
+        # The latest PARAM_VALUE replayed for each parameter
+        self.param_values: Dict[str, mavutil.mavlink.MAVLink_message] = {}
+
+        self._log = self.__openLog()
+        self._pending_msg: Optional[Any] = None
+        self._first_timestamp: Optional[float] = None
+        self._start_time = 0.0
+        self._closed = False
+
+    def write(self, buf: bytes) -> None:
+        """Called by mav to send a message to the drone, which is dropped."""
+        self.bytes_sent += len(buf)
+
+    def recv_msg(self) -> Optional[Any]:
+        """
+        Get the next message in the replay file, once it is due.
+
+        Raises:
+            SerialException: If the connection is closed or the end of the replay file was reached
+
+        Returns:
+            Optional[Any]: The message, or None if the next message isn't due within RECV_TIMEOUT
+        """
+        if self._closed:
+            raise SerialException("Replay connection is closed")
+
+        msg = self._pending_msg or self.__readMessage()
+        if msg is None:
+            raise SerialException(f"Reached the end of replay file {self.log_file}")
+
+        if self.speed is not None:
+            if self._first_timestamp is None:
+                self._first_timestamp = msg._timestamp
+                self._start_time = time.monotonic()
+            due_time = (
+                self._start_time + (msg._timestamp - self._first_timestamp) / self.speed
+            )
+            wait_time = due_time - time.monotonic()
+            if wait_time > 0:
+                time.sleep(min(wait_time, RECV_TIMEOUT))
+                if wait_time > RECV_TIMEOUT:
+                    self._pending_msg = msg
+                    return None
+
+        self._pending_msg = None
+        self.messages_replayed += 1
+        if msg.get_type() == "PARAM_VALUE":
+            self.param_values[msg.param_id] = msg
+        elif (
+            msg.get_type() == "HEARTBEAT"
+            and msg.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID
+            and self.target_system == 0
+        ):
+            self.target_system = msg.get_srcSystem()
+            self.target_component = msg.get_srcComponent()
+        return msg
+
+    def wait_heartbeat(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Replay messages until a heartbeat from an autopilot.
+
+        Args:
+            timeout (Optional[float], optional): The longest time to wait in seconds. Defaults to waiting forever.
+
+        Returns:
+            Optional[Any]: The heartbeat, or None if there wasn't one in time
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while end_time is None or time.monotonic() < end_time:
+            try:
+                msg = self.recv_msg()
+            except SerialException:
+                return None
+            if (
+                msg is not None
+                and msg.get_type() == "HEARTBEAT"
+                and msg.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID
+            ):
+                return msg
+        return None
+
+    def param_fetch_all(self) -> None:
+        self.mav.param_request_list_send(self.target_system, self.target_component)
+
+    def param_set_send(
+        self, parm_name: str, parm_value: float, parm_type: Optional[int] = None
+    ) -> None:
+        self.mav.param_set_send(
+            self.target_system,
+            self.target_component,
+            parm_name.encode(),
+            parm_value,
+            mavutil.mavlink.MAV_PARAM_TYPE_REAL32 if parm_type is None else parm_type,
+        )
+
+    def close(self) -> None:
+        self._closed = True
+        self._log.close()
+
+    def __openLog(self) -> mavutil.mavlogfile:
+        return mavutil.mavlogfile(str(self.log_file), notimestamps=not self.timestamps)
+
+    def __readMessage(self) -> Optional[Any]:
+        while True:
+            msg = self._log.recv_msg()
+            if msg is None:
+                if not self.loop or self.messages_replayed == 0:
+                    return None
+                # The next pass is timed from when it starts
+                self._log.close()
+                self._log = self.__openLog()
+                self._first_timestamp = None
+                continue
+            if msg.get_type() != "BAD_DATA":
+                return msg
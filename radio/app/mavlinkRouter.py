@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import selectors
+import socket
+import time
+from logging import Logger
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
+
+from pymavlink import mavutil
+from typing_extensions import TypedDict
+
+UDP_OUT = "udpout"
+UDP_IN = "udpin"
+TCP_IN = "tcpin"
+ENDPOINT_TYPES = (UDP_OUT, UDP_IN, TCP_IN)
+
+# A message received from two endpoints within this many seconds is only sent to the
+# drone once
+DEDUP_WINDOW = 1.0
+READ_SIZE = 65535
+# A TCP consumer which falls this far behind is disconnected rather than buffered for
+MAX_PENDING_BYTES = 256 * 1024
+SELECT_TIMEOUT = 0.05
+
+Address = Tuple[str, int]
+# Where a message read by an endpoint came from, a UDP peer or a TCP client
+Peer = Union[Address, socket.socket]
+
+
+class RouterEndpointStats(TypedDict):
+    endpoint: str
+    peers: int
+    messages_out: int
+    bytes_out: int
+    dropped_out: int
+    messages_in: int
+    duplicates_in: int
+
+
+def parseEndpoint(endpoint: str) -> Tuple[str, Address]:
+    """
+    Parse an endpoint string in the format used by MAVProxy, such as
+    udpout:127.0.0.1:14550, udpin:0.0.0.0:14551 or tcpin:127.0.0.1:5770.
+
+    Args:
+        endpoint (str): The endpoint
+
+    Raises:
+        ValueError: If the endpoint type, host or port is not valid
+
+    Returns:
+        Tuple[str, Address]: The endpoint type and its address
+    """
+    parts = endpoint.split(":")
+    if len(parts) != 3 or parts[0] not in ENDPOINT_TYPES:
+        raise ValueError(
+            f"Invalid router endpoint {endpoint}, expected one of {ENDPOINT_TYPES} followed by :host:port"
+        )
+    try:
+        port = int(parts[2])
+    except ValueError:
+        raise ValueError(f"Invalid port in router endpoint {endpoint}") from None
+    return parts[0], (parts[1], port)
+
+
+class RouterEndpoint:
+    def __init__(self, endpoint: str) -> None:
+        """
+        A local endpoint which the drone's traffic is forwarded to and which may send
+        messages back to the drone.
+
+        Args:
+            endpoint (str): The endpoint string, see parseEndpoint
+        """
+        self.endpoint = endpoint
+        self.endpoint_type, self.address = parseEndpoint(endpoint)
+        self.messages_out = 0
+        self.bytes_out = 0
+        self.dropped_out = 0
+        self.messages_in = 0
+        self.duplicates_in = 0
+
+    def open(self, selector: selectors.BaseSelector) -> None:
+        raise NotImplementedError
+
+    def close(self, selector: selectors.BaseSelector) -> None:
+        raise NotImplementedError
+
+    def send(self, buf: Union[bytes, bytearray]) -> None:
+        raise NotImplementedError
+
+    def read(
+        self, sock: socket.socket, selector: selectors.BaseSelector
+    ) -> List[Tuple[Peer, bytes]]:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Send any data left over from a send which couldn't be completed."""
+
+    def getPeerCount(self) -> int:
+        raise NotImplementedError
+
+    def getStats(self) -> RouterEndpointStats:
+        return {
+            "endpoint": self.endpoint,
+            "peers": self.getPeerCount(),
+            "messages_out": self.messages_out,
+            "bytes_out": self.bytes_out,
+            "dropped_out": self.dropped_out,
+            "messages_in": self.messages_in,
+            "duplicates_in": self.duplicates_in,
+        }
+
+
+class UdpEndpoint(RouterEndpoint):
+    def __init__(self, endpoint: str) -> None:
+        """
+        A UDP endpoint. udpout sends to a fixed address, such as a MAVProxy console
+        listening on udpin. udpin listens on the address and sends to every peer which
+        has sent it a message.
+
+        Args:
+            endpoint (str): The endpoint string, see parseEndpoint
+        """
+        super().__init__(endpoint)
+        self.sock: Optional[socket.socket] = None
+        self.peers: Tuple[Address, ...] = (
+            (self.address,) if self.endpoint_type == UDP_OUT else ()
+        )
+
+    def open(self, selector: selectors.BaseSelector) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        if self.endpoint_type == UDP_IN:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind(self.address)
+        selector.register(self.sock, selectors.EVENT_READ, (self, self.sock))
+
+    def close(self, selector: selectors.BaseSelector) -> None:
+        if self.sock is not None:
+            selector.unregister(self.sock)
+            self.sock.close()
+            self.sock = None
+
+    def send(self, buf: Union[bytes, bytearray]) -> None:
+        sock = self.sock
+        if sock is None:
+            return
+        for peer in self.peers:
+            try:
+                sock.sendto(buf, peer)
+            except OSError:
+                # Nothing listening yet, or the socket buffer is full
+                self.dropped_out += 1
+                continue
+            self.messages_out += 1
+            self.bytes_out += len(buf)
+
+    def read(
+        self, sock: socket.socket, selector: selectors.BaseSelector
+    ) -> List[Tuple[Peer, bytes]]:
+        try:
+            data, peer = sock.recvfrom(READ_SIZE)
+        except OSError:
+            return []
+        if peer not in self.peers and self.endpoint_type == UDP_IN:
+            # Replaced rather than appended to, as send() iterates it on another thread
+            self.peers = self.peers + (peer,)
+        return [(peer, data)]
+
+    def getPeerCount(self) -> int:
+        return len(self.peers)
+
+
+class TcpServerEndpoint(RouterEndpoint):
+    def __init__(self, endpoint: str) -> None:
+        """
+        A TCP endpoint which listens on the address, every client which connects is
+        sent the drone's traffic. A client which can't keep up has its data buffered up
+        to MAX_PENDING_BYTES, after which it is disconnected.
+
+        Args:
+            endpoint (str): The endpoint string, see parseEndpoint
+        """
+        super().__init__(endpoint)
+        self.server: Optional[socket.socket] = None
+        self._lock = Lock()
+        self._clients: Dict[socket.socket, bytearray] = {}
+        self._closing: List[socket.socket] = []
+
+    def open(self, selector: selectors.BaseSelector) -> None:
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.address)
+        self.server.listen()
+        self.server.setblocking(False)
+        selector.register(self.server, selectors.EVENT_READ, (self, self.server))
+
+    def close(self, selector: selectors.BaseSelector) -> None:
+        with self._lock:
+            clients = list(self._clients)
+            self._clients = {}
+        for client in clients:
+            self.__closeClient(client, selector)
+        if self.server is not None:
+            selector.unregister(self.server)
+            self.server.close()
+            self.server = None
+
+    def send(self, buf: Union[bytes, bytearray]) -> None:
+        with self._lock:
+            for client, pending in self._clients.items():
+                if pending:
+                    if len(pending) + len(buf) > MAX_PENDING_BYTES:
+                        self.dropped_out += 1
+                        self._closing.append(client)
+                        continue
+                    pending += buf
+                else:
+                    try:
+                        sent = client.send(buf)
+                    except BlockingIOError:
+                        sent = 0
+                    except OSError:
+                        self.dropped_out += 1
+                        self._closing.append(client)
+                        continue
+                    if sent < len(buf):
+                        pending += memoryview(buf)[sent:]
+                self.messages_out += 1
+                self.bytes_out += len(buf)
+
+    def flush(self) -> None:
+        with self._lock:
+            for client, pending in self._clients.items():
+                if not pending:
+                    continue
+                try:
+                    sent = client.send(pending)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    self._closing.append(client)
+                    continue
+                del pending[:sent]
+
+    def read(
+        self, sock: socket.socket, selector: selectors.BaseSelector
+    ) -> List[Tuple[Peer, bytes]]:
+        if sock is self.server:
+            try:
+                client, _ = sock.accept()
+            except OSError:
+                return []
+            client.setblocking(False)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._clients[client] = bytearray()
+            selector.register(client, selectors.EVENT_READ, (self, client))
+            return []
+
+        try:
+            data = sock.recv(READ_SIZE)
+        except BlockingIOError:
+            return []
+        except OSError:
+            data = b""
+        if not data:
+            with self._lock:
+                self._clients.pop(sock, None)
+            self.__closeClient(sock, selector)
+            return []
+        return [(sock, data)]
+
+    def closeSlowClients(self, selector: selectors.BaseSelector) -> List[socket.socket]:
+        """
+        Disconnect the clients which couldn't be sent to.
+
+        Args:
+            selector (selectors.BaseSelector): The selector the clients are registered with
+
+        Returns:
+            List[socket.socket]: The clients disconnected
+        """
+        with self._lock:
+            closing = self._closing
+            self._closing = []
+            for client in closing:
+                self._clients.pop(client, None)
+        for client in closing:
+            self.__closeClient(client, selector)
+        return closing
+
+    def getPeerCount(self) -> int:
+        return len(self._clients)
+
+    def __closeClient(
+        self, client: socket.socket, selector: selectors.BaseSelector
+    ) -> None:
+        try:
+            selector.unregister(client)
+        except (KeyError, ValueError):
+            pass
+        client.close()
+
+
+def createEndpoint(endpoint: str) -> RouterEndpoint:
+    endpoint_type, _ = parseEndpoint(endpoint)
+    if endpoint_type == TCP_IN:
+        return TcpServerEndpoint(endpoint)
+    return UdpEndpoint(endpoint)
+
+
+class MavlinkRouter:
+    def __init__(
+        self,
+        endpoints: List[str],
+        injectCb: Callable[[bytes], None],
+        logger: Logger,
+        vehicle_system: Optional[int] = None,
+        dedup_window: float = DEDUP_WINDOW,
+    ) -> None:
+        """
+        Shares the drone's link with other local programs, such as a logging box, a
+        MAVProxy console or a test harness, while the drone holds the serial port.
+
+        Every message received from the drone is sent to each endpoint as the raw bytes
+        it arrived as, so an extra consumer costs a socket send and no decoding or
+        encoding. Messages sent by the consumers are split into packets, deduplicated
+        and written to the drone. A consumer that echoes the drone's own messages back
+        doesn't cause a loop, as messages from the drone's system are never injected.
+
+        forward() is called from the drone listener thread, everything else runs on
+        the router's own thread.
+
+        Args:
+            endpoints (List[str]): The endpoints to forward to, see parseEndpoint
+            injectCb (Callable[[bytes], None]): Writes a packet from a consumer to the drone
+            logger (Logger): The logger to report errors to
+            vehicle_system (Optional[int], optional): The system ID of the drone, whose messages are not injected. Defaults to None.
+            dedup_window (float, optional): The seconds a packet is remembered for to drop duplicates. Defaults to DEDUP_WINDOW.
+
+        Raises:
+            ValueError: If an endpoint is not valid
+        """
+        self.endpoints = [createEndpoint(endpoint) for endpoint in endpoints]
+        self.injectCb = injectCb
+        self.logger = logger
+        self.vehicle_system = vehicle_system
+        self.dedup_window = dedup_window
+
+        self._selector = selectors.DefaultSelector()
+        self._parsers: Dict[Tuple[int, Peer], Any] = {}
+        self._recent: Dict[bytes, float] = {}
+        self._next_prune_time = 0.0
+        self._is_running = False
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """
+        Open the endpoints and start the router thread. An endpoint which can't be
+        opened, such as a port already in use, is logged and left out.
+        """
+        opened = []
+        for endpoint in self.endpoints:
+            try:
+                endpoint.open(self._selector)
+            except OSError as e:
+                self.logger.error(
+                    f"Could not open router endpoint {endpoint.endpoint}: {e}"
+                )
+                continue
+            opened.append(endpoint)
+            self.logger.info(f"Forwarding the drone's traffic to {endpoint.endpoint}")
+        self.endpoints = opened
+
+        self._is_running = True
+        self._thread = Thread(target=self.__run, name="mavlink-router", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the router thread and close the endpoints."""
+        self._is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        for endpoint in self.endpoints:
+            endpoint.close(self._selector)
+        self._selector.close()
+
+    def forward(self, buf: Union[bytes, bytearray]) -> None:
+        """
+        Send a packet received from the drone to every endpoint.
+
+        Args:
+            buf (Union[bytes, bytearray]): The raw bytes of the packet, such as msg.get_msgbuf()
+        """
+        for endpoint in self.endpoints:
+            endpoint.send(buf)
+
+    def getStats(self) -> List[RouterEndpointStats]:
+        """
+        Get the traffic sent to and received from each endpoint.
+
+        Returns:
+            List[RouterEndpointStats]: The stats of each endpoint that was opened
+        """
+        return [endpoint.getStats() for endpoint in self.endpoints]
+
+    def __run(self) -> None:
+        while self._is_running:
+            try:
+                events = self._selector.select(timeout=SELECT_TIMEOUT)
+            except OSError:
+                break
+            for key, _ in events:
+                # Each socket is registered along with the endpoint it belongs to
+                endpoint, sock = cast(Tuple[RouterEndpoint, socket.socket], key.data)
+                for source, data in endpoint.read(sock, self._selector):
+                    self.__inject(endpoint, source, data)
+
+            for endpoint in self.endpoints:
+                endpoint.flush()
+                if isinstance(endpoint, TcpServerEndpoint):
+                    for client in endpoint.closeSlowClients(self._selector):
+                        self._parsers.pop((id(endpoint), client), None)
+
+    def __inject(self, endpoint: RouterEndpoint, source: Peer, data: bytes) -> None:
+        # Each peer has its own parser as a TCP stream can split a packet across reads
+        parser_key = (id(endpoint), source)
+        parser = self._parsers.get(parser_key)
+        if parser is None:
+            parser = mavutil.mavlink.MAVLink(None)
+            parser.robust_parsing = True
+            self._parsers[parser_key] = parser
+
+        try:
+            msgs = parser.parse_buffer(data) or []
+        except mavutil.mavlink.MAVError as e:
+            self.logger.debug(f"Dropped invalid data from {endpoint.endpoint}: {e}")
+            return
+
+        now = time.monotonic()
+        self.__pruneRecent(now)
+        for msg in msgs:
+            if msg.get_type() == "BAD_DATA":
+                continue
+            if msg.get_srcSystem() == self.vehicle_system:
+                continue
+            buf = bytes(msg.get_msgbuf())
+            if self._recent.get(buf, 0) > now:
+                endpoint.duplicates_in += 1
+                continue
+            self._recent[buf] = now + self.dedup_window
+            endpoint.messages_in += 1
+            try:
+                self.injectCb(buf)
+            except Exception as e:
+                self.logger.error(
+                    f"Could not send message from {endpoint.endpoint} to the drone: {e}"
+                )
+
+    def __pruneRecent(self, now: float) -> None:
+        if now < self._next_prune_time:
+            return
+        self._recent = {
+            buf: expiry for buf, expiry in self._recent.items() if expiry > now
+        }
+        self._next_prune_time = now + self.dedup_window
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import time
+from logging import Logger
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from pymavlink import mavutil
+
+if TYPE_CHECKING:
+    from app.backendStats import BackendStats
+
+# Subscribing to this message type receives every message published on the bus
+WILDCARD = "*"
+
+MessageCallback = Callable[[Any], None]
+
+
+class MessageBusSubscription:
+    def __init__(
+        self, bus: MessageBus, msg_type: str, callback: MessageCallback
+    ) -> None:
+        """
+        Handle for a callback subscribed to the message bus.
+
+        Args:
+            bus (MessageBus): The bus the callback is subscribed to
+            msg_type (str): The message type subscribed to, or WILDCARD
+            callback (MessageCallback): The function run for each message
+        """
+        self.bus = bus
+        self.msg_type = msg_type
+        self.callback = callback
+
+    def unsubscribe(self) -> bool:
+        """
+        Remove this subscription from the bus.
+
+        Returns:
+            bool: True if the subscription was removed, False if it was already removed
+        """
+        return self.bus.unsubscribe(self)
+
+
+class MessageBus:
+    def __init__(self, logger: Logger) -> None:
+        """
+        Publish/subscribe bus for messages from the drone, allowing any number of callbacks
+        per message type as well as wildcard callbacks receiving every message.
+
+        The callbacks for each message type are precomputed into a tuple whenever the
+        subscriptions change, so publishing a message only has to look up its tuple.
+
+        Args:
+            logger (Logger): The logger to report callback errors to
+        """
+        self.logger = logger
+        # Set to time every callback, publishing takes the untimed path when it is None
+        self.stats: Optional[BackendStats] = None
+        self._lock = Lock()
+        self._subscriptions: Dict[str, List[MessageBusSubscription]] = {}
+        self._callbacks: Dict[str, Tuple[MessageCallback, ...]] = {}
+        self._wildcard_callbacks: Tuple[MessageCallback, ...] = ()
+
+    def subscribe(
+        self, msg_type: str, callback: MessageCallback
+    ) -> MessageBusSubscription:
+        """
+        Subscribe a callback to a message type.
+
+        Args:
+            msg_type (str): The message type to subscribe to, or WILDCARD for all messages
+            callback (MessageCallback): The function to run with each message
+
+        Returns:
+            MessageBusSubscription: The handle used to unsubscribe
+        """
+        subscription = MessageBusSubscription(self, msg_type, callback)
+        with self._lock:
+            self._subscriptions.setdefault(msg_type, []).append(subscription)
+            self.__rebuildCallbacks()
+        return subscription
+
+    def unsubscribe(self, subscription: MessageBusSubscription) -> bool:
+        """
+        Remove a subscription from the bus.
+
+        Args:
+            subscription (MessageBusSubscription): The subscription to remove
+
+        Returns:
+            bool: True if the subscription was removed, False if it was not subscribed
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.msg_type)
+            if not subscriptions or subscription not in subscriptions:
+                return False
+
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.msg_type]
+            self.__rebuildCallbacks()
+        return True
+
+    def unsubscribeAll(self, msg_type: str) -> bool:
+        """
+        Remove every subscription to a message type.
+
+        Args:
+            msg_type (str): The message type, or WILDCARD
+
+        Returns:
+            bool: True if any subscriptions were removed, False otherwise
+        """
+        with self._lock:
+            if msg_type not in self._subscriptions:
+                return False
+            del self._subscriptions[msg_type]
+            self.__rebuildCallbacks()
+        return True
+
+    def clear(self) -> None:
+        """Remove all subscriptions."""
+        with self._lock:
+            self._subscriptions = {}
+            self.__rebuildCallbacks()
+
+    def getSubscriptions(self, msg_type: str) -> List[MessageBusSubscription]:
+        """
+        Get the subscriptions to a message type, not including wildcard subscriptions.
+
+        Args:
+            msg_type (str): The message type
+
+        Returns:
+            List[MessageBusSubscription]: A copy of the subscriptions
+        """
+        with self._lock:
+            return list(self._subscriptions.get(msg_type, []))
+
+    def subscribedMessageTypes(self) -> List[str]:
+        """
+        Get every message type with at least one subscription.
+
+        Returns:
+            List[str]: The message types, including WILDCARD if there are wildcard subscriptions
+        """
+        with self._lock:
+            return list(self._subscriptions)
+
+    def hasSubscribers(self, msg_type: str) -> bool:
+        """
+        Check if a message of this type would be delivered to any callback.
+
+        Args:
+            msg_type (str): The message type
+
+        Returns:
+            bool: True if there is a subscription to the type or a wildcard subscription
+        """
+        return msg_type in self._callbacks or bool(self._wildcard_callbacks)
+
+    def publish(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Run every callback subscribed to the message's type. An exception raised by one
+        callback is logged and does not stop the others from running.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to publish
+        """
+        callbacks = self._callbacks.get(msg.get_type(), self._wildcard_callbacks)
+        if self.stats is not None:
+            self.__publishTimed(msg, callbacks, self.stats)
+            return
+
+        for callback in callbacks:
+            try:
+                callback(msg)
+            except Exception as e:
+                self.__logCallbackError(msg, callback, e)
+
+    def __publishTimed(
+        self,
+        msg: mavutil.mavlink.MAVLink_message,
+        callbacks: Tuple[MessageCallback, ...],
+        stats: BackendStats,
+    ) -> None:
+        msg_type = msg.get_type()
+        for callback in callbacks:
+            start = time.perf_counter()
+            try:
+                callback(msg)
+            except Exception as e:
+                self.__logCallbackError(msg, callback, e)
+            stats.recordListener(msg_type, callback, time.perf_counter() - start)
+
+    def __logCallbackError(
+        self,
+        msg: mavutil.mavlink.MAVLink_message,
+        callback: MessageCallback,
+        e: Exception,
+    ) -> None:
+        self.logger.error(
+            f"Message listener {callback} failed for {msg.get_type()}: {e}",
+            exc_info=True,
+        )
+
+    def __rebuildCallbacks(self) -> None:
+        # Must be called with the lock held. The new table is swapped in with a single
+        # assignment so publish() never sees a partially built table.
+        wildcard_callbacks = tuple(
+            subscription.callback
+            for subscription in self._subscriptions.get(WILDCARD, [])
+        )
+        self._callbacks = {
+            msg_type: tuple(subscription.callback for subscription in subscriptions)
+            + wildcard_callbacks
+            for msg_type, subscriptions in self._subscriptions.items()
+            if msg_type != WILDCARD
+        }
+        self._wildcard_callbacks = wildcard_callbacks
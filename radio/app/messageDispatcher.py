@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from logging import Logger
+from queue import Empty, Queue
+from threading import Event, Lock
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pymavlink import mavutil
+
+MessageTypes = Union[str, List[str]]
+
+
+class MessageMatcher:
+    def __init__(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> None:
+        """
+        Describes which messages a pending request or subscription is interested in.
+
+        Args:
+            msg_types (MessageTypes): The message type, or list of message types, to match
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the message. Defaults to None.
+            **fields: Message fields which must equal the given value, e.g. command=MAV_CMD_NAV_TAKEOFF or seq=3
+        """
+        self.msg_types = [msg_types] if isinstance(msg_types, str) else msg_types
+        self.condition = condition
+        self.fields = fields
+
+    def matches(self, msg: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Check if a message matches the fields and condition of this matcher.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to check
+
+        Returns:
+            bool: True if the message matches, False otherwise
+        """
+        for field, value in self.fields.items():
+            if getattr(msg, field, None) != value:
+                return False
+        return self.condition is None or bool(self.condition(msg))
+
+
+class PendingMessage(MessageMatcher):
+    def __init__(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> None:
+        """
+        A one-shot request waiting for the first matching message from the drone.
+        """
+        super().__init__(msg_types, condition, **fields)
+        self._event = Event()
+        self._message: Optional[mavutil.mavlink.MAVLink_message] = None
+        self._exception: Optional[BaseException] = None
+        self.on_timeout: Optional[Callable[[], None]] = None
+
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def setResult(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self._message = msg
+        self._event.set()
+
+    def setException(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._event.set()
+
+    def result(
+        self, timeout: Optional[float] = None
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        """
+        Wait for the matching message.
+
+        Args:
+            timeout (Optional[float], optional): The time to wait in seconds, None waits forever. Defaults to None.
+
+        Returns:
+            Optional[mavutil.mavlink.MAVLink_message]: The matching message, or None if the timeout was reached (the request is then cancelled)
+
+        Raises:
+            The exception that the dispatcher failed this request with, e.g. a SerialException when the link drops
+        """
+        if not self._event.wait(timeout) and self.on_timeout is not None:
+            self.on_timeout()
+        if self._exception is not None:
+            raise self._exception
+        return self._message
+
+
+class MessageSubscription(MessageMatcher):
+    def __init__(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> None:
+        """
+        A stream of every matching message from the drone, used when a single request has several responses.
+        """
+        super().__init__(msg_types, condition, **fields)
+        self._queue: Queue = Queue()
+
+    def put(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self._queue.put((msg, None))
+
+    def setException(self, exception: BaseException) -> None:
+        self._queue.put((None, exception))
+
+    def get(
+        self, timeout: Optional[float] = None
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        """
+        Get the next matching message.
+
+        Args:
+            timeout (Optional[float], optional): The time to wait in seconds, None waits forever. Defaults to None.
+
+        Returns:
+            Optional[mavutil.mavlink.MAVLink_message]: The next matching message, or None if the timeout was reached
+        """
+        try:
+            msg, exception = self._queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+        if exception is not None:
+            # Keep the failure for any further calls
+            self._queue.put((None, exception))
+            raise exception
+        return msg
+
+
+class MessageDispatcher:
+    def __init__(self, logger: Logger) -> None:
+        """
+        Routes messages read by the drone listener thread to the requests waiting on them.
+        The listener thread is the only reader of the connection, so controllers register
+        what they expect here (before sending their request) instead of reading the link
+        themselves.
+
+        Args:
+            logger (Logger): The logger to report dispatch errors to
+        """
+        self.logger = logger
+        self._lock = Lock()
+        self._pending: Dict[str, List[PendingMessage]] = {}
+        self._subscriptions: Dict[str, List[MessageSubscription]] = {}
+        self._closed_exception: Optional[BaseException] = None
+
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> PendingMessage:
+        """
+        Register a one-shot request for a message. Must be called before the request is sent
+        so the response cannot be missed.
+
+        Args:
+            msg_types (MessageTypes): The message type, or list of message types, to wait for
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the message. Defaults to None.
+            **fields: Message fields which must equal the given value
+
+        Returns:
+            PendingMessage: The pending request, call result() to wait for the message
+        """
+        pending = PendingMessage(msg_types, condition, **fields)
+        pending.on_timeout = lambda: self.cancel(pending)
+        with self._lock:
+            if self._closed_exception is not None:
+                pending.setException(self._closed_exception)
+                return pending
+            for msg_type in pending.msg_types:
+                self._pending.setdefault(msg_type, []).append(pending)
+        return pending
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> MessageSubscription:
+        """
+        Register a subscription receiving every matching message until it is removed with unsubscribe().
+
+        Args:
+            msg_types (MessageTypes): The message type, or list of message types, to subscribe to
+            condition (Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]], optional): Extra check run against the message. Defaults to None.
+            **fields: Message fields which must equal the given value
+
+        Returns:
+            MessageSubscription: The subscription, call get() to wait for the next message
+        """
+        subscription = MessageSubscription(msg_types, condition, **fields)
+        with self._lock:
+            if self._closed_exception is not None:
+                subscription.setException(self._closed_exception)
+                return subscription
+            for msg_type in subscription.msg_types:
+                self._subscriptions.setdefault(msg_type, []).append(subscription)
+        return subscription
+
+    def cancel(self, pending: PendingMessage) -> None:
+        """
+        Stop waiting on a pending request, used when the caller timed out.
+
+        Args:
+            pending (PendingMessage): The pending request to remove
+        """
+        with self._lock:
+            self.__remove(self._pending, pending)
+
+    def unsubscribe(self, subscription: MessageSubscription) -> None:
+        """
+        Remove a subscription.
+
+        Args:
+            subscription (MessageSubscription): The subscription to remove
+        """
+        with self._lock:
+            self.__remove(self._subscriptions, subscription)
+
+    def __remove(self, registry: Dict[str, List[Any]], item: MessageMatcher) -> None:
+        for msg_type in item.msg_types:
+            items = registry.get(msg_type)
+            if items and item in items:
+                items.remove(item)
+                if not items:
+                    del registry[msg_type]
+
+    def isWaitingFor(self, msg_type: str) -> bool:
+        """
+        Check if a pending request or subscription is waiting on a message type.
+
+        Args:
+            msg_type (str): The message type
+
+        Returns:
+            bool: True if a message of this type could be delivered
+        """
+        return msg_type in self._pending or msg_type in self._subscriptions
+
+    def dispatch(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Deliver a message to every matching subscription and the oldest matching pending request.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message read from the drone
+        """
+        msg_type = msg.get_type()
+
+        # Fast path for the common case of nothing waiting on this message type
+        if msg_type not in self._pending and msg_type not in self._subscriptions:
+            return
+
+        with self._lock:
+            for subscription in self._subscriptions.get(msg_type, ()):
+                try:
+                    if subscription.matches(msg):
+                        subscription.put(msg)
+                except Exception as e:
+                    self.logger.error(e, exc_info=True)
+
+            for pending in self._pending.get(msg_type, ()):
+                try:
+                    if pending.matches(msg):
+                        self.__remove(self._pending, pending)
+                        pending.setResult(msg)
+                        break
+                except Exception as e:
+                    self.logger.error(e, exc_info=True)
+
+    def failAll(self, exception: BaseException) -> None:
+        """
+        Fail every pending request and subscription, and any registered afterwards, e.g. when the link drops.
+
+        Args:
+            exception (BaseException): The exception raised to the waiting callers
+        """
+        with self._lock:
+            self._closed_exception = exception
+            pending_requests = {
+                id(pending): pending
+                for pending_list in self._pending.values()
+                for pending in pending_list
+            }
+            subscriptions = {
+                id(subscription): subscription
+                for subscription_list in self._subscriptions.values()
+                for subscription in subscription_list
+            }
+            self._pending = {}
+            self._subscriptions = {}
+
+        for pending in pending_requests.values():
+            pending.setException(exception)
+        for subscription in subscriptions.values():
+            subscription.setException(exception)
@@ -0,0 +1,616 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import os
+import select
+import socket
+import time
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pymavlink import mavutil
+
+TCP_TRANSPORT = "tcp"
+PTY_TRANSPORT = "pty"
+
+# A copter SITL has about this many parameters
+DEFAULT_PARAM_COUNT = 1400
+
+HEARTBEAT_INTERVAL = 1.0
+# How long the connection thread waits for data before checking if it was stopped
+READ_TIMEOUT = 0.1
+READ_SIZE = 4096
+
+# Every sensor present, enabled and healthy, which is what tests wait for
+SENSORS_HEALTHY = 1467063343
+
+# The SITL default location, CMAC in Canberra
+HOME_LATITUDE = -35.363262
+HOME_LONGITUDE = 149.165237
+HOME_ALTITUDE = 584.0
+
+# Parameters the controllers read when the drone connects, with SITL values
+DEFAULT_PARAMS: Dict[str, Tuple[float, int]] = {
+    "FLTMODE1": (7, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE2": (9, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE3": (6, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE4": (3, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE5": (5, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE6": (0, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FLTMODE_CH": (5, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FRAME_CLASS": (1, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "FRAME_TYPE": (1, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "GRIP_ENABLE": (1, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "GRIP_TYPE": (1, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "GRIP_GRAB": (1900, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    "GRIP_RELEASE": (1100, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    "GRIP_NEUTRAL": (1500, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    "GRIP_REGRAB": (0, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    "GRIP_AUTOCLOSE": (0, mavutil.mavlink.MAV_PARAM_TYPE_REAL32),
+    "GRIP_CAN_ID": (0, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    "RCMAP_ROLL": (1, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "RCMAP_PITCH": (2, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "RCMAP_THROTTLE": (3, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    "RCMAP_YAW": (4, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    **{
+        f"RC{channel}_{name}": (value, param_type)
+        for channel in range(1, 17)
+        for name, value, param_type in [
+            (
+                "MIN",
+                1000 if channel <= 8 else 1100,
+                mavutil.mavlink.MAV_PARAM_TYPE_INT16,
+            ),
+            (
+                "MAX",
+                2000 if channel <= 8 else 1900,
+                mavutil.mavlink.MAV_PARAM_TYPE_INT16,
+            ),
+            ("REVERSED", 0, mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+            ("OPTION", 7 if channel == 7 else 0, mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+        ]
+    },
+}
+
+# The messages sent for each data stream
+DATA_STREAM_MESSAGES: Dict[int, List[str]] = {
+    mavutil.mavlink.MAV_DATA_STREAM_RAW_SENSORS: ["RAW_IMU", "SCALED_PRESSURE"],
+    mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS: [
+        "SYS_STATUS",
+        "GPS_RAW_INT",
+        "MISSION_CURRENT",
+    ],
+    mavutil.mavlink.MAV_DATA_STREAM_RC_CHANNELS: ["RC_CHANNELS", "SERVO_OUTPUT_RAW"],
+    mavutil.mavlink.MAV_DATA_STREAM_POSITION: ["GLOBAL_POSITION_INT"],
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA1: ["ATTITUDE"],
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA2: ["VFR_HUD"],
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA3: ["BATTERY_STATUS", "SYSTEM_TIME"],
+}
+
+MISSION_TYPES = (
+    mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+    mavutil.mavlink.MAV_MISSION_TYPE_FENCE,
+    mavutil.mavlink.MAV_MISSION_TYPE_RALLY,
+)
+
+
+class MockAutopilot:
+    def __init__(
+        self,
+        transport: str = TCP_TRANSPORT,
+        param_count: int = DEFAULT_PARAM_COUNT,
+        mission_size: int = 0,
+        latency: float = 0.0,
+        vehicle_type: int = mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        system_id: int = 1,
+        component_id: int = 1,
+    ) -> None:
+        """
+        A pure Python autopilot which answers the MAVLink the controllers use, so the
+        drone can be tested and benchmarked without SITL or hardware. It sends
+        heartbeats and requested data streams, and handles the parameter and mission
+        protocols and COMMAND_LONG/COMMAND_INT with a COMMAND_ACK.
+
+        The drone connects to it over a local TCP port or a pty, given by
+        connection_string once it has been started.
+
+        Args:
+            transport (str, optional): TCP_TRANSPORT or PTY_TRANSPORT, which is not available on Windows. Defaults to TCP_TRANSPORT.
+            param_count (int, optional): The number of parameters, made up of DEFAULT_PARAMS and numbered MOCK_ parameters. Defaults to DEFAULT_PARAM_COUNT.
+            mission_size (int, optional): The number of waypoints in the mission it starts with. Defaults to 0.
+            latency (float, optional): The seconds to wait before answering each message. Defaults to 0.0.
+            vehicle_type (int, optional): The MAV_TYPE sent in heartbeats. Defaults to MAV_TYPE_QUADROTOR.
+            system_id (int, optional): The system ID of the autopilot. Defaults to 1.
+            component_id (int, optional): The component ID of the autopilot. Defaults to 1.
+        """
+        if transport not in (TCP_TRANSPORT, PTY_TRANSPORT):
+            raise ValueError(f"Unknown transport {transport}")
+
+        self.transport = transport
+        self.latency = latency
+        self.vehicle_type = vehicle_type
+        self.connection_string: Optional[str] = None
+
+        self.armed = False
+        self.custom_mode = 0
+        self.mission_current_seq = 0
+        self.params: Dict[str, Tuple[float, int]] = dict(DEFAULT_PARAMS)
+        for i in range(len(self.params), param_count):
+            self.params[f"MOCK_{i:05d}"] = (0, mavutil.mavlink.MAV_PARAM_TYPE_REAL32)
+        self._param_ids = list(self.params)
+        self.mission_size = mission_size
+        self.missions: Dict[int, List[mavutil.mavlink.MAVLink_message]] = {
+            mission_type: [] for mission_type in MISSION_TYPES
+        }
+        self.stream_rates: Dict[int, float] = {}
+
+        self.messages_received = 0
+        self.messages_sent = 0
+
+        self.system_id = system_id
+        self.component_id = component_id
+        self._mav: Any = None
+        self._parser: Any = None
+        self._upload: Optional[
+            Tuple[int, int, List[mavutil.mavlink.MAVLink_message]]
+        ] = None
+        self._start_time = time.monotonic()
+
+        # Messages and periodic tasks waiting to be sent by the send thread, ordered
+        # by when they are due
+        self._schedule: List[Tuple[float, int, Callable[[], None]]] = []
+        self._schedule_order = itertools.count()
+        self._condition = Condition()
+
+        self._server_socket: Optional[socket.socket] = None
+        self._client_socket: Optional[socket.socket] = None
+        self._pty_fd: Optional[int] = None
+        self._pty_slave_fd: Optional[int] = None
+        self._is_running = False
+        self._threads: List[Thread] = []
+
+    def start(self) -> str:
+        """
+        Start listening for the drone and sending heartbeats.
+
+        Returns:
+            str: The port for the drone to connect to
+        """
+        if self.transport == TCP_TRANSPORT:
+            self._server_socket = socket.create_server(("127.0.0.1", 0))
+            self.connection_string = (
+                f"tcp:127.0.0.1:{self._server_socket.getsockname()[1]}"
+            )
+        else:
+            self._pty_fd, self._pty_slave_fd = os.openpty()
+            self.connection_string = os.ttyname(self._pty_slave_fd)
+
+        # ArduPilot speaks MAVLink 2, mavutil switches to it when it first receives a
+        # MAVLink 2 message, and the mission protocol needs its extension fields
+        if mavutil.mavlink.WIRE_PROTOCOL_VERSION != "2.0":
+            os.environ["MAVLINK20"] = "1"
+            mavutil.set_dialect(mavutil.current_dialect)
+        self._mav = mavutil.mavlink.MAVLink(
+            self, srcSystem=self.system_id, srcComponent=self.component_id
+        )
+        self.__resetParser()
+        # Home is item 0, followed by the waypoints
+        self.missions[mavutil.mavlink.MAV_MISSION_TYPE_MISSION] = [
+            self.__missionItem(seq, mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+            for seq in range(self.mission_size + 1 if self.mission_size else 0)
+        ]
+
+        self._is_running = True
+        self.__scheduleEvery(HEARTBEAT_INTERVAL, self.__sendHeartbeat)
+        self._threads = [
+            Thread(target=self.__receiveMessages, daemon=True),
+            Thread(target=self.__sendMessages, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self.connection_string
+
+    def stop(self) -> None:
+        """Stop the autopilot and close the connection to the drone."""
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=READ_TIMEOUT * 10)
+
+        for sock in (self._client_socket, self._server_socket):
+            if sock is not None:
+                sock.close()
+        for fd in (self._pty_fd, self._pty_slave_fd):
+            if fd is not None:
+                os.close(fd)
+
+    def sendBurst(self, msg_type: str, count: int) -> None:
+        """
+        Send a burst of telemetry messages as fast as the connection allows, to load
+        the drone's message handling.
+
+        Args:
+            msg_type (str): The message to send, one of the data stream messages
+            count (int): How many of the message to send
+        """
+
+        def send() -> None:
+            for _ in range(count):
+                self._mav.send(self.__createMessage(msg_type))
+
+        self.__schedule(send, 0)
+
+    def write(self, buf: bytes) -> None:
+        """Called by mav to send a message to the drone, only from the send thread."""
+        try:
+            if self._pty_fd is not None:
+                os.write(self._pty_fd, buf)
+            elif self._client_socket is not None:
+                self._client_socket.sendall(buf)
+            else:
+                return
+        except OSError:
+            return
+        self.messages_sent += 1
+
+    def __receiveMessages(self) -> None:
+        while self._is_running:
+            data = self.__read()
+            if not data:
+                continue
+            for msg in self._parser.parse_buffer(data) or []:
+                self.messages_received += 1
+                self.handleMessage(msg)
+
+    def __read(self) -> bytes:
+        # The pty is read by its file descriptor, the TCP connection by its socket
+        readable: List[Union[int, socket.socket]]
+        if self._pty_fd is not None:
+            readable, _, _ = select.select([self._pty_fd], [], [], READ_TIMEOUT)
+            return os.read(self._pty_fd, READ_SIZE) if readable else b""
+
+        assert self._server_socket is not None
+        if self._client_socket is None:
+            readable, _, _ = select.select([self._server_socket], [], [], READ_TIMEOUT)
+            if readable:
+                self._client_socket, _ = self._server_socket.accept()
+                # Don't keep the drone waiting for the next heartbeat to connect
+                self.__schedule(self.__sendHeartbeat, 0)
+            return b""
+
+        readable, _, _ = select.select([self._client_socket], [], [], READ_TIMEOUT)
+        if not readable:
+            return b""
+        try:
+            data = self._client_socket.recv(READ_SIZE)
+        except OSError:
+            data = b""
+        if not data:
+            # The drone disconnected, wait for it to connect again
+            self._client_socket.close()
+            self._client_socket = None
+            self.__resetParser()
+        return data
+
+    def __resetParser(self) -> None:
+        self._parser = mavutil.mavlink.MAVLink(None)
+        self._parser.robust_parsing = True
+
+    def __sendMessages(self) -> None:
+        while True:
+            with self._condition:
+                while self._is_running and (
+                    not self._schedule or self._schedule[0][0] > time.monotonic()
+                ):
+                    self._condition.wait(
+                        self._schedule[0][0] - time.monotonic()
+                        if self._schedule
+                        else None
+                    )
+                if not self._is_running:
+                    return
+                _, _, send = heapq.heappop(self._schedule)
+            send()
+
+    def __schedule(self, send: Callable[[], None], delay: float) -> None:
+        with self._condition:
+            heapq.heappush(
+                self._schedule,
+                (time.monotonic() + delay, next(self._schedule_order), send),
+            )
+            self._condition.notify()
+
+    def __scheduleEvery(self, interval: float, send: Callable[[], None]) -> None:
+        def sendAndReschedule() -> None:
+            send()
+            self.__schedule(sendAndReschedule, interval)
+
+        self.__schedule(sendAndReschedule, 0)
+
+    def __reply(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self.__schedule(lambda: self._mav.send(msg), self.latency)
+
+    def handleMessage(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Answer a message from the drone.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The message
+        """
+        handler = self._handlers.get(msg.get_type())
+        if handler is not None:
+            handler(self, msg)
+
+    def __handleParamRequestList(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        for param_index in range(len(self._param_ids)):
+            self.__reply(self.__paramValue(param_index))
+
+    def __handleParamRequestRead(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        param_id = msg.param_id
+        if msg.param_index >= 0 and msg.param_index < len(self._param_ids):
+            self.__reply(self.__paramValue(msg.param_index))
+        elif param_id in self.params:
+            self.__reply(self.__paramValue(self._param_ids.index(param_id)))
+
+    def __handleParamSet(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        if msg.param_id not in self.params:
+            return
+        _, param_type = self.params[msg.param_id]
+        self.params[msg.param_id] = (msg.param_value, param_type)
+        self.__reply(self.__paramValue(self._param_ids.index(msg.param_id)))
+
+    def __handleMissionRequestList(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self.__reply(
+            mavutil.mavlink.MAVLink_mission_count_message(
+                msg.get_srcSystem(),
+                msg.get_srcComponent(),
+                len(self.missions.get(msg.mission_type, [])),
+                mission_type=msg.mission_type,
+            )
+        )
+
+    def __handleMissionRequest(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        items = self.missions.get(msg.mission_type, [])
+        if msg.seq < len(items):
+            self.__reply(items[msg.seq])
+
+    def __handleMissionCount(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        if msg.count == 0:
+            self.missions[msg.mission_type] = []
+            self.__sendMissionAck(msg, mavutil.mavlink.MAV_MISSION_ACCEPTED)
+            return
+        self._upload = (msg.mission_type, msg.count, [])
+        self.__requestMissionItem(msg, 0)
+
+    def __handleMissionItem(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        if self._upload is None:
+            return
+        mission_type, count, items = self._upload
+        if msg.mission_type != mission_type or msg.seq != len(items):
+            return
+
+        items.append(msg)
+        if len(items) < count:
+            self.__requestMissionItem(msg, len(items))
+        else:
+            self.missions[mission_type] = items
+            self._upload = None
+            self.__sendMissionAck(msg, mavutil.mavlink.MAV_MISSION_ACCEPTED)
+
+    def __handleMissionClearAll(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self.missions[msg.mission_type] = []
+        self.__sendMissionAck(msg, mavutil.mavlink.MAV_MISSION_ACCEPTED)
+
+    def __handleCommand(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        result = mavutil.mavlink.MAV_RESULT_ACCEPTED
+        if msg.command == mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+            self.armed = msg.param1 == 1
+        elif msg.command == mavutil.mavlink.MAV_CMD_DO_SET_MODE:
+            self.custom_mode = int(msg.param2)
+        elif msg.command == mavutil.mavlink.MAV_CMD_DO_SET_MISSION_CURRENT:
+            self.mission_current_seq = int(msg.param1)
+        elif msg.command == mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE:
+            if int(msg.param1) == mavutil.mavlink.MAVLINK_MSG_ID_HOME_POSITION:
+                self.__reply(self.__createMessage("HOME_POSITION"))
+            else:
+                result = mavutil.mavlink.MAV_RESULT_UNSUPPORTED
+
+        self.__reply(
+            mavutil.mavlink.MAVLink_command_ack_message(
+                msg.command,
+                result,
+                target_system=msg.get_srcSystem(),
+                target_component=msg.get_srcComponent(),
+            )
+        )
+
+    def __handleRequestDataStream(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        stream_ids = (
+            list(DATA_STREAM_MESSAGES)
+            if msg.req_stream_id == mavutil.mavlink.MAV_DATA_STREAM_ALL
+            else [msg.req_stream_id]
+        )
+        for stream_id in stream_ids:
+            if stream_id not in DATA_STREAM_MESSAGES:
+                continue
+            previous_rate = self.stream_rates.get(stream_id)
+            rate = msg.req_message_rate if msg.start_stop else 0
+            self.stream_rates[stream_id] = rate
+            if rate > 0 and not previous_rate:
+                self.__scheduleStream(stream_id, 0)
+
+    def __sendStream(self, stream_id: int) -> None:
+        rate = self.stream_rates.get(stream_id, 0)
+        if rate <= 0:
+            return
+        for msg_type in DATA_STREAM_MESSAGES[stream_id]:
+            self._mav.send(self.__createMessage(msg_type))
+        self.__scheduleStream(stream_id, 1 / rate)
+
+    def __scheduleStream(self, stream_id: int, delay: float) -> None:
+        self.__schedule(lambda: self.__sendStream(stream_id), delay)
+
+    def __sendHeartbeat(self) -> None:
+        base_mode = mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+        if self.armed:
+            base_mode |= mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+        self._mav.heartbeat_send(
+            self.vehicle_type,
+            mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+            base_mode,
+            self.custom_mode,
+            mavutil.mavlink.MAV_STATE_ACTIVE
+            if self.armed
+            else mavutil.mavlink.MAV_STATE_STANDBY,
+        )
+
+    def __sendMissionAck(
+        self, msg: mavutil.mavlink.MAVLink_message, result: int
+    ) -> None:
+        self.__reply(
+            mavutil.mavlink.MAVLink_mission_ack_message(
+                msg.get_srcSystem(),
+                msg.get_srcComponent(),
+                result,
+                mission_type=msg.mission_type,
+            )
+        )
+
+    def __requestMissionItem(
+        self, msg: mavutil.mavlink.MAVLink_message, seq: int
+    ) -> None:
+        self.__reply(
+            mavutil.mavlink.MAVLink_mission_request_message(
+                msg.get_srcSystem(),
+                msg.get_srcComponent(),
+                seq,
+                mission_type=msg.mission_type,
+            )
+        )
+
+    def __paramValue(self, param_index: int) -> mavutil.mavlink.MAVLink_message:
+        param_id = self._param_ids[param_index]
+        param_value, param_type = self.params[param_id]
+        return mavutil.mavlink.MAVLink_param_value_message(
+            param_id.encode(),
+            param_value,
+            param_type,
+            len(self._param_ids),
+            param_index,
+        )
+
+    def __missionItem(
+        self, seq: int, mission_type: int
+    ) -> mavutil.mavlink.MAVLink_message:
+        # Waypoints 10m apart heading north from home, which is item 0
+        return mavutil.mavlink.MAVLink_mission_item_int_message(
+            255,
+            0,
+            seq,
+            mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT,
+            mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+            0,
+            1,
+            0,
+            0,
+            0,
+            0,
+            int((HOME_LATITUDE + seq * 0.0001) * 1e7),
+            int(HOME_LONGITUDE * 1e7),
+            0 if seq == 0 else 20,
+            mission_type=mission_type,
+        )
+
+    def __createMessage(self, msg_type: str) -> mavutil.mavlink.MAVLink_message:
+        time_boot_ms = int((time.monotonic() - self._start_time) * 1000)
+        lat = int(HOME_LATITUDE * 1e7)
+        lon = int(HOME_LONGITUDE * 1e7)
+        alt = int(HOME_ALTITUDE * 1000)
+        if msg_type == "SYS_STATUS":
+            return mavutil.mavlink.MAVLink_sys_status_message(
+                SENSORS_HEALTHY,
+                SENSORS_HEALTHY,
+                SENSORS_HEALTHY,
+                500,
+                12600,
+                1000,
+                90,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+            )
+        if msg_type == "GPS_RAW_INT":
+            return mavutil.mavlink.MAVLink_gps_raw_int_message(
+                time_boot_ms * 1000, 6, lat, lon, alt, 121, 200, 0, 0, 10
+            )
+        if msg_type == "MISSION_CURRENT":
+            return mavutil.mavlink.MAVLink_mission_current_message(
+                self.mission_current_seq
+            )
+        if msg_type == "RAW_IMU":
+            return mavutil.mavlink.MAVLink_raw_imu_message(
+                time_boot_ms * 1000, 0, 0, -1000, 0, 0, 0, 200, 0, 400
+            )
+        if msg_type == "SCALED_PRESSURE":
+            return mavutil.mavlink.MAVLink_scaled_pressure_message(
+                time_boot_ms, 945.0, 0.0, 2500
+            )
+        if msg_type == "RC_CHANNELS":
+            return mavutil.mavlink.MAVLink_rc_channels_message(
+                time_boot_ms, 16, *([1500] * 18), 255
+            )
+        if msg_type == "SERVO_OUTPUT_RAW":
+            return mavutil.mavlink.MAVLink_servo_output_raw_message(
+                time_boot_ms * 1000, 0, *([1000] * 8)
+            )
+        if msg_type == "GLOBAL_POSITION_INT":
+            return mavutil.mavlink.MAVLink_global_position_int_message(
+                time_boot_ms, lat, lon, alt, 0, 0, 0, 0, 0
+            )
+        if msg_type == "ATTITUDE":
+            # A slow roll so the values change
+            roll = 0.1 * math.sin(time_boot_ms / 1000)
+            return mavutil.mavlink.MAVLink_attitude_message(
+                time_boot_ms, roll, 0.0, 0.0, 0.0, 0.0, 0.0
+            )
+        if msg_type == "VFR_HUD":
+            return mavutil.mavlink.MAVLink_vfr_hud_message(
+                0.0, 0.0, 0, 0, HOME_ALTITUDE, 0.0
+            )
+        if msg_type == "BATTERY_STATUS":
+            return mavutil.mavlink.MAVLink_battery_status_message(
+                0, 0, 0, 2500, [12600] + [65535] * 9, 500, -1, -1, 90
+            )
+        if msg_type == "SYSTEM_TIME":
+            return mavutil.mavlink.MAVLink_system_time_message(
+                int(time.time() * 1e6), time_boot_ms
+            )
+        if msg_type == "HOME_POSITION":
+            return mavutil.mavlink.MAVLink_home_position_message(
+                lat, lon, alt, 0, 0, 0, [1, 0, 0, 0], 0, 0, 0
+            )
+        raise ValueError(f"Can't create a {msg_type} message")
+
+    _handlers: Dict[
+        str, Callable[[MockAutopilot, mavutil.mavlink.MAVLink_message], None]
+    ] = {
+        "PARAM_REQUEST_LIST": __handleParamRequestList,
+        "PARAM_REQUEST_READ": __handleParamRequestRead,
+        "PARAM_SET": __handleParamSet,
+        "MISSION_REQUEST_LIST": __handleMissionRequestList,
+        "MISSION_REQUEST": __handleMissionRequest,
+        "MISSION_REQUEST_INT": __handleMissionRequest,
+        "MISSION_COUNT": __handleMissionCount,
+        "MISSION_ITEM": __handleMissionItem,
+        "MISSION_ITEM_INT": __handleMissionItem,
+        "MISSION_CLEAR_ALL": __handleMissionClearAll,
+        "COMMAND_LONG": __handleCommand,
+        "COMMAND_INT": __handleCommand,
+        "REQUEST_DATA_STREAM": __handleRequestDataStream,
+    }
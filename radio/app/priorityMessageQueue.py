@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from queue import Empty
+from threading import Condition
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from pymavlink import mavutil
+from typing_extensions import TypedDict
+
+from app.boundedQueue import BLOCK, DROP_OLDEST, QueueStats, checkQueuePolicy
+
+CRITICAL = 0
+STATUS = 1
+BULK = 2
+
+PRIORITY_NAMES = ("critical", "status", "bulk")
+
+DEFAULT_CRITICAL_MESSAGES = ("HEARTBEAT", "STATUSTEXT", "COMMAND_ACK")
+DEFAULT_STATUS_MESSAGES = (
+    "SYS_STATUS",
+    "BATTERY_STATUS",
+    "GPS_RAW_INT",
+    "MISSION_CURRENT",
+    "HOME_POSITION",
+    "EKF_STATUS_REPORT",
+)
+
+
+class PriorityClassStats(TypedDict):
+    queued: int
+    processed: int
+    average_wait: float
+    max_wait: float
+
+
+class PriorityMessageQueue:
+    def __init__(
+        self,
+        critical_messages: Iterable[str] = DEFAULT_CRITICAL_MESSAGES,
+        status_messages: Iterable[str] = DEFAULT_STATUS_MESSAGES,
+        max_size: int = 0,
+        policy: str = DROP_OLDEST,
+    ) -> None:
+        """
+        Queue of messages waiting to be executed, which always hands out critical messages
+        first, then status messages, then bulk telemetry (every other message). Messages of
+        the same class keep the order they were received in.
+
+        When max_size messages are waiting, the drop_oldest policy discards the oldest
+        message of the lowest priority class to make space, and the block policy makes
+        put() wait until there is space.
+
+        Args:
+            critical_messages (Iterable[str], optional): The messages in the critical class. Defaults to HEARTBEAT, STATUSTEXT and COMMAND_ACK.
+            status_messages (Iterable[str], optional): The messages in the status class. Defaults to DEFAULT_STATUS_MESSAGES.
+            max_size (int, optional): The maximum number of waiting messages, 0 for no limit. Defaults to 0.
+            policy (str, optional): The overflow policy, drop_oldest or block. Defaults to drop_oldest.
+        """
+        checkQueuePolicy(policy, (DROP_OLDEST, BLOCK))
+        self.max_size = max_size
+        self.policy = policy
+        self.dropped_count = 0
+
+        self.priorities: Dict[str, int] = {}
+        self.setPriorities(critical_messages, status_messages)
+
+        self._condition = Condition()
+        self._closed = False
+        self._queues: Tuple[
+            Deque[Tuple[float, mavutil.mavlink.MAVLink_message]], ...
+        ] = tuple(deque() for _ in PRIORITY_NAMES)
+
+        self._processed = [0] * len(PRIORITY_NAMES)
+        self._total_wait = [0.0] * len(PRIORITY_NAMES)
+        self._max_wait = [0.0] * len(PRIORITY_NAMES)
+
+    def setPriorities(
+        self, critical_messages: Iterable[str], status_messages: Iterable[str]
+    ) -> None:
+        """
+        Set which messages are in the critical and status classes, any other message is bulk telemetry.
+
+        Args:
+            critical_messages (Iterable[str]): The messages in the critical class
+            status_messages (Iterable[str]): The messages in the status class
+        """
+        priorities = {msg_type: STATUS for msg_type in status_messages}
+        priorities.update({msg_type: CRITICAL for msg_type in critical_messages})
+        self.priorities = priorities
+
+    def put(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Add a message to the queue of its priority class.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message
+        """
+        priority = self.priorities.get(msg.get_type(), BULK)
+        with self._condition:
+            if self._closed:
+                return
+
+            if self.__isFull():
+                if self.policy == DROP_OLDEST:
+                    self.__dropOldest()
+                else:
+                    self._condition.wait_for(
+                        lambda: self._closed or not self.__isFull()
+                    )
+                    if self._closed:
+                        return
+
+            self._queues[priority].append((time.monotonic(), msg))
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> mavutil.mavlink.MAVLink_message:
+        """
+        Remove and return the oldest message of the highest priority class with messages waiting.
+
+        Args:
+            timeout (Optional[float], optional): The time to wait for a message in seconds, None waits forever. Defaults to None.
+
+        Returns:
+            mavutil.mavlink.MAVLink_message: The MAVLink message
+
+        Raises:
+            Empty: If no message arrived before the timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.qsize, timeout):
+                raise Empty
+
+            for priority, queue in enumerate(self._queues):
+                if queue:
+                    queued_time, msg = queue.popleft()
+                    break
+            else:
+                raise Empty
+
+            # Wake up put() if it is waiting for space
+            self._condition.notify()
+
+        wait = time.monotonic() - queued_time
+        self._processed[priority] += 1
+        self._total_wait[priority] += wait
+        if wait > self._max_wait[priority]:
+            self._max_wait[priority] = wait
+        return msg
+
+    def qsize(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def close(self) -> None:
+        """Stop accepting messages, a put() waiting for space returns without adding its message."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def getQueueStats(self) -> QueueStats:
+        """
+        Get the size of the queue and the number of messages dropped because it was full.
+
+        Returns:
+            QueueStats: The queue stats
+        """
+        return {
+            "size": self.qsize(),
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "dropped": self.dropped_count,
+            "spilled": 0,
+        }
+
+    def getStats(self) -> Dict[str, PriorityClassStats]:
+        """
+        Get the number of queued and processed messages and the time processed messages
+        spent waiting in the queue, for each priority class.
+
+        Returns:
+            Dict[str, PriorityClassStats]: The stats keyed by priority class name
+        """
+        stats: Dict[str, PriorityClassStats] = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            processed = self._processed[priority]
+            stats[name] = {
+                "queued": len(self._queues[priority]),
+                "processed": processed,
+                "average_wait": (
+                    self._total_wait[priority] / processed if processed else 0.0
+                ),
+                "max_wait": self._max_wait[priority],
+            }
+        return stats
+
+    def __isFull(self) -> bool:
+        return self.max_size > 0 and self.qsize() >= self.max_size
+
+    def __dropOldest(self) -> None:
+        for queue in reversed(self._queues):
+            if queue:
+                queue.popleft()
+                self.dropped_count += 1
+                return
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from typing_extensions import TypedDict
+
+# 100 samples a second is enough to find hot spots, and walking the stacks of the
+# backend's handful of threads at that rate costs well under 1% of a core
+DEFAULT_INTERVAL = 0.01
+# A profile started without a duration is stopped after this long, so one left
+# running by mistake doesn't grow for the rest of the session
+MAX_DURATION = 600
+
+COLLAPSED_SUFFIX = ".collapsed"
+PSTATS_SUFFIX = ".pstats"
+
+# The (filename, first line, function name) of a function, as used by pstats
+FunctionKey = Tuple[str, int, str]
+Stack = Tuple[FunctionKey, ...]
+
+
+class ProfileResult(TypedDict):
+    collapsed_file: str
+    pstats_file: str
+    samples: int
+    duration: float
+
+
+class ProfilerStatus(TypedDict):
+    running: bool
+    interval: float
+    samples: int
+    elapsed: float
+    last_profile: Optional[ProfileResult]
+
+
+def formatFrame(key: FunctionKey) -> str:
+    filename, line, name = key
+    # Semicolons separate frames and spaces separate the count in the collapsed format
+    return f"{name} ({Path(filename).name}:{line})".replace(";", ":").replace(" ", "_")
+
+
+def toPstats(
+    samples: Counter[Tuple[str, Stack]], seconds_per_sample: float
+) -> Dict[FunctionKey, tuple]:
+    """
+    Convert stack samples to the stats of the profile module, so they can be read with
+    pstats and the tools built on it. A function's call counts are the number of
+    samples it was on the stack for, as a sampling profiler doesn't see calls.
+
+    Args:
+        samples (Counter[Tuple[str, Stack]]): How many times each stack of each thread was sampled, outermost frame first
+        seconds_per_sample (float): The time each sample stands for
+
+    Returns:
+        Dict[FunctionKey, tuple]: The (primitive calls, calls, own time, cumulative time, callers) of each function
+    """
+    stats: Dict[FunctionKey, List] = {}
+    for (_, stack), count in samples.items():
+        seen = set()
+        for index, key in enumerate(stack):
+            entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            is_leaf = index == len(stack) - 1
+            own_time = count * seconds_per_sample if is_leaf else 0.0
+            # Recursive functions are only counted once for each sample
+            cumulative_time = 0.0 if key in seen else count * seconds_per_sample
+            seen.add(key)
+
+            entry[0] += count
+            entry[1] += count
+            entry[2] += own_time
+            entry[3] += cumulative_time
+            if index > 0:
+                caller = stack[index - 1]
+                calls, primitive_calls, caller_own, caller_cumulative = entry[4].get(
+                    caller, (0, 0, 0.0, 0.0)
+                )
+                entry[4][caller] = (
+                    calls + count,
+                    primitive_calls + count,
+                    caller_own + own_time,
+                    caller_cumulative + cumulative_time,
+                )
+
+    return {key: tuple(entry) for key, entry in stats.items()}
+
+
+class SamplingProfiler:
+    def __init__(
+        self, output_directory: Path, interval: float = DEFAULT_INTERVAL
+    ) -> None:
+        """
+        A wall clock sampling profiler for every thread in the process, which can be
+        started and stopped while the backend runs. While running, a background thread
+        takes the stack of every other thread at each interval. Threads waiting on a
+        socket or queue are sampled too, so a profile shows where each thread spends its
+        time rather than only where it uses the CPU.
+
+        Stopping writes the samples as a flamegraph compatible collapsed stack file,
+        with the thread name as the root frame, and as a pstats file.
+
+        Args:
+            output_directory (Path): The directory to write the profiles to
+            interval (float, optional): The default seconds between samples. Defaults to DEFAULT_INTERVAL.
+        """
+        self.output_directory = Path(output_directory)
+        self.interval = interval
+        self.last_profile: Optional[ProfileResult] = None
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples: Counter[Tuple[str, Stack]] = Counter()
+        self._sample_count = 0
+        self._start_time = 0.0
+        self._end_time: Optional[float] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(
+        self, interval: Optional[float] = None, duration: Optional[float] = None
+    ) -> None:
+        """
+        Start sampling.
+
+        Args:
+            interval (Optional[float], optional): Seconds between samples. Defaults to the profiler's interval.
+            duration (Optional[float], optional): Stop and write the profile after this many seconds. Defaults to MAX_DURATION.
+
+        Raises:
+            RuntimeError: If the profiler is already running
+            ValueError: If the interval or duration are not positive
+        """
+        with self._lock:
+            if self._thread is not None:
+                raise RuntimeError("Profiler is already running")
+            if interval is not None:
+                if interval <= 0:
+                    raise ValueError("Profiler interval must be positive")
+                self.interval = interval
+            if duration is not None and duration <= 0:
+                raise ValueError("Profiler duration must be positive")
+
+            self._samples = Counter()
+            self._sample_count = 0
+            self._start_time = time.monotonic()
+            self._end_time = None
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self.__sample,
+                args=(self._start_time + (duration or MAX_DURATION),),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> Optional[ProfileResult]:
+        """
+        Stop sampling and write the profile.
+
+        Returns:
+            Optional[ProfileResult]: The files written, or None if the profiler wasn't running
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return None
+            self._stop_event.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        return self.__finish(thread)
+
+    def getStatus(self) -> ProfilerStatus:
+        """
+        Get whether the profiler is running and how many samples it has taken.
+
+        Returns:
+            ProfilerStatus: The status, with the files of the last profile written
+        """
+        end_time = self._end_time if self._end_time is not None else time.monotonic()
+        return {
+            "running": self.is_running,
+            "interval": self.interval,
+            "samples": self._sample_count,
+            "elapsed": end_time - self._start_time if self._start_time else 0.0,
+            "last_profile": self.last_profile,
+        }
+
+    def __sample(self, end_time: float) -> None:
+        own_thread_id = threading.get_ident()
+        next_sample_time = time.monotonic()
+        while not self._stop_event.is_set():
+            thread_names = {
+                thread.ident: thread.name for thread in threading.enumerate()
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack: List[FunctionKey] = []
+                current: Optional[FrameType] = frame
+                while current is not None:
+                    code = current.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    current = current.f_back
+                stack.reverse()
+                thread_name = thread_names.get(thread_id, str(thread_id))
+                self._samples[(thread_name, tuple(stack))] += 1
+            self._sample_count += 1
+
+            if time.monotonic() >= end_time:
+                self.__finish(threading.current_thread())
+                return
+            # Keep to the interval instead of drifting by the time taken to sample
+            next_sample_time += self.interval
+            self._stop_event.wait(max(next_sample_time - time.monotonic(), 0))
+
+    def __finish(self, thread: threading.Thread) -> Optional[ProfileResult]:
+        with self._lock:
+            # Stopping at the end of the duration and a stop call can race
+            if self._thread is not thread:
+                return self.last_profile
+            self._end_time = time.monotonic()
+            self.last_profile = self.__write()
+            self._thread = None
+            return self.last_profile
+
+    def __write(self) -> ProfileResult:
+        self.output_directory.mkdir(parents=True, exist_ok=True)
+        base_name = f"profile_{time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime())}"
+        name = base_name
+        count = 0
+        while self.output_directory.joinpath(name + PSTATS_SUFFIX).exists():
+            count += 1
+            name = f"{base_name}-{count}"
+        collapsed_file = self.output_directory.joinpath(name + COLLAPSED_SUFFIX)
+        pstats_file = self.output_directory.joinpath(name + PSTATS_SUFFIX)
+
+        with open(collapsed_file, "w") as f:
+            for (thread_name, stack), count in self._samples.most_common():
+                frames = [thread_name.replace(";", ":").replace(" ", "_")]
+                frames.extend(formatFrame(key) for key in stack)
+                f.write(f"{';'.join(frames)} {count}\n")
+
+        with open(pstats_file, "wb") as f:
+            marshal.dump(toPstats(self._samples, self.interval), f)
+
+        assert self._end_time is not None
+        return {
+            "collapsed_file": str(collapsed_file),
+            "pstats_file": str(pstats_file),
+            "samples": self._sample_count,
+            "duration": self._end_time - self._start_time,
+        }
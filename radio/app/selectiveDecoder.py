@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import sys
+from typing import Callable, Dict
+
+from pymavlink import mavutil
+
+from app.backendStats import DecodeStats
+
+# mavutil reads the fields of these messages for every connection, so they are always
+# decoded even when nothing in the GCS listens for them
+MAVUTIL_MESSAGES = frozenset(
+    (
+        "HEARTBEAT",
+        "HIGH_LATENCY2",
+        "PARAM_VALUE",
+        "SYS_STATUS",
+        "GPS_RAW",
+        "GPS_RAW_INT",
+    )
+)
+
+HEADER_LEN_V1 = 6
+HEADER_LEN_V2 = 10
+CRC_LEN = 2
+
+
+def isSkippedMessage(msg: mavutil.mavlink.MAVLink_message) -> bool:
+    """
+    Check if a message was passed over by a SelectiveDecoder, so only its header and
+    raw bytes are available.
+
+    Args:
+        msg (mavutil.mavlink.MAVLink_message): The MAVLink message
+
+    Returns:
+        bool: True if the message's fields were not decoded
+    """
+    return msg.__dict__.get("_skipped", False)
+
+
+class SelectiveDecoder:
+    def __init__(
+        self,
+        mav: mavutil.mavlink.MAVLink,
+        shouldDecode: Callable[[str], bool],
+        verify_crc: bool = True,
+    ) -> None:
+        """
+        Replaces the decode step of a pymavlink MAVLink parser so that only the messages
+        someone wants are fully decoded. The message ID is read from the frame header,
+        and a message whose type shouldDecode() turns down is returned with just its
+        header and raw bytes, skipping the unpacking of its fields, which is most of
+        the time pymavlink spends on a message. The CRC is still checked, so a corrupted
+        frame is never counted in the link statistics or split out as a component by
+        its sysid and compid bytes.
+
+        The skipped messages still go through mavutil, so the sequence numbers, packet
+        counts and loss statistics it keeps are unchanged, and their raw bytes can still
+        be forwarded or counted. Signed links, and message IDs missing from the dialect,
+        are always decoded in full.
+
+        mavutil also keeps the skipped messages as the latest of their type, in
+        master.messages and the per system messages. Code reading a message from there
+        gets no fields for a skipped type, such as an AttributeError for
+        master.messages["VFR_HUD"].airspeed, so any message read that way has to be
+        accepted by shouldDecode().
+
+        decode() is only called from the thread reading the connection.
+
+        Args:
+            mav (mavutil.mavlink.MAVLink): The parser to install into, such as the mav of a mavutil connection
+            shouldDecode (Callable[[str], bool]): Called with the message type of each message, returns False to skip decoding it
+            verify_crc (bool, optional): Check the CRC of skipped messages, turning this off also skips the CRC calculation but lets corrupted frames through. Defaults to True.
+        """
+        self.mav = mav
+        self.shouldDecode = shouldDecode
+        self.verify_crc = verify_crc
+
+        # The dialect the parser was created from, as mavutil.mavlink can be switched
+        self._dialect = sys.modules[type(mav).__module__]
+        self._message_types = self._dialect.mavlink_map
+        self._decode = mav.decode
+
+        self.decoded_count = 0
+        self.skipped_count = 0
+        self.skipped_types: Dict[str, int] = {}
+
+        mav.decode = self.decode
+
+    def remove(self) -> None:
+        """Put the parser's own decode back."""
+        if self.mav.__dict__.get("decode") == self.decode:
+            del self.mav.decode
+
+    def decode(self, msgbuf: bytearray) -> mavutil.mavlink.MAVLink_message:
+        """
+        Decode a frame, or only its header if its message type isn't wanted.
+
+        Args:
+            msgbuf (bytearray): One complete MAVLink frame
+
+        Raises:
+            MAVError: If the frame is invalid
+
+        Returns:
+            mavutil.mavlink.MAVLink_message: The MAVLink message
+        """
+        if msgbuf[0] == self._dialect.PROTOCOL_MARKER_V2:
+            header_len = HEADER_LEN_V2
+            if len(msgbuf) < header_len + CRC_LEN:
+                return self.__decodeFully(msgbuf)
+            incompat_flags = msgbuf[2]
+            compat_flags = msgbuf[3]
+            seq, src_system, src_component = msgbuf[4], msgbuf[5], msgbuf[6]
+            msg_id = msgbuf[7] | (msgbuf[8] << 8) | (msgbuf[9] << 16)
+        else:
+            header_len = HEADER_LEN_V1
+            if len(msgbuf) < header_len + CRC_LEN:
+                return self.__decodeFully(msgbuf)
+            incompat_flags = compat_flags = 0
+            seq, src_system, src_component = msgbuf[2], msgbuf[3], msgbuf[4]
+            msg_id = msgbuf[5]
+
+        msg_type = self._message_types.get(msg_id)
+        if (
+            msg_type is None
+            or self.mav.signing.secret_key is not None
+            or self.shouldDecode(msg_type.msgname)
+        ):
+            return self.__decodeFully(msgbuf)
+
+        signature_len = (
+            self._dialect.MAVLINK_SIGNATURE_BLOCK_LEN
+            if incompat_flags & self._dialect.MAVLINK_IFLAG_SIGNED
+            else 0
+        )
+        payload_end = len(msgbuf) - CRC_LEN - signature_len
+        if msgbuf[1] != payload_end - header_len:
+            # Let pymavlink raise its usual error for the bad length
+            return self.__decodeFully(msgbuf)
+
+        crc = msgbuf[payload_end] | (msgbuf[payload_end + 1] << 8)
+        if self.verify_crc and not self._dialect.MAVLINK_IGNORE_CRC:
+            crcbuf = msgbuf[1:payload_end]
+            crcbuf.append(msg_type.crc_extra)
+            if self._dialect.x25crc(crcbuf).crc != crc:
+                return self.__decodeFully(msgbuf)
+
+        msg = self._dialect.MAVLink_message(msg_id, msg_type.msgname)
+        msg._header = self._dialect.MAVLink_header(
+            msg_id,
+            incompat_flags,
+            compat_flags,
+            msgbuf[1],
+            seq,
+            src_system,
+            src_component,
+        )
+        msg._msgbuf = msgbuf
+        msg._payload = msgbuf[header_len:payload_end]
+        msg._crc = crc
+        msg._skipped = True
+
+        self.skipped_count += 1
+        self.skipped_types[msg_type.msgname] = (
+            self.skipped_types.get(msg_type.msgname, 0) + 1
+        )
+        return msg
+
+    def getStats(self) -> DecodeStats:
+        """
+        Get how many messages were decoded and skipped.
+
+        Returns:
+            DecodeStats: The counts, and the count of each skipped message type
+        """
+        return {
+            "decoded": self.decoded_count,
+            "skipped": self.skipped_count,
+            "skipped_types": dict(self.skipped_types),
+        }
+
+    def __decodeFully(self, msgbuf: bytearray) -> mavutil.mavlink.MAVLink_message:
+        self.decoded_count += 1
+        return self._decode(msgbuf)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from pymavlink import mavutil
+from typing_extensions import TypedDict
+
+
+class TelemetryBatch(TypedDict):
+    fields: Dict[str, List[str]]
+    records: List[list]
+
+
+class TelemetryBatcher:
+    def __init__(
+        self, emitCb: Callable[[TelemetryBatch], None], interval: float = 0.05
+    ) -> None:
+        """
+        Collects the messages forwarded to the GUI over a time window and sends them as a
+        single batch, rather than one socket event per message.
+
+        A batch lists the field names of each message type once, then one record per message:
+            {
+                "fields": {"ATTITUDE": ["timestamp", "time_boot_ms", "roll", ...]},
+                "records": [["ATTITUDE", 1718000000.1, 1234, 0.01, ...], ...],
+            }
+
+        add() and flush() are only called from the drone sender thread.
+
+        Args:
+            emitCb (Callable[[TelemetryBatch], None]): The function used to send a batch to the GUI
+            interval (float, optional): The time window of each batch in seconds. Defaults to 0.05.
+        """
+        self.emitCb = emitCb
+        self.interval = interval
+        self.next_flush_time = time.monotonic() + self.interval
+
+        self.fields: Dict[str, List[str]] = {}
+        self.records: List[list] = []
+        self.batch_count = 0
+        self.message_count = 0
+
+    def add(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Add a message to the current batch.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to forward
+        """
+        msg_type = msg.get_type()
+        field_names = msg.get_fieldnames()
+        if msg_type not in self.fields:
+            self.fields[msg_type] = ["timestamp", *field_names]
+
+        record = [msg_type, msg._timestamp]
+        record.extend(msg.format_attr(field) for field in field_names)
+        self.records.append(record)
+
+    def timeUntilNextFlush(self) -> Optional[float]:
+        """
+        Get how long until the current batch is due to be sent.
+
+        Returns:
+            Optional[float]: The time in seconds, or None if the batch is empty
+        """
+        if not self.records:
+            return None
+        return max(self.next_flush_time - time.monotonic(), 0)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Send the current batch if it is due.
+
+        Args:
+            force (bool, optional): Send the batch even if it is not due yet. Defaults to False.
+
+        Returns:
+            int: The number of messages sent
+        """
+        now = time.monotonic()
+        if not force and now < self.next_flush_time:
+            return 0
+
+        self.next_flush_time = now + self.interval
+        if not self.records:
+            return 0
+
+        batch: TelemetryBatch = {"fields": self.fields, "records": self.records}
+        self.fields = {}
+        self.records = []
+        self.emitCb(batch)
+
+        self.batch_count += 1
+        self.message_count += len(batch["records"])
+        return len(batch["records"])
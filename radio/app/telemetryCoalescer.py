@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from pymavlink import mavutil
+
+BYPASS_MESSAGES = ("HEARTBEAT", "STATUSTEXT")
+
+
+class TelemetryCoalescer:
+    def __init__(
+        self,
+        emitCb: Callable[[mavutil.mavlink.MAVLink_message], None],
+        rate: float = 10,
+        bypass_messages: Iterable[str] = BYPASS_MESSAGES,
+        key_by_source: bool = False,
+    ) -> None:
+        """
+        Holds on to the newest sample of each telemetry message and forwards them to the GUI
+        at a fixed rate, so a burst of messages does not turn into a burst of socket events.
+        Messages in bypass_messages are always forwarded straight away. Messages sent once
+        per instance, such as a BATTERY_STATUS for each battery, keep the newest sample of
+        each instance.
+
+        push() and flush() are only called from the drone sender thread.
+
+        Args:
+            emitCb (Callable[[mavutil.mavlink.MAVLink_message], None]): The function used to send a message to the GUI
+            rate (float, optional): The rate, in hertz, to forward coalesced messages at. 0 disables coalescing. Defaults to 10.
+            bypass_messages (Iterable[str], optional): The messages which are never coalesced. Defaults to HEARTBEAT and STATUSTEXT.
+            key_by_source (bool, optional): Keep the newest sample per system and component rather than just per message type. Defaults to False.
+        """
+        self.emitCb = emitCb
+        self.bypass_messages = frozenset(bypass_messages)
+        self.key_by_source = key_by_source
+        self.setRate(rate)
+
+        self.latest: Dict[Hashable, mavutil.mavlink.MAVLink_message] = {}
+        self.forwarded_count = 0
+        self.coalesced_count = 0
+
+    def setRate(self, rate: float) -> None:
+        """
+        Set the rate at which coalesced messages are forwarded.
+
+        Args:
+            rate (float): The rate in hertz, 0 disables coalescing
+        """
+        self.rate = rate
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_flush_time = time.monotonic() + self.interval
+
+    def push(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Add a message to be forwarded to the GUI, replacing any older sample of the same message.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message to forward
+        """
+        msg_type = msg.get_type()
+        if self.interval == 0 or msg_type in self.bypass_messages:
+            self.forwarded_count += 1
+            self.emitCb(msg)
+            return
+
+        key: Hashable = msg_type
+        # The field telling the instances apart, such as the id of BATTERY_STATUS
+        instance_field = getattr(msg, "_instance_field", None)
+        if instance_field is not None:
+            key = (msg_type, getattr(msg, instance_field, None))
+        if self.key_by_source:
+            key = (key, msg.get_srcSystem(), msg.get_srcComponent())
+
+        if key in self.latest:
+            self.coalesced_count += 1
+        self.latest[key] = msg
+
+    def timeUntilNextFlush(self) -> Optional[float]:
+        """
+        Get how long until the held messages are due to be forwarded.
+
+        Returns:
+            Optional[float]: The time in seconds, or None if no messages are being held
+        """
+        if not self.latest:
+            return None
+        return max(self.next_flush_time - time.monotonic(), 0)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Forward the held messages if they are due.
+
+        Args:
+            force (bool, optional): Forward the held messages even if they are not due yet. Defaults to False.
+
+        Returns:
+            int: The number of messages forwarded
+        """
+        now = time.monotonic()
+        if not force and now < self.next_flush_time:
+            return 0
+
+        self.next_flush_time = now + self.interval
+        if not self.latest:
+            return 0
+
+        latest, self.latest = self.latest, {}
+        for msg in latest.values():
+            self.emitCb(msg)
+
+        self.forwarded_count += len(latest)
+        return len(latest)
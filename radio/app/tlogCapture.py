@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from pymavlink import mavutil
+
+# Flight log formats selected with telemetry.flight_log_format in IMACS.yml
+FTLOG_FORMAT = "ftlog"  # One line of text per message, readable by FLA
+TLOG_FORMAT = "tlog"  # The raw packet bytes, converted to text when exported
+
+FLIGHT_LOG_FORMATS = (FTLOG_FORMAT, TLOG_FORMAT)
+
+# Each tlog record is the receive time in microseconds since the epoch as a big
+# endian 64 bit integer, followed by the MAVLink packet exactly as it was received
+TLOG_TIMESTAMP = struct.Struct(">Q")
+
+
+def formatTlogRecord(msg: mavutil.mavlink.MAVLink_message) -> bytes:
+    """
+    Format a message as a tlog record, without decoding any of its fields.
+
+    Args:
+        msg (mavutil.mavlink.MAVLink_message): The MAVLink message received from the drone
+
+    Returns:
+        bytes: The tlog record
+    """
+    return TLOG_TIMESTAMP.pack(int(msg._timestamp * 1e6)) + msg.get_msgbuf()
+
+
+def formatFtlogLine(msg: mavutil.mavlink.MAVLink_message) -> str:
+    """
+    Format a message as a line of an FTLog file, "timestamp,type,field:value,...".
+
+    Args:
+        msg (mavutil.mavlink.MAVLink_message): The MAVLink message
+
+    Returns:
+        str: The line, without a newline at the end
+    """
+    fields = msg.to_dict()
+    fields.pop("mavpackettype", None)
+    return f"{msg._timestamp},{msg.get_type()},{','.join(f'{field}:{value}' for field, value in fields.items())}"
+
+
+def convertTlogToFtlog(
+    tlog_file: Union[str, Path], ftlog_file: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Convert a tlog captured by the drone into an FTLog file.
+
+    Args:
+        tlog_file (Union[str, Path]): The tlog file to convert
+        ftlog_file (Optional[Union[str, Path]], optional): The FTLog file to write. Defaults to the tlog file name with an .ftlog extension.
+
+    Returns:
+        Path: The FTLog file written
+    """
+    tlog_file = Path(tlog_file)
+    ftlog_file = (
+        Path(ftlog_file) if ftlog_file is not None else tlog_file.with_suffix(".ftlog")
+    )
+
+    tlog = mavutil.mavlink_connection(str(tlog_file), notimestamps=False)
+    try:
+        with open(ftlog_file, "w") as ftlog_file_handle:
+            start_time_written = False
+            while (msg := tlog.recv_msg()) is not None:
+                if msg.get_type() == "BAD_DATA":
+                    continue
+
+                if not start_time_written:
+                    start_time = time.strftime(
+                        "%Y-%m-%d_%H-%M-%S", time.localtime(msg._timestamp)
+                    )
+                    ftlog_file_handle.write(f"==START_TIME=={start_time}==END==\n")
+                    start_time_written = True
+
+                ftlog_file_handle.write(formatFtlogLine(msg) + "\n")
+    finally:
+        tlog.close()
+
+    return ftlog_file
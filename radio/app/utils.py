@@ -1,10 +1,12 @@
 import sys
-from typing import Any, List
+from typing import Any, List, Optional
 
 from pymavlink import mavutil
 from serial.tools import list_ports
 
 from app.customTypes import VehicleType
+from app.telemetryBatcher import TelemetryBatch
+from app.vehicleRegistry import getVehicleRoom
 
 from . import socketio
 
@@ -130,6 +132,21 @@ def droneErrorCb(msg: Any) -> None:
     socketio.emit("drone_error", {"message": msg})
 
 
+def sendLogRecoveryStatus(message: str, recovered: int, total: int) -> None:
+    """
+    Send the progress of recovering temp logs left behind by a previous session to the socket
+
+    Args:
+        message: The status message
+        recovered: The number of sets of temp logs recovered so far
+        total: The number of sets of temp logs being recovered
+    """
+    socketio.emit(
+        "log_recovery_status",
+        {"message": message, "recovered": recovered, "total": total},
+    )
+
+
 def droneConnectStatusCb(msg: Any) -> None:
     """
     Send drone connect status updates to the socket
@@ -173,16 +190,39 @@ def missingParameterError(endpoint: str, params: str | list[str]) -> None:
     )
 
 
-def sendMessage(msg: Any) -> None:
+def sendMessage(msg: Any, vehicle_id: Optional[str] = None) -> None:
     """
     Sends a message to the frontend with a timestamp
 
     Args:
         msg: The message to send
+        vehicle_id: The vehicle the message is from, the message is sent to the vehicle's room with its ID. Sent to every client if None
     """
     data = msg.to_dict()
     data["timestamp"] = msg._timestamp
-    socketio.emit("incoming_msg", data)
+    if vehicle_id is None:
+        socketio.emit("incoming_msg", data)
+    else:
+        data["vehicle_id"] = vehicle_id
+        socketio.emit("incoming_msg", data, to=getVehicleRoom(vehicle_id))
+
+
+def sendTelemetryBatch(batch: TelemetryBatch, vehicle_id: Optional[str] = None) -> None:
+    """
+    Sends a batch of messages to the frontend in a single event
+
+    Args:
+        batch: The batch of messages to send, see TelemetryBatcher for the layout
+        vehicle_id: The vehicle the messages are from, the batch is sent to the vehicle's room with its ID. Sent to every client if None
+    """
+    if vehicle_id is None:
+        socketio.emit("telemetry_batch", batch)
+    else:
+        socketio.emit(
+            "telemetry_batch",
+            {**batch, "vehicle_id": vehicle_id},
+            to=getVehicleRoom(vehicle_id),
+        )
 
 
 def wpToMissionItemInt(
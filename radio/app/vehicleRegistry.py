@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from app.drone import Drone
+
+VEHICLE_ROOM_PREFIX = "vehicle_"
+
+
+class VehicleInfo(TypedDict):
+    vehicle_id: str
+    port: str
+    aircraft_type: Optional[int]
+    system_id: int
+    component_id: int
+
+
+def getVehicleRoom(vehicle_id: str) -> str:
+    """
+    Get the Socket.IO room that a vehicle's telemetry is sent to.
+
+    Args:
+        vehicle_id (str): The ID of the vehicle
+
+    Returns:
+        str: The name of the room
+    """
+    return f"{VEHICLE_ROOM_PREFIX}{vehicle_id}"
+
+
+class VehicleRegistry:
+    def __init__(self) -> None:
+        """
+        The drones connected to the backend, keyed by vehicle ID. Each drone has its own
+        connection and threads, the registry only tracks them so endpoints can find the
+        vehicle a request is for.
+
+        A vehicle's ID is its system ID unless another connected vehicle already has
+        that system ID, such as two SITL instances on their defaults, in which case its
+        connection ID (the port it was connected on) is used instead.
+        """
+        self._lock = Lock()
+        self._vehicles: Dict[str, Drone] = {}
+
+    def add(self, drone: Drone, vehicle_id: Optional[str] = None) -> str:
+        """
+        Add a connected drone.
+
+        Args:
+            drone (Drone): The drone
+            vehicle_id (Optional[str], optional): The ID to add the drone as. Defaults to its system ID, or its port if that is taken.
+
+        Raises:
+            ValueError: If the vehicle ID, or both the system ID and port, are taken by another drone
+
+        Returns:
+            str: The ID of the vehicle
+        """
+        with self._lock:
+            if vehicle_id is None:
+                candidates = [str(drone.target_system), drone.port]
+            else:
+                candidates = [str(vehicle_id)]
+
+            for candidate in candidates:
+                existing = self._vehicles.get(candidate)
+                if existing is None or existing is drone:
+                    self._vehicles[candidate] = drone
+                    drone.vehicle_id = candidate
+                    return candidate
+
+        raise ValueError(f"Vehicle ID {' or '.join(candidates)} is already in use")
+
+    def get(self, vehicle_id: str) -> Optional[Drone]:
+        with self._lock:
+            return self._vehicles.get(str(vehicle_id))
+
+    def remove(self, vehicle_id: str) -> Optional[Drone]:
+        """
+        Remove a drone from the registry, without closing its connection.
+
+        Args:
+            vehicle_id (str): The ID of the vehicle
+
+        Returns:
+            Optional[Drone]: The drone removed, or None if there is no vehicle with the ID
+        """
+        with self._lock:
+            drone = self._vehicles.pop(str(vehicle_id), None)
+        if drone is not None:
+            drone.vehicle_id = None
+        return drone
+
+    def getVehicleId(self, drone: Drone) -> Optional[str]:
+        with self._lock:
+            for vehicle_id, vehicle in self._vehicles.items():
+                if vehicle is drone:
+                    return vehicle_id
+        return None
+
+    def getVehicles(self) -> Dict[str, Drone]:
+        """
+        Get every connected drone.
+
+        Returns:
+            Dict[str, Drone]: A copy of the drones keyed by vehicle ID
+        """
+        with self._lock:
+            return dict(self._vehicles)
+
+    def getVehicleInfo(self) -> List[VehicleInfo]:
+        """
+        Get the connection details of every vehicle, to list them in the GUI.
+
+        Returns:
+            List[VehicleInfo]: The vehicles, in the order they were connected
+        """
+        return [
+            {
+                "vehicle_id": vehicle_id,
+                "port": drone.port,
+                "aircraft_type": drone.aircraft_type,
+                "system_id": drone.target_system,
+                "component_id": drone.target_component,
+            }
+            for vehicle_id, drone in self.getVehicles().items()
+        ]
+
+    def __len__(self) -> int:
+        return len(self._vehicles)
+
+    def __contains__(self, vehicle_id: object) -> bool:
+        return str(vehicle_id) in self._vehicles
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Optional, Union
+
+from pymavlink import mavutil
+from typing_extensions import TypedDict
+
+from app.utils import getVehicleType
+
+
+class Position(TypedDict):
+    lat: int
+    lon: int
+    alt: int
+    relative_alt: int
+    hdg: int
+
+
+class HomePosition(TypedDict):
+    lat: int
+    lon: int
+    alt: int
+
+
+class Battery(TypedDict):
+    voltage: int
+    current: int
+    remaining: int
+
+
+class GpsStatus(TypedDict):
+    fix_type: int
+    satellites_visible: int
+
+
+# The value of a state field, a flag, a number such as the mode or one of the TypedDicts above
+StateValue = Union[bool, int, Position, HomePosition, Battery, GpsStatus]
+
+
+class VehicleState:
+    def __init__(self, target_system: int, target_component: int) -> None:
+        """
+        The latest known state of the drone, kept up to date by the listener thread from
+        the messages it receives. Reading the state never waits on the drone, so controllers
+        and endpoints can use it instead of requesting a message and waiting for the reply.
+
+        Each field is stored with the time.monotonic() time it was last updated, a field
+        which has not been received yet is None. Messages from other systems are ignored,
+        and the HEARTBEAT is only used from the autopilot component.
+
+        Args:
+            target_system (int): The system ID of the drone
+            target_component (int): The component ID of the autopilot
+        """
+        self.target_system = target_system
+        self.target_component = target_component
+
+        self._lock = Lock()
+        self._values: Dict[str, Any] = {}
+        self._timestamps: Dict[str, float] = {}
+
+        self._handlers: Dict[str, Callable[[mavutil.mavlink.MAVLink_message], None]] = {
+            "HEARTBEAT": self.__updateFromHeartbeat,
+            "GLOBAL_POSITION_INT": self.__updateFromGlobalPositionInt,
+            "HOME_POSITION": self.__updateFromHomePosition,
+            "SYS_STATUS": self.__updateFromSysStatus,
+            "MISSION_CURRENT": self.__updateFromMissionCurrent,
+            "GPS_RAW_INT": self.__updateFromGpsRawInt,
+        }
+
+    def update(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Update the state from a message, messages which do not hold any state are ignored.
+
+        Args:
+            msg (mavutil.mavlink.MAVLink_message): The MAVLink message received from the drone
+        """
+        handler = self._handlers.get(msg.get_type())
+        if handler is None or msg.get_srcSystem() != self.target_system:
+            return
+        handler(msg)
+
+    def getMessageTypes(self) -> FrozenSet[str]:
+        """
+        Get the message types the state is built from.
+
+        Returns:
+            FrozenSet[str]: The message types update() uses
+        """
+        return frozenset(self._handlers)
+
+    def get(self, field: str) -> Optional[StateValue]:
+        """
+        Get the latest value of a field.
+
+        Args:
+            field (str): The name of the field
+
+        Returns:
+            Optional[StateValue]: The value, or None if it has not been received yet
+        """
+        return self._values.get(field)
+
+    def getTimestamp(self, field: str) -> Optional[float]:
+        """
+        Get the time.monotonic() time a field was last updated.
+
+        Args:
+            field (str): The name of the field
+
+        Returns:
+            Optional[float]: The time, or None if it has not been received yet
+        """
+        return self._timestamps.get(field)
+
+    def getAge(self, field: str) -> Optional[float]:
+        """
+        Get how long ago a field was last updated.
+
+        Args:
+            field (str): The name of the field
+
+        Returns:
+            Optional[float]: The age in seconds, or None if it has not been received yet
+        """
+        timestamp = self._timestamps.get(field)
+        if timestamp is None:
+            return None
+        return time.monotonic() - timestamp
+
+    def clear(self, field: str) -> None:
+        """
+        Forget the value of a field, for when it is known to be out of date.
+
+        Args:
+            field (str): The name of the field
+        """
+        with self._lock:
+            self._values.pop(field, None)
+            self._timestamps.pop(field, None)
+
+    def snapshot(self) -> Dict[str, StateValue]:
+        """
+        Get a consistent copy of every field received so far.
+
+        Returns:
+            Dict[str, StateValue]: The values keyed by field name
+        """
+        with self._lock:
+            return dict(self._values)
+
+    @property
+    def armed(self) -> bool:
+        return bool(self._values.get("armed", False))
+
+    @property
+    def mode(self) -> Optional[int]:
+        """The custom mode (the ArduPilot flight mode number) from the last HEARTBEAT."""
+        return self._values.get("mode")
+
+    @property
+    def mav_type(self) -> Optional[int]:
+        return self._values.get("mav_type")
+
+    @property
+    def aircraft_type(self) -> Optional[int]:
+        """The VehicleType value of the drone, from the MAV_TYPE in the last HEARTBEAT."""
+        mav_type = self.mav_type
+        return None if mav_type is None else getVehicleType(mav_type)
+
+    @property
+    def system_status(self) -> Optional[int]:
+        return self._values.get("system_status")
+
+    @property
+    def position(self) -> Optional[Position]:
+        return self._values.get("position")
+
+    @property
+    def home_position(self) -> Optional[HomePosition]:
+        return self._values.get("home_position")
+
+    @property
+    def battery(self) -> Optional[Battery]:
+        return self._values.get("battery")
+
+    @property
+    def gps(self) -> Optional[GpsStatus]:
+        return self._values.get("gps")
+
+    @property
+    def mission_current_seq(self) -> Optional[int]:
+        return self._values.get("mission_current_seq")
+
+    def __set(self, **fields: StateValue) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for field, value in fields.items():
+                self._values[field] = value
+                self._timestamps[field] = now
+
+    def __updateFromHeartbeat(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        if msg.get_srcComponent() != self.target_component:
+            return
+        self.__set(
+            armed=bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED),
+            base_mode=msg.base_mode,
+            mode=msg.custom_mode,
+            mav_type=msg.type,
+            system_status=msg.system_status,
+        )
+
+    def __updateFromGlobalPositionInt(
+        self, msg: mavutil.mavlink.MAVLink_message
+    ) -> None:
+        position: Position = {
+            "lat": msg.lat,
+            "lon": msg.lon,
+            "alt": msg.alt,
+            "relative_alt": msg.relative_alt,
+            "hdg": msg.hdg,
+        }
+        self.__set(position=position)
+
+    def __updateFromHomePosition(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        home_position: HomePosition = {
+            "lat": msg.latitude,
+            "lon": msg.longitude,
+            "alt": msg.altitude,
+        }
+        self.__set(home_position=home_position)
+
+    def __updateFromSysStatus(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        battery: Battery = {
+            "voltage": msg.voltage_battery,
+            "current": msg.current_battery,
+            "remaining": msg.battery_remaining,
+        }
+        self.__set(battery=battery)
+
+    def __updateFromMissionCurrent(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        self.__set(mission_current_seq=msg.seq)
+
+    def __updateFromGpsRawInt(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        gps: GpsStatus = {
+            "fix_type": msg.fix_type,
+            "satellites_visible": msg.satellites_visible,
+        }
+        self.__set(gps=gps)
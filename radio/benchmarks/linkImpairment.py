@@ -0,0 +1,210 @@
+"""
+Reports how parameter download, mission transfer and telemetry latency degrade over
+slow and lossy links, by connecting the drone to the mock autopilot through a link
+impairment proxy for each scenario preset.
+
+Run from the root of the repository:
+    python radio/benchmarks/linkImpairment.py [--presets wired radio_57600] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pymavlink import mavutil  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.customTypes import Response  # noqa: E402
+from app.drone import Drone  # noqa: E402
+from app.linkImpairment import IMPAIRMENT_PRESETS, ImpairmentProxy  # noqa: E402
+from app.mockAutopilot import MockAutopilot  # noqa: E402
+
+# How long to wait for a transfer before recording it as failed
+TRANSFER_TIMEOUT = 60
+
+
+def measureTelemetryLatency(drone: Drone, duration: float) -> Dict[str, Any]:
+    """Compare the send time in SYSTEM_TIME messages against when the drone gets them."""
+    latencies: List[float] = []
+
+    def recordLatency(msg: mavutil.mavlink.MAVLink_message) -> None:
+        latencies.append(time.time() - msg.time_unix_usec / 1e6)
+
+    # The dashboard starts the data streams when the GUI opens it
+    drone.setupDataStreams()
+    drone.addMessageListener("SYSTEM_TIME", recordLatency)
+    time.sleep(duration)
+    drone.removeMessageListener("SYSTEM_TIME", recordLatency)
+
+    if not latencies:
+        return {"messages": 0, "mean_ms": None, "max_ms": None}
+    return {
+        "messages": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def measureParamDownload(drone: Drone, param_count: int) -> Dict[str, Any]:
+    params_controller = drone.paramsController
+    start = time.perf_counter()
+    params_controller.getAllParams()
+    while (
+        params_controller.is_requesting_params
+        and time.perf_counter() - start < TRANSFER_TIMEOUT
+    ):
+        time.sleep(0.01)
+    duration = time.perf_counter() - start
+
+    received = len(params_controller.params)
+    return {
+        "success": received == param_count,
+        "params": received,
+        "seconds": duration,
+    }
+
+
+def measureMissionTransfer(drone: Drone, mission_size: int) -> Dict[str, Any]:
+    mission_controller = drone.missionController
+
+    start = time.perf_counter()
+    download = mission_controller.getMissionItems(0)
+    download_duration = time.perf_counter() - start
+
+    upload: Response = {"success": False}
+    upload_duration: Optional[float] = None
+    if download.get("success"):
+        start = time.perf_counter()
+        upload = mission_controller.uploadMission(0)
+        upload_duration = time.perf_counter() - start
+
+    return {
+        "items": mission_size,
+        "download_success": bool(download.get("success")),
+        "download_seconds": download_duration,
+        "upload_success": bool(upload.get("success")),
+        "upload_seconds": upload_duration,
+    }
+
+
+def runPreset(
+    preset: str,
+    param_count: int,
+    mission_size: int,
+    telemetry_duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    mock_autopilot = MockAutopilot(param_count=param_count, mission_size=mission_size)
+    proxy = ImpairmentProxy(
+        mock_autopilot.start(), IMPAIRMENT_PRESETS[preset], seed=seed
+    )
+    port = proxy.start()
+
+    result: Dict[str, Any] = {"preset": preset}
+    try:
+        start = time.perf_counter()
+        drone = Drone(port, wireless=preset != "wired")
+        result["connect_seconds"] = time.perf_counter() - start
+        if drone.connectionError is not None:
+            result["error"] = drone.connectionError
+            return result
+
+        try:
+            result["telemetry"] = measureTelemetryLatency(drone, telemetry_duration)
+            result["params"] = measureParamDownload(drone, param_count)
+            result["mission"] = measureMissionTransfer(drone, mission_size)
+        finally:
+            drone.close()
+        result["link"] = proxy.getStats()
+    finally:
+        proxy.stop()
+        mock_autopilot.stop()
+    return result
+
+
+def formatSeconds(seconds: Optional[float], success: bool = True) -> str:
+    if seconds is None:
+        return "-"
+    return f"{seconds:.2f}" if success else "failed"
+
+
+def printReport(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'preset':<16} {'connect (s)':>11} {'latency (ms)':>13} {'max (ms)':>9} "
+        f"{'params (s)':>10} {'mission down (s)':>16} {'mission up (s)':>14} "
+        f"{'dropped':>8}"
+    )
+    for result in results:
+        if "error" in result:
+            print(f"{result['preset']:<16} {result['error']}")
+            continue
+
+        telemetry = result["telemetry"]
+        params = result["params"]
+        mission = result["mission"]
+        dropped = sum(link["dropped"] for link in result["link"].values())
+        mean_latency = (
+            f"{telemetry['mean_ms']:.1f}" if telemetry["mean_ms"] is not None else "-"
+        )
+        max_latency = (
+            f"{telemetry['max_ms']:.1f}" if telemetry["max_ms"] is not None else "-"
+        )
+        print(
+            f"{result['preset']:<16} {result['connect_seconds']:>11.2f} "
+            f"{mean_latency:>13} {max_latency:>9} "
+            f"{formatSeconds(params['seconds'], params['success']):>10} "
+            f"{formatSeconds(mission['download_seconds'], mission['download_success']):>16} "
+            f"{formatSeconds(mission['upload_seconds'], mission['upload_success']):>14} "
+            f"{dropped:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--presets",
+        nargs="+",
+        choices=list(IMPAIRMENT_PRESETS),
+        default=list(IMPAIRMENT_PRESETS),
+    )
+    parser.add_argument("--params", type=int, default=1400)
+    parser.add_argument(
+        "--mission-size", type=int, default=100, help="Waypoints in the mission"
+    )
+    parser.add_argument(
+        "--telemetry-duration",
+        type=float,
+        default=5,
+        help="Seconds to measure telemetry latency for",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    create_app()
+
+    results = [
+        runPreset(
+            preset,
+            args.params,
+            args.mission_size,
+            args.telemetry_duration,
+            args.seed,
+        )
+        for preset in args.presets
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        printReport(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares merging temp FTLog files with readlines()/writelines() against the streaming
+mergeLogFiles, for flights of increasing length.
+
+Run from the root of the repository:
+    python radio/benchmarks/logMerge.py
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.ftlogWriter import LOG_LINE_LIMIT, mergeLogFiles  # noqa: E402
+
+LINE = (
+    "1718000000.123456,ATTITUDE,time_boot_ms:123456,roll:0.0123,pitch:-0.0456,"
+    "yaw:1.5708,rollspeed:0.001,pitchspeed:-0.002,yawspeed:0.0005\n"
+)
+
+
+def mergeWithReadlines(log_files: List[Path], merged_log_file: Path) -> None:
+    """The previous Drone.close behaviour."""
+    with open(merged_log_file, "a") as merged_log_file_handle:
+        for log_file in log_files:
+            with open(log_file) as log_file_handle:
+                merged_log_file_handle.writelines(log_file_handle.readlines())
+            log_file.unlink()
+
+
+def makeSegments(directory: Path, segments: int) -> List[Path]:
+    segment = "==START_TIME==2024-01-01_00-00-00==END==\n" + LINE * LOG_LINE_LIMIT
+    log_files = []
+    for i in range(segments):
+        log_file = directory.joinpath(f"tmp_{i}.ftlog")
+        log_file.write_text(segment)
+        log_files.append(log_file)
+    return log_files
+
+
+def measure(
+    merge: Callable[[List[Path], Path], None], directory: Path, segments: int
+) -> Tuple[float, int]:
+    log_files = makeSegments(directory, segments)
+    merged_log_file = directory.joinpath("merged.ftlog")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    merge(log_files, merged_log_file)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    merged_log_file.unlink()
+    return duration, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--segments",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16],
+        help=f"Numbers of {LOG_LINE_LIMIT} line temp log files to merge",
+    )
+    args = parser.parse_args()
+
+    print(f"{'segments':>8} {'merge':>10} {'time (s)':>9} {'peak MiB':>9}")
+    for segments in args.segments:
+        with tempfile.TemporaryDirectory() as directory:
+            for name, merge in [
+                ("readlines", mergeWithReadlines),
+                ("streaming", mergeLogFiles),
+            ]:
+                duration, peak = measure(merge, Path(directory), segments)
+                print(f"{segments:>8} {name:>10} {duration:>9.3f} {peak / 2**20:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
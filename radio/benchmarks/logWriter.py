@@ -0,0 +1,96 @@
+"""
+Compares writing FTLog lines by opening the temp log file for every message against
+the buffered FtlogWriter, at a range of telemetry rates.
+
+Run from the root of the repository:
+    python radio/benchmarks/logWriter.py
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.ftlogWriter import FtlogWriter  # noqa: E402
+
+LINE = (
+    "1718000000.123456,ATTITUDE,time_boot_ms:123456,roll:0.0123,pitch:-0.0456,"
+    "yaw:1.5708,rollspeed:0.001,pitchspeed:-0.002,yawspeed:0.0005"
+)
+
+
+def writePerMessage(log_file: Path) -> Callable[[str], None]:
+    """The previous logMessages behaviour, open, append and close for every line."""
+    with open(log_file, "w") as f:
+        f.write("==START_TIME==2024-01-01_00-00-00==END==\n")
+
+    def write(line: str) -> None:
+        with open(log_file, "a") as f:
+            f.write(line + "\n")
+
+    return write
+
+
+def run(write: Callable[[str], None], rate: int, duration: float) -> float:
+    """Feed lines at the given rate and return the time spent in write() in seconds."""
+    interval = 1 / rate
+    next_time = time.perf_counter()
+    end_time = next_time + duration
+    busy = 0.0
+
+    while next_time < end_time:
+        start = time.perf_counter()
+        write(LINE)
+        busy += time.perf_counter() - start
+
+        next_time += interval
+        sleep_time = next_time - time.perf_counter()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+    return busy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[100, 500, 2000], help="Messages/s"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=3, help="Seconds to run each rate for"
+    )
+    args = parser.parse_args()
+
+    print(f"{'rate':>6} {'writer':>12} {'us/msg':>8} {'cpu %':>7}")
+    for rate in args.rates:
+        messages = int(rate * args.duration)
+        results: List[tuple] = []
+
+        with tempfile.TemporaryDirectory() as directory:
+            busy = run(
+                writePerMessage(Path(directory, "per_message.ftlog")),
+                rate,
+                args.duration,
+            )
+            results.append(("per-message", busy))
+
+            writer = FtlogWriter(Path(directory))
+            busy = run(writer.write, rate, args.duration)
+            start = time.perf_counter()
+            writer.close()
+            busy += time.perf_counter() - start
+            results.append(("buffered", busy))
+
+        for name, busy in results:
+            print(
+                f"{rate:>6} {name:>12} {busy / messages * 1e6:>8.2f} "
+                f"{busy / args.duration * 100:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
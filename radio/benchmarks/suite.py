@@ -0,0 +1,402 @@
+"""
+Benchmarks the backend hot paths against the mock autopilot: connect time, message pump
+throughput through checkForMessages and executeMessages, end to end Socket.IO emit
+latency, the logMessages write rate, full parameter download time and mission upload
+and download time per 100 items.
+
+Run from the root of the repository, saving the results of each commit to compare:
+    python radio/benchmarks/suite.py run --output before.json
+    python radio/benchmarks/suite.py run --output after.json
+    python radio/benchmarks/suite.py compare before.json after.json
+
+compare exits with status 1 if any metric regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask_socketio import SocketIOTestClient  # noqa: E402
+from pymavlink import mavutil  # noqa: E402
+from typing_extensions import TypedDict  # noqa: E402
+
+from app import create_app, socketio  # noqa: E402
+from app.drone import Drone  # noqa: E402
+from app.mockAutopilot import MockAutopilot  # noqa: E402
+from app.tlogCapture import formatFtlogLine  # noqa: E402
+
+# How long to wait for a transfer or burst to finish before giving up
+TIMEOUT = 60
+# A burst is finished once no message has arrived for this long
+IDLE_TIME = 1.0
+POLL_INTERVAL = 0.001
+REGRESSION_THRESHOLD = 0.1
+
+
+class Metric(TypedDict):
+    value: Optional[float]
+    unit: str
+    higher_is_better: bool
+    samples: List[Optional[float]]
+
+
+def metric(value: Optional[float], unit: str, higher_is_better: bool = False) -> Metric:
+    return {
+        "value": value,
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "samples": [value],
+    }
+
+
+def measureEmitLatency(
+    drone: Drone, client: SocketIOTestClient, duration: float
+) -> Dict[str, Metric]:
+    """
+    Time SYSTEM_TIME messages from when the autopilot sends them to when the GUI
+    receives them, through the message queue, coalescer and batcher.
+    """
+    drone.addMessageListener("SYSTEM_TIME", drone.forwardMessage)
+    drone.sendDataStreamRequestMessage(mavutil.mavlink.MAV_DATA_STREAM_EXTRA3, 10)
+    client.get_received()
+
+    latencies: List[float] = []
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        packets = client.get_received()
+        received_time = time.time()
+        for packet in packets:
+            latencies.extend(
+                received_time - send_time for send_time in getSystemTimes(packet)
+            )
+        time.sleep(POLL_INTERVAL)
+
+    drone.stopAllDataStreams()
+    drone.removeMessageListener("SYSTEM_TIME", drone.forwardMessage)
+
+    if not latencies:
+        return {"emit_latency_mean_ms": metric(None, "ms")}
+    latencies.sort()
+    return {
+        "emit_latency_mean_ms": metric(statistics.mean(latencies) * 1000, "ms"),
+        "emit_latency_p95_ms": metric(
+            latencies[int(len(latencies) * 0.95)] * 1000, "ms"
+        ),
+    }
+
+
+def getSystemTimes(packet: dict) -> List[float]:
+    """Get the send times of the SYSTEM_TIME messages in an emitted socket event."""
+    if packet["name"] == "incoming_msg":
+        data = packet["args"][0]
+        if data.get("mavpackettype") == "SYSTEM_TIME":
+            return [data["time_unix_usec"] / 1e6]
+    elif packet["name"] == "telemetry_batch":
+        batch = packet["args"][0]
+        fields = batch["fields"].get("SYSTEM_TIME")
+        if fields is not None:
+            index = fields.index("time_unix_usec") + 1
+            return [
+                record[index] / 1e6
+                for record in batch["records"]
+                if record[0] == "SYSTEM_TIME"
+            ]
+    return []
+
+
+def measurePumpThroughput(
+    drone: Drone, mock_autopilot: MockAutopilot, count: int
+) -> Dict[str, Metric]:
+    """Send a burst of messages and count how many reach a message listener."""
+    received = 0
+    last_received_time = time.perf_counter()
+
+    def countMessage(msg: mavutil.mavlink.MAVLink_message) -> None:
+        nonlocal received, last_received_time
+        received += 1
+        last_received_time = time.perf_counter()
+
+    drone.addMessageListener("ATTITUDE", countMessage)
+    start = time.perf_counter()
+    mock_autopilot.sendBurst("ATTITUDE", count)
+    while received < count and time.perf_counter() - last_received_time < IDLE_TIME:
+        time.sleep(POLL_INTERVAL)
+    drone.removeMessageListener("ATTITUDE", countMessage)
+
+    duration = last_received_time - start
+    return {
+        "pump_messages_per_second": metric(
+            received / duration if received else 0, "msg/s", higher_is_better=True
+        ),
+        "pump_dropped": metric(count - received, "msgs"),
+    }
+
+
+def measureLogWriteRate(drone: Drone, count: int) -> Dict[str, Metric]:
+    """Time how long the log thread takes to write a queue of FTLog lines."""
+    msg = mavutil.mavlink.MAVLink_attitude_message(123456, 0.01, -0.04, 1.57, 0, 0, 0)
+    msg._timestamp = time.time()
+    line = formatFtlogLine(msg)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        drone.log_message_queue.put(line)
+    while not drone.log_message_queue.empty():
+        time.sleep(POLL_INTERVAL)
+    duration = time.perf_counter() - start
+
+    return {
+        "log_lines_per_second": metric(
+            count / duration, "lines/s", higher_is_better=True
+        )
+    }
+
+
+def measureParamDownload(drone: Drone, param_count: int) -> Dict[str, Metric]:
+    params_controller = drone.paramsController
+    start = time.perf_counter()
+    params_controller.getAllParams()
+    while (
+        params_controller.is_requesting_params and time.perf_counter() - start < TIMEOUT
+    ):
+        time.sleep(POLL_INTERVAL)
+    duration = time.perf_counter() - start
+
+    success = len(params_controller.params) == param_count
+    return {"param_download_seconds": metric(duration if success else None, "s")}
+
+
+def measureMissionTransfer(drone: Drone, mission_size: int) -> Dict[str, Metric]:
+    mission_controller = drone.missionController
+    per_100_items = 100 / mission_size
+
+    start = time.perf_counter()
+    download = mission_controller.getMissionItems(0)
+    download_duration = time.perf_counter() - start
+    if not download.get("success"):
+        return {"mission_download_seconds_per_100": metric(None, "s")}
+
+    start = time.perf_counter()
+    upload = mission_controller.uploadMission(0)
+    upload_duration = time.perf_counter() - start
+
+    return {
+        "mission_download_seconds_per_100": metric(
+            download_duration * per_100_items, "s"
+        ),
+        "mission_upload_seconds_per_100": metric(
+            upload_duration * per_100_items if upload.get("success") else None, "s"
+        ),
+    }
+
+
+def runOnce(args: argparse.Namespace, client: SocketIOTestClient) -> Dict[str, Metric]:
+    mock_autopilot = MockAutopilot(
+        param_count=args.params, mission_size=args.mission_size
+    )
+    port = mock_autopilot.start()
+
+    metrics: Dict[str, Metric] = {}
+    try:
+        start = time.perf_counter()
+        drone = Drone(port)
+        connect_duration = time.perf_counter() - start
+        if drone.connectionError is not None:
+            raise RuntimeError(drone.connectionError)
+        metrics["connect_seconds"] = metric(connect_duration, "s")
+
+        # The log files written by the benchmark are removed once the drone closes
+        existing_log_files = set(drone.log_directory.iterdir())
+        try:
+            metrics.update(measureEmitLatency(drone, client, args.emit_duration))
+            metrics.update(measurePumpThroughput(drone, mock_autopilot, args.burst))
+            metrics.update(measureLogWriteRate(drone, args.log_lines))
+            metrics.update(measureParamDownload(drone, args.params))
+            metrics.update(measureMissionTransfer(drone, args.mission_size))
+        finally:
+            drone.close()
+            for log_file in set(drone.log_directory.iterdir()) - existing_log_files:
+                log_file.unlink()
+    finally:
+        mock_autopilot.stop()
+    return metrics
+
+
+def combineRuns(runs: List[Dict[str, Metric]]) -> Dict[str, Metric]:
+    """Combine the metrics of each run, taking the median as the value."""
+    combined: Dict[str, Metric] = {}
+    for run in runs:
+        for name, run_metric in run.items():
+            if name not in combined:
+                combined[name] = {**run_metric, "samples": []}
+            combined[name]["samples"].extend(run_metric["samples"])
+
+    for combined_metric in combined.values():
+        samples = [s for s in combined_metric["samples"] if s is not None]
+        # A failed run counts as no result, rather than a fast one
+        combined_metric["value"] = (
+            statistics.median(samples)
+            if len(samples) == len(combined_metric["samples"])
+            else None
+        )
+    return combined
+
+
+def getCommit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def formatValue(value: Optional[float]) -> str:
+    return "failed" if value is None else f"{value:.4g}"
+
+
+def run(args: argparse.Namespace) -> int:
+    app = create_app()
+    client = socketio.test_client(app)
+    try:
+        runs = [runOnce(args, client) for _ in range(args.repeat)]
+    finally:
+        client.disconnect()
+
+    metrics = combineRuns(runs)
+    results = {
+        "commit": getCommit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("command", "func", "output")
+        },
+        "metrics": metrics,
+    }
+
+    print(f"{'metric':<34} {'value':>10}  unit")
+    for name, result in metrics.items():
+        print(f"{name:<34} {formatValue(result['value']):>10}  {result['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"Comparing {baseline.get('commit')} with {current.get('commit')}")
+    print(f"{'metric':<34} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = []
+    for name, current_metric in current["metrics"].items():
+        baseline_metric = baseline["metrics"].get(name)
+        if baseline_metric is None:
+            continue
+
+        before = baseline_metric["value"]
+        after = current_metric["value"]
+        status = ""
+        change = "-"
+        if after is None and before is not None:
+            status = "REGRESSION"
+        elif before is not None and after is not None:
+            # Counts such as dropped messages regress on any change from zero
+            relative_change = (
+                (after - before) / abs(before) if before else float(after - before)
+            )
+            if before:
+                change = f"{relative_change:+.1%}"
+            worse = (
+                -relative_change
+                if current_metric["higher_is_better"]
+                else relative_change
+            )
+            if worse > (args.threshold if before else 0):
+                status = "REGRESSION"
+            elif worse < -args.threshold:
+                status = "improved"
+        if status == "REGRESSION":
+            regressions.append(name)
+
+        print(
+            f"{name:<34} {formatValue(before):>10} {formatValue(after):>10} "
+            f"{change:>8}  {status}"
+        )
+
+    if regressions:
+        print(f"{len(regressions)} regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--output", help="JSON file to save the results to")
+    run_parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs to take the median of"
+    )
+    run_parser.add_argument("--params", type=int, default=1400)
+    run_parser.add_argument(
+        "--mission-size", type=int, default=100, help="Waypoints in the mission"
+    )
+    run_parser.add_argument(
+        "--burst", type=int, default=20000, help="Messages sent to the message pump"
+    )
+    run_parser.add_argument(
+        "--log-lines", type=int, default=100000, help="FTLog lines to write"
+    )
+    run_parser.add_argument(
+        "--emit-duration",
+        type=float,
+        default=3,
+        help="Seconds to measure the emit latency for",
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare two result files and flag regressions"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Relative change that counts as a regression",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compares forwarding telemetry to the GUI as one socket event per message against batched
+telemetry_batch events.
+
+Run from the root of the repository:
+    python radio/benchmarks/telemetryBatching.py
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pymavlink import mavutil  # noqa: E402
+
+from app import create_app, socketio  # noqa: E402
+from app.telemetryBatcher import TelemetryBatcher  # noqa: E402
+from app.utils import sendMessage, sendTelemetryBatch  # noqa: E402
+
+
+def makeMessages(count: int) -> List[Any]:
+    """Create a mix of the telemetry messages sent by the drone on a wired link."""
+    mav = mavutil.mavlink
+    templates: List[Callable[[int], Any]] = [
+        lambda i: mav.MAVLink_attitude_message(i, 0.1, 0.2, 0.3, 0.01, 0.02, 0.03),
+        lambda i: mav.MAVLink_global_position_int_message(
+            i, -353632621, 1491652374, 584000, 10000, 10, -5, 0, 9000
+        ),
+        lambda i: mav.MAVLink_vfr_hud_message(12.5, 13.1, 90, 45, 10.0, 0.5),
+        lambda i: mav.MAVLink_sys_status_message(
+            0, 0, 0, 250, 12400, 1500, 80, 0, 0, 0, 0, 0, 0
+        ),
+        lambda i: mav.MAVLink_nav_controller_output_message(
+            0.1, 0.2, 90, 91, 120, 0.5, 0.1, 0.0
+        ),
+    ]
+
+    messages = []
+    for i in range(count):
+        msg = templates[i % len(templates)](i)
+        msg._timestamp = time.time()
+        messages.append(msg)
+    return messages
+
+
+def runPerMessage(messages: List[Any], drain: Callable[[], None]) -> dict:
+    start = time.perf_counter()
+    for i, msg in enumerate(messages):
+        sendMessage(msg)
+        if i % 1000 == 0:
+            drain()
+    elapsed = time.perf_counter() - start
+    drain()
+
+    return {"emits": len(messages), "seconds": elapsed}
+
+
+def runBatched(
+    messages: List[Any], drain: Callable[[], None], messages_per_batch: int
+) -> dict:
+    batcher = TelemetryBatcher(sendTelemetryBatch)
+
+    start = time.perf_counter()
+    for i, msg in enumerate(messages, start=1):
+        batcher.add(msg)
+        # Stands in for the batch window elapsing at the benchmarked message rate
+        if i % messages_per_batch == 0:
+            batcher.flush(force=True)
+            if batcher.batch_count % 100 == 0:
+                drain()
+    batcher.flush(force=True)
+    elapsed = time.perf_counter() - start
+    drain()
+
+    return {"emits": batcher.batch_count, "seconds": elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument(
+        "--rate", type=int, default=200, help="Telemetry rate in messages per second"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=50, help="Batch window in milliseconds"
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    client = socketio.test_client(app)
+
+    def drain() -> None:
+        client.get_received()
+
+    messages = makeMessages(args.messages)
+    messages_per_batch = max(1, args.rate * args.interval // 1000)
+
+    per_message = runPerMessage(messages, drain)
+    batched = runBatched(messages, drain, messages_per_batch)
+    client.disconnect()
+
+    print(
+        f"{args.messages} messages at {args.rate} msg/s, {args.interval} ms batch window"
+    )
+    for name, result in (("incoming_msg", per_message), ("telemetry_batch", batched)):
+        print(
+            f"  {name:<16} {result['emits']:>7} emits  {result['seconds']:.3f} s  "
+            f"{args.messages / result['seconds']:>10.0f} msg/s"
+        )
+    print(
+        f"  {per_message['emits'] / batched['emits']:.1f}x fewer emits, "
+        f"{per_message['seconds'] / batched['seconds']:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import pytest
 import time
 
 from app.drone import Drone
+from app.mockAutopilot import MockAutopilot
 from app.utils import getComPort
 from logging import getLogger
 from pymavlink import mavutil
@@ -55,6 +56,11 @@ def waitUntilCalibrated() -> None:
 
 def pytest_addoption(parser):
     parser.addoption("--fc", action="store_true")
+    parser.addoption(
+        "--mock",
+        action="store_true",
+        help="Run the tests against an in-process mock autopilot instead of SITL",
+    )
 
 
 def pytest_sessionstart(session):
@@ -70,6 +76,12 @@ def pytest_sessionstart(session):
         print("\033[1;31;40mRUNNING TESTS WITH A PHYSICAL DEVICE \033[0m")
         connection_string = getComPort()
 
+    elif session.config.getoption("--mock"):
+        print("\033[1;31;40mRUNNING TESTS WITH A MOCK AUTOPILOT \033[0m")
+        mock_autopilot = MockAutopilot()
+        connection_string = mock_autopilot.start()
+        session.config.add_cleanup(mock_autopilot.stop)
+
     else:
         print("\033[1;31;40mRUNNING TESTS WITH A SIMULATOR \033[0m")
 
@@ -1,35 +1,90 @@
 import pytest
-from typing import Optional, Union
+from abc import ABC, abstractmethod
+from logging import getLogger
+from typing import Callable, Optional, Union
+from pymavlink import mavutil
 from serial.serialutil import SerialException
 
 from app import droneStatus, logger
+from app.messageDispatcher import (
+    MessageDispatcher,
+    MessageSubscription,
+    MessageTypes,
+    PendingMessage,
+)
 from . import socketio_client
 
 
-class FakeTCP:
+class DispatcherOverride(MessageDispatcher, ABC):
     """
-    Context manager that replaces the mavlink mavtcp recv_match method in `droneStatus.drone.master` with one that raises a
-    `serial.serialutils.SerialException`. Use if you want to simulate a serial issue for a unit test.
+    Base context manager that replaces `droneStatus.drone.messageDispatcher` so the controllers receive the
+    responses given by the `expect` and `subscribe` methods of the subclass instead of the drone's.
     """
 
-    @staticmethod
-    def recv_match_override(
-        condition=None, type=None, blocking=False, timeout=None
-    ) -> None:
-        raise SerialException(
-            "Test SerialException generated by tests.FakeTCP context manager."
-        )
+    def __init__(self) -> None:
+        super().__init__(getLogger("fgcs"))
+
+    @abstractmethod
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> PendingMessage:
+        ...
+
+    @abstractmethod
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> MessageSubscription:
+        ...
 
     def __enter__(self) -> None:
-        # Replace drone mavtcp recv_match function with one that raises SerialException
         if droneStatus.drone is not None:
-            self.old_recv = droneStatus.drone.master.recv_match
-            droneStatus.drone.master.recv_match = FakeTCP.recv_match_override
+            self.old_dispatcher = droneStatus.drone.messageDispatcher
+            droneStatus.drone.messageDispatcher = self
 
     def __exit__(self, type, value, traceback) -> None:
-        # Reset recv_match method
         if droneStatus.drone is not None:
-            droneStatus.drone.master.recv_match = self.old_recv
+            droneStatus.drone.messageDispatcher = self.old_dispatcher
+
+
+class FakeTCP(DispatcherOverride):
+    """
+    Context manager that makes every response awaited through `droneStatus.drone.messageDispatcher` raise a
+    `serial.serialutils.SerialException`. Use if you want to simulate a serial issue for a unit test.
+    """
+
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> PendingMessage:
+        pending = PendingMessage(msg_types, condition, **fields)
+        pending.setException(
+            SerialException(
+                "Test SerialException generated by tests.FakeTCP context manager."
+            )
+        )
+        return pending
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> MessageSubscription:
+        subscription = MessageSubscription(msg_types, condition, **fields)
+        subscription.setException(
+            SerialException(
+                "Test SerialException generated by tests.FakeTCP context manager."
+            )
+        )
+        return subscription
 
 
 class NoDrone:
@@ -49,93 +104,84 @@ class NoDrone:
         droneStatus.drone = self.oldDrone
 
 
-class ParamSetTimeout:
-    """Context manager that replaces the mavlink recv_match function in drone.master with a function that return a None value
+class ParamSetTimeout(DispatcherOverride):
+    """Context manager that makes the responses awaited through drone.messageDispatcher never arrive
     to cause the set multipleparams function to timeout
     """
 
-    @staticmethod
-    def recv_match_null_value(
-        condition=None, type=None, blocking=False, timeout=None
-    ) -> None:
-        return None
-
-    def __enter__(self) -> None:
-        if droneStatus.drone is not None:
-            self.old_recv = droneStatus.drone.master.recv_match
-            droneStatus.drone.master.recv_match = ParamSetTimeout.recv_match_null_value
-
-    def __exit__(self, type, value, traceback) -> None:
-        if droneStatus.drone is not None:
-            droneStatus.drone.master.recv_match = self.old_recv
-
-
-class ParamRefreshTimeout:
-    """Context manager that replaces the mavlink recv_msg function in drone.master with a function that returns a False value
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> PendingMessage:
+        return PendingMessage(msg_types, condition, **fields)
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> MessageSubscription:
+        return MessageSubscription(msg_types, condition, **fields)
+
+
+class ParamRefreshTimeout(ParamSetTimeout):
+    """Context manager that makes the responses awaited through drone.messageDispatcher never arrive
     and sets current_param_index to -1 to cause the refresh_params function to timeout with no params received from the drone
     """
 
-    @staticmethod
-    def recv_msg_false_value(
-        condition=None, Type=None, blocking=False, timeout=None
-    ) -> bool:
-        return False
-
     def __enter__(self) -> None:
+        super().__enter__()
         if droneStatus.drone is not None:
-            self.old_recv_msg = droneStatus.drone.master.recv_msg
-            droneStatus.drone.master.recv_msg = ParamRefreshTimeout.recv_msg_false_value
             self.old_param_index = (
                 droneStatus.drone.paramsController.current_param_index
             )
             droneStatus.drone.paramsController.current_param_index = -1
 
     def __exit__(self, type, value, traceback) -> None:
+        super().__exit__(type, value, traceback)
         if droneStatus.drone is not None:
-            droneStatus.drone.master.recv_msg = self.old_recv_msg
             droneStatus.drone.paramsController.current_param_index = (
                 self.old_param_index
             )
 
 
-class NoAcknowledgementMessage:
-    """Context manager that replaces the mavlink recv_match function in drone.master with a function that returns False
-    causing no acknowledgement messages to be received when used in the MotorTestController tests
-    """
-
-    @staticmethod
-    def recv_msg_false_value(
-        condition=None, type=None, blocking=False, timeout=None
-    ) -> bool:
-        return False
-
-    def __enter__(self) -> None:
-        if droneStatus.drone is not None:
-            self.old_recv = droneStatus.drone.master.recv_match
-            droneStatus.drone.master.recv_match = (
-                NoAcknowledgementMessage.recv_msg_false_value
-            )
-
-    def __exit__(self, type, value, traceback) -> None:
-        if droneStatus.drone is not None:
-            droneStatus.drone.master.recv_match = self.old_recv
+class EmptySubscription(MessageSubscription):
+    """A subscription whose get() returns no message straight away, as if it timed out"""
 
+    def get(
+        self, timeout: Optional[float] = None
+    ) -> Optional[mavutil.mavlink.MAVLink_message]:
+        return None
 
-class RecvMsgReturnsFalse:
-    @staticmethod
-    def recv_match_false(
-        condition=None, type=None, blocking=False, timeout=None
-    ) -> bool:
-        return False
 
-    def __enter__(self) -> None:
-        if droneStatus.drone is not None:
-            self.old_recv = droneStatus.drone.master.recv_match
-            droneStatus.drone.master.recv_match = RecvMsgReturnsFalse.recv_match_false
+class NoAcknowledgementMessage(DispatcherOverride):
+    """Context manager that makes the responses awaited through drone.messageDispatcher resolve straight away with
+    no message, causing no acknowledgement messages to be received when used in the MotorTestController tests
+    """
 
-    def __exit__(self, type, value, traceback) -> None:
-        if droneStatus.drone is not None:
-            droneStatus.drone.master.recv_match = self.old_recv
+    def expect(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> PendingMessage:
+        pending = PendingMessage(msg_types, condition, **fields)
+        pending.setResult(None)
+        return pending
+
+    def subscribe(
+        self,
+        msg_types: MessageTypes,
+        condition: Optional[Callable[[mavutil.mavlink.MAVLink_message], bool]] = None,
+        **fields: object,
+    ) -> MessageSubscription:
+        return EmptySubscription(msg_types, condition, **fields)
+
+
+class RecvMsgReturnsFalse(NoAcknowledgementMessage):
+    pass
 
 
 class SetAircraftType:
@@ -177,3 +177,48 @@ def test_arm_no_gps(gps_failure) -> None:
         "success": True,
         "message": "Armed successfully",
     }
+
+
+@falcon_test(pass_drone_status=True)
+def test_arm_startsFlightLog(socketio_client: SocketIOTestClient, droneStatus) -> None:
+    drone = droneStatus.drone
+    assert drone.armController.arm() == {
+        "success": True,
+        "message": "Armed successfully",
+    }
+    assert drone.armed
+
+    # The log thread creates the log file once the first armed message is written
+    timeout = time.monotonic() + 5
+    while not drone.ftlogWriter.log_file_names and time.monotonic() < timeout:
+        time.sleep(0.1)
+    assert drone.ftlogWriter.log_file_names
+    assert drone.ftlogWriter.log_file_names[-1].exists()
+
+    assert drone.armController.disarm() == {
+        "success": True,
+        "message": "Disarmed successfully",
+    }
+    assert not drone.armed
+
+
+@falcon_test(pass_drone_status=True)
+def test_arm_timesOutWaitingForState(
+    socketio_client: SocketIOTestClient, droneStatus
+) -> None:
+    drone = droneStatus.drone
+    # The command is accepted but the vehicle state never shows the drone armed
+    armed_property = type(drone).armed
+    type(drone).armed = property(lambda self: False)
+    try:
+        assert drone.armController.arm() == {
+            "success": False,
+            "message": "Could not arm, timed out",
+        }
+    finally:
+        type(drone).armed = armed_property
+
+    assert drone.armController.disarm() == {
+        "success": True,
+        "message": "Disarmed successfully",
+    }
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+from app.asyncLink import (
+    AsyncLinkLoop,
+    AsyncMavlinkLink,
+    LinkClosedError,
+    parseConnectionString,
+)
+from app.mockAutopilot import MockAutopilot
+from pymavlink import mavutil
+
+
+def test_parseConnectionString() -> None:
+    assert parseConnectionString("tcp:127.0.0.1:5760") == ("tcp", "127.0.0.1", 5760)
+    assert parseConnectionString("udp:0.0.0.0:14550") == ("udpin", "0.0.0.0", 14550)
+    assert parseConnectionString("/dev/ttyUSB0") == ("serial", "/dev/ttyUSB0", 0)
+    with pytest.raises(ValueError):
+        parseConnectionString("tcp:5760")
+
+
+def test_requestsAndSubscriptions() -> None:
+    mock_autopilot = MockAutopilot(param_count=10, latency=0.05)
+    connection_string = mock_autopilot.start()
+
+    async def run() -> None:
+        link = AsyncMavlinkLink(connection_string)
+        await link.open(timeout=2)
+        assert (link.target_system, link.target_component) == (1, 1)
+
+        heartbeats = link.subscribe("HEARTBEAT")
+        msg = await link.request(
+            link.mav.param_request_read_encode(1, 1, b"FLTMODE1", -1),
+            "PARAM_VALUE",
+            param_id="FLTMODE1",
+        )
+        assert msg is not None and msg.param_id == "FLTMODE1"
+
+        # Both requests wait on the loop at once rather than one after the other
+        acks = await asyncio.gather(
+            link.command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1),
+            link.command(mavutil.mavlink.MAV_CMD_DO_SET_MODE, 1, 4),
+        )
+        assert [ack is not None and ack.command for ack in acks] == [
+            mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
+            mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+        ]
+        heartbeat = await heartbeats.get(timeout=2)
+        assert heartbeat is not None and heartbeat.get_type() == "HEARTBEAT"
+
+        await link.close()
+        with pytest.raises(LinkClosedError):
+            await heartbeats.get()
+
+    try:
+        asyncio.run(run())
+    finally:
+        mock_autopilot.stop()
+
+
+def test_linkLoop() -> None:
+    mock_autopilots = [MockAutopilot(system_id=i + 1) for i in range(4)]
+    connection_strings = [mock_autopilot.start() for mock_autopilot in mock_autopilots]
+    threads_before = threading.active_count()
+
+    link_loop = AsyncLinkLoop()
+    try:
+        links = [
+            link_loop.connect(connection_string, timeout=2)
+            for connection_string in connection_strings
+        ]
+        assert [link.target_system for link in links] == [1, 2, 3, 4]
+        # Every link is served by the loop's one thread
+        assert threading.active_count() == threads_before + 1
+
+        ack = link_loop.run(
+            links[2].command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        )
+        assert ack is not None and ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+        assert mock_autopilots[2].armed
+    finally:
+        link_loop.close()
+        for mock_autopilot in mock_autopilots:
+            mock_autopilot.stop()
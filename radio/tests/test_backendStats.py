@@ -0,0 +1,48 @@
+import time
+from logging import getLogger
+
+from app.backendStats import BackendStats
+from app.messageBus import MessageBus
+from pymavlink import mavutil
+
+
+def packed(msg: mavutil.mavlink.MAVLink_message) -> mavutil.mavlink.MAVLink_message:
+    msg.pack(mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1))
+    return msg
+
+
+def test_recordMessage_countsTypesAndBytes() -> None:
+    stats = BackendStats()
+    attitude = packed(mavutil.mavlink.MAVLink_attitude_message(0, 0, 0, 0, 0, 0, 0))
+    vfr_hud = packed(mavutil.mavlink.MAVLink_vfr_hud_message(0, 0, 0, 0, 0, 0))
+
+    for _ in range(3):
+        stats.recordMessage(attitude)
+    stats.recordMessage(vfr_hud)
+
+    snapshot = stats.getStats()
+    assert snapshot["messages"]["ATTITUDE"]["count"] == 3
+    assert snapshot["messages"]["ATTITUDE"]["bytes"] == 3 * len(attitude.get_msgbuf())
+    assert snapshot["link"]["bytes_received"] == 3 * len(attitude.get_msgbuf()) + len(
+        vfr_hud.get_msgbuf()
+    )
+
+
+def test_messageBus_timesListeners() -> None:
+    bus = MessageBus(getLogger("test"))
+    bus.stats = BackendStats()
+
+    def slowListener(msg: mavutil.mavlink.MAVLink_message) -> None:
+        time.sleep(0.002)
+
+    bus.subscribe("ATTITUDE", slowListener)
+    bus.publish(mavutil.mavlink.MAVLink_attitude_message(0, 0, 0, 0, 0, 0, 0))
+    bus.publish(mavutil.mavlink.MAVLink_attitude_message(0, 0, 0, 0, 0, 0, 0))
+
+    (listener,) = bus.stats.getStats()["listeners"]
+    assert listener["message"] == "ATTITUDE"
+    assert listener["listener"].endswith("slowListener")
+    assert listener["count"] == 2
+    assert listener["mean_ms"] >= 2
+    assert sum(listener["histogram"].values()) == 2
+    assert listener["histogram"]["<=1.0ms"] == 0
@@ -0,0 +1,64 @@
+from pathlib import Path
+from threading import Thread
+
+import pytest
+from app.boundedQueue import BLOCK, DROP_OLDEST, SPILL, BoundedQueue
+
+
+def test_dropOldest_keepsNewestItems() -> None:
+    queue: BoundedQueue[int] = BoundedQueue(max_size=3, policy=DROP_OLDEST)
+    for item in range(5):
+        queue.put(item)
+
+    assert [queue.get(timeout=0) for _ in range(3)] == [2, 3, 4]
+    assert queue.getStats()["dropped"] == 2
+
+
+def test_block_waitsForSpace() -> None:
+    queue: BoundedQueue[int] = BoundedQueue(max_size=1, policy=BLOCK)
+    queue.put(0)
+
+    producer = Thread(target=queue.put, args=(1,), daemon=True)
+    producer.start()
+    producer.join(timeout=0.05)
+    assert producer.is_alive()
+
+    assert queue.get(timeout=0) == 0
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert queue.get(timeout=0) == 1
+
+
+def test_block_closeReleasesWaitingPut() -> None:
+    queue: BoundedQueue[int] = BoundedQueue(max_size=1, policy=BLOCK)
+    queue.put(0)
+
+    producer = Thread(target=queue.put, args=(1,), daemon=True)
+    producer.start()
+    queue.close()
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+
+
+def test_spill_keepsOrder(tmp_path: Path) -> None:
+    queue: BoundedQueue[str] = BoundedQueue(
+        max_size=2, policy=SPILL, spill_directory=tmp_path
+    )
+    for item in range(5):
+        queue.put(f"line {item}")
+
+    assert queue.getStats()["spilled"] == 3
+    assert queue.get(timeout=0) == "line 0"
+
+    # Items put while older items are still on disk must come out after them
+    queue.put("line 5")
+    assert [queue.get(timeout=0) for _ in range(5)] == [
+        f"line {item}" for item in range(1, 6)
+    ]
+    assert queue.empty()
+    queue.close()
+
+
+def test_invalidPolicy() -> None:
+    with pytest.raises(ValueError):
+        BoundedQueue(max_size=1, policy="explode")
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+
+from app.columnarLog import convertLog, loadColumns
+from app.ftlogWriter import FtlogWriter, mergeLogFiles
+
+DATAFLASH_LOG = """FMT, 128, 89, FMT, BBnNZ, Type,Length,Name,Format,Columns
+FMT, 129, 23, ATT, QffB, TimeUS,Roll,Pitch,I
+FMT, 130, 75, MSG, QZ, TimeUS,Message
+ATT, 1000, 0.5, -1.25, 0
+ATT, 2000, 0.75, -1.5, 1
+MSG, 1500, ArduCopter V4.5.0, Frame: QUAD
+"""
+
+
+def test_convertLog_ftlog(tmp_path: Path) -> None:
+    writer = FtlogWriter(tmp_path, compress=True)
+    for i in range(3):
+        writer.write(f"{1000 + i},ATTITUDE,roll:{i / 4},time_boot_ms:{i}")
+        writer.write(f"{1000 + i},BATTERY_STATUS,voltages:[1, 2, {i}],id:0")
+    writer.close()
+    log_file = tmp_path.joinpath("flight.ftlog.gz")
+    mergeLogFiles(writer.log_file_names, log_file)
+
+    columnar_file = convertLog(log_file)
+    columns = loadColumns(columnar_file)
+
+    assert isinstance(columns["ATTITUDE"]["roll"], np.memmap)
+    assert columns["ATTITUDE"]["_timestamp"].tolist() == [1000, 1001, 1002]
+    assert columns["ATTITUDE"]["roll"].tolist() == [0, 0.25, 0.5]
+    assert columns["ATTITUDE"]["time_boot_ms"].dtype == np.int64
+    assert columns["BATTERY_STATUS"]["voltages"].tolist() == [
+        [1, 2, 0],
+        [1, 2, 1],
+        [1, 2, 2],
+    ]
+
+    # The converted log is reused while the log file doesn't change
+    columnar_file.touch()
+    modified_time = columnar_file.stat().st_mtime_ns
+    assert convertLog(log_file) == columnar_file
+    assert columnar_file.stat().st_mtime_ns == modified_time
+
+
+def test_convertLog_dataflash(tmp_path: Path) -> None:
+    log_file = tmp_path.joinpath("flight.log")
+    log_file.write_text(DATAFLASH_LOG)
+
+    columns = loadColumns(convertLog(log_file, tmp_path.joinpath("cache")))
+
+    assert columns["ATT"]["TimeUS"].dtype == np.int64
+    assert columns["ATT"]["Pitch"].tolist() == [-1.25, -1.5]
+    assert columns["MSG"]["Message"].tolist() == ["ArduCopter V4.5.0, Frame: QUAD"]
+    assert "FMT" not in columns
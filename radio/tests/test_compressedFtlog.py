@@ -0,0 +1,89 @@
+import gzip
+from pathlib import Path
+
+from app.compressedFtlog import (
+    compressFrame,
+    getFrameIndexFile,
+    readFrameIndex,
+    readFrames,
+    truncateToLastFrame,
+)
+from app.ftlogWriter import FtlogWriter, mergeLogFiles, readFirstLine, readLastLine
+
+
+def writeLog(directory: Path, lines: int) -> FtlogWriter:
+    writer = FtlogWriter(directory, line_limit=250, compress=True, frame_lines=100)
+    for i in range(lines):
+        writer.write(f"{1000 + i},ATTITUDE,roll:{i}")
+    writer.close()
+    return writer
+
+
+def test_writer_writesGzipFramesWithIndex(tmp_path: Path) -> None:
+    writer = writeLog(tmp_path, 200)
+    log_file = writer.log_file_names[0]
+
+    assert log_file.name.endswith(".ftlog.gz")
+    lines = gzip.open(log_file, "rt").read().splitlines()
+    assert lines[0].startswith("==START_TIME==")
+    assert lines[1:] == [f"{1000 + i},ATTITUDE,roll:{i}" for i in range(200)]
+
+    index = readFrameIndex(log_file)
+    assert [entry["lines"] for entry in index] == [1, 100, 100]
+    assert index[1]["first_timestamp"] == 1000
+    assert index[2]["last_timestamp"] == 1199
+
+
+def test_readFrames_timeRange(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 200).log_file_names[0]
+
+    assert list(readFrames(log_file, 1150, 1152)) == [
+        f"{1000 + i},ATTITUDE,roll:{i}\n" for i in range(150, 153)
+    ]
+
+
+def test_mergeLogFiles_keepsFramesSeekable(tmp_path: Path) -> None:
+    writer = writeLog(tmp_path, 600)
+    log_files = writer.log_file_names
+    assert len(log_files) == 3
+    assert readFirstLine(log_files[0]).startswith("==START_TIME==")
+    assert readLastLine(log_files[0]).startswith("==NEXT_FILE==")
+
+    # A frame cut off by the GCS exiting is dropped when merging
+    with open(log_files[-1], "ab") as log_file_handle:
+        log_file_handle.write(gzip.compress(b"lost line\n")[:10])
+
+    merged_log_file = tmp_path.joinpath("merged.ftlog.gz")
+    mergeLogFiles(log_files, merged_log_file)
+
+    lines = gzip.open(merged_log_file, "rt").read().splitlines()
+    assert [line for line in lines if not line.startswith("==")] == [
+        f"{1000 + i},ATTITUDE,roll:{i}" for i in range(600)
+    ]
+    assert list(readFrames(merged_log_file, 1590, 1590)) == ["1590,ATTITUDE,roll:590\n"]
+    assert not any(getFrameIndexFile(log_file).exists() for log_file in log_files)
+
+
+def test_truncateToLastFrame_missingIndex(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 200).log_file_names[0]
+    size = log_file.stat().st_size
+    getFrameIndexFile(log_file).unlink()
+    with open(log_file, "ab") as log_file_handle:
+        log_file_handle.write(gzip.compress(b"lost line\n")[:10])
+
+    # The frames are found by scanning the log file rather than truncating it all
+    truncateToLastFrame(log_file)
+    assert log_file.stat().st_size == size
+    assert [entry["lines"] for entry in readFrameIndex(log_file)] == [1, 100, 100]
+    assert list(readFrames(log_file, 1199, 1199)) == ["1199,ATTITUDE,roll:199\n"]
+
+
+def test_truncateToLastFrame_keepsUnindexedFrames(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 200).log_file_names[0]
+    # The GCS exited after writing a frame but before adding it to the index
+    with open(log_file, "ab") as log_file_handle:
+        log_file_handle.write(compressFrame(["1200,ATTITUDE,roll:200\n"]))
+
+    truncateToLastFrame(log_file)
+    assert [entry["lines"] for entry in readFrameIndex(log_file)] == [1, 100, 100, 1]
+    assert list(readFrames(log_file, 1200, 1200)) == ["1200,ATTITUDE,roll:200\n"]
@@ -57,4 +57,3 @@ def test_disconnect(socketio_client: SocketIOTestClient, droneStatus):
     assert len(socketio_result) == 0  # No message sent back
 
     assert droneStatus.drone is None  # Drone has been reset
-    assert droneStatus.state is None  # State has been reset
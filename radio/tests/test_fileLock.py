@@ -0,0 +1,16 @@
+from pathlib import Path
+
+from app.fileLock import FileLock
+
+
+def test_acquire_isExclusive(tmp_path: Path) -> None:
+    lock_file = tmp_path.joinpath(".recovery.lock")
+    first_lock = FileLock(lock_file)
+    second_lock = FileLock(lock_file)
+
+    assert first_lock.acquire()
+    assert not second_lock.acquire()
+
+    first_lock.release()
+    assert second_lock.acquire()
+    second_lock.release()
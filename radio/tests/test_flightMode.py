@@ -29,7 +29,7 @@ def run_once_after_all_tests():
 def test_getFlightModeConfig_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("get_flight_mode_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -43,7 +43,7 @@ def test_getFlightModeConfig_wrongState(
 def test_getFlightModeConfig_correctState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("get_flight_mode_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -58,7 +58,7 @@ def test_getFlightModeConfig_correctState(
 def test_setFlightModeConfig_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("set_flight_mode", {"mode_number": 1, "flight_mode": 7})
     socketio_result = socketio_client.get_received()[0]
 
@@ -72,7 +72,7 @@ def test_setFlightModeConfig_wrongState(
 def test_setFlightMode_missingFlightMode(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_flight_mode", {"mode_number": 1})
     socketio_result = socketio_client.get_received()[0]
 
@@ -86,7 +86,7 @@ def test_setFlightMode_missingFlightMode(
 def test_setFlightMode_missingModeNumber(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_flight_mode", {"flight_mode": 1})
     socketio_result = socketio_client.get_received()[0]
 
@@ -98,7 +98,7 @@ def test_setFlightMode_missingModeNumber(
 
 @falcon_test(pass_drone_status=True)
 def test_setFlightMode_missingData(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_flight_mode", {})
     socketio_result = socketio_client.get_received()[0]
 
@@ -112,7 +112,7 @@ def test_setFlightMode_missingData(socketio_client: SocketIOTestClient, droneSta
 def test_setFlightMode_wrongModeNumber(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_flight_mode", {"mode_number": 0, "flight_mode": 9})
     socketio_result = socketio_client.get_received()[0]
 
@@ -127,7 +127,7 @@ def test_setFlightMode_wrongModeNumber(
 def test_setFlightMode_successfullySet(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_flight_mode", {"mode_number": 1, "flight_mode": 7})
     socketio_result = socketio_client.get_received()[0]
 
@@ -143,7 +143,7 @@ def test_setFlightMode_successfullySet(
 def test_refreshFlightModeData_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("refresh_flight_mode_data")
     socketio_result = socketio_client.get_received()[0]
 
@@ -157,7 +157,7 @@ def test_refreshFlightModeData_wrongState(
 def test_refreshFlightModeData_success(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("refresh_flight_mode_data")
     socketio_result = socketio_client.get_received()[0]
 
@@ -168,7 +168,7 @@ def test_refreshFlightModeData_success(
 def test_setCurrentFlightMode_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.flight_modes"
+    droneStatus.drone.state = "config.flight_modes"
     socketio_client.emit("set_current_flight_mode", {})
     socketio_result = socketio_client.get_received()[0]
 
@@ -182,7 +182,7 @@ def test_setCurrentFlightMode_wrongState(
 def test_setCurrentFlightMode_missingData(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
     socketio_client.emit("set_current_flight_mode", {})
     socketio_result = socketio_client.get_received()[0]
 
@@ -194,7 +194,7 @@ def test_setCurrentFlightMode_missingData(
 def test_setCurrentFlightMode_successfullySet(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
     socketio_client.emit("set_current_flight_mode", {"newFlightMode": 7})
     socketio_result = socketio_client.get_received()[0]
 
@@ -209,7 +209,6 @@ def test_setCurrentFlightMode_successfullySet(
 def test_flightModeEndpoints_noDrone(socketio_client: SocketIOTestClient, droneStatus):
     with NoDrone():
         # Test get flight mode config
-        droneStatus.state = "config.flight_modes"
         socketio_client.emit("get_flight_mode_config")
         result = socketio_client.get_received()[0]
         assert result["name"] == "connection_error"
@@ -237,7 +236,6 @@ def test_flightModeEndpoints_noDrone(socketio_client: SocketIOTestClient, droneS
         )
 
         # Test refresh flight mode
-        droneStatus.state = "dashboard"
         socketio_client.emit("set_current_flight_mode", {"newFlightMode": 1})
         result = socketio_client.get_received()[0]
         assert result["name"] == "connection_error"
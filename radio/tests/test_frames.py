@@ -6,7 +6,7 @@ from .helpers import NoDrone
 
 @falcon_test(pass_drone_status=True)
 def test_getFrameDetails_wrongState(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("get_frame_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -18,7 +18,7 @@ def test_getFrameDetails_wrongState(socketio_client: SocketIOTestClient, droneSt
 
 @falcon_test(pass_drone_status=True)
 def test_getFrameDetails_correctState(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "config.motor_test"
+    droneStatus.drone.state = "config.motor_test"
     socketio_client.emit("get_frame_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -33,7 +33,7 @@ def test_getFrameDetails_correctState(socketio_client: SocketIOTestClient, drone
 def test_getFrameDetails_noDroneConnection(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.motor_test"
+    droneStatus.drone.state = "config.motor_test"
 
     with NoDrone():
         socketio_client.emit("get_frame_config")
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from app.ftlogIndex import getMessageIndexFile, queryFtlog, readMessageIndex
+from app.ftlogWriter import FtlogWriter, mergeLogFiles
+
+MESSAGE_TYPES = ["ATTITUDE", "BATTERY_STATUS", "GPS_RAW_INT"]
+
+
+def writeLog(directory: Path, lines: int, line_limit: int = 250) -> FtlogWriter:
+    writer = FtlogWriter(directory, line_limit=line_limit, flush_size=1)
+    for i in range(lines):
+        writer.write(f"{1000 + i},{MESSAGE_TYPES[i % 3]},value:{i}")
+    writer.close()
+    return writer
+
+
+def expectedLines(start: int, end: int, message_type: str) -> list:
+    return [
+        f"{1000 + i},{message_type},value:{i}\n"
+        for i in range(start, end + 1)
+        if MESSAGE_TYPES[i % 3] == message_type
+    ]
+
+
+def test_writer_writesMessageIndex(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 100).log_file_names[0]
+
+    assert getMessageIndexFile(log_file).is_file()
+    index = readMessageIndex(log_file)
+    # The ==START_TIME== line has no timestamp so isn't indexed
+    assert index[0]["message_counts"] is None
+    assert [entry["first_timestamp"] for entry in index[1:]] == list(
+        range(1000, 1100, 10)
+    )
+    assert index[1]["message_counts"] == {
+        "ATTITUDE": 4,
+        "BATTERY_STATUS": 3,
+        "GPS_RAW_INT": 3,
+    }
+    assert index[-1]["offset"] + index[-1]["length"] == log_file.stat().st_size
+
+
+def test_queryFtlog_timeRangeAndType(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 100).log_file_names[0]
+
+    assert list(queryFtlog(log_file, 1012, 1045, ["BATTERY_STATUS"])) == (
+        expectedLines(12, 45, "BATTERY_STATUS")
+    )
+    assert list(queryFtlog(log_file, message_types=["GPS_RAW_INT"])) == (
+        expectedLines(0, 99, "GPS_RAW_INT")
+    )
+
+
+def test_queryFtlog_unindexedTail(tmp_path: Path) -> None:
+    log_file = writeLog(tmp_path, 100).log_file_names[0]
+    # Lines written after the index, as if the GCS exited before closing the log
+    with open(log_file, "a") as log_file_handle:
+        log_file_handle.write("2000,BATTERY_STATUS,value:-1\n")
+
+    assert list(queryFtlog(log_file, 1095, None, ["BATTERY_STATUS"])) == (
+        expectedLines(95, 99, "BATTERY_STATUS") + ["2000,BATTERY_STATUS,value:-1\n"]
+    )
+
+
+def test_mergeLogFiles_mergesMessageIndexes(tmp_path: Path) -> None:
+    writer = writeLog(tmp_path, 600)
+    log_files = writer.log_file_names
+    assert len(log_files) == 3
+    getMessageIndexFile(log_files[1]).unlink()
+
+    merged_log_file = tmp_path.joinpath("merged.ftlog")
+    mergeLogFiles(log_files, merged_log_file)
+
+    assert not any(getMessageIndexFile(log_file).exists() for log_file in log_files)
+    assert all(
+        entry["message_counts"] is not None
+        for entry in readMessageIndex(merged_log_file)
+        if entry["length"] > 100
+    )
+    assert list(queryFtlog(merged_log_file, 1240, 1510, ["ATTITUDE"])) == (
+        expectedLines(240, 510, "ATTITUDE")
+    )
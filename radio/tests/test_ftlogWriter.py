@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from app.ftlogWriter import FtlogWriter, mergeLogFiles, readFirstLine, readLastLine
+
+
+def test_write_buffersUntilFlush(tmp_path: Path) -> None:
+    writer = FtlogWriter(tmp_path, flush_size=1024, flush_interval=60)
+    writer.write("1,ATTITUDE,roll:0.1")
+
+    assert writer.current_log_file is not None
+    assert writer.current_log_file.name.startswith("tmp_first_")
+    assert writer.current_log_file.read_text().startswith("==START_TIME==")
+    assert "ATTITUDE" not in writer.current_log_file.read_text()
+
+    writer.flush()
+    assert writer.current_log_file.read_text().endswith("1,ATTITUDE,roll:0.1\n")
+    writer.close()
+
+
+def test_write_flushesWhenBufferFull(tmp_path: Path) -> None:
+    writer = FtlogWriter(tmp_path, flush_size=10, flush_interval=60)
+    writer.write("1,ATTITUDE,roll:0.1")
+
+    assert writer.current_log_file is not None
+    assert writer.current_log_file.read_text().endswith("1,ATTITUDE,roll:0.1\n")
+    writer.close()
+
+
+def test_write_rotatesAtLineLimit(tmp_path: Path) -> None:
+    writer = FtlogWriter(tmp_path, line_limit=2)
+    for i in range(5):
+        writer.write(f"{i},ATTITUDE,roll:0.1")
+    writer.close()
+
+    assert len(writer.log_file_names) == 3
+    first_lines = writer.log_file_names[0].read_text().splitlines()
+    assert first_lines[0].startswith("==START_TIME==")
+    assert first_lines[1:3] == ["0,ATTITUDE,roll:0.1", "1,ATTITUDE,roll:0.1"]
+    assert first_lines[3] == f"==NEXT_FILE=={writer.log_file_names[1]}==END=="
+
+    last_lines = writer.log_file_names[2].read_text().splitlines()
+    assert last_lines[1:] == ["4,ATTITUDE,roll:0.1"]
+
+
+def test_readFirstAndLastLine(tmp_path: Path) -> None:
+    log_file = tmp_path.joinpath("tmp_first_0.ftlog")
+    long_line = "x" * 10000
+    log_file.write_text(f"==START_TIME==now==END==\n{long_line}\n{long_line}\n")
+
+    assert readFirstLine(log_file) == "==START_TIME==now==END==\n"
+    assert readLastLine(log_file) == long_line + "\n"
+
+    log_file.write_text("")
+    assert readLastLine(log_file) == ""
+
+
+def test_mergeLogFiles(tmp_path: Path) -> None:
+    log_files = [tmp_path.joinpath(f"tmp_{i}.ftlog") for i in range(3)]
+    for i, log_file in enumerate(log_files):
+        log_file.write_text(f"line {i}\n" * 1000)
+    merged_log_file = tmp_path.joinpath("merged.ftlog")
+
+    mergeLogFiles(log_files, merged_log_file)
+
+    assert merged_log_file.read_text() == "".join(
+        f"line {i}\n" * 1000 for i in range(3)
+    )
+    assert not any(log_file.exists() for log_file in log_files)
+
+
+def test_mergeLogFiles_renamesSingleFile(tmp_path: Path) -> None:
+    log_file = tmp_path.joinpath("tmp_first_0.ftlog")
+    log_file.write_text("line\n")
+    merged_log_file = tmp_path.joinpath("merged.ftlog")
+
+    mergeLogFiles([log_file], merged_log_file)
+
+    assert merged_log_file.read_text() == "line\n"
+    assert not log_file.exists()
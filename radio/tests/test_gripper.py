@@ -31,13 +31,13 @@ def run_once_after_all_tests():
 @falcon_test(pass_drone_status=True)
 def test_gripperEnabled(socketio_client: SocketIOTestClient, droneStatus):
     # Failure on wrong drone state
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     assert send_and_recieve("gripper_enabled") == {
         "message": "You must be on the config screen to access the gripper."
     }
 
     # Failure with no drone connected
-    droneStatus.state = "config"
+    droneStatus.drone.state = "config"
     with NoDrone():
         assert send_and_recieve("gripper_enabled") == {
             "message": "You must be connected to the drone to access the gripper."
@@ -56,13 +56,13 @@ def test_gripperEnabled(socketio_client: SocketIOTestClient, droneStatus):
 @falcon_test(pass_drone_status=True)
 def test_setGripper(socketio_client: SocketIOTestClient, droneStatus):
     # Failure on wrong drone state
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     assert send_and_recieve("set_gripper", "release") == {
         "message": "You must be on the config screen to access the gripper."
     }
 
     # Failure with no drone connected
-    droneStatus.state = "config"
+    droneStatus.drone.state = "config"
     with NoDrone():
         assert send_and_recieve("set_gripper", "release") == {
             "message": "You must be connected to the drone to access the gripper."
@@ -0,0 +1,85 @@
+from logging import getLogger
+from typing import List
+
+from app.linkDemux import LinkDemux
+from app.messageBus import WILDCARD
+from app.vehicleState import VehicleState
+from pymavlink import mavutil
+
+
+def packed(
+    msg: mavutil.mavlink.MAVLink_message, system_id: int, component_id: int = 1
+) -> mavutil.mavlink.MAVLink_message:
+    msg.pack(
+        mavutil.mavlink.MAVLink(None, srcSystem=system_id, srcComponent=component_id)
+    )
+    return msg
+
+
+def heartbeat(system_id: int, component_id: int = 1) -> mavutil.mavlink.MAVLink_message:
+    return packed(
+        mavutil.mavlink.MAVLink_heartbeat_message(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR,
+            mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+            0,
+            0,
+            0,
+            3,
+        ),
+        system_id,
+        component_id,
+    )
+
+
+def position(system_id: int, lat: int) -> mavutil.mavlink.MAVLink_message:
+    return packed(
+        mavutil.mavlink.MAVLink_global_position_int_message(
+            0, lat, 0, 0, 0, 0, 0, 0, 0
+        ),
+        system_id,
+    )
+
+
+def test_route_keepsStatePerComponent() -> None:
+    primary_state = VehicleState(1, 1)
+    demux = LinkDemux(getLogger("test"), primary_state)
+    new_components: List[mavutil.mavlink.MAVLink_message] = []
+    demux.onNewComponent(new_components.append)
+
+    for msg in (heartbeat(1), heartbeat(2), position(2, 123), heartbeat(1, 154)):
+        demux.route(msg)
+
+    assert [(c.system_id, c.component_id) for c in new_components] == [
+        (1, 1),
+        (2, 1),
+        (1, 154),
+    ]
+    assert [(c["system_id"], c["component_id"]) for c in demux.getComponents()] == [
+        (1, 1),
+        (1, 154),
+        (2, 1),
+    ]
+    assert demux.getSystemIds() == [1, 2]
+
+    other = demux.getComponent(2, 1)
+    assert other is not None
+    assert other.state.position is not None
+    assert other.state.position["lat"] == 123
+    # The components of the drone's own system share the state the drone keeps
+    component = demux.getComponent(1, 154)
+    assert component is not None and component.state is primary_state
+    assert primary_state.position is None
+
+
+def test_publish_deliversOnlyTheSubscribedSystem() -> None:
+    demux = LinkDemux(getLogger("test"), VehicleState(1, 1))
+    received: List[mavutil.mavlink.MAVLink_message] = []
+    demux.subscribe(2, "GLOBAL_POSITION_INT", received.append)
+    demux.subscribe(2, WILDCARD, received.append, component_id=154)
+
+    for msg in (position(1, 1), position(2, 2), heartbeat(2, 154), heartbeat(2)):
+        if demux.hasSubscribers(msg):
+            demux.publish(msg)
+
+    assert [msg.get_type() for msg in received] == ["GLOBAL_POSITION_INT", "HEARTBEAT"]
+    assert received[1].get_srcComponent() == 154
@@ -0,0 +1,82 @@
+import random
+import socket
+import time
+from typing import Iterator, Tuple
+
+import pytest
+from app.linkImpairment import (
+    NO_IMPAIRMENT,
+    ImpairedLink,
+    ImpairmentProxy,
+    splitMavlinkPackets,
+)
+from app.mockAutopilot import MockAutopilot
+from pymavlink import mavutil
+
+
+def heartbeat() -> bytes:
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    return mavutil.mavlink.MAVLink_heartbeat_message(2, 3, 0, 0, 0, 3).pack(mav)
+
+
+@pytest.fixture
+def sockets() -> Iterator[Tuple[socket.socket, socket.socket]]:
+    source, destination = socket.socketpair()
+    yield source, destination
+    source.close()
+    destination.close()
+
+
+def test_splitMavlinkPackets() -> None:
+    packet = heartbeat()
+    buffer = bytearray(b"xx" + packet + packet[:5])
+
+    assert splitMavlinkPackets(buffer) == [b"xx", packet]
+    assert buffer == packet[:5]
+
+
+def test_impairedLink_lossAndBandwidth(
+    sockets: Tuple[socket.socket, socket.socket],
+) -> None:
+    link = ImpairedLink(*sockets, {**NO_IMPAIRMENT, "loss": 1.0}, random.Random(0))
+    assert link.impair(heartbeat()) is None
+    assert link.getStats()["dropped"] == 1
+
+    packet = heartbeat()
+    link = ImpairedLink(
+        *sockets, {**NO_IMPAIRMENT, "baud": 1000, "latency": 0.5}, random.Random(0)
+    )
+    start = time.monotonic()
+    first = link.impair(packet)
+    second = link.impair(packet)
+    assert first is not None and second is not None
+    first_delivery_time, second_delivery_time = first[0], second[0]
+
+    assert first_delivery_time >= start + 0.5 + len(packet) / 100
+    assert second_delivery_time - first_delivery_time == pytest.approx(
+        len(packet) / 100
+    )
+
+
+def test_proxy_delaysMessages() -> None:
+    mock_autopilot = MockAutopilot()
+    proxy = ImpairmentProxy(
+        mock_autopilot.start(), {**NO_IMPAIRMENT, "latency": 0.2}, seed=0
+    )
+    connection = mavutil.mavlink_connection(proxy.start())
+    try:
+        assert connection.wait_heartbeat(timeout=2) is not None
+
+        start = time.monotonic()
+        connection.param_fetch_all()
+        msg = connection.recv_match(type="PARAM_VALUE", blocking=True, timeout=2)
+        assert msg is not None
+        assert time.monotonic() - start >= 0.4
+
+        stats = proxy.getStats()
+        assert stats["uplink"]["packets"] > 0
+        assert stats["downlink"]["dropped"] == 0
+    finally:
+        connection.close()
+        proxy.stop()
+        mock_autopilot.stop()
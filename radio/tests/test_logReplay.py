@@ -0,0 +1,105 @@
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+from app.drone import Drone
+from app.logReplay import ReplayConnection, openReplayConnection
+from app.tlogCapture import formatTlogRecord
+from pymavlink import mavutil
+from serial import SerialException
+
+
+def packed(msg: mavutil.mavlink.MAVLink_message, timestamp: float) -> bytes:
+    msg.pack(mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1))
+    msg._timestamp = timestamp
+    return formatTlogRecord(msg)
+
+
+def writeTlog(tlog_file: Path, interval: float) -> None:
+    with open(tlog_file, "wb") as f:
+        f.write(
+            packed(
+                mavutil.mavlink.MAVLink_heartbeat_message(
+                    mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                    mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                    0,
+                    0,
+                    0,
+                    3,
+                ),
+                1718000000,
+            )
+        )
+        for i in range(4):
+            f.write(
+                packed(
+                    mavutil.mavlink.MAVLink_attitude_message(i, i, 0, 0, 0, 0, 0),
+                    1718000000 + (i + 1) * interval,
+                )
+            )
+
+
+def test_replay_maxSpeed(tmp_path: Path) -> None:
+    tlog_file = tmp_path.joinpath("flight.tlog")
+    writeTlog(tlog_file, 60)
+    connection = openReplayConnection(f"replay:{tlog_file}?speed=max")
+
+    assert connection.wait_heartbeat(timeout=1) is not None
+    assert (connection.target_system, connection.target_component) == (1, 1)
+
+    messages: List[mavutil.mavlink.MAVLink_message] = []
+    for _ in range(4):
+        msg = connection.recv_msg()
+        assert msg is not None
+        messages.append(msg)
+    assert [msg.time_boot_ms for msg in messages] == [0, 1, 2, 3]
+    assert messages[-1]._timestamp == 1718000240
+    with pytest.raises(SerialException):
+        connection.recv_msg()
+
+    # Messages sent to the drone are dropped
+    connection.param_fetch_all()
+    assert connection.bytes_sent > 0
+    connection.close()
+
+
+def test_replay_keepsTiming(tmp_path: Path) -> None:
+    tlog_file = tmp_path.joinpath("flight.tlog")
+    writeTlog(tlog_file, 0.5)
+    connection = ReplayConnection(tlog_file, speed=10)
+
+    start_time = time.monotonic()
+    messages: List[mavutil.mavlink.MAVLink_message] = []
+    while len(messages) < 5:
+        msg = connection.recv_msg()
+        if msg is not None:
+            messages.append(msg)
+
+    assert time.monotonic() - start_time >= 0.2
+    connection.close()
+
+
+def test_replay_droneConnects(tmp_path: Path) -> None:
+    tlog_file = tmp_path.joinpath("flight.tlog")
+    writeTlog(tlog_file, 0.01)
+    with open(tlog_file, "ab") as f:
+        f.write(
+            packed(
+                mavutil.mavlink.MAVLink_param_value_message(
+                    b"FLTMODE1", 6, mavutil.mavlink.MAV_PARAM_TYPE_REAL32, 1, 0
+                ),
+                1718000001,
+            )
+        )
+
+    # Parameter reads are answered from the recording rather than waiting for replies
+    start_time = time.monotonic()
+    drone = Drone(f"replay:{tlog_file}?speed=max&loop=1")
+    assert time.monotonic() - start_time < 10
+    assert drone.master is not None
+
+    # The parameter is only known once it has been replayed
+    drone.flightModesController.getFlightModes()
+    assert drone.flightModesController.flight_modes[0] == 6
+    drone.close()
@@ -0,0 +1,89 @@
+import socket
+import time
+from logging import getLogger
+from typing import Callable, List
+
+import pytest
+from app.mavlinkRouter import MavlinkRouter, parseEndpoint
+from pymavlink import mavutil
+
+
+def freePort() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def heartbeatPacket(system_id: int, seq: int = 0) -> bytes:
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=system_id, srcComponent=1)
+    mav.seq = seq
+    return bytes(mavutil.mavlink.MAVLink_heartbeat_message(6, 8, 0, 0, 0, 3).pack(mav))
+
+
+def waitFor(condition: Callable[[], object], timeout: float = 2) -> bool:
+    end_time = time.monotonic() + timeout
+    while time.monotonic() < end_time:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_parseEndpoint() -> None:
+    assert parseEndpoint("udpout:127.0.0.1:14550") == ("udpout", ("127.0.0.1", 14550))
+    for endpoint in ("serial:/dev/ttyUSB0:57600", "udpin:0.0.0.0", "tcpin:host:port"):
+        with pytest.raises(ValueError):
+            parseEndpoint(endpoint)
+
+
+def test_udpout_forwardsAndInjectsWithoutDuplicates() -> None:
+    consumer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    consumer.bind(("127.0.0.1", 0))
+    consumer.settimeout(2)
+    injected: List[bytes] = []
+    router = MavlinkRouter(
+        [f"udpout:127.0.0.1:{consumer.getsockname()[1]}"],
+        injected.append,
+        getLogger("test"),
+        vehicle_system=1,
+    )
+    router.start()
+    try:
+        packet = heartbeatPacket(1)
+        router.forward(packet)
+        data, router_address = consumer.recvfrom(1024)
+        assert data == packet
+
+        # The drone's own packets echoed back are not injected, and a packet sent twice
+        # is only injected once
+        consumer.sendto(packet, router_address)
+        consumer.sendto(heartbeatPacket(255), router_address)
+        consumer.sendto(heartbeatPacket(255), router_address)
+        consumer.sendto(heartbeatPacket(255, seq=1), router_address)
+        assert waitFor(lambda: len(injected) == 2)
+        time.sleep(0.1)
+        assert injected == [heartbeatPacket(255), heartbeatPacket(255, seq=1)]
+        assert router.getStats()[0]["duplicates_in"] == 1
+    finally:
+        router.stop()
+        consumer.close()
+
+
+def test_tcpin_forwardsToEveryClient() -> None:
+    port = freePort()
+    router = MavlinkRouter(
+        [f"tcpin:127.0.0.1:{port}"], lambda buf: None, getLogger("test")
+    )
+    router.start()
+    clients = [socket.create_connection(("127.0.0.1", port)) for _ in range(2)]
+    try:
+        assert waitFor(lambda: router.getStats()[0]["peers"] == 2)
+        packet = heartbeatPacket(1)
+        router.forward(packet)
+        for client in clients:
+            client.settimeout(2)
+            assert client.recv(1024) == packet
+    finally:
+        for client in clients:
+            client.close()
+        router.stop()
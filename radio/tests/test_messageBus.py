@@ -0,0 +1,73 @@
+from logging import getLogger
+from typing import Any, List
+
+from app.messageBus import WILDCARD, MessageBus
+from pymavlink import mavutil
+
+
+def attitude() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_attitude_message(0, 0, 0, 0, 0, 0, 0)
+
+
+def vfrHud() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_vfr_hud_message(0, 0, 0, 0, 0, 0)
+
+
+def test_publish_reachesEverySubscriber() -> None:
+    bus = MessageBus(getLogger("test"))
+    first: List[Any] = []
+    second: List[Any] = []
+
+    bus.subscribe("ATTITUDE", first.append)
+    bus.subscribe("ATTITUDE", second.append)
+    bus.publish(attitude())
+    bus.publish(vfrHud())
+
+    assert len(first) == 1
+    assert len(second) == 1
+
+
+def test_publish_wildcardReceivesAllMessages() -> None:
+    bus = MessageBus(getLogger("test"))
+    received: List[Any] = []
+
+    bus.subscribe(WILDCARD, received.append)
+    assert bus.hasSubscribers("VFR_HUD")
+
+    bus.publish(attitude())
+    bus.publish(vfrHud())
+
+    assert [msg.get_type() for msg in received] == ["ATTITUDE", "VFR_HUD"]
+
+
+def test_publish_failingSubscriberDoesNotStopOthers() -> None:
+    bus = MessageBus(getLogger("test"))
+    received: List[Any] = []
+
+    def failingCallback(msg: mavutil.mavlink.MAVLink_message) -> None:
+        raise ValueError("Listener failed")
+
+    bus.subscribe("ATTITUDE", failingCallback)
+    bus.subscribe("ATTITUDE", received.append)
+    bus.publish(attitude())
+
+    assert len(received) == 1
+
+
+def test_unsubscribe_removesOnlyThatSubscription() -> None:
+    bus = MessageBus(getLogger("test"))
+    first: List[Any] = []
+    second: List[Any] = []
+
+    subscription = bus.subscribe("ATTITUDE", first.append)
+    bus.subscribe("ATTITUDE", second.append)
+
+    assert subscription.unsubscribe()
+    assert not subscription.unsubscribe()
+
+    bus.publish(attitude())
+    assert first == []
+    assert len(second) == 1
+
+    assert bus.unsubscribeAll("ATTITUDE")
+    assert not bus.hasSubscribers("ATTITUDE")
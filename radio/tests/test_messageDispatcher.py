@@ -0,0 +1,76 @@
+from logging import getLogger
+from threading import Timer
+
+import pytest
+from app.messageDispatcher import MessageDispatcher
+from pymavlink import mavutil
+from serial.serialutil import SerialException
+
+
+def commandAck(command: int) -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_command_ack_message(
+        command, mavutil.mavlink.MAV_RESULT_ACCEPTED
+    )
+
+
+def test_expect_matchesOnTypeAndFields() -> None:
+    dispatcher = MessageDispatcher(getLogger("test"))
+    pending = dispatcher.expect(
+        "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+    )
+
+    # Acknowledgements for other commands are ignored
+    dispatcher.dispatch(commandAck(mavutil.mavlink.MAV_CMD_NAV_LAND))
+    assert not pending.done()
+
+    Timer(
+        0.1,
+        lambda: dispatcher.dispatch(commandAck(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF)),
+    ).start()
+    response = pending.result(timeout=1)
+    assert response is not None
+    assert response.command == mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+
+
+def test_expect_timeoutCancelsRequest() -> None:
+    dispatcher = MessageDispatcher(getLogger("test"))
+    pending = dispatcher.expect("HOME_POSITION")
+
+    assert pending.result(timeout=0.05) is None
+    assert "HOME_POSITION" not in dispatcher._pending
+
+
+def test_subscribe_receivesEveryMatchingMessage() -> None:
+    dispatcher = MessageDispatcher(getLogger("test"))
+    subscription = dispatcher.subscribe(
+        "COMMAND_ACK", command=mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST
+    )
+
+    for _ in range(3):
+        dispatcher.dispatch(commandAck(mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST))
+    dispatcher.dispatch(commandAck(mavutil.mavlink.MAV_CMD_NAV_LAND))
+
+    for _ in range(3):
+        assert subscription.get(timeout=0.1) is not None
+    assert subscription.get(timeout=0.05) is None
+
+    dispatcher.unsubscribe(subscription)
+    dispatcher.dispatch(commandAck(mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST))
+    assert subscription.get(timeout=0.05) is None
+
+
+def test_failAll_raisesInWaitingCallers() -> None:
+    dispatcher = MessageDispatcher(getLogger("test"))
+    pending = dispatcher.expect("COMMAND_ACK")
+    subscription = dispatcher.subscribe("PARAM_VALUE")
+
+    dispatcher.failAll(SerialException("Link lost"))
+
+    with pytest.raises(SerialException):
+        pending.result(timeout=1)
+    with pytest.raises(SerialException):
+        subscription.get(timeout=1)
+
+    # Requests made after the link is lost fail straight away
+    with pytest.raises(SerialException):
+        dispatcher.expect("COMMAND_ACK").result(timeout=1)
@@ -6,7 +6,7 @@ from .helpers import NoDrone
 
 @falcon_test(pass_drone_status=True)
 def test_getCurrentMission_wrongState(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("get_current_mission_all")
     socketio_result = socketio_client.get_received()[0]
 
@@ -20,7 +20,7 @@ def test_getCurrentMission_wrongState(socketio_client: SocketIOTestClient, drone
 def test_getCurrentMission_correctState(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
     socketio_client.emit("get_current_mission_all")
     socketio_result = socketio_client.get_received()[0]
 
@@ -183,7 +183,7 @@ def test_getCurrentMission_correctState(
 def test_getCurrentMission_noDroneConnection(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
 
     with NoDrone():
         socketio_client.emit("get_current_mission_all")
@@ -0,0 +1,80 @@
+import time
+from typing import Iterator, Set
+
+import pytest
+from app.mockAutopilot import MockAutopilot
+from pymavlink import mavutil
+
+
+@pytest.fixture
+def mock_autopilot() -> Iterator[MockAutopilot]:
+    mock_autopilot = MockAutopilot(param_count=5000, mission_size=20, latency=0.05)
+    mock_autopilot.start()
+    yield mock_autopilot
+    mock_autopilot.stop()
+
+
+@pytest.fixture
+def connection(mock_autopilot: MockAutopilot) -> Iterator[mavutil.mavfile]:
+    connection = mavutil.mavlink_connection(mock_autopilot.connection_string)
+    assert connection.wait_heartbeat(timeout=2) is not None
+    yield connection
+    connection.close()
+
+
+def test_params(mock_autopilot: MockAutopilot, connection: mavutil.mavfile) -> None:
+    connection.mav.param_request_list_send(1, 1)
+    param_indexes: Set[int] = set()
+    while len(param_indexes) < 5000:
+        msg = connection.recv_match(type="PARAM_VALUE", blocking=True, timeout=2)
+        assert msg is not None and msg.param_count == 5000
+        param_indexes.add(msg.param_index)
+
+    start_time = time.monotonic()
+    connection.param_set_send("FLTMODE1", 6)
+    msg = connection.recv_match(type="PARAM_VALUE", blocking=True, timeout=2)
+    assert time.monotonic() - start_time >= mock_autopilot.latency
+    assert (msg.param_id, msg.param_value) == ("FLTMODE1", 6)
+
+
+def test_mission(connection: mavutil.mavfile) -> None:
+    connection.mav.mission_request_list_send(1, 1, mission_type=0)
+    msg = connection.recv_match(type="MISSION_COUNT", blocking=True, timeout=2)
+    assert msg.count == 21
+
+    connection.mav.mission_count_send(1, 1, 2, mission_type=0)
+    for seq in range(2):
+        msg = connection.recv_match(type="MISSION_REQUEST", blocking=True, timeout=2)
+        assert msg.seq == seq
+        connection.mav.mission_item_int_send(
+            1, 1, seq, 3, 16, 0, 1, 0, 0, 0, 0, seq, seq, 10, mission_type=0
+        )
+    msg = connection.recv_match(type="MISSION_ACK", blocking=True, timeout=2)
+    assert msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED
+
+    connection.mav.mission_request_int_send(1, 1, 1, mission_type=0)
+    msg = connection.recv_match(type="MISSION_ITEM_INT", blocking=True, timeout=2)
+    assert (msg.seq, msg.x, msg.z) == (1, 1, 10)
+
+
+def test_commandsAndStreams(
+    mock_autopilot: MockAutopilot, connection: mavutil.mavfile
+) -> None:
+    connection.mav.command_long_send(
+        1, 1, mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0, 1, 0, 0, 0, 0, 0, 0
+    )
+    msg = connection.recv_match(type="COMMAND_ACK", blocking=True, timeout=2)
+    assert msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+    assert mock_autopilot.armed
+
+    connection.mav.request_data_stream_send(
+        1, 1, mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS, 10, 1
+    )
+    msg = connection.recv_match(type="SYS_STATUS", blocking=True, timeout=2)
+    assert msg.onboard_control_sensors_health == 1467063343
+
+
+def test_sendBurst(mock_autopilot: MockAutopilot, connection: mavutil.mavfile) -> None:
+    mock_autopilot.sendBurst("ATTITUDE", 100)
+    for _ in range(100):
+        assert connection.recv_match(type="ATTITUDE", blocking=True, timeout=2)
@@ -1,5 +1,6 @@
 import pytest
-from typing import Optional, Union
+from types import SimpleNamespace
+from typing import Dict, Optional, Union
 from flask_socketio.test_client import SocketIOTestClient
 
 from . import falcon_test
@@ -10,7 +11,7 @@ from typing import List, Any
 def send_and_receive_params(
     client: SocketIOTestClient,
     endpoint: str,
-    args: Optional[Union[List[Any], str]] = None,
+    args: Optional[Union[List[Any], Dict[str, Any], str]] = None,
 ) -> dict:
     """
     Sends a request to the socketio test client and awaits a response, returning the entire response (name and args)
@@ -18,7 +19,7 @@ def send_and_receive_params(
     Args:
         client: The socketio test client
         endpoint(str): The endpoint to send the request to
-        args(Optional[Union[List[Any], str]]): The arguments to pass to the endpoint
+        args(Optional[Union[List[Any], Dict[str, Any], str]]): The arguments to pass to the endpoint
 
     Returns:
          The data received from the client (name and arguments of the socket.emit)
@@ -44,7 +45,7 @@ def assert_test_params(data: dict, message: dict, name: str) -> None:
 def test_setMultipleParams_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
     socketio_result = send_and_receive_params(
         socketio_client, "set_multiple_params", []
     )
@@ -56,11 +57,36 @@ def test_setMultipleParams_wrongState(
     )
 
 
+@falcon_test(pass_drone_status=True)
+def test_setMultipleParams_stateIsPerVehicle(
+    socketio_client: SocketIOTestClient, droneStatus
+) -> None:
+    # Another vehicle on a different screen doesn't take the selected vehicle's state
+    other_drone = SimpleNamespace(state="dashboard", vehicle_id=None)
+    droneStatus.vehicles.add(other_drone, vehicle_id="other")
+    try:
+        droneStatus.drone.state = "params"
+        socketio_result = send_and_receive_params(
+            socketio_client,
+            "set_multiple_params",
+            {"params": [], "vehicle_id": "other"},
+        )
+    finally:
+        droneStatus.vehicles.remove("other")
+
+    assert_test_params(
+        socketio_result,
+        {"message": "You must be on the params screen to save parameters."},
+        "params_error",
+    )
+    assert droneStatus.drone.state == "params"
+
+
 @falcon_test(pass_drone_status=True)
 def test_setMultipleParams_missingData(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_result = send_and_receive_params(
         socketio_client, "set_multiple_params", []
     )
@@ -75,7 +101,7 @@ def test_setMultipleParams_invalidData(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
     # Invalid Param Type
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_result = send_and_receive_params(
         socketio_client,
         "set_multiple_params",
@@ -200,7 +226,7 @@ def test_setMultipleParams_invalidData(
 def test_setMultipleParams_paramSetTimeout(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     with ParamSetTimeout():
         socketio_result = send_and_receive_params(
             socketio_client,
@@ -216,7 +242,7 @@ def test_setMultipleParams_paramSetTimeout(
 def test_setMultipleParams_successfullySet_paramsState(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_result = send_and_receive_params(
         socketio_client,
         "set_multiple_params",
@@ -234,7 +260,7 @@ def test_setMultipleParams_successfullySet_paramsState(
 def test_setMultipleParams_successfullySet_configState(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "config"
+    droneStatus.drone.state = "config"
     socketio_result = send_and_receive_params(
         socketio_client,
         "set_multiple_params",
@@ -252,7 +278,7 @@ def test_setMultipleParams_successfullySet_configState(
 def test_refreshParams_wrongState(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "dashboard"
+    droneStatus.drone.state = "dashboard"
     socketio_result = send_and_receive_params(socketio_client, "refresh_params")
     assert_test_params(
         socketio_result,
@@ -265,7 +291,7 @@ def test_refreshParams_wrongState(
 def test_refreshParams_timeout(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     with ParamRefreshTimeout():
         socketio_result = send_and_receive_params(socketio_client, "refresh_params")
         assert (
@@ -287,7 +313,7 @@ def test_refreshParams_timeout(
 def test_refreshParams_successfullyRefreshed(
     socketio_client: SocketIOTestClient, droneStatus
 ) -> None:
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_result = send_and_receive_params(socketio_client, "refresh_params")
     assert (
         socketio_result["name"] == "param_request_update"
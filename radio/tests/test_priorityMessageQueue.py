@@ -0,0 +1,84 @@
+from queue import Empty
+
+import pytest
+from app.priorityMessageQueue import PriorityMessageQueue
+from pymavlink import mavutil
+
+
+def attitude() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_attitude_message(0, 0, 0, 0, 0, 0, 0)
+
+
+def sysStatus() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_sys_status_message(
+        0, 0, 0, 250, 12400, 1500, 80, 0, 0, 0, 0, 0, 0
+    )
+
+
+def heartbeat() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_heartbeat_message(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+        0,
+        0,
+        0,
+        3,
+    )
+
+
+def test_get_returnsHighestPriorityFirst() -> None:
+    queue = PriorityMessageQueue()
+    for msg in [attitude(), sysStatus(), attitude(), heartbeat()]:
+        queue.put(msg)
+
+    assert [queue.get(timeout=0).get_type() for _ in range(4)] == [
+        "HEARTBEAT",
+        "SYS_STATUS",
+        "ATTITUDE",
+        "ATTITUDE",
+    ]
+    assert queue.empty()
+
+
+def test_get_raisesEmptyOnTimeout() -> None:
+    queue = PriorityMessageQueue()
+    with pytest.raises(Empty):
+        queue.get(timeout=0.01)
+
+
+def test_setPriorities_changesClasses() -> None:
+    queue = PriorityMessageQueue()
+    queue.setPriorities(critical_messages=["ATTITUDE"], status_messages=[])
+    queue.put(heartbeat())
+    queue.put(attitude())
+
+    assert queue.get(timeout=0).get_type() == "ATTITUDE"
+
+
+def test_getStats_recordsEachClass() -> None:
+    queue = PriorityMessageQueue()
+    queue.put(heartbeat())
+    queue.put(attitude())
+    queue.put(attitude())
+    queue.get(timeout=0)
+    queue.get(timeout=0)
+
+    stats = queue.getStats()
+    assert stats["critical"]["processed"] == 1
+    assert stats["status"]["processed"] == 0
+    assert stats["bulk"]["processed"] == 1
+    assert stats["bulk"]["queued"] == 1
+    assert stats["bulk"]["max_wait"] >= stats["bulk"]["average_wait"] >= 0
+
+
+def test_dropOldest_dropsLowestPriorityFirst() -> None:
+    queue = PriorityMessageQueue(max_size=2)
+    queue.put(attitude())
+    queue.put(heartbeat())
+    queue.put(sysStatus())
+
+    assert [queue.get(timeout=0).get_type() for _ in range(2)] == [
+        "HEARTBEAT",
+        "SYS_STATUS",
+    ]
+    assert queue.getQueueStats()["dropped"] == 1
@@ -6,7 +6,7 @@ from .helpers import NoDrone
 
 @falcon_test(pass_drone_status=True)
 def test_getRcConfig_wrongState(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "params"
+    droneStatus.drone.state = "params"
     socketio_client.emit("get_rc_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -18,7 +18,7 @@ def test_getRcConfig_wrongState(socketio_client: SocketIOTestClient, droneStatus
 
 @falcon_test(pass_drone_status=True)
 def test_getRcConfig_correctState(socketio_client: SocketIOTestClient, droneStatus):
-    droneStatus.state = "config.rc"
+    droneStatus.drone.state = "config.rc"
     socketio_client.emit("get_rc_config")
     socketio_result = socketio_client.get_received()[0]
 
@@ -52,7 +52,7 @@ def test_getRcConfig_correctState(socketio_client: SocketIOTestClient, droneStat
 def test_getRcConfig_noDroneConnection(
     socketio_client: SocketIOTestClient, droneStatus
 ):
-    droneStatus.state = "config.rc"
+    droneStatus.drone.state = "config.rc"
 
     with NoDrone():
         socketio_client.emit("get_rc_config")
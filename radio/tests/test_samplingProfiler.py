@@ -0,0 +1,51 @@
+import pstats
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from app.samplingProfiler import SamplingProfiler
+
+
+def busyWait(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profile_writesCollapsedStacksAndPstats(tmp_path: Path) -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=busyWait, args=(stop,), name="busy worker")
+    worker.start()
+
+    profiler = SamplingProfiler(tmp_path, interval=0.002)
+    profiler.start()
+    with pytest.raises(RuntimeError):
+        profiler.start()
+    time.sleep(0.3)
+    profile = profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profile is not None and profile["samples"] > 10
+    assert not profiler.is_running
+    assert profiler.stop() is None
+
+    lines = Path(profile["collapsed_file"]).read_text().splitlines()
+    busy_lines = [line for line in lines if line.startswith("busy_worker;")]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert "busyWait_(test_samplingProfiler.py:" in stack and int(count) > 0
+
+    stats_profile = pstats.Stats(profile["pstats_file"]).get_stats_profile()
+    assert stats_profile.func_profiles["busyWait"].cumtime > 0
+
+
+def test_profile_stopsAfterDuration(tmp_path: Path) -> None:
+    profiler = SamplingProfiler(tmp_path, interval=0.005)
+    profiler.start(duration=0.05)
+    time.sleep(0.3)
+
+    status = profiler.getStatus()
+    assert not status["running"]
+    assert status["last_profile"] is not None
+    assert Path(status["last_profile"]["pstats_file"]).is_file()
@@ -0,0 +1,61 @@
+import time
+
+from app.mockAutopilot import MockAutopilot
+from app.selectiveDecoder import SelectiveDecoder, isSkippedMessage
+from pymavlink import mavutil
+
+
+def test_skipsUnwantedMessages() -> None:
+    mock_autopilot = MockAutopilot()
+    mock_autopilot.start()
+    connection = mavutil.mavlink_connection(mock_autopilot.connection_string)
+    try:
+        assert connection.wait_heartbeat(timeout=2) is not None
+        decoder = SelectiveDecoder(
+            connection.mav, lambda msg_type: msg_type in ("HEARTBEAT", "ATTITUDE")
+        )
+
+        mock_autopilot.sendBurst("ATTITUDE", 50)
+        mock_autopilot.sendBurst("VFR_HUD", 50)
+        count_before = connection.mav_count
+        received = {"ATTITUDE": 0, "VFR_HUD": 0}
+        deadline = time.monotonic() + 2
+        while sum(received.values()) < 100 and time.monotonic() < deadline:
+            msg = connection.recv_msg()
+            if msg is None or msg.get_type() not in received:
+                continue
+            received[msg.get_type()] += 1
+            if msg.get_type() == "ATTITUDE":
+                assert not isSkippedMessage(msg) and msg.roll is not None
+            else:
+                assert isSkippedMessage(msg)
+                assert msg.get_srcSystem() == 1
+                assert msg.get_msgbuf() and msg.get_payload()
+
+        assert received == {"ATTITUDE": 50, "VFR_HUD": 50}
+        assert decoder.skipped_types == {"VFR_HUD": 50}
+        # The sequence numbers of skipped messages are still counted by mavutil
+        assert connection.mav_count - count_before >= 100
+        assert connection.mav_loss == 0
+
+        decoder.remove()
+        mock_autopilot.sendBurst("VFR_HUD", 1)
+        msg = connection.recv_match(type="VFR_HUD", blocking=True, timeout=2)
+        assert not isSkippedMessage(msg)
+    finally:
+        connection.close()
+        mock_autopilot.stop()
+
+
+def test_verifyCrc() -> None:
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    frame = bytearray(mav.vfr_hud_encode(1, 2, 3, 4, 5, 6).pack(mav))
+    frame[-1] ^= 0xFF
+
+    parser = mavutil.mavlink.MAVLink(None)
+    parser.robust_parsing = True
+    decoder = SelectiveDecoder(parser, lambda msg_type: False)
+    assert parser.parse_char(frame).get_type() == "BAD_DATA"
+
+    decoder.verify_crc = False
+    assert isSkippedMessage(parser.parse_char(frame))
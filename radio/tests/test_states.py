@@ -28,30 +28,30 @@ def test_setState(socketio_client: SocketIOTestClient, droneStatus) -> None:
     # Success on changing state to dashboard
     socketio_client.emit("set_state", {"state": "dashboard"})
     assert len(socketio_client.get_received()) == 0
-    assert len(droneStatus.drone.message_listeners) == 13
+    assert len(droneStatus.drone.messageBus.subscribedMessageTypes()) == 13
 
-    droneStatus.drone.message_listeners = {}
+    droneStatus.drone.messageBus.clear()
 
     socketio_client.emit("set_state", {"state": "graphs"})
     assert len(socketio_client.get_received()) == 0
-    assert len(droneStatus.drone.message_listeners) == 3
+    assert len(droneStatus.drone.messageBus.subscribedMessageTypes()) == 3
 
-    droneStatus.drone.message_listeners = {}
+    droneStatus.drone.messageBus.clear()
 
     socketio_client.emit("set_state", {"state": "config.flight_modes"})
     assert len(socketio_client.get_received()) == 0
-    assert len(droneStatus.drone.message_listeners) == 2
+    assert len(droneStatus.drone.messageBus.subscribedMessageTypes()) == 2
 
-    droneStatus.drone.message_listeners = {}
+    droneStatus.drone.messageBus.clear()
 
     socketio_client.emit("set_state", {"state": "config.rc"})
     assert len(socketio_client.get_received()) == 0
-    assert len(droneStatus.drone.message_listeners) == 0
+    assert len(droneStatus.drone.messageBus.subscribedMessageTypes()) == 0
 
-    droneStatus.drone.message_listeners = {}
+    droneStatus.drone.messageBus.clear()
 
     pytest.skip(reason="Issues with parameterController to be fixed in alpha 0.1.8")
     socketio_client.emit("set_state", {"state": "params"})
     time.sleep(15)
     assert len(socketio_client.get_received()[-1]["args"][0]) == 1400
-    assert len(droneStatus.drone.message_listeners) == 0
+    assert len(droneStatus.drone.messageBus.subscribedMessageTypes()) == 0
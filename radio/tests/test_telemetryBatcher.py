@@ -0,0 +1,42 @@
+from typing import List
+
+from app.telemetryBatcher import TelemetryBatch, TelemetryBatcher
+from pymavlink import mavutil
+
+
+def attitude(time_boot_ms: int) -> mavutil.mavlink.MAVLink_message:
+    msg = mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0.1, 0, 0, 0, 0, 0)
+    msg._timestamp = 1000.0 + time_boot_ms
+    return msg
+
+
+def test_flush_sendsAllMessagesAsOneBatch() -> None:
+    batches: List[TelemetryBatch] = []
+    batcher = TelemetryBatcher(batches.append, interval=10)
+
+    for time_boot_ms in range(3):
+        batcher.add(attitude(time_boot_ms))
+
+    # Not due yet
+    assert batcher.flush() == 0
+    assert batches == []
+
+    assert batcher.flush(force=True) == 3
+    assert len(batches) == 1
+
+    batch = batches[0]
+    assert batch["fields"]["ATTITUDE"][:3] == ["timestamp", "time_boot_ms", "roll"]
+    assert [record[:4] for record in batch["records"]] == [
+        ["ATTITUDE", 1000.0, 0, 0.1],
+        ["ATTITUDE", 1001.0, 1, 0.1],
+        ["ATTITUDE", 1002.0, 2, 0.1],
+    ]
+
+
+def test_flush_emptyBatchIsNotSent() -> None:
+    batches: List[TelemetryBatch] = []
+    batcher = TelemetryBatcher(batches.append)
+
+    assert batcher.timeUntilNextFlush() is None
+    assert batcher.flush(force=True) == 0
+    assert batches == []
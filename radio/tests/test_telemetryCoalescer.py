@@ -0,0 +1,84 @@
+from typing import List
+
+from app.telemetryCoalescer import TelemetryCoalescer
+from pymavlink import mavutil
+
+
+def attitude(roll: float) -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_attitude_message(0, roll, 0, 0, 0, 0, 0)
+
+
+def batteryStatus(battery_id: int, voltage: int) -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_battery_status_message(
+        battery_id, 0, 0, 0, [voltage] + [65535] * 9, 0, 0, 0, 50
+    )
+
+
+def heartbeat() -> mavutil.mavlink.MAVLink_message:
+    return mavutil.mavlink.MAVLink_heartbeat_message(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+        0,
+        0,
+        0,
+        3,
+    )
+
+
+def test_push_keepsNewestSampleUntilFlush() -> None:
+    emitted: List[mavutil.mavlink.MAVLink_message] = []
+    coalescer = TelemetryCoalescer(emitted.append, rate=10)
+
+    for roll in range(5):
+        coalescer.push(attitude(roll))
+
+    assert emitted == []
+    assert coalescer.coalesced_count == 4
+    wait = coalescer.timeUntilNextFlush()
+    assert wait is not None and 0 <= wait <= 0.1
+
+    assert coalescer.flush(force=True) == 1
+    assert emitted[0].roll == 4
+    assert coalescer.timeUntilNextFlush() is None
+
+
+def test_push_keepsNewestSampleOfEachInstance() -> None:
+    emitted: List[mavutil.mavlink.MAVLink_message] = []
+    coalescer = TelemetryCoalescer(emitted.append, rate=10)
+
+    for voltage in (12000, 12100):
+        coalescer.push(batteryStatus(0, voltage))
+        coalescer.push(batteryStatus(1, voltage + 1000))
+
+    assert coalescer.flush(force=True) == 2
+    assert sorted((msg.id, msg.voltages[0]) for msg in emitted) == [
+        (0, 12100),
+        (1, 13100),
+    ]
+
+
+def test_push_bypassMessagesAreForwardedImmediately() -> None:
+    emitted: List[mavutil.mavlink.MAVLink_message] = []
+    coalescer = TelemetryCoalescer(emitted.append, rate=10)
+
+    coalescer.push(heartbeat())
+    assert [msg.get_type() for msg in emitted] == ["HEARTBEAT"]
+
+
+def test_flush_waitsForInterval() -> None:
+    emitted: List[mavutil.mavlink.MAVLink_message] = []
+    coalescer = TelemetryCoalescer(emitted.append, rate=1)
+
+    coalescer.push(attitude(1))
+    assert coalescer.flush() == 0
+    assert emitted == []
+
+
+def test_zeroRate_disablesCoalescing() -> None:
+    emitted: List[mavutil.mavlink.MAVLink_message] = []
+    coalescer = TelemetryCoalescer(emitted.append, rate=0)
+
+    for roll in range(3):
+        coalescer.push(attitude(roll))
+
+    assert len(emitted) == 3
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from app.tlogCapture import convertTlogToFtlog, formatFtlogLine, formatTlogRecord
+from pymavlink import mavutil
+
+
+def attitude(timestamp: float, roll: float) -> mavutil.mavlink.MAVLink_message:
+    msg = mavutil.mavlink.MAVLink_attitude_message(1000, roll, 0.5, 0.0, 0.0, 0.0, 0.0)
+    msg.pack(mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1))
+    msg._timestamp = timestamp
+    return msg
+
+
+def test_formatFtlogLine() -> None:
+    line = formatFtlogLine(attitude(1718000000.5, 0.25))
+
+    assert line == (
+        "1718000000.5,ATTITUDE,time_boot_ms:1000,roll:0.25,pitch:0.5,yaw:0.0,"
+        "rollspeed:0.0,pitchspeed:0.0,yawspeed:0.0"
+    )
+
+
+def test_convertTlogToFtlog(tmp_path: Path) -> None:
+    tlog_file = tmp_path.joinpath("flight.tlog")
+    messages = [attitude(1718000000.5 + i, i / 4) for i in range(3)]
+    with open(tlog_file, "wb") as f:
+        for msg in messages:
+            f.write(formatTlogRecord(msg))
+
+    ftlog_file = convertTlogToFtlog(tlog_file)
+
+    assert ftlog_file == tmp_path.joinpath("flight.ftlog")
+    lines = ftlog_file.read_text().splitlines()
+    assert lines[0].startswith("==START_TIME==")
+    assert lines[1:] == [formatFtlogLine(msg) for msg in messages]
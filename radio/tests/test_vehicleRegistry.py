@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+from app.drone import Drone
+from app.vehicleRegistry import VehicleRegistry, getVehicleRoom
+
+
+def fakeDrone(port: str, target_system: int = 1) -> Drone:
+    return cast(
+        Drone,
+        SimpleNamespace(
+            port=port,
+            target_system=target_system,
+            target_component=1,
+            aircraft_type=2,
+            vehicle_id=None,
+        ),
+    )
+
+
+def test_add_usesSystemIdThenPort() -> None:
+    registry = VehicleRegistry()
+    first = fakeDrone("tcp:127.0.0.1:5760")
+    second = fakeDrone("tcp:127.0.0.1:5770")
+    third = fakeDrone("tcp:127.0.0.1:5780", target_system=2)
+
+    assert registry.add(first) == "1"
+    # Two vehicles on the default system ID are told apart by their port
+    assert registry.add(second) == "tcp:127.0.0.1:5770"
+    assert registry.add(third) == "2"
+    assert second.vehicle_id == "tcp:127.0.0.1:5770"
+    assert registry.get("2") is third
+    assert [info["vehicle_id"] for info in registry.getVehicleInfo()] == [
+        "1",
+        "tcp:127.0.0.1:5770",
+        "2",
+    ]
+
+    with pytest.raises(ValueError):
+        registry.add(fakeDrone("tcp:127.0.0.1:5790"), vehicle_id="2")
+
+
+def test_remove() -> None:
+    registry = VehicleRegistry()
+    drone = fakeDrone("tcp:127.0.0.1:5760")
+    registry.add(drone, vehicle_id="leader")
+
+    assert "leader" in registry
+    assert registry.getVehicleId(drone) == "leader"
+    assert registry.remove("leader") is drone
+    assert drone.vehicle_id is None
+    assert len(registry) == 0
+    assert registry.remove("leader") is None
+    assert getVehicleRoom("leader") == "vehicle_leader"
@@ -0,0 +1,58 @@
+from app.customTypes import VehicleType
+from app.vehicleState import VehicleState
+from pymavlink import mavutil
+
+
+def heartbeat(base_mode: int, custom_mode: int) -> mavutil.mavlink.MAVLink_message:
+    msg = mavutil.mavlink.MAVLink_heartbeat_message(
+        mavutil.mavlink.MAV_TYPE_FIXED_WING,
+        mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+        base_mode,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+        3,
+    )
+    msg._header.srcSystem = 1
+    msg._header.srcComponent = 1
+    return msg
+
+
+def homePosition(srcSystem: int = 1) -> mavutil.mavlink.MAVLink_message:
+    msg = mavutil.mavlink.MAVLink_home_position_message(
+        525000000, -15000000, 100000, 0, 0, 0, [1, 0, 0, 0], 0, 0, 0
+    )
+    msg._header.srcSystem = srcSystem
+    return msg
+
+
+def test_heartbeat_updatesArmedModeAndType() -> None:
+    state = VehicleState(1, 1)
+    assert not state.armed
+    assert state.mode is None
+
+    state.update(heartbeat(mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED, 10))
+
+    assert state.armed
+    assert state.mode == 10
+    assert state.aircraft_type == VehicleType.FIXED_WING.value
+    assert state.getAge("armed") >= 0
+
+
+def test_homePosition_cachedUntilCleared() -> None:
+    state = VehicleState(1, 1)
+    state.update(homePosition())
+
+    assert state.home_position == {"lat": 525000000, "lon": -15000000, "alt": 100000}
+    assert state.getTimestamp("home_position") is not None
+
+    state.clear("home_position")
+    assert state.home_position is None
+    assert state.getTimestamp("home_position") is None
+
+
+def test_update_ignoresOtherSystems() -> None:
+    state = VehicleState(1, 1)
+    state.update(homePosition(srcSystem=2))
+
+    assert state.home_position is None
+    assert state.snapshot() == {}